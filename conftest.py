@@ -1,32 +1,38 @@
+from __future__ import annotations
+
 import pathlib
 import sys
-import os, inspect
+import os, inspect, time
+
+# --profile-startup: must hook imports before the heavy ones below
+from src.utils.startup_profiler import maybe_start_import_timer, get_profile, load_reports, summarize, REPORT_DIR as STARTUP_REPORT_DIR
+maybe_start_import_timer()
+
 from pathlib import Path
-import requests
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 import json, base64
-from typing import Generator, Dict, Any, Optional, Callable, List, Set
+from typing import TYPE_CHECKING, Generator, Dict, Any, Optional, Callable, List, Set
 import pytest
-from playwright.sync_api import (Playwright, BrowserType, Browser, BrowserContext, Page, APIRequestContext)
-import allure
+import allure  # loaded by allure-pytest-bdd and api_reporting anyway
 import sqlite3
 from contextlib import contextmanager
-from src.config.settings import get_settings, Settings
-
-# Appium imports can be optional if not always installed
-try:
-    from appium import webdriver as appium_driver
-    from appium.options.android import UiAutomator2Options
-    from appium.options.ios import XCUITestOptions
-except Exception:
-    appium_driver = None
-    UiAutomator2Options = None
-    XCUITestOptions = None
-
-from src.utils.logger import get_logger
+from src.config.settings import get_settings, prime_settings, Settings
+
+from src.utils.logger import get_logger, shutdown_logger
 from src.utils.api.api_reporting import ApiRecorder
-from src.api.execution.executor import make_api_executor
+from src.api.execution.endpoints import endpoint_key
+from src.api.execution.deadline import start_deadline
+from src.utils import step_loader, bdd_cache, step_index, duration_schedule, impact, har
+from src.utils.performance import latency_histogram, baselines, resource_sampler, memtrack, hotpath
+from src.utils.ui.auth_state import AuthStateCache, form_login, TAG_PREFIX as AUTH_ROLE_TAG
+from src.utils.ui.asset_cache import AssetCache, block_list
+from src.utils.ui.context_pool import ContextPool
+from src.utils.ui import readiness
+
+if TYPE_CHECKING:  # annotations only; the executor is imported by the api_executor fixture
+    from playwright.sync_api import Playwright, BrowserType, Browser, BrowserContext, Page, APIRequestContext
+
 logger = get_logger(__name__)
 
 ROOT = pathlib.Path(__file__).parent.resolve()
@@ -37,18 +43,22 @@ STEPS_DIR = ROOT / "step_definitions"
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-def _discover_step_modules():
-    mods = []
-    if STEPS_DIR.is_dir():
-        for py in STEPS_DIR.rglob("*_steps.py"):
-            mod = ".".join(py.relative_to(ROOT).with_suffix("").parts)  # e.g. step_definitions.api.auth_api_steps
-            mods.append(mod)
-    # optional: print for debug
-    for m in sorted(set(mods)):
-        print(f"[bdd] registering step plugin: {m}")
-    return sorted(set(mods))
+# Step glue is registered after collection, only for the stacks the selected
+# scenarios use (see src/utils/step_loader.py). BDD_EAGER_STEPS=1 = old behaviour.
+STEP_MODULES = step_loader.discover(STEPS_DIR, ROOT)
+
+if step_loader.eager_requested():
+    pytest_plugins = [m for mods in STEP_MODULES.values() for m in mods]
+    for _m in pytest_plugins:
+        print(f"[bdd] registering step plugin: {_m}")
 
-pytest_plugins = _discover_step_modules()
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    # Runs on each xdist worker too, against the items that worker collected.
+    # --collect-only never needs step glue, so nothing is imported then.
+    if session.config.option.collectonly or step_loader.eager_requested():
+        return
+    step_loader.register_for_items(session.config, session.items, STEP_MODULES)
 
 # -------------------------
 # Robust SQLite Test Data Store (xdist-safe)
@@ -254,6 +264,50 @@ def pytest_addoption(parser):
     parser.addoption("--user-role", action="store", default="user", help="Test user role (e.g. user, admin)")
     parser.addoption("--api-worker-html", action="store_true", default=False, help="Also write per-worker HTML under reports/workers/")
     parser.addoption("--api-clean-workers", action="store_true", default=False, help="Delete reports/workers/* after combining")
+    parser.addoption("--profile-startup", action="store_true", default=False, help="Report import and fixture-setup time per module (reports/startup/)")
+    parser.addoption(
+        "--perf-baseline", action="store", default="compare", choices=["off", "compare", "update"],
+        help="Compare API latency per endpoint with the stored baseline for --env (update: also add this run to it if clean)",
+    )
+    parser.addoption(
+        "--resources", action="store", default="off", choices=["off", "process", "children"],
+        help="Sample CPU/RSS/FDs/threads/IO in the background and report per-test deltas (children: include browsers/drivers)",
+    )
+    parser.addoption("--resources-interval", action="store", type=float, default=0.5, help="Seconds between resource samples")
+    parser.addoption(
+        "--profile", action="store_true", default=False,
+        help="Time setup/call/teardown, fixtures, steps and API phases (transport, recording, redaction, png...). "
+             "Breakdown + collapsed stacks under reports/profile*",
+    )
+    parser.addoption("--profile-sample", action="store_true", default=False, help="--profile plus a sampling profiler (implies --profile)")
+    parser.addoption("--memtrack", action="store_true", default=False, help="tracemalloc heap growth per test + per-worker leak report (slow)")
+    parser.addoption("--memtrack-threshold", action="store", type=float, default=256, help="--memtrack: list allocation sites of tests that leave more than this many KB behind")
+    parser.addoption(
+        "--check-steps", action="store", default=os.getenv("CHECK_STEPS", "summary"), choices=["off", "summary", "warn", "strict"],
+        help="Check selected scenarios for steps with no definition at collection time "
+             "(summary: one line; warn: list them; strict: list them and fail them before setup)",
+    )
+    parser.addoption(
+        "--schedule", action="store", default=os.getenv("TEST_SCHEDULE", "off"), choices=["off", "record", "durations"],
+        help="record: keep per-test durations in test-durations/<env>.json; durations: also plan the xdist "
+             "queues from them (longest first, browser/mobile tests grouped), work stealing on top",
+    )
+    parser.addoption(
+        "--changed-since", action="store", default=None, metavar="GIT_REF",
+        help="Only run tests affected by files changed since merge-base(GIT_REF, HEAD) (test-impact/index.json)",
+    )
+    parser.addoption("--impact-record", action="store_true", default=False, help="Trace which repo files each test runs and update test-impact/index.json (slow)")
+    parser.addoption(
+        "--context-pool", action="store_true", default=os.getenv("CONTEXT_POOL", "").lower() in ("1", "true", "yes"),
+        help="Reuse browser contexts across tests on a worker: reset between tests, recycle after N uses/failures/leaks",
+    )
+    parser.addoption(
+        "--har", action="store", default=os.getenv("HAR_MODE", "off"), choices=["off", "record", "replay"],
+        help="record: save UI/API traffic per scenario under hars/<env>/; replay: answer it from there (no backend)",
+    )
+    parser.addoption("--asset-cache", action="store_true", default=os.getenv("ASSET_CACHE", "").lower() in ("1", "true", "yes"), help="Serve static UI assets from an on-disk cache shared by workers (.asset-cache/)")
+    parser.addoption("--block-third-party", action="store_true", default=os.getenv("BLOCK_THIRD_PARTY", "").lower() in ("1", "true", "yes"), help="Abort UI requests to analytics/ads domains (+ UI_BLOCK_DOMAINS)")
+    parser.addoption("--context-pool-max-uses", action="store", type=int, default=int(os.getenv("CONTEXT_POOL_MAX_USES", "25")), help="--context-pool: recycle a context after this many tests")
 
 # ---------------------------
 # Helpers
@@ -308,7 +362,11 @@ def session_context(request) -> Settings:
     os.environ["TEST_ENV"] = env
 
     # 2) build the singleton (loads .env, json configs, validates, etc.)
+    #    xdist workers get a pre-resolved snapshot from the controller (see pytest_configure_node)
     settings = get_settings()
+    prof = get_profile()
+    if prof:
+        prof.mark("settings_ready")
 
     # 3) resolve allure results dir SAME as pytest/allure uses
     try:
@@ -332,6 +390,8 @@ def session_context(request) -> Settings:
             f.write(f"BASE_URL={settings.base_url}\n")
             f.write(f"API_BASE_URL={settings.api_base_url}\n")
             f.write(f"TIMEOUT={settings.timeout}\n")
+            f.write(f"CONNECT_TIMEOUT={settings.connect_timeout}\n")
+            f.write(f"SCENARIO_TIMEOUT={settings.scenario_timeout}\n")
             # Only the REAL runtime worker count:
             f.write(f"XDIST_WORKERS={actual_workers}\n")
             f.write(f"RUN_SMOKE_ONLY={settings.should_run_smoke_only()}\n")
@@ -395,6 +455,268 @@ def pytest_sessionstart(session):
     # PLease do not delete, Keep for non-Allure early setup if needed; do NOT call allure.attach here.
     pass
 
+# ---------------------------
+# Settings hand-off to xdist workers
+# - The controller resolves Settings once (.env, environments.json, validation, test data)
+# - Each worker gets the JSON snapshot via workerinput and skips the full build
+# ---------------------------
+def _controller_settings_snapshot(config) -> Optional[str]:
+    cached = getattr(config, "_settings_snapshot", None)
+    if cached is None:
+        os.environ["TEST_ENV"] = config.getoption("--env")
+        try:
+            cached = json.dumps(get_settings().to_snapshot())
+        except Exception as e:
+            # Workers will resolve (and report) the problem themselves, as before
+            logger.warning(f"Settings not shared with workers: {e}")
+            cached = ""
+        config._settings_snapshot = cached
+    return cached or None
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    # --schedule=durations replaces load / worksteal; other --dist modes keep their own grouping
+    if config.getoption("--schedule") == "durations" and config.getvalue("dist") in ("load", "worksteal"):
+        return duration_schedule.make_scheduler(config, log, config.getoption("--env"))
+    return None
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    snapshot = _controller_settings_snapshot(node.config)
+    if snapshot:
+        node.workerinput["settings_snapshot"] = snapshot
+
+def pytest_configure(config):
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput and workerinput.get("settings_snapshot"):
+        prime_settings(json.loads(workerinput["settings_snapshot"]))
+    elif workerinput is None and getattr(config.option, "numprocesses", None):
+        # Controller: resolve before xdist spawns any worker, so every worker inherits the same environment
+        _controller_settings_snapshot(config)
+
+    # Parsed-feature cache dir (.pytest_cache/d/bdd) + indexed step lookup
+    bdd_cache.configure(config)
+
+    prof = get_profile()
+    if prof:
+        prof.mark("configure")
+        if _xdist_is_master(config):
+            # Stale files from an earlier run with more workers would skew the summary
+            for fp in STARTUP_REPORT_DIR.glob("*.json"):
+                try:
+                    fp.unlink()
+                except Exception:
+                    pass
+
+    if _xdist_is_master(config):
+        # Per-endpoint latency histograms: start from an empty reports/latency/
+        latency_histogram.clear_worker_files()
+        resource_sampler.clear_worker_files()
+        memtrack.clear_worker_files()
+        hotpath.clear_worker_files()
+        impact.clear_worker_files()
+        latency_histogram.clear_worker_files(readiness.REPORT_DIR)
+
+    # --resources: every process (controller and each xdist worker) samples itself
+    mode = config.getoption("--resources")
+    if mode != "off":
+        resource_sampler.start_sampler(config.getoption("--resources-interval"), children=(mode == "children"))
+    # --profile: phase timers (+ sampling) in every process that runs tests
+    if _profiling(config) and not (_xdist_is_master(config) and _resolve_xdist_workers(config) > 1):
+        hotpath.start_profiler(sample=config.getoption("--profile-sample"))
+        config.pluginmanager.register(_PhaseProfilePlugin(), "phase-profile")
+    # --impact-record: which repo files each test executes
+    if config.getoption("--impact-record") and not (_xdist_is_master(config) and _resolve_xdist_workers(config) > 1):
+        impact.start_recorder(ROOT)
+    # --memtrack: only processes that run tests (workers, or the single process without xdist)
+    if config.getoption("--memtrack") and not (_xdist_is_master(config) and _resolve_xdist_workers(config) > 1):
+        memtrack.start_tracker(config.getoption("--memtrack-threshold"))
+
+def pytest_unconfigure(config):
+    # Let the background log writer drain before the interpreter exits
+    shutdown_logger()
+
+# ---------------------------
+# --profile-startup hooks (no-ops unless profiling)
+# ---------------------------
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    prof = get_profile()
+    # --schedule: what a browser / mobile driver costs a worker to set up
+    heavy = fixturedef.argname in duration_schedule.HEAVY_FIXTURES and request.config.getoption("--schedule") != "off"
+    if prof is None and not heavy:
+        yield
+        return
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    if prof is not None:
+        module = getattr(fixturedef.func, "__module__", None) or "?"
+        prof.add_fixture(module, fixturedef.argname, elapsed)
+    item = getattr(request, "_pyfuncitem", None)
+    if heavy and item is not None:
+        item._heavy_fixture_setup = dict(getattr(item, "_heavy_fixture_setup", {}), **{fixturedef.argname: elapsed})
+
+# --resources / --memtrack / --impact-record: per test (setup + call + teardown)
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    trackers = [t for t in (resource_sampler.get_sampler(), memtrack.get_tracker(), impact.get_recorder()) if t is not None]
+    for t in trackers:
+        t.begin(item.nodeid)
+    yield
+    for t in trackers:
+        t.end(item.nodeid)
+
+class _PhaseProfilePlugin:
+    """--profile only: setup / call / teardown, fixtures and pytest-bdd steps as hotpath phases."""
+
+    @staticmethod
+    def _phase(kind, label=None):
+        hotpath.begin(kind, label)
+        try:
+            yield
+        finally:
+            hotpath.end(kind)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        yield from self._phase("setup")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        yield from self._phase("call")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item):
+        yield from self._phase("teardown")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        yield from self._phase("fixture", fixturedef.argname)
+
+    def pytest_bdd_before_step(self, request, feature, scenario, step, step_func):
+        hotpath.begin("step", f"{step.keyword} {step.name}")
+
+    def pytest_bdd_after_step(self, request, feature, scenario, step, step_func, step_func_args):
+        hotpath.end("step")
+
+    def pytest_bdd_step_error(self, request, feature, scenario, step, step_func, step_func_args, exception):
+        hotpath.end("step")
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    # --changed-since: deselect tests none of whose files changed (src/utils/impact.py)
+    ref = config.getoption("--changed-since")
+    if not ref or not items:
+        return
+    try:
+        changed = impact.changed_files(ref, ROOT)
+    except ValueError as e:
+        raise pytest.UsageError(f"--changed-since: {e}")
+    cache = getattr(config, "cache", None)
+    steps = step_index.step_files_for_items(items, ROOT, Path(cache.mkdir("bdd")) if cache else None)
+    static = {item.nodeid: impact.static_files(item, ROOT) | steps.get(item.nodeid, set()) for item in items}
+    index = impact.load_index()
+    selected, run_all = impact.select(static, changed, index)
+
+    if os.getenv("PYTEST_XDIST_WORKER", "gw0") == "gw0":
+        if run_all:
+            print(f"\n[impact] running all {len(items)} test(s): {run_all}")
+        else:
+            print(f"\n[impact] {len(changed)} file(s) changed since {ref}: {len(selected)} of {len(items)} test(s) "
+                  f"affected (index from {(index.get('commit') or '?')[:10]}, {index.get('recorded_at', '?')})")
+    if run_all:
+        return
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in selected]
+
+# nodeid -> steps with no definition (filled at collection by --check-steps)
+_UNMATCHED_STEPS: Dict[str, List[str]] = {}
+
+def pytest_collection_finish(session):
+    prof = get_profile()
+    if prof:
+        prof.mark("collection_finish")
+
+    mode = session.config.getoption("--check-steps")
+    if mode == "off" or session.config.option.collectonly:
+        return
+    cache = getattr(session.config, "cache", None)
+    _UNMATCHED_STEPS.update(
+        step_index.unmatched_for_items(session.items, ROOT, Path(cache.mkdir("bdd")) if cache else None)
+    )
+    # Every xdist worker collects the same items; only one of them needs to say so
+    if not _UNMATCHED_STEPS or os.getenv("PYTEST_XDIST_WORKER", "gw0") != "gw0":
+        return
+    if mode == "summary":
+        steps = len({m for missing in _UNMATCHED_STEPS.values() for m in missing})
+        print(f"\n[bdd] ⚠️ {len(_UNMATCHED_STEPS)} selected scenario(s) use {steps} step(s) with no definition "
+              f"(--check-steps=warn lists them)")
+    else:
+        print(f"\n[bdd] ⚠️ {len(_UNMATCHED_STEPS)} selected scenario(s) use steps with no definition:")
+        for nodeid, missing in sorted(_UNMATCHED_STEPS.items()):
+            print(f"  {nodeid}")
+            for m in missing:
+                print(f"      {m}")
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    prof = get_profile()
+    if prof:
+        prof.mark("first_test_setup")
+
+    missing = _UNMATCHED_STEPS.get(item.nodeid)
+    if missing and step_loader.IMPORT_ERRORS:
+        errors = "\n  ".join(f"{mod}: {err}" for mod, err in sorted(step_loader.IMPORT_ERRORS.items()))
+        pytest.fail(f"Step definition(s) not found - step module(s) failed to import:\n  {errors}", pytrace=False)
+    if missing and item.config.getoption("--check-steps") == "strict":
+        pytest.fail("Step definition(s) not found:\n  " + "\n  ".join(missing), pytrace=False)
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if _is_worker(config):
+        return
+    lines = latency_histogram.format_rows(_LATENCY_ROWS, top=10)
+    if lines:
+        terminalreporter.write_sep("-", "API latency per endpoint")
+        for line in lines:
+            terminalreporter.write_line(line)
+    lines = baselines.format_comparison(_BASELINE_ROWS, top=10)
+    if lines:
+        terminalreporter.write_sep("-", f"API latency vs baseline ({config.getoption('--env')})")
+        for line in lines:
+            terminalreporter.write_line(line)
+    lines = latency_histogram.format_rows(_PAGE_READY_ROWS, top=10, label="page (strategy)", source=readiness.MERGED_FILE)
+    if lines:
+        terminalreporter.write_sep("-", "UI page readiness")
+        for line in lines:
+            terminalreporter.write_line(line)
+    if _RESOURCES:
+        terminalreporter.write_sep("-", "resources per worker / test")
+        for line in resource_sampler.format_summary(_RESOURCES):
+            terminalreporter.write_line(line)
+    if _PROFILE:
+        terminalreporter.write_sep("-", "time per phase (--profile)")
+        for line in hotpath.format_summary(_PROFILE):
+            terminalreporter.write_line(line)
+    if config.getoption("--schedule") != "off" and len(_WORKER_TIME) > 1:
+        terminalreporter.write_sep("-", "time per xdist worker (--schedule)")
+        for line in duration_schedule.format_summary(_WORKER_TIME, duration_schedule.get_scheduler()):
+            terminalreporter.write_line(line)
+    if _MEMTRACK:
+        terminalreporter.write_sep("-", "Python heap growth (tracemalloc)")
+        for line in memtrack.format_summary(_MEMTRACK):
+            terminalreporter.write_line(line)
+
+    if get_profile() is None:
+        return
+    lines = summarize(load_reports(STARTUP_REPORT_DIR))
+    if lines:
+        terminalreporter.write_sep("-", "startup profile")
+        for line in lines:
+            terminalreporter.write_line(line)
+
 # -------------------------
 # Browser / Context / Page
 # -------------------------
@@ -416,17 +738,87 @@ def browser(browser_type: BrowserType, request: pytest.FixtureRequest) -> Genera
     finally:
         b.close()
 
+@pytest.fixture(scope="session")
+def context_pool(browser: Browser, browser_context_args: Dict[str, Any], request: pytest.FixtureRequest) -> Generator[Optional[ContextPool], None, None]:
+    """Per-worker pool behind `context` with --context-pool (None without it)."""
+    if not request.config.getoption("--context-pool"):
+        yield None
+        return
+    pool = ContextPool(browser, max_uses=request.config.getoption("--context-pool-max-uses"))
+    if pool.poolable(browser_context_args):
+        pool.prewarm(browser_context_args)
+    try:
+        yield pool
+    finally:
+        pool.close()
+        print(pool.summary())
+
+@pytest.fixture(scope="session")
+def auth_states(browser: Browser, browser_context_args: Dict[str, Any], settings, testdata_store: KVStore,
+                request: pytest.FixtureRequest) -> Generator[AuthStateCache, None, None]:
+    """Logged-in storage_state per role for tests marked auth_role: one login per role per run."""
+    cache = AuthStateCache(
+        request.config.getoption("--env"),
+        login=lambda role: form_login(browser, browser_context_args, settings.get_test_user(role)),
+        store=testdata_store,
+        worker=_xdist_worker_id(),
+    )
+    yield cache
+    print(cache.summary())
+
+@pytest.fixture(scope="session")
+def asset_cache(request: pytest.FixtureRequest) -> Generator[Optional[AssetCache], None, None]:
+    """Static asset cache / third-party blocking routes for `context` (None unless asked for)."""
+    store, block = request.config.getoption("--asset-cache"), request.config.getoption("--block-third-party")
+    if not (store or block):
+        yield None
+        return
+    cache = AssetCache(store=store, block=block_list() if block else ())
+    yield cache
+    print(cache.summary())
+
 @pytest.fixture
-def context(browser: Browser, browser_context_args: Dict[str, Any]) -> Generator[BrowserContext, None, None]:
+def context(browser: Browser, browser_context_args: Dict[str, Any], context_pool: Optional[ContextPool],
+            asset_cache: Optional[AssetCache], request: pytest.FixtureRequest) -> Generator[BrowserContext, None, None]:
     """
     Default: function-scoped for test isolation and parallel safety.
     One fresh context per test, but we reuse the same Browser (fast).
+    With --context-pool the context comes from the worker's pool and is reset, not closed, afterwards.
+    @pytest.mark.auth_role("admin") starts it logged in as that role (no args: --user-role).
+    --har=record saves the scenario's traffic (no pooling then); --har=replay answers it from the recording.
     """
-    ctx = browser.new_context(**browser_context_args)
+    role = request.node.get_closest_marker("auth_role")
+    if role is not None:
+        name = role.args[0] if role.args else request.config.getoption("--user-role")
+        state = request.getfixturevalue("auth_states").get(name)
+        browser_context_args = dict(browser_context_args, storage_state=state)
+
+    har_mode, replay = request.config.getoption("--har"), None
+    if har_mode != "off":
+        har_path = har.scenario_path(request.node.nodeid, request.config.getoption("--env"), "ui")
+        if har_mode == "record":
+            browser_context_args = dict(browser_context_args, **har.record_args(har_path))
+        elif not har_path.exists():
+            pytest.skip(f"--har=replay: no recording at {har_path} (record it with --har=record)")
+        else:
+            replay = har.HarReplay.load(har_path)
+
+    pooled = context_pool is not None and context_pool.poolable(browser_context_args)
+    ctx = context_pool.acquire(browser_context_args) if pooled else browser.new_context(**browser_context_args)
+    # Routes go on every time: the pool's reset drops them. The last one added is tried first.
+    if asset_cache is not None:
+        asset_cache.install(ctx)
+    if replay is not None:
+        replay.install(ctx)
     try:
         yield ctx
     finally:
-        ctx.close()
+        if pooled:
+            context_pool.release(ctx, failed=getattr(request.node, "_test_failed", False))
+        else:
+            ctx.close()
+        if replay is not None and replay.report():
+            print(replay.report())
 
 @pytest.fixture(scope="session")
 def shared_context(browser: Browser, browser_context_args: Dict[str, Any]) -> Generator[BrowserContext, None, None]:
@@ -504,11 +896,15 @@ def testdata(testdata_store: KVStore, request) -> KVStore:
     return testdata_store.namespace_store(ns)
 
 @pytest.fixture
-def ctx() -> dict:
+def ctx(settings) -> dict:
     """
     Your existing per-test scratchpad (fast in-memory, not cross-test).
+    Carries the scenario deadline (SCENARIO_TIMEOUT) that the executor and
+    retry helpers respect; narrow it per step with deadline.step_budget(ctx, s).
     """
-    return {}
+    scratch: dict = {}
+    start_deadline(scratch, settings.scenario_timeout)
+    return scratch
 
 
 @pytest.fixture
@@ -656,6 +1052,8 @@ def api_shared(api_client_factory) -> Callable[..., APIRequestContext]:
 @pytest.fixture
 def rq(settings):
     """ If you also want requests for API and not playwright for API Testing"""
+    import requests
+
     s = requests.Session()
     s.headers.update({"Accept": "application/json"})
     s.base_url = settings.api_base_url  # just a hint; build URLs as f"{s.base_url}/path"
@@ -833,11 +1231,60 @@ def _try_capture_mobile_screenshot(request) -> Optional[bytes]:
     
     return None
 
+def _attach_api_exchanges(report, api_executor) -> None:
+    """Redact + attach the executor's recent-exchange buffer (failure path only)."""
+    exchanges = getattr(api_executor, "exchanges", None)
+    if exchanges is None or not len(exchanges):
+        return
+    try:
+        body = exchanges.to_json(api_executor.redactor)
+    except Exception as e:
+        print(f"[api] ⚠️ could not render recent API exchanges: {e}")
+        return
+    name = f"api-recent-exchanges ({len(exchanges)} of {exchanges.total})"
+    try:
+        allure.attach(body, name=name, attachment_type=allure.attachment_type.JSON)
+    except Exception:
+        pass
+    try:
+        import pytest_html
+        if hasattr(report, "extra"):
+            report.extra.append(pytest_html.extras.json(json.loads(body), name=name))
+    except Exception:
+        pass
+
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     outcome = yield
     report = outcome.get_result()
 
+    if report.failed and report.when in ("setup", "call"):
+        item._test_failed = True  # read by api_recorder's teardown (API_RECORD=on_failure)
+
+    # Deferred API records (API_RECORD=on_failure): flush or summarize while the
+    # Allure scenario is still open (stashed by the api_recorder fixture)
+    api_recorder = getattr(item, "_api_recorder", None)
+    if report.when == "call" and api_recorder is not None:
+        api_recorder.finish(failed=report.failed, force=item.get_closest_marker("api_record") is not None)
+
+    # @pytest.mark.perf_baseline: regressions on the endpoints this test called fail
+    # the run. Sent via user_properties so the xdist controller sees them too
+    if report.when == "call" and item.get_closest_marker("perf_baseline") is not None:
+        api_executor = getattr(item, "_api_executor", None)
+        if api_executor is not None and api_executor.endpoints:
+            report.user_properties.append(("perf_baseline_endpoints", sorted(api_executor.endpoints)))
+
+    # --schedule: heavy session fixtures / xdist_group of this test (and fixture setup, if it paid for it)
+    if report.when == "setup" and item.config.getoption("--schedule") != "off":
+        heavy = [f for f in item.fixturenames if f in duration_schedule.HEAVY_FIXTURES]
+        group = item.get_closest_marker("xdist_group")
+        if group is not None:
+            heavy.append(duration_schedule.GROUP_PREFIX + str(group.args[0] if group.args else group.kwargs.get("name", "default")))
+        if heavy:
+            report.user_properties.append(("schedule_fixtures", heavy))
+        if getattr(item, "_heavy_fixture_setup", None):
+            report.user_properties.append(("schedule_fixture_setup", item._heavy_fixture_setup))
+
     if report.when != "call" or not report.failed:
         return
 
@@ -864,13 +1311,15 @@ def pytest_runtest_makereport(item, call):
         except Exception:
             pass
 
-    # 2) Optional: log the last API response if your executor supports it
-    try:
-        api_executor = item._request.getfixturevalue("api_executor")
-        if hasattr(api_executor, "log_last_response_on_failure"):
+    # 2) Recent API exchanges: only if this test actually built an executor
+    #    (stashed by the api_executor fixture; never instantiate one here)
+    api_executor = getattr(item, "_api_executor", None)
+    if api_executor is not None:
+        try:
             api_executor.log_last_response_on_failure()
-    except Exception:
-        pass
+        except Exception:
+            pass
+        _attach_api_exchanges(report, api_executor)
 
     # 3) Re-attach last API request/response JSON if your tests stash them on `item`
     try:
@@ -951,6 +1400,13 @@ def pytest_runtest_makereport(item, call):
     # except Exception:
     #     pass
 
+def pytest_bdd_apply_tag(tag, function):
+    # @auth_role:admin on a feature/scenario -> @pytest.mark.auth_role("admin")
+    if tag.startswith(AUTH_ROLE_TAG):
+        pytest.mark.auth_role(tag[len(AUTH_ROLE_TAG):])(function)
+        return True
+    return None
+
 # --- Optional: BDD lifecycle logging (safe, minimal signatures) ---
 def pytest_bdd_before_scenario(request, feature, scenario):
     logger.info(f"Starting scenario: {scenario.name}")
@@ -962,13 +1418,16 @@ def pytest_bdd_after_scenario(request, feature, scenario):
 @pytest.fixture(scope="session")
 def mobile_driver(request, settings):
     """Only set up if Appium and options are installed and wanted."""
-    if appium_driver is None:
+    # Imported here so API/UI runs never pay for Appium + Selenium
+    try:
+        from appium import webdriver as appium_driver
+        from appium.options.android import UiAutomator2Options
+        from appium.options.ios import XCUITestOptions
+    except Exception:
         pytest.skip("Appium not available in this environment")
 
     platform = request.config.getoption("--mobile-platform")
     if platform == "android":
-        if UiAutomator2Options is None:
-            pytest.skip("Android Appium options not available")
         options = UiAutomator2Options()
         options.platform_name = "Android"
         options.automation_name = "UiAutomator2"
@@ -977,8 +1436,6 @@ def mobile_driver(request, settings):
         options.app_package = settings.android_app_package
         options.app_activity = settings.android_app_activity
     else:
-        if XCUITestOptions is None:
-            pytest.skip("iOS Appium options not available")
         options = XCUITestOptions()
         options.platform_name = "iOS"
         options.automation_name = "XCUITest"
@@ -1008,6 +1465,11 @@ class ApiTrace:
     response_png_b64: Optional[str] = None
     # at: str  # ISO 8601 UTC
     at: str = ""
+    # Executor timing: {"total_ms", "ttfb_ms"?, "source"}
+    duration_ms: Optional[float] = None
+    timing: Optional[dict] = None
+    # Endpoint template ("GET /users/{user_id}") for grouping; see src/api/execution/endpoints.py
+    endpoint: str = ""
 
 def _b64_json(d: dict | None) -> str | None:
     if d is None:
@@ -1021,7 +1483,42 @@ def _b64(d: dict | None) -> str | None:
         return None
     return base64.b64encode(json.dumps(d, indent=2).encode("utf-8")).decode("ascii")
 
-def _render_html(traces: list[ApiTrace]) -> str:
+def _latency_table(rows: list[dict]) -> str:
+    if not rows:
+        return ""
+    def ms(v):
+        return "-" if v is None else f"{v:.1f}"
+    body = "".join(
+        f"<tr><td><code>{r['endpoint'].replace('&', '&amp;').replace('<', '&lt;')}</code></td>"
+        f"<td>{r['count']}</td><td>{r['errors']}</td><td>{ms(r.get('p50_ms'))}</td><td>{ms(r.get('p90_ms'))}</td>"
+        f"<td>{ms(r.get('p99_ms'))}</td><td>{ms(r.get('max_ms'))}</td></tr>"
+        for r in rows
+    )
+    return f"""<section class="card"><h2>Latency per endpoint (ms)</h2>
+<table class="lat"><thead><tr><th>Endpoint</th><th>Calls</th><th>Errors</th><th>p50</th><th>p90</th><th>p99</th><th>max</th></tr></thead>
+<tbody>{body}</tbody></table></section>"""
+
+def _baseline_table(rows: list[dict]) -> str:
+    if not rows:
+        return ""
+    def fmt(v, spec=".1f"):
+        return "-" if v is None else format(v, spec)
+    def ci(v):
+        return "-" if not v else f"{v[0]:.2f}&ndash;{v[1]:.2f}"
+    body = "".join(
+        f"<tr class=\"{r['status']}\"><td>{r['status']}{' (gated)' if r.get('gated') else ''}</td>"
+        f"<td><code>{r['endpoint'].replace('&', '&amp;').replace('<', '&lt;')}</code></td>"
+        f"<td>{fmt(r.get('current_ms'))}</td><td>{fmt(r.get('baseline_ms'))}</td><td>{fmt(r.get('ratio'), '.2f')}</td>"
+        f"<td>{ci(r.get('ci'))}</td>"
+        f"<td>{fmt(r.get('p_value'), '.1e')}</td><td>{', '.join(r.get('reasons') or [])}</td></tr>"
+        for r in rows
+    )
+    q = f"p{rows[0]['percentile']:g}"
+    return f"""<section class="card"><h2>Latency vs baseline ({q}, ms)</h2>
+<table class="lat"><thead><tr><th>Status</th><th>Endpoint</th><th>Now</th><th>Baseline</th><th>Ratio</th><th>95% CI</th><th>p-value</th><th>Why</th></tr></thead>
+<tbody>{body}</tbody></table></section>"""
+
+def _render_html(traces: list[ApiTrace], latency_rows: list[dict] | None = None, baseline_rows: list[dict] | None = None) -> str:
     import base64, json
 
     def esc(s: str | None) -> str:
@@ -1088,8 +1585,9 @@ def _render_html(traces: list[ApiTrace]) -> str:
           </div>
           <div class="req">
             <div class="line"><span class="method">{esc(t.method)}</span>
-              <code>{esc(t.url)}</code>
+              <code title="{esc(t.endpoint)}">{esc(t.url)}</code>
               → <span class="status">{t.status if t.status is not None else "-"}</span>
+              {f'<span class="dur">{t.duration_ms:.1f} ms</span>' if t.duration_ms is not None else ""}
             </div>
             {req_block}
           </div>
@@ -1110,6 +1608,12 @@ def _render_html(traces: list[ApiTrace]) -> str:
     .line{margin:.25rem 0 .5rem}
     .method{display:inline-block;background:#2a6ad9;padding:.15rem .45rem;border-radius:6px;margin-right:.5rem;font-weight:600}
     .status{display:inline-block;background:#214a2e;padding:.15rem .45rem;border-radius:6px;margin-left:.5rem}
+    .dur{display:inline-block;opacity:.75;margin-left:.5rem}
+    table.lat{border-collapse:collapse;width:100%}
+    table.lat th,table.lat td{text-align:right;padding:.2rem .6rem;border-bottom:1px solid #24324a}
+    table.lat th:first-child,table.lat td:first-child{text-align:left}
+    table.lat tr.regression td{color:#ff7b7b;font-weight:600}
+    table.lat tr.improvement td{color:#7bd88f}
     pre{background:#0f1622;border:1px solid #24324a;border-radius:10px;padding:.75rem;overflow:auto;max-height:320px}
     code{background:#0f1622;border:1px solid #24324a;border-radius:6px;padding:.1rem .3rem}
     details>summary{cursor:pointer;opacity:.9}
@@ -1123,6 +1627,8 @@ def _render_html(traces: list[ApiTrace]) -> str:
 <body>
 <h1>API Report</h1>
 <div class="summary">Total entries: {len(traces)}</div>
+{_latency_table(latency_rows or [])}
+{_baseline_table(baseline_rows or [])}
 {''.join(rows) if rows else "<p>No API calls captured.</p>"}
 </body></html>"""
 
@@ -1157,6 +1663,7 @@ def api_trace_add(api_trace_store, request):
         # NEW:
         req_png_b64: str | None = None, resp_png_b64: str | None = None,
         at: str | None = None,
+        timing: dict | None = None,
     ):
         api_trace_store.append(ApiTrace(
             feature=feature_name,
@@ -1172,12 +1679,15 @@ def api_trace_add(api_trace_store, request):
             request_png_b64=req_png_b64,
             response_png_b64=resp_png_b64,
             at=at or datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            duration_ms=(timing or {}).get("total_ms"),
+            timing=timing,
+            endpoint=endpoint_key(method, url),
         ))
     return _add
 
 
 @pytest.fixture
-def api_recorder(api_trace_add, browser):
+def api_recorder(request, api_trace_add, browser):
     print(f"  browser: {browser}")
     
     if api_trace_add is None:
@@ -1192,18 +1702,36 @@ def api_recorder(api_trace_add, browser):
     r = ApiRecorder(api_trace_add, browser, make_png=True)
     print(f"[DEBUG] Created ApiRecorder, _add_trace: {r._add_trace}")
     
+    request.node._api_recorder = r
     try:
         yield r
+        # Normally finished in pytest_runtest_makereport; this only catches setup failures
+        r.finish(
+            failed=getattr(request.node, "_test_failed", False),
+            force=request.node.get_closest_marker("api_record") is not None,
+        )
     finally:
         r.close()
 
 @pytest.fixture
-def api_executor(api, rq, settings, api_recorder):
+def api_executor(request, api, rq, settings, api_recorder):
     """
     Core API execution engine that can route between different clients.
     Uses the 'api' fixture (pure API client) as the default Playwright client.
     """
-    return make_api_executor(pw_api=api, rq_session=rq, settings=settings, recorder=api_recorder)
+    from src.api.execution.executor import make_api_executor
+
+    executor = make_api_executor(pw_api=api, rq_session=rq, settings=settings, recorder=api_recorder)
+    # The failure hook reads the recent-exchange buffer from here instead of re-requesting the fixture
+    request.node._api_executor = executor
+    har_mode = request.config.getoption("--har")
+    if har_mode != "off":
+        executor.har = har.ApiHar(har_mode, har.scenario_path(request.node.nodeid, request.config.getoption("--env"), "api"))
+    yield executor
+    if executor.har is not None:
+        executor.har.save()
+        if executor.har.report():
+            print(executor.har.report())
 
 # --- Post-session aggregator: merge per-worker API traces into one JSON/HTML ---
 # --- aggregator helpers ---
@@ -1257,14 +1785,141 @@ def _rehydrate(obj: dict) -> ApiTrace:
         request_png_b64=obj.get("request_png_b64"),
         response_png_b64=obj.get("response_png_b64"),
         at=obj.get("at", ""),
+        duration_ms=obj.get("duration_ms"),
+        timing=obj.get("timing"),
+        endpoint=obj.get("endpoint", ""),
     )
 
+# Merged per-endpoint latency rows (controller), for the API report + terminal summary
+_LATENCY_ROWS: List[Dict[str, Any]] = []
+# Same for the time pages took to become ready (src/utils/ui/readiness.py)
+_PAGE_READY_ROWS: List[Dict[str, Any]] = []
+# Comparison with the stored baseline (--perf-baseline) + endpoints of @perf_baseline tests
+_BASELINE_ROWS: List[Dict[str, Any]] = []
+_GATED_ENDPOINTS: set = set()
+_RESOURCES: Dict[str, Any] = {}
+_MEMTRACK: Dict[str, Any] = {}
+_PROFILE: Dict[str, Any] = {}
+
+
+def _profiling(config) -> bool:
+    return config.getoption("--profile") or config.getoption("--profile-sample")
+# --schedule (controller): nodeid -> [seconds, heavy fixtures], fixture -> [setup s, n], worker -> [s, tests]
+_TEST_DURATIONS: Dict[str, list] = {}
+_FIXTURE_SETUP: Dict[str, list] = {}
+_WORKER_TIME: Dict[str, list] = {}
+
+def pytest_runtest_logreport(report):
+    # Controller side of the perf_baseline marker (workers ship it in user_properties)
+    for name, value in getattr(report, "user_properties", ()):
+        if name == "perf_baseline_endpoints":
+            _GATED_ENDPOINTS.update(value)
+
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        return
+    # --schedule: a test's duration without the one-off browser/driver setup it may have paid for
+    entry = _TEST_DURATIONS.setdefault(report.nodeid, [0.0, ()])
+    entry[0] += report.duration
+    for name, value in getattr(report, "user_properties", ()):
+        if name == "schedule_fixtures":
+            entry[1] = tuple(value)
+        elif name == "schedule_fixture_setup":
+            for fixture, seconds in value.items():
+                entry[0] -= seconds
+                total = _FIXTURE_SETUP.setdefault(fixture, [0.0, 0])
+                total[0] += seconds
+                total[1] += 1
+    worker = getattr(getattr(getattr(report, "node", None), "gateway", None), "id", "master")
+    spent = _WORKER_TIME.setdefault(worker, [0.0, 0])
+    spent[0] += report.duration
+    spent[1] += report.when == "setup"
+
+def _compare_perf_baseline(session, latency) -> List[Dict[str, Any]]:
+    mode = session.config.getoption("--perf-baseline")
+    env = session.config.getoption("--env")
+    store = baselines.BaselineStore(env, "pytest-api")
+    current = dict(latency.items())
+    base, _ = store.baseline()
+    rows = baselines.compare(current, base) if base else []
+    for r in rows:
+        r["gated"] = r["endpoint"] in _GATED_ENDPOINTS
+    if rows:
+        baselines.write_comparison(rows, env=env, baseline=str(store.path))
+
+    regressions = [r for r in rows if r["status"] == "regression"]
+    gated = [r for r in regressions if r["gated"]]
+    if gated:
+        print(f"[perf-baseline] ❌ {len(gated)} regression(s) on endpoints of @perf_baseline tests: "
+              + ", ".join(r["endpoint"] for r in gated))
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    if mode == "update":
+        if session.exitstatus != 0 or regressions:
+            print(f"[perf-baseline] not updating {store.path}: run failed or regressed")
+        else:
+            print(f"[perf-baseline] added this run to {store.add_run(current)}")
+    return rows
+
 # --- run once on controller to write the single combined report ---
 def pytest_sessionfinish(session, exitstatus):
     config = session.config
+    prof = get_profile()
+    if prof:
+        prof.write(_xdist_worker_id())
+
+    # Latency histograms: every process writes its own, the controller merges
+    latency_histogram.write_worker_file(_xdist_worker_id())
+    resource_sampler.write_worker_file(_xdist_worker_id())
+    memtrack.write_worker_file(os.getenv("PYTEST_XDIST_WORKER") or "main")  # same name as the API trace JSON
+    hotpath.write_worker_file(_xdist_worker_id())
+    impact.write_worker_file(_xdist_worker_id())
+    latency_histogram.write_worker_file(_xdist_worker_id(), readiness.readiness_registry(), readiness.REPORT_DIR)
+
     if _is_worker(config):
         return  # workers only write their own JSON
 
+    # --changed-since: "no test affected" is a pass, not pytest's "no tests collected" (5)
+    if config.getoption("--changed-since") and session.exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED:
+        print("[impact] no test affected by the change")
+        session.exitstatus = pytest.ExitCode.OK
+
+    if config.getoption("--impact-record"):
+        recorded = impact.merge_worker_files()
+        if recorded:
+            print(f"[impact] recorded {len(recorded)} test(s) in {impact.update_index(recorded, ROOT)}")
+
+    if config.getoption("--schedule") != "off" and _TEST_DURATIONS:
+        store = duration_schedule.DurationStore(config.getoption("--env"))
+        store.update({k: (max(0.0, s), fx) for k, (s, fx) in _TEST_DURATIONS.items()},
+                     {name: s / n for name, (s, n) in _FIXTURE_SETUP.items()})
+        print(f"[schedule] recorded {len(_TEST_DURATIONS)} test duration(s) in {store.save()}")
+
+    if _profiling(config):
+        _PROFILE.update(hotpath.merge_worker_files())
+        if _PROFILE["workers"]:
+            print(f"[profile] wrote {', '.join(str(p) for p in hotpath.write_merged(_PROFILE))}")
+
+    if config.getoption("--memtrack"):
+        _MEMTRACK.update(memtrack.merge_worker_files())
+        if _MEMTRACK["workers"]:
+            print(f"[memtrack] wrote {memtrack.write_merged(_MEMTRACK)}")
+
+    if resource_sampler.get_sampler() is not None:
+        _RESOURCES.update(resource_sampler.merge_worker_files())
+        print(f"[resources] wrote {resource_sampler.write_merged(_RESOURCES)}")
+
+    latency = latency_histogram.merge_worker_files()
+    if len(latency):
+        latency_histogram.write_merged(latency)
+        _LATENCY_ROWS[:] = latency.summary_rows()
+        if config.getoption("--perf-baseline") != "off":
+            _BASELINE_ROWS[:] = _compare_perf_baseline(session, latency)
+
+    page_ready = latency_histogram.merge_worker_files(readiness.REPORT_DIR)
+    if len(page_ready):
+        latency_histogram.write_merged(page_ready, readiness.MERGED_FILE)
+        _PAGE_READY_ROWS[:] = page_ready.summary_rows()
+
     reports_dir = Path("reports")
     merged = _gather_worker_reports(reports_dir)
     if not merged:
@@ -1278,7 +1933,7 @@ def pytest_sessionfinish(session, exitstatus):
 
     # Combined HTML (renderer expects ApiTrace objects)
     traces = [_rehydrate(x) for x in merged]
-    html = _render_html(traces)
+    html = _render_html(traces, latency_rows=_LATENCY_ROWS, baseline_rows=_BASELINE_ROWS)
     (reports_dir / "api-report.html").write_text(html, encoding="utf-8")
     print("[api-report] wrote reports/api-report.json and reports/api-report.html")
 
@@ -1,8 +1,25 @@
 # scripts/check_duplicates.py
-import ast
+# Static BDD step check (pre-push). Reads step definitions with ast and features
+# with pytest-bdd's parser; both are cached per file under .pytest_cache/d/bdd,
+# so re-runs only re-read what changed.
+#
+#   python scripts/check_duplicates.py            # duplicates + ambiguous (blocking), overlaps (warning)
+#   python scripts/check_duplicates.py --all      # + unused steps, unmatched feature lines
+#   python scripts/check_duplicates.py --strict   # unmatched feature lines also block
+import argparse
 import sys
+import time
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.step_index import build_report  # noqa: E402
+
+CACHE_DIR = ROOT / ".pytest_cache" / "d" / "bdd"  # same dir pytest's config.cache.mkdir("bdd") uses
+
+
 class Colors:
     RED = '\033[91m'
     GREEN = '\033[92m'
@@ -11,70 +28,81 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
-def extract_step_definitions(file_path):
-    with open(file_path) as f:
-        tree = ast.parse(f.read())
-    
-    steps = []
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            for decorator in node.decorator_list:
-                if isinstance(decorator, ast.Call):
-                    if hasattr(decorator.func, 'id') and decorator.func.id in ['given', 'when', 'then']:
-                        if decorator.args:
-                            arg = decorator.args[0]
-                            if isinstance(arg, ast.Constant):
-                                pattern = arg.value
-                                pattern_type = "string"
-                            elif isinstance(arg, ast.Call):
-                                if hasattr(arg.func, 'attr') and arg.func.attr == 'parse':
-                                    if arg.args and isinstance(arg.args[0], ast.Constant):
-                                        pattern = arg.args[0].value
-                                        pattern_type = "parse"
-                                    else:
-                                        pattern = "<complex_parse>"
-                                        pattern_type = "parse"
-                                else:
-                                    pattern = "<function_call>"
-                                    pattern_type = "other"
-                            else:
-                                pattern = "<unknown>"
-                                pattern_type = "other"
-                            
-                            steps.append((decorator.func.id, pattern_type, pattern, node.lineno, node.name))
-    return steps
-
-def find_duplicates():
-    steps_dir = Path("step_definitions")
-    all_steps = {}
-    duplicates_found = False
-    
-    for py_file in steps_dir.rglob("*_steps.py"):
-        try:
-            steps = extract_step_definitions(py_file)
-            for step_type, pattern_type, pattern, lineno, func_name in steps:
-                key = (step_type, pattern_type, pattern)
-                if key in all_steps:
-                    if not duplicates_found:
-                        print(f"{Colors.RED}{Colors.BOLD}🚨 DUPLICATE BDD STEP DEFINITIONS DETECTED 🚨{Colors.END}")
-                        print()
-                        duplicates_found = True
-                    
-                    print(f"{Colors.RED}DUPLICATE: {step_type.upper()} {pattern_type}:'{pattern}'{Colors.END}")
-                    print(f"  {Colors.YELLOW}First:{Colors.END}  {all_steps[key][0]}:{all_steps[key][1]} in {Colors.BLUE}{all_steps[key][2]}(){Colors.END}")
-                    print(f"  {Colors.YELLOW}Second:{Colors.END} {py_file}:{lineno} in {Colors.BLUE}{func_name}(){Colors.END}")
-                    print()
-                else:
-                    all_steps[key] = (py_file, lineno, func_name)
-        except Exception as e:
-            print(f"{Colors.RED}Error processing {py_file}: {e}{Colors.END}")
-    
-    if duplicates_found:
-        print(f"{Colors.RED}{Colors.BOLD}❌ BUILD BLOCKED: Fix duplicate step definitions before pushing{Colors.END}")
+
+def _defn(d):
+    return f"{d.file}:{d.line} in {Colors.BLUE}{d.func}(){Colors.END}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check BDD step definitions against feature files")
+    ap.add_argument("--unused", action="store_true", help="list step definitions no feature uses")
+    ap.add_argument("--unmatched", action="store_true", help="list feature steps with no definition")
+    ap.add_argument("--all", action="store_true", help="--unused + --unmatched")
+    ap.add_argument("--strict", action="store_true", help="unmatched feature steps fail the check")
+    ap.add_argument("--no-cache", action="store_true", help="re-read every file")
+    args = ap.parse_args(argv)
+
+    started = time.perf_counter()
+    report, cache = build_report(ROOT, None if args.no_cache else CACHE_DIR)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    blocking = False
+
+    if cache.errors:
+        print(f"{Colors.RED}{Colors.BOLD}Step files skipped (could not be parsed):{Colors.END}")
+        for err in cache.errors:
+            print(f"  {Colors.RED}Error processing {err}{Colors.END}")
+        print()
+
+    if report.duplicates:
+        blocking = True
+        print(f"{Colors.RED}{Colors.BOLD}🚨 DUPLICATE BDD STEP DEFINITIONS DETECTED 🚨{Colors.END}\n")
+        for first, second in report.duplicates:
+            print(f"{Colors.RED}DUPLICATE: {first.label}{Colors.END}")
+            print(f"  {Colors.YELLOW}First:{Colors.END}  {_defn(first)}")
+            print(f"  {Colors.YELLOW}Second:{Colors.END} {_defn(second)}\n")
+
+    if report.ambiguous:
+        blocking = True
+        print(f"{Colors.RED}{Colors.BOLD}🚨 AMBIGUOUS FEATURE STEPS (more than one definition matches) 🚨{Colors.END}\n")
+        for fs, hits in report.ambiguous:
+            print(f"{Colors.RED}{fs.file}:{fs.line} {fs.type.upper()} {fs.text}{Colors.END}")
+            for d in hits:
+                print(f"  {Colors.YELLOW}{d.label}{Colors.END}  {_defn(d)}")
+            print()
+
+    if report.overlaps:
+        print(f"{Colors.YELLOW}{Colors.BOLD}⚠️  OVERLAPPING STEP PATTERNS{Colors.END}")
+        for a, b in report.overlaps:
+            print(f"  {a.label} {_defn(a)}")
+            print(f"    ↔ {b.label} {_defn(b)}")
+        print()
+
+    if args.unused or args.all:
+        print(f"{Colors.YELLOW}{Colors.BOLD}UNUSED STEP DEFINITIONS ({len(report.unused)}){Colors.END}")
+        for d in report.unused:
+            print(f"  {d.label}  {_defn(d)}")
+        print()
+
+    if report.unmatched and (args.unmatched or args.all or args.strict):
+        colour = Colors.RED if args.strict else Colors.YELLOW
+        print(f"{colour}{Colors.BOLD}FEATURE STEPS WITH NO DEFINITION ({len(report.unmatched)}){Colors.END}")
+        for fs, other_types in report.unmatched:
+            hint = f"  (defined as {', '.join(d.label for d in other_types)})" if other_types else ""
+            print(f"  {fs.file}:{fs.line} {fs.type.upper()} {fs.text}{hint}")
+        print()
+        blocking = blocking or args.strict
+
+    print(
+        f"{report.definitions} definitions, {report.feature_steps} feature steps, "
+        f"{len(report.unused)} unused, {len(report.unmatched)} unmatched "
+        f"({cache.parsed} step files parsed, {cache.reused} cached, {elapsed_ms:.0f} ms)"
+    )
+    if blocking:
+        print(f"{Colors.RED}{Colors.BOLD}❌ BUILD BLOCKED: Fix the step definitions above before pushing{Colors.END}")
         return 1
-    else:
-        print(f"{Colors.GREEN}✅ No duplicate step definitions found{Colors.END}")
-        return 0
+    print(f"{Colors.GREEN}✅ No duplicate or ambiguous step definitions found{Colors.END}")
+    return 0
+
 
 if __name__ == "__main__":
-    sys.exit(find_duplicates())
\ No newline at end of file
+    sys.exit(main())
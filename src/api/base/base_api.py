@@ -22,7 +22,8 @@ class BaseAPI:
 
     def _call(self, ctx: dict, step: str, method: str, endpoint: str,
               req_json: Dict[str, Any] | None = None,
-              req_headers: Dict[str, str] | None = None) -> Tuple[int, Dict[str, Any]]:
+              req_headers: Dict[str, str] | None = None,
+              timeout: float | Tuple[float, float] | None = None) -> Tuple[int, Dict[str, Any]]:
         path = f"{self._base}{endpoint}"
         headers = self._auth_headers(req_headers)
         return self._exec(
@@ -32,6 +33,7 @@ class BaseAPI:
             path=path,
             req_json=req_json,
             req_headers=headers,
+            timeout=timeout,
         )
     
     def get(self, ctx: dict, step: str, endpoint: str, 
@@ -0,0 +1,161 @@
+# src/api/execution/deadline.py
+# Scenario/step time budgets carried in the per-test `ctx` dict.
+# The executor and the retry helpers read the budget from here so a hung
+# socket can never hold a worker longer than the scenario allows.
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+# Key under which the active Deadline lives in ctx
+DEADLINE_KEY = "_deadline"
+# Smallest timeout handed to Playwright (0 there disables the timeout)
+MIN_PLAYWRIGHT_TIMEOUT_MS = 1.0
+
+
+class Deadline:
+    """
+    A monotonic time budget.
+
+    - `remaining()` shrinks as steps run; it never goes below 0.
+    - `cap(seconds)` clamps a per-call timeout to what is left of the budget.
+    """
+
+    def __init__(self, budget_s: float, *, label: str = "scenario", clock=time.monotonic):
+        self.budget_s = float(budget_s)
+        self.label = label
+        self._clock = clock
+        self._started = clock()
+        self._expires = self._started + self.budget_s
+
+    def elapsed(self) -> float:
+        return self._clock() - self._started
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def cap(self, seconds: Optional[float]) -> float:
+        """Clamp a timeout to the remaining budget (None means 'whatever is left')."""
+        left = self.remaining()
+        return left if seconds is None else min(float(seconds), left)
+
+    def tightened(self, budget_s: float, *, label: str = "step") -> "Deadline":
+        """Return a deadline that ends at min(self, now + budget_s)."""
+        child = Deadline(budget_s, label=label, clock=self._clock)
+        if self._expires < child._expires:
+            child._expires = self._expires
+            child.label = self.label
+        return child
+
+    def __repr__(self) -> str:
+        return f"Deadline(label={self.label!r}, budget={self.budget_s:.1f}s, remaining={self.remaining():.2f}s)"
+
+
+# ---------- ctx helpers ----------
+
+def start_deadline(ctx: Dict[str, Any], budget_s: Optional[float], *, label: str = "scenario") -> Optional[Deadline]:
+    """Attach a new deadline to ctx. A falsy budget disables the deadline."""
+    if not budget_s or budget_s <= 0:
+        ctx.pop(DEADLINE_KEY, None)
+        return None
+    dl = Deadline(budget_s, label=label)
+    ctx[DEADLINE_KEY] = dl
+    return dl
+
+
+def get_deadline(ctx: Optional[Dict[str, Any]]) -> Optional[Deadline]:
+    if not ctx:
+        return None
+    dl = ctx.get(DEADLINE_KEY)
+    return dl if isinstance(dl, Deadline) else None
+
+
+@contextmanager
+def step_budget(ctx: Dict[str, Any], budget_s: float, *, label: str = "step"):
+    """
+    Temporarily narrow the budget for a block of calls (e.g. one step).
+    The scenario deadline still wins if it ends sooner.
+
+    with step_budget(ctx, 5):
+        auth_api.login(ctx, user, pwd)
+    """
+    prev = get_deadline(ctx)
+    ctx[DEADLINE_KEY] = prev.tightened(budget_s, label=label) if prev else Deadline(budget_s, label=label)
+    try:
+        yield ctx[DEADLINE_KEY]
+    finally:
+        if prev is None:
+            ctx.pop(DEADLINE_KEY, None)
+        else:
+            ctx[DEADLINE_KEY] = prev
+
+
+# ---------- timeouts + synthetic responses ----------
+
+def resolve_timeouts(
+    connect_s: float,
+    read_s: float,
+    deadline: Optional[Deadline] = None,
+) -> Tuple[float, float]:
+    """Per-call (connect, read) timeouts, clamped to the remaining budget."""
+    if deadline is None:
+        return connect_s, read_s
+    return deadline.cap(connect_s), deadline.cap(read_s)
+
+
+def playwright_timeout_ms(total_s: float, deadline: Optional[Deadline] = None) -> float:
+    """
+    Playwright's single timeout in ms, clamped to the remaining budget. Never 0:
+    Playwright reads 0 as "no timeout", the opposite of a spent budget.
+    """
+    seconds = deadline.cap(total_s) if deadline is not None else total_s
+    return max(MIN_PLAYWRIGHT_TIMEOUT_MS, seconds * 1000)
+
+
+def deadline_exceeded_response(
+    deadline: Deadline,
+    *,
+    method: Optional[str] = None,
+    url: Optional[str] = None,
+    description: Optional[str] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """Synthetic 408 returned instead of (or after) a call that ran out of budget."""
+    data: Dict[str, Any] = {
+        "error": "Deadline exceeded",
+        "deadline_exceeded": True,
+        "deadline": deadline.label,
+        "budget_s": round(deadline.budget_s, 3),
+        "elapsed_s": round(deadline.elapsed(), 3),
+    }
+    if method:
+        data["method"] = method.upper()
+    if url:
+        data["url"] = url
+    if description:
+        data["description"] = description
+    return 408, data
+
+
+def stop_retrying(deadline: Optional[Deadline], description: str, attempt: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """
+    The retry helpers' check before each attempt: the synthetic 408 to return
+    once the deadline is spent, else None. The ctx deadline wins over a local timeout.
+    """
+    if deadline is None or not deadline.expired:
+        return None
+    print(f"⏱️ {description} stopped before attempt {attempt}: {deadline!r}")
+    return deadline_exceeded_response(deadline, description=description)
+
+
+def sleep_within(seconds: float, deadline: Optional[Deadline] = None) -> None:
+    """time.sleep that never sleeps past the deadline (used between retry attempts)."""
+    if deadline is not None:
+        seconds = deadline.cap(seconds)
+    if seconds > 0:
+        time.sleep(seconds)
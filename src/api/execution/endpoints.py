@@ -0,0 +1,205 @@
+# src/api/execution/endpoints.py
+# Concrete request paths -> endpoint templates ("/users/123" -> "/users/{user_id}").
+#
+# Used wherever calls are grouped per endpoint: log sampling budgets, the
+# latency histograms, ApiTrace.endpoint in the API report.
+#
+# Where templates come from, in priority order:
+#   1. API_ENDPOINT_TEMPLATES="/orders/{order_id}/items/{item_id},/v2/x/{id}"
+#   2. the API wrappers themselves: every f-string path in
+#      src/api/wrappers/*.py (e.g. UserAPI.get_user -> f"/users/{user_id}"),
+#      read with `ast` (nothing is imported), plus their literal paths so
+#      "/users/search" stays literal next to "/users/{user_id}"
+#   3. id heuristics per segment (numbers, UUIDs, long hex/opaque tokens -> {id})
+#
+# Templates live in a segment trie (literal children win over parameters);
+# a template may match a suffix of the path, so base paths/prefixes such as
+# "/api/v1" need no configuration. Results are memoized per path.
+
+from __future__ import annotations
+
+import ast
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+TEMPLATES_ENV = "API_ENDPOINT_TEMPLATES"
+WRAPPERS_DIR = Path(__file__).resolve().parents[1] / "wrappers"
+
+_PARAM = "{}"  # trie key for a parameter segment
+_MEMO_MAX = 8192
+
+_UUID = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+_HEX = re.compile(r"^[0-9a-fA-F]{16,}$")
+_NUMBER = re.compile(r"^\d+$")
+_OPAQUE = re.compile(r"^[A-Za-z0-9_\-.~]{20,}$")  # tokens, slugs with hashes, base64url ids
+
+
+def looks_like_id(segment: str) -> bool:
+    if _NUMBER.match(segment) or _UUID.match(segment) or _HEX.match(segment):
+        return True
+    # long opaque tokens need at least one digit so long words stay literal
+    return bool(_OPAQUE.match(segment)) and any(c.isdigit() for c in segment)
+
+
+def _segments(path: str) -> List[str]:
+    return [s for s in path.split("/") if s]
+
+
+def _is_param(segment: str) -> bool:
+    return segment.startswith("{") and segment.endswith("}")
+
+
+class _Node:
+    __slots__ = ("children", "template", "param_name")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.template: Optional[List[str]] = None  # template segments (with param names)
+        self.param_name: Optional[str] = None
+
+
+class EndpointNormalizer:
+    """
+    n = EndpointNormalizer(["/users/{user_id}", "/users/search"])
+    n.normalize("https://h/api/v1/users/42?x=1") -> "/api/v1/users/{user_id}"
+    n.key("get", url)                            -> "GET /api/v1/users/{user_id}"
+    """
+
+    def __init__(self, templates: Iterable[str] = (), *, heuristics: bool = True):
+        self.heuristics = heuristics
+        self._root = _Node()
+        self._memo: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.templates: List[str] = []
+        for t in templates:
+            self.add(t)
+
+    def add(self, template: str) -> None:
+        segs = _segments(template.split("?", 1)[0])
+        if not segs:
+            return
+        node = self._root
+        for seg in segs:
+            key = _PARAM if _is_param(seg) else seg
+            node = node.children.setdefault(key, _Node())
+        if node.template is None:
+            node.template = segs
+            self.templates.append("/" + "/".join(segs))
+        with self._lock:
+            self._memo.clear()
+
+    def _match(self, segs: List[str], i: int, node: _Node) -> Optional[List[str]]:
+        """Template segments matching segs[i:] exactly, literal branches first."""
+        if i == len(segs):
+            return node.template
+        lit = node.children.get(segs[i])
+        if lit is not None:
+            hit = self._match(segs, i + 1, lit)
+            if hit is not None:
+                return hit
+        param = node.children.get(_PARAM)
+        if param is not None:
+            return self._match(segs, i + 1, param)
+        return None
+
+    def _heuristic(self, segs: Iterable[str]) -> List[str]:
+        return ["{id}" if (self.heuristics and looks_like_id(s)) else s for s in segs]
+
+    def normalize_path(self, path: str) -> str:
+        hit = self._memo.get(path)
+        if hit is not None:
+            return hit
+        segs = _segments(path)
+        out: Optional[List[str]] = None
+        for start in range(len(segs)):  # longest suffix first: template may sit under a base path
+            tpl = self._match(segs, start, self._root)
+            if tpl is not None:
+                out = self._heuristic(segs[:start]) + tpl
+                break
+        if out is None:
+            out = self._heuristic(segs)
+        result = "/" + "/".join(out)
+        with self._lock:
+            if len(self._memo) >= _MEMO_MAX:
+                self._memo.clear()
+            self._memo[path] = result
+        return result
+
+    def normalize(self, url: str) -> str:
+        """Template for a full URL or a path (query string and fragment dropped)."""
+        path = urlparse(url).path if "://" in url else url.split("?", 1)[0].split("#", 1)[0]
+        return self.normalize_path(path or "/")
+
+    def key(self, method: str, url: str) -> str:
+        return f"{method.upper()} {self.normalize(url)}"
+
+
+# ---------- templates learned from the wrappers ----------
+
+def _path_literal(node: ast.AST) -> Optional[str]:
+    """'/users/{user_id}' for f"/users/{user_id}", '/users/search' for "/users/search"."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        v = node.value
+        return v if v.startswith("/") and " " not in v and len(v) > 1 else None
+    if isinstance(node, ast.JoinedStr) and node.values:
+        first = node.values[0]
+        if not (isinstance(first, ast.Constant) and isinstance(first.value, str) and first.value.startswith("/")):
+            return None
+        parts = []
+        for i, part in enumerate(node.values):
+            if isinstance(part, ast.Constant):
+                parts.append(str(part.value))
+            elif isinstance(part, ast.FormattedValue):
+                expr = part.value
+                name = expr.id if isinstance(expr, ast.Name) else getattr(expr, "attr", None) or f"p{i}"
+                parts.append("{" + name + "}")
+        text = "".join(parts)
+        return text if " " not in text else None
+    return None
+
+
+def templates_from_wrappers(wrappers_dir: Path = WRAPPERS_DIR) -> List[str]:
+    """Path templates used in call arguments of the API wrapper modules."""
+    found: List[str] = []
+    for py in sorted(Path(wrappers_dir).glob("*.py")):
+        try:
+            tree = ast.parse(py.read_text(encoding="utf-8"), filename=str(py))
+        except (OSError, SyntaxError):
+            continue
+        for call in ast.walk(tree):
+            if not isinstance(call, ast.Call):
+                continue
+            args = list(call.args) + [kw.value for kw in call.keywords if kw.arg in ("path", "endpoint", "url")]
+            for arg in args:
+                text = (_path_literal(arg) or "").split("?", 1)[0]
+                if text and text not in found:
+                    found.append(text)
+    return found
+
+
+def templates_from_env() -> List[str]:
+    raw = os.getenv(TEMPLATES_ENV, "")
+    return [t.strip() for t in raw.split(",") if t.strip()]
+
+
+_default: Optional[EndpointNormalizer] = None
+_default_lock = threading.Lock()
+
+
+def get_normalizer() -> EndpointNormalizer:
+    """Process-wide normalizer (configured templates first, then the wrappers')."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = EndpointNormalizer(templates_from_env() + templates_from_wrappers())
+    return _default
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """'GET /users/{user_id}' for 'GET https://host/users/42?x=1'."""
+    return get_normalizer().key(method, url)
@@ -0,0 +1,78 @@
+# src/api/execution/exchange_buffer.py
+# Bounded, thread-safe buffer of a test's most recent API exchanges.
+#
+# Entries hold the raw headers/bodies (references, no copies) and are only
+# redacted + serialized when something asks for them - in practice when a
+# test fails and conftest attaches them to the report. Passing tests pay
+# for a deque append and nothing else.
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SIZE = 20
+
+
+class ExchangeBuffer:
+    """Last `maxlen` exchanges; append/snapshot are safe from any thread."""
+
+    def __init__(self, maxlen: int = DEFAULT_SIZE):
+        self._items: deque = deque(maxlen=max(1, int(maxlen)))
+        self._lock = threading.Lock()
+        self.total = 0  # exchanges seen, including the ones that fell off the end
+
+    @property
+    def maxlen(self) -> int:
+        return self._items.maxlen
+
+    def append(self, exchange: Dict[str, Any]) -> None:
+        with self._lock:
+            self._items.append(exchange)
+            self.total += 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._items)
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._items[-1] if self._items else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def render(self, redactor=None) -> List[Dict[str, Any]]:
+        """Redacted copies, oldest first (`redactor` is a DataRedactor or None)."""
+        out = []
+        for ex in self.snapshot():
+            item = {k: v for k, v in ex.items() if k not in _PAYLOAD_KEYS}
+            for key, kind in _PAYLOAD_KEYS.items():
+                value = ex.get(key)
+                if redactor is not None and value is not None:
+                    value = redactor.redact_headers(value) if kind == "headers" else redactor.redact_json(value)
+                item[key] = value
+            out.append(item)
+        return out
+
+    def to_json(self, redactor=None, indent: Optional[int] = 2) -> str:
+        return json.dumps(
+            {"total_calls": self.total, "kept": len(self), "exchanges": self.render(redactor)},
+            indent=indent,
+            default=str,
+        )
+
+
+_PAYLOAD_KEYS = {
+    "req_headers": "headers",
+    "req_json": "json",
+    "resp_headers": "headers",
+    "resp_json": "json",
+}
@@ -15,10 +15,21 @@ import threading
 import time
 import random
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional, Tuple, Union, Callable
+from typing import Any, Dict, List, Optional, Set, Tuple, Union, Callable
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 
+from src.utils.logger import get_logger, level_enabled
 from .router import select_mode, ApiClientMode, mock_call
+from .deadline import (
+    Deadline, get_deadline, resolve_timeouts, deadline_exceeded_response, playwright_timeout_ms, sleep_within,
+    stop_retrying,
+)
+from .log_sampling import get_sampler
+from .endpoints import endpoint_key
+from .exchange_buffer import ExchangeBuffer
+from .timing import CallTimer
+from src.utils.performance.latency_histogram import latency_registry
+from src.utils.performance import hotpath
 
 # Optional typing helper so imports don't explode if Playwright isn't installed
 try:
@@ -27,6 +38,11 @@ except Exception:  # pragma: no cover
     PWContext = object  # type: ignore
 
 
+# Request/response lines go through the shared (enqueued) loguru pipeline;
+# header/body dumps are DEBUG and only built when a DEBUG sink is active.
+api_log = get_logger("api")
+
+
 # ---------- Console colors ----------
 
 class ConsoleColors:
@@ -283,7 +299,8 @@ class RetryHelpers:
         delay: float = 1.0,
         retry_on_statuses: Optional[List[int]] = None,
         timeout: Optional[float] = None,
-        description: str = "API call"
+        description: str = "API call",
+        deadline: Optional[Deadline] = None,
     ) -> Tuple[int, Dict[str, Any]]:
         """
         Basic retry with linear backoff and exception handling
@@ -294,6 +311,10 @@ class RetryHelpers:
         start_time = time.time()
         
         for attempt in range(1, max_attempts + 1):
+            spent = stop_retrying(deadline, description, attempt)
+            if spent:
+                return spent
+            
             # Check timeout
             if timeout and (time.time() - start_time) > timeout:
                 print(f"❌ {description} timed out after {timeout}s")
@@ -318,7 +339,7 @@ class RetryHelpers:
                     return status, data
                 
                 print(f"🔄 Retrying {description} in {delay}s...")
-                time.sleep(delay)
+                sleep_within(delay, deadline)
                 continue
             
             # Success or non-retryable status
@@ -334,7 +355,7 @@ class RetryHelpers:
             
             # Wait and retry
             print(f"🔄 {description} attempt {attempt} failed (status: {status}). Retrying in {delay}s...")
-            time.sleep(delay)
+            sleep_within(delay, deadline)
         
         return status, data
     
@@ -348,7 +369,8 @@ class RetryHelpers:
         jitter: bool = True,
         retry_on_statuses: Optional[List[int]] = None,
         timeout: Optional[float] = None,
-        description: str = "API call"
+        description: str = "API call",
+        deadline: Optional[Deadline] = None,
     ) -> Tuple[int, Dict[str, Any]]:
         """
         Enhanced retry with exponential backoff and jitter
@@ -360,6 +382,10 @@ class RetryHelpers:
         delay = initial_delay
         
         for attempt in range(1, max_attempts + 1):
+            spent = stop_retrying(deadline, description, attempt)
+            if spent:
+                return spent
+            
             # Check timeout
             if timeout and (time.time() - start_time) > timeout:
                 elapsed = time.time() - start_time
@@ -386,7 +412,7 @@ class RetryHelpers:
                     return status, data
     
                 print(f"🔄 Retrying {description} in {actual_delay:.1f}s...")
-                time.sleep(actual_delay)
+                sleep_within(actual_delay, deadline)
     
                 # Exponential backoff for next iteration
                 delay = min(delay * backoff_factor, max_delay)
@@ -414,7 +440,7 @@ class RetryHelpers:
                 actual_delay = max(0.1, actual_delay)  # Minimum 100ms
             
             print(f"🔄 {description} attempt {attempt} failed (status: {status}). Retrying in {actual_delay:.1f}s...")
-            time.sleep(actual_delay)
+            sleep_within(actual_delay, deadline)
             
             # Exponential backoff for next iteration
             delay = min(delay * backoff_factor, max_delay)
@@ -432,15 +458,29 @@ class ApiExecutor:
     provided recorder.
     """
 
-    def __init__(self, *, pw_api, rq_session, settings, recorder):
+    def __init__(self, *, pw_api, rq_session, settings, recorder, recording: bool = True):
         self.pw_api = pw_api
         self.rq = rq_session
         self.settings = settings
         self.recorder = recorder
+        # recording=False: no logging / exchange buffer / recorder for any thread
+        # (load runs); silent_recording() does the same for one thread and one block
+        self.recording = recording
 
         self.debug = getattr(settings, "debug_api", False) or os.getenv("DEBUG_API", "").lower() == "true"
         self.colors = ConsoleColors()
-        self.last_response: Optional[Dict[str, Any]] = None
+        # Log sampling (see log_sampling.py) + bounded buffer of this test's recent calls,
+        # redacted only when a failure dumps/attaches them (see exchange_buffer.py)
+        self.sampler = get_sampler(
+            getattr(settings, "api_log_sampling", None) or os.getenv("API_LOG_SAMPLING", "all"),
+            getattr(settings, "api_log_first_n", 5),
+            getattr(settings, "api_log_every_k", 100),
+        )
+        self.exchanges = ExchangeBuffer(getattr(settings, "api_log_buffer_size", 20))
+        # Endpoint templates this executor has called (perf_baseline marker gating)
+        self.endpoints: Set[str] = set()
+        # --har: src.utils.har.ApiHar recording this test's calls or answering them (set by the fixture)
+        self.har = None
 
         # Thread-local storage for parallel execution safety
         self._local = threading.local()
@@ -455,12 +495,21 @@ class ApiExecutor:
 
     @property
     def skip_recording(self) -> bool:
-        return getattr(self._local, "skip_recording", False)
+        return getattr(self._local, "skip_recording", not self.recording)
 
     @skip_recording.setter
     def skip_recording(self, value: bool) -> None:
         self._local.skip_recording = value
 
+    @property
+    def last_response(self) -> Optional[Dict[str, Any]]:
+        """Last response seen by *this thread* (concurrent calls each see their own)."""
+        return getattr(self._local, "last_response", None)
+
+    @last_response.setter
+    def last_response(self, value: Optional[Dict[str, Any]]) -> None:
+        self._local.last_response = value
+
     @contextmanager
     def silent_recording(self):
         """Thread-safe context manager for temporarily disabling recording"""
@@ -476,6 +525,16 @@ class ApiExecutor:
     def _redact_if_enabled(self, data: Any) -> Any:
         return self.redactor.redact_json(data) if (self.redactor and data is not None) else data
 
+    def _redact_for_har(self, data: Any) -> Any:
+        """Redacted like the logs, but never truncated: a replayed body has to stay whole."""
+        if not self.redactor or data is None:
+            return data
+        if isinstance(data, dict):
+            return self.redactor.redact_dict(data)
+        if isinstance(data, list):
+            return self.redactor.redact_list(data)
+        return data
+
     def _method_allows_body(self, method: str) -> bool:
         return method.upper() in {"POST", "PUT", "PATCH", "DELETE"}
 
@@ -505,6 +564,21 @@ class ApiExecutor:
         """Case-insensitive check for Content-Type header"""
         return any(key.lower() == 'content-type' for key in headers.keys())
 
+    def _resolve_timeouts(self, timeout, deadline) -> Tuple[float, float]:
+        """
+        (connect, read) seconds for one call.
+        Priority: per-call `timeout` > Settings (connect_timeout / timeout),
+        then clamped to whatever is left of the ctx deadline.
+        """
+        connect_s = float(getattr(self.settings, "connect_timeout", 10.0))
+        read_s = float(getattr(self.settings, "timeout", 30))
+        if isinstance(timeout, (tuple, list)):
+            connect_s, read_s = float(timeout[0]), float(timeout[1])
+        elif timeout is not None:
+            read_s = float(timeout)
+            connect_s = min(connect_s, read_s)
+        return resolve_timeouts(connect_s, read_s, deadline)
+
     # ---- main call ----
 
     def __call__(
@@ -517,8 +591,17 @@ class ApiExecutor:
         req_json: Optional[Dict[str, Any]] = None,
         req_headers: Optional[Dict[str, str]] = None,
         resp_headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
     ) -> Tuple[int, Dict[str, Any]]:
+        """
+        `timeout` may be a read timeout in seconds or a (connect, read) tuple.
+        A deadline stored in ctx (see deadline.py) caps both; once it has run out
+        the call is not sent and a synthetic 408 is returned instead.
+        """
+        if hotpath.active():  # pytest --profile
+            hotpath.begin("api", endpoint_key(method, path))
         mode = select_mode(ctx)
+        deadline = get_deadline(ctx)
 
         # Assemble headers: keep minimal defaults; only set Content-Type if we do send a body
         headers: Dict[str, str] = {"Accept": "application/json"}
@@ -533,23 +616,45 @@ class ApiExecutor:
         full_url = f"{base}{safe_path}"
         safe_url = self.redactor.redact_url(full_url) if self.redactor else full_url
 
-        if not self.skip_recording:
-            self._log_request(step, method, safe_url, headers, req_json, mode, send_body)
+        # With sampling the decision needs the status, so the request line waits for the response
+        log_now = not self.skip_recording and self.sampler.logs_everything
+        if log_now:
+            self._log_request(step, method, safe_url, mode)
            
         # Execute with proper exception handling and response header capture
         real_resp_headers: Dict[str, str] = {}
         status = 0
         data: Dict[str, Any] = {}
-        
+        connect_s, read_s = self._resolve_timeouts(timeout, deadline)
+        timer = CallTimer(self._get_mode_name(mode))
+        ttfb_s: Optional[float] = None
+        sent = True  # False when the deadline stopped the call before it left (or a HAR answered it)
+        har = self.har if mode != ApiClientMode.MOCK else None
+
+        hotpath.begin("transport")
         try:
-            if mode == ApiClientMode.PLAYWRIGHT:
+            if deadline is not None and deadline.expired:
+                # Out of budget: don't open a socket at all
+                status, data = deadline_exceeded_response(deadline, method=method, url=safe_url)
+                real_resp_headers = {"Content-Type": "application/json"}
+                sent = False
+                api_log.warning("⏱️ Deadline exceeded before {} {} ({!r})", method.upper(), safe_url, deadline)
+
+            elif har is not None and har.replaying:
+                status, real_resp_headers, data = har.replay(method, full_url, req_json if send_body else None)
+                sent = False  # no backend latency to record
+
+            elif mode == ApiClientMode.PLAYWRIGHT:
                 if not self.pw_api:
                     raise RuntimeError("Playwright API client not available")
+                # Playwright has a single overall timeout (ms), no connect/read split
+                total_s = connect_s + read_s
                 resp = self.pw_api.fetch(
                     safe_path,
                     method=method.upper(),
                     headers=headers,
                     data=json.dumps(req_json) if send_body else None,
+                    timeout=playwright_timeout_ms(total_s, deadline),
                 )
                 status = resp.status
                 real_resp_headers = self._extract_response_headers(resp, mode)
@@ -581,9 +686,11 @@ class ApiExecutor:
                     url=full_url,
                     headers=headers,
                     json=req_json if send_body else None,
-                    timeout=30,
+                    timeout=(connect_s, read_s),
                 )
                 status = r.status_code
+                elapsed = getattr(r, "elapsed", None)  # requests: sent -> headers parsed
+                ttfb_s = elapsed.total_seconds() if hasattr(elapsed, "total_seconds") else None
                 real_resp_headers = self._extract_response_headers(r, mode)
                 ct = (real_resp_headers.get("content-type") or "").lower()
                 if "application/json" in ct:
@@ -605,17 +712,40 @@ class ApiExecutor:
                 real_resp_headers = resp_headers or self._extract_response_headers(None, mode)
 
         except Exception as e:
-            # Capture transport/connection errors as synthetic failures
-            status = 0  # Special status for exceptions
-            data = {
-                "error": "Transport/connection error",
-                "exception_type": type(e).__name__,
-                "exception_message": str(e),
-                "url": full_url,
-                "method": method.upper()
-            }
             real_resp_headers = {"Content-Type": "application/json"}
-            print(f"🔌 Transport error for {method.upper()} {safe_url}: {type(e).__name__}: {e}")
+            if deadline is not None and deadline.expired:
+                # The call used up the rest of the budget: report the deadline, not a generic error
+                status, data = deadline_exceeded_response(deadline, method=method, url=safe_url)
+                data["exception_type"] = type(e).__name__
+                data["exception_message"] = str(e)
+                api_log.warning("⏱️ Deadline exceeded during {} {}: {}: {}", method.upper(), safe_url, type(e).__name__, e)
+            else:
+                # Capture transport/connection errors as synthetic failures
+                status = 0  # Special status for exceptions
+                data = {
+                    "error": "Transport/connection error",
+                    "exception_type": type(e).__name__,
+                    "exception_message": str(e),
+                    "url": full_url,
+                    "method": method.upper(),
+                    "timeout_s": {"connect": round(connect_s, 3), "read": round(read_s, 3)},
+                }
+                if self.recording:  # load runs count errors themselves; a warning per failure would flood
+                    api_log.warning("🔌 Transport error for {} {}: {}: {}", method.upper(), safe_url, type(e).__name__, e)
+        hotpath.end("transport")
+
+        # Stops after the body was read/decoded (total = what the test waited for)
+        timing = timer.stop(ttfb_s=ttfb_s).as_dict()
+        if har is not None and har.recording and sent and status:
+            har.record(method=method, url=full_url, req_headers=headers, req_body=req_json if send_body else None,
+                       status=status, resp_headers=real_resp_headers, resp_body=data, time_ms=timing["total_ms"],
+                       redact=self._redact_for_har)
+        if sent and (mode != ApiClientMode.MOCK or not self.recording):
+            # Per-endpoint histogram for this process, merged across workers at session end. Real transports
+            # only; a load run (recording=False) with --client mock still reports what its engine sent
+            key = endpoint_key(method, safe_url)
+            self.endpoints.add(key)
+            latency_registry().record(key, timing["total_ms"], error=status == 0 or status >= 400)
 
         # Enhanced last response tracking
         self.last_response = {
@@ -627,72 +757,114 @@ class ApiExecutor:
             "method": method.upper(),
             "timestamp": time.time(),
             "step": step,
+            "duration_ms": timing["total_ms"],
+            "timing": timing,
         }
 
-        if self.debug and not self.skip_recording:
-            self._log_response(status, data, mode, safe_url, real_resp_headers)
-
         if not self.skip_recording:
-            safe_req_headers = self.redactor.redact_headers(headers) if self.redactor else headers
-            safe_req_json = self._redact_if_enabled(req_json)
-            safe_resp_headers = self.redactor.redact_headers(real_resp_headers) if self.redactor else real_resp_headers
-            safe_resp_json = self._redact_if_enabled(data)
-
-            self.recorder.record(
-                step=step,
-                method=method.upper(),
-                url=safe_url,
-                status=status,
-                req_headers=safe_req_headers,
-                req_json=safe_req_json,
-                resp_headers=safe_resp_headers,
-                resp_json=safe_resp_json,
-            )
+            hotpath.begin("recording")
+            # Redacted once, on first use: the debug log and the recorder share it, and
+            # a deferred recorder (API_RECORD=on_failure) never asks for passing tests
+            redacted: Dict[str, Any] = {}
+
+            def exchange() -> Dict[str, Any]:
+                if not redacted:
+                    hotpath.begin("redaction")
+                    redacted["request"] = {
+                        "headers": self.redactor.redact_headers(headers) if self.redactor else headers,
+                        "body": self._redact_if_enabled(req_json),
+                    }
+                    redacted["response"] = {
+                        "headers": self.redactor.redact_headers(real_resp_headers) if self.redactor else real_resp_headers,
+                        "body": self._redact_if_enabled(data),
+                    }
+                    hotpath.end("redaction")
+                return redacted
+
+            logged = log_now or self.sampler.should_log(method, safe_url, status)
+            if logged:
+                hotpath.begin("logging")
+                if not log_now:
+                    self._log_request(step, method, safe_url, mode)
+                self._log_response(status, mode, safe_url, exchange, send_body, timing)
+                hotpath.end("logging")
+            self.exchanges.append({
+                "step": step,
+                "method": method.upper(),
+                "url": safe_url,
+                "status": status,
+                "mode": self._get_mode_name(mode),
+                "timestamp": self.last_response["timestamp"],
+                "thread": threading.current_thread().name,
+                "timing": timing,
+                "logged": logged,
+                # raw; ExchangeBuffer.render() redacts on demand
+                "req_headers": headers,
+                "req_json": req_json if send_body else None,
+                "resp_headers": real_resp_headers,
+                "resp_json": data,
+            })
+
+            def record_kwargs() -> Dict[str, Any]:
+                ex = exchange()
+                return dict(
+                    step=step,
+                    method=method.upper(),
+                    url=safe_url,
+                    status=status,
+                    req_headers=ex["request"]["headers"],
+                    req_json=ex["request"]["body"],
+                    resp_headers=ex["response"]["headers"],
+                    resp_json=ex["response"]["body"],
+                    timing=timing,
+                )
+
+            record_lazy = getattr(self.recorder, "record_lazy", None)
+            if record_lazy is not None:
+                record_lazy(record_kwargs, method=method.upper(), url=safe_url, status=status)
+            else:
+                self.recorder.record(**record_kwargs())
+            hotpath.end("recording")
 
+        hotpath.end("api")
         return status, data
 
     # ---- enhanced logging ----
 
-    def _log_request(self, step, method, url, headers, body, mode, send_body):    
+    def _log_request(self, step, method, url, mode):
         mode_name = self._get_mode_name(mode)
-        print(f"\n{self.colors.cyan('🚀 API REQUEST')} {self.colors.dim(f'[{mode_name}]')}")
-        print(f"   {self.colors.bold('Step:')} {step}")
-        print(f"   {self.colors.bold('Method:')} {self.colors.yellow(method.upper())}")
-        print(f"   {self.colors.bold('URL:')} {self.colors.blue(url)}")
-
-        if headers:
-            print(f"   {self.colors.bold('Headers:')}")
-            safe_headers = self.redactor.redact_headers(headers) if self.redactor else headers
-            print(self.colors.dim(json.dumps(safe_headers, indent=6)))
-
-        if body is not None and send_body:
-            print(f"   {self.colors.bold('Body:')}")
-            safe_body = self._redact_if_enabled(body)
-            print(self.colors.green(json.dumps(safe_body, indent=6)))
-
-    def _log_response(self, status, data, mode, url, headers):
+        api_log.bind(event="api_request", method=method.upper(), url=url, mode=mode_name, step=step).info(
+            "🚀 API REQUEST [{}] {} {} ({})", mode_name, method.upper(), url, step
+        )
+
+    def _log_response(self, status, mode, url, exchange, send_body, timing=None):
+        """`exchange()` returns the redacted {"request": ..., "response": ...} (built on first call)."""
         mode_name = self._get_mode_name(mode)
-        status_color = self.colors.green if status < 400 else self.colors.red
-        print(f"\n{self.colors.magenta('📥 API RESPONSE')} {self.colors.dim(f'[{mode_name}]')}")
-        print(f"   {self.colors.bold('URL:')} {self.colors.blue(url)}")
-        print(f"   {self.colors.bold('Status:')} {status_color(str(status))}")
-        
-        if headers:
-            print(f"   {self.colors.bold('Response Headers:')}")
-            safe_headers = self.redactor.redact_headers(headers) if self.redactor else headers
-            print(self.colors.dim(json.dumps(safe_headers, indent=6)))
-        
-        if data is not None:
-            print(f"   {self.colors.bold('Body:')}")
-            safe = self._redact_if_enabled(data)
-            print(status_color(json.dumps(safe, indent=6)))
-        print(self.colors.dim("=" * 60))
+        duration_ms = (timing or {}).get("total_ms")
+        log = api_log.bind(event="api_response", url=url, mode=mode_name, status=status, timing=timing)
+        # Failures (and DEBUG_API) reach the console at INFO; passing calls are DEBUG only
+        level = "INFO" if (self.debug or status == 0 or status >= 400) else "DEBUG"
+        log.log(level, "📥 API RESPONSE [{}] {} {} ({} ms)", mode_name, status, url,
+                "?" if duration_ms is None else f"{duration_ms:.1f}")
+        if level_enabled("DEBUG"):  # otherwise no redaction / json.dumps at all
+            log.opt(lazy=True).debug("   Exchange: {}", lambda: self._dump_exchange(exchange(), send_body))
+
+    @staticmethod
+    def _dump_exchange(ex: Dict[str, Any], send_body: bool) -> str:
+        request = dict(ex["request"], body=ex["request"]["body"] if send_body else None)
+        return json.dumps({"request": request, "response": ex["response"]}, default=str)
 
     def log_last_response_on_failure(self):
         """Enhanced failure logging with more context"""
-        if not self.last_response:
-            return
         resp = self.last_response
+        if not resp:
+            # Calls made on other threads (or none at all): fall back to the shared buffer
+            last = self.exchanges.last()
+            if not last:
+                return
+            resp = {"status": last["status"], "headers": last["resp_headers"], "body": last["resp_json"],
+                    "url": last["url"], "mode": last["mode"], "method": last["method"], "step": last["step"]}
+        self._print_recent_calls()
         safe_url = self.redactor.redact_url(resp['url']) if self.redactor else resp['url']
 
         print(f"\n{self.colors.red('💥 TEST FAILURE - LAST API RESPONSE 💥')}")
@@ -713,8 +885,21 @@ class ApiExecutor:
             print(self.colors.red(json.dumps(safe, indent=6)))
         print(self.colors.red("=" * 60))
 
+    def _print_recent_calls(self):
+        """Calls of this test the sampler kept off the console (the last one is printed in full below)."""
+        earlier = self.exchanges.render(self.redactor)[:-1] if self.debug else self.exchanges.snapshot()[:-1]
+        if not any(not c["logged"] for c in earlier):
+            return
+        print(f"\n{self.colors.yellow(f'📜 RECENT API CALLS (last {len(earlier)}, not logged at the time marked *)')}")
+        for c in earlier:
+            mark = " " if c["logged"] else "*"
+            status = str(c["status"])
+            status = self.colors.red(status) if (c["status"] == 0 or c["status"] >= 400) else self.colors.green(status)
+            print(f"  {mark} [{c['mode']}] {c['method']} {c['url']} -> {status}  ({c['step']})")
+            if not c["logged"] and self.debug:
+                print(self.colors.dim(f"      request:  {json.dumps({'headers': c['req_headers'], 'body': c['req_json']}, default=str)}"))
+                print(self.colors.dim(f"      response: {json.dumps({'headers': c['resp_headers'], 'body': c['resp_json']}, default=str)}"))
 
-    
     def record_final_retry_attempt(
         self,
         step: str,
@@ -724,7 +909,7 @@ class ApiExecutor:
         req_headers: Optional[Dict] = None,
         ):
         """Record the final attempt from a retry using cached last_response data."""
-        if not self.last_response:
+        if not self.last_response or self.skip_recording:
             return
 
         safe_path = self._ensure_leading_slash(path)
@@ -750,13 +935,14 @@ class ApiExecutor:
             req_json=safe_req_json,
             resp_headers=safe_resp_headers,
             resp_json=safe_resp_json,
+            timing=self.last_response.get("timing"),
         )
 
 
 
-def make_api_executor(*, pw_api, rq_session, settings, recorder) -> ApiExecutor:
+def make_api_executor(*, pw_api, rq_session, settings, recorder, recording: bool = True) -> ApiExecutor:
     """Factory for DI/tests."""
-    return ApiExecutor(pw_api=pw_api, rq_session=rq_session, settings=settings, recorder=recorder)
+    return ApiExecutor(pw_api=pw_api, rq_session=rq_session, settings=settings, recorder=recorder, recording=recording)
 
 
 # from __future__ import annotations
@@ -0,0 +1,87 @@
+# src/api/execution/log_sampling.py
+# Console/log volume control for high-volume API runs.
+#
+# The sampler only decides whether an exchange's request/response lines are
+# logged *now*. Every exchange still goes into the executor's bounded
+# per-test buffer of recent calls, which log_last_response_on_failure()
+# dumps when a test fails, so sampled-away calls are not lost for debugging.
+#
+#   all      log every call (default, previous behaviour)
+#   first    first N calls per endpoint, per process
+#   every    1 in K calls per endpoint (the first one always)
+#   errors   only failures (status 0 / >= 400)
+#   failure  nothing while tests pass; only the on-failure dump
+#
+# In `first` and `every` modes failures are always logged as well.
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from .endpoints import endpoint_key
+
+SAMPLING_MODES = ("all", "first", "every", "errors", "failure")
+
+
+def is_failure(status: int) -> bool:
+    return status == 0 or status >= 400
+
+
+class LogSampler:
+    """Thread-safe per-endpoint counters deciding which exchanges get logged."""
+
+    def __init__(self, mode: str = "all", first_n: int = 5, every_k: int = 100):
+        mode = (mode or "all").lower()
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"Unknown API log sampling mode {mode!r} (expected one of {', '.join(SAMPLING_MODES)})")
+        self.mode = mode
+        self.first_n = max(1, int(first_n))
+        self.every_k = max(1, int(every_k))
+        self.suppressed = 0
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def logs_everything(self) -> bool:
+        """True when the decision does not depend on the outcome (request line can go out first)."""
+        return self.mode == "all"
+
+    def should_log(self, method: str, url: str, status: int) -> bool:
+        if self.mode == "all":
+            return True
+        if self.mode != "failure" and is_failure(status):
+            return True
+        if self.mode in ("errors", "failure"):
+            self._suppress()
+            return False
+
+        key = endpoint_key(method, url)
+        with self._lock:
+            n = self._counts.get(key, 0) + 1
+            self._counts[key] = n
+        keep = n <= self.first_n if self.mode == "first" else (n - 1) % self.every_k == 0
+        if not keep:
+            self._suppress()
+        return keep
+
+    def _suppress(self) -> None:
+        with self._lock:
+            self.suppressed += 1
+
+
+# One sampler per process and configuration: executors are per test, but the
+# "first N per endpoint" budget is for the whole run
+_samplers: Dict[Tuple[str, int, int], LogSampler] = {}
+_samplers_lock = threading.Lock()
+
+
+def get_sampler(mode: Optional[str] = None, first_n: int = 5, every_k: int = 100) -> LogSampler:
+    key = ((mode or "all").lower(), int(first_n), int(every_k))
+    sampler = _samplers.get(key)
+    if sampler is None:
+        with _samplers_lock:
+            sampler = _samplers.get(key)
+            if sampler is None:
+                sampler = _samplers[key] = LogSampler(*key)
+    return sampler
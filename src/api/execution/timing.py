@@ -0,0 +1,71 @@
+# src/api/execution/timing.py
+# Per-call latency captured by the executor.
+#
+# What each transport can tell us:
+#   requests     total (our clock) + ttfb (Response.elapsed: request sent ->
+#                response headers parsed)
+#   playwright   total only (APIResponse exposes no timing breakdown)
+#   mock         total only
+# DNS/connect are not exposed by either client without patching their
+# connection pools, so they are reported only when a transport provides them.
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+PHASES = ("dns_ms", "connect_ms", "ttfb_ms", "total_ms")
+
+
+class CallTimer:
+    """
+    timer = CallTimer("requests")   # starts the clock
+    ... send, read body ...
+    timer.stop(ttfb_s=r.elapsed.total_seconds())
+    timer.as_dict() -> {"total_ms": 12.3, "ttfb_ms": 10.1, "source": "requests"}
+    """
+
+    __slots__ = ("source", "_t0", "total_ms", "phases")
+
+    def __init__(self, source: str, clock=time.perf_counter):
+        self.source = source
+        self._t0 = clock()
+        self.total_ms: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+
+    def stop(self, clock=time.perf_counter, **phases_s: Optional[float]) -> "CallTimer":
+        """Stop the clock; keyword args are phase durations in *seconds* (dns_s, connect_s, ttfb_s)."""
+        if self.total_ms is None:
+            self.total_ms = round((clock() - self._t0) * 1000.0, 3)
+        for name, seconds in phases_s.items():
+            if seconds is not None and name.endswith("_s"):
+                self.phases[f"{name[:-2]}_ms"] = round(seconds * 1000.0, 3)
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"total_ms": self.total_ms, "source": self.source}
+        out.update(self.phases)
+        return out
+
+
+def response_time_ms(response: Any, phase: str = "total_ms") -> Optional[float]:
+    """
+    Duration of `phase` for whatever the tests have at hand:
+    - an executor `last_response` dict (or an ApiExecutor: its last_response),
+    - a requests.Response (`elapsed`, i.e. time to headers, for any phase),
+    - a dict / ApiTrace-like object carrying `timing`.
+    Returns None if nothing was measured.
+    """
+    if response is None:
+        return None
+    last = getattr(response, "last_response", None)
+    if isinstance(last, dict):
+        response = last
+    timing = response.get("timing") if isinstance(response, dict) else getattr(response, "timing", None)
+    if isinstance(timing, dict):
+        value = timing.get(phase)
+        return float(value) if value is not None else None
+    elapsed = getattr(response, "elapsed", None)
+    if elapsed is not None and hasattr(elapsed, "total_seconds"):
+        return elapsed.total_seconds() * 1000.0
+    return None
@@ -1,6 +1,7 @@
 from ..base.base_api import BaseAPI
 from typing import Any, Dict, Tuple, Optional
 from src.utils.api.api_helpers import APIHelpers
+from src.api.execution.deadline import get_deadline
 
 
 class AuthAPI(BaseAPI):
@@ -81,7 +82,8 @@ class AuthAPI(BaseAPI):
             condition=is_login_successful,
             max_attempts=max_attempts,
             delay=delay,
-            description=f"Login for user '{username}'"
+            description=f"Login for user '{username}'",
+            deadline=get_deadline(ctx),
         )
         
         # Set auth token if login was successful
@@ -109,7 +111,8 @@ class AuthAPI(BaseAPI):
             max_attempts=max_attempts,
             retry_on_statuses=[503],  # Service Unavailable
             delay=1.5,
-            description=f"Simple login retry for '{username}'"
+            description=f"Simple login retry for '{username}'",
+            deadline=get_deadline(ctx),
         )
         
         # Set auth token if successful
@@ -142,7 +145,8 @@ class AuthAPI(BaseAPI):
             max_attempts=max_attempts,
             timeout=timeout,
             delay=1.0,  # Fixed typo: was "elay"
-            description=f"Get list instance {endpoint}"
+            description=f"Get list instance {endpoint}",
+            deadline=get_deadline(ctx),
         )
     
         # Record only the final result using enhanced method
@@ -172,7 +176,8 @@ class AuthAPI(BaseAPI):
             max_attempts=max_attempts,
             initial_delay=initial_delay,
             timeout=timeout,
-            description=f"Get list instance with backoff {endpoint}"
+            description=f"Get list instance with backoff {endpoint}",
+            deadline=get_deadline(ctx),
         )
     
         if hasattr(self, '_executor'):
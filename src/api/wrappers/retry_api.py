@@ -2,6 +2,7 @@
 
 from typing import Tuple, Dict, Any, Optional, List
 from src.utils.api.api_helpers import APIHelpers
+from src.api.execution.deadline import get_deadline
 
 
 class RetryTestAPI:
@@ -77,7 +78,8 @@ class RetryTestAPI:
             delay=delay,
             timeout=timeout,
             retry_on_statuses=retry_on_statuses,
-            description=f"Retry test endpoint (id: {endpoint_id})"
+            description=f"Retry test endpoint (id: {endpoint_id})",
+            deadline=get_deadline(ctx),
         )
         
         # Record only the final result using enhanced recording method
@@ -148,7 +150,8 @@ class RetryTestAPI:
             jitter=jitter,
             timeout=timeout,
             retry_on_statuses=retry_on_statuses,
-            description=f"Retry test with backoff (id: {endpoint_id})"
+            description=f"Retry test with backoff (id: {endpoint_id})",
+            deadline=get_deadline(ctx),
         )
         
         # Record final result
@@ -194,7 +197,8 @@ class RetryTestAPI:
             expected_status=200,
             max_attempts=max_attempts,
             delay=delay,
-            description=f"Retry until success (id: {endpoint_id})"
+            description=f"Retry until success (id: {endpoint_id})",
+            deadline=get_deadline(ctx),
         )
         
         # Record final result
@@ -244,7 +248,8 @@ class RetryTestAPI:
             condition=success_condition,
             max_attempts=max_attempts,
             delay=delay,
-            description=f"Retry with custom condition (id: {endpoint_id})"
+            description=f"Retry with custom condition (id: {endpoint_id})",
+            deadline=get_deadline(ctx),
         )
         
         # Record final result
@@ -1,57 +1,59 @@
 from src.api.base.base_api import BaseAPI
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlencode
 from src.utils.data_factory import DataFactory
 
 class UserAPI(BaseAPI):
     """User management API wrapper"""
 
-    def login(self, username: str, password: str):
-        """Login and get authentication token"""
-        response = self.post("/auth/login", {
-            "username": username,
-            "password": password
-        })
-
-        if response.status == 200:
-            token = response.json().get("token")
-            self.set_auth_token(token)
-            return token
-
-        return None
-
-    def create_user(self, user_data: Dict[str, Any] = None):
+    def login(self, ctx, username: str, password: str) -> Tuple[int, Dict[str, Any]]:
+        """Login and keep the token for the following calls"""
+        status, data = self._call(
+            ctx=ctx,
+            step="Users: login",
+            method="POST",
+            endpoint="/auth/login",
+            req_json={"username": username, "password": password},
+        )
+        if status == 200 and isinstance(data, dict):
+            token = data.get("token") or data.get("access_token")
+            if token:
+                self.set_auth_token(token)
+        return status, data
+
+    def create_user(self, ctx, user_data: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
         """Create new user"""
         if not user_data:
             user_data = DataFactory.generate_user_data()
 
-        return self.post("/users", user_data)
+        return self.post(ctx, "Users: create user", "/users", user_data)
 
-    def get_user(self, user_id: str):
+    def get_user(self, ctx, user_id: str) -> Tuple[int, Dict[str, Any]]:
         """Get user by ID"""
-        return self.get(f"/users/{user_id}")
+        return self.get(ctx, "Users: get user", f"/users/{user_id}")
 
-    def get_all_users(self, page: int = 1, limit: int = 10):
+    def get_all_users(self, ctx, page: int = 1, limit: int = 10) -> Tuple[int, Dict[str, Any]]:
         """Get all users with pagination"""
         params = {"page": page, "limit": limit}
-        return self.get("/users", params=params)
+        return self.get(ctx, "Users: list users", f"/users?{urlencode(params)}")
 
-    def update_user(self, user_id: str, update_data: Dict[str, Any]):
+    def update_user(self, ctx, user_id: str, update_data: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
         """Update user"""
-        return self.put(f"/users/{user_id}", update_data)
+        return self.put(ctx, "Users: update user", f"/users/{user_id}", update_data)
 
-    def delete_user(self, user_id: str):
+    def delete_user(self, ctx, user_id: str) -> Tuple[int, Dict[str, Any]]:
         """Delete user"""
-        return self.delete(f"/users/{user_id}")
+        return self.delete(ctx, "Users: delete user", f"/users/{user_id}")
 
-    def search_users(self, query: str):
+    def search_users(self, ctx, query: str) -> Tuple[int, Dict[str, Any]]:
         """Search users"""
         params = {"q": query}
-        return self.get("/users/search", params=params)
+        return self.get(ctx, "Users: search users", f"/users/search?{urlencode(params)}")
 
-    def get_user_profile(self, user_id: str):
+    def get_user_profile(self, ctx, user_id: str) -> Tuple[int, Dict[str, Any]]:
         """Get user profile"""
-        return self.get(f"/users/{user_id}/profile")
+        return self.get(ctx, "Users: get profile", f"/users/{user_id}/profile")
 
-    def update_user_profile(self, user_id: str, profile_data: Dict[str, Any]):
+    def update_user_profile(self, ctx, user_id: str, profile_data: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
         """Update user profile"""
-        return self.put(f"/users/{user_id}/profile", profile_data)
\ No newline at end of file
+        return self.put(ctx, "Users: update profile", f"/users/{user_id}/profile", profile_data)
@@ -382,7 +382,7 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
 from pydantic import Field, AliasChoices, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic_core import PydanticUndefined
@@ -432,7 +432,9 @@ class Settings(BaseSettings):
     api_base_url: str = Field("", validation_alias=AliasChoices("API_BASE_URL"))
     database_url: str = Field("", validation_alias=AliasChoices("DATABASE_URL"))
 
-    timeout: int = Field(30, ge=1, le=300, validation_alias=AliasChoices("API_TIMEOUT"))
+    timeout: int = Field(30, ge=1, le=300, validation_alias=AliasChoices("API_TIMEOUT"))  # read timeout per API call
+    connect_timeout: float = Field(10.0, ge=0.1, le=120.0, validation_alias=AliasChoices("API_CONNECT_TIMEOUT"))
+    scenario_timeout: float = Field(0.0, ge=0.0, le=3600.0, validation_alias=AliasChoices("SCENARIO_TIMEOUT"))  # 0 = no scenario deadline
     retries: int = Field(3, ge=0, le=10, validation_alias=AliasChoices("TEST_RETRIES"))
     browser_slowmo: int = Field(500, ge=0, le=5000, validation_alias=AliasChoices("UI_SLOW_MO"))
     record_video: bool = Field(False, validation_alias=AliasChoices("RECORD_VIDEO"))
@@ -451,6 +453,10 @@ class Settings(BaseSettings):
     redact_sensitive_data: bool = Field(True, validation_alias=AliasChoices("REDACT_SENSITIVE_DATA"))
     redact_uuid_values: bool = Field(False, validation_alias=AliasChoices("REDACT_UUIDS"))
     max_log_body_size: int = Field(51200, ge=1024, le=1048576, validation_alias=AliasChoices("MAX_LOG_BODY_SIZE"))  # 50KB default, 1KB-1MB range
+    api_log_sampling: str = Field("all", validation_alias=AliasChoices("API_LOG_SAMPLING"))  # all|first|every|errors|failure
+    api_log_first_n: int = Field(5, ge=1, le=100000, validation_alias=AliasChoices("API_LOG_FIRST_N"))
+    api_log_every_k: int = Field(100, ge=1, le=1000000, validation_alias=AliasChoices("API_LOG_EVERY_K"))
+    api_log_buffer_size: int = Field(20, ge=1, le=1000, validation_alias=AliasChoices("API_LOG_BUFFER"))  # recent calls kept per test
 
     # Retry configuration for mock endpoints
     login_retry_attempts: int = Field(3, ge=1, le=10, validation_alias=AliasChoices("LOGIN_RETRY_ATTEMPTS"))
@@ -477,6 +483,8 @@ class Settings(BaseSettings):
 
     config_sources: Dict[str, str] = Field(default_factory=dict, exclude=True)
     loaded_files: List[str] = Field(default_factory=list, exclude=True)
+    # Keys the .env files define: read with os.getenv all over the code base, not just through Settings
+    dotenv_keys: List[str] = Field(default_factory=list, exclude=True)
 
     model_config = SettingsConfigDict(
         env_file=None,
@@ -505,15 +513,16 @@ class Settings(BaseSettings):
             print(f"[CONFIG] Env-specific: {env_specific} ({'found' if env_specific.exists() else 'missing'})")
 
         loaded_files: List[str] = []
-        if base_env.exists():
-            load_dotenv(base_env, override=False)
-            loaded_files.append(str(base_env))
-        if env_specific.exists():
-            load_dotenv(env_specific, override=False)
-            loaded_files.append(str(env_specific))
+        dotenv_keys: List[str] = []
+        for env_file in (base_env, env_specific):
+            if env_file.exists():
+                load_dotenv(env_file, override=False)
+                loaded_files.append(str(env_file))
+                dotenv_keys.extend(k for k in dotenv_values(env_file) if k not in dotenv_keys)
 
         super().__init__(**values)
         self.loaded_files = loaded_files
+        self.dotenv_keys = dotenv_keys
 
     @model_validator(mode="after")
     def _post_init(self) -> "Settings":
@@ -691,13 +700,54 @@ class Settings(BaseSettings):
             "base_url": self.base_url,
             "api_base_url": self.api_base_url,
             "timeout": self.timeout,
+            "connect_timeout": self.connect_timeout,
+            "scenario_timeout": self.scenario_timeout,
             "parallel_workers": self.parallel_workers,
             "redaction_enabled": self.redact_sensitive_data,
             "max_log_size": self.max_log_body_size,
             "has_test_data": bool(self.test_data),
         }
 
+    # --- Snapshot (xdist controller -> workers) ---
+    def to_snapshot(self) -> Dict[str, Any]:
+        """JSON-safe dump of the fully resolved settings, including the bookkeeping fields."""
+        data = self.model_dump(mode="json")
+        data["config_sources"] = dict(self.config_sources)
+        data["loaded_files"] = list(self.loaded_files)
+        data["dotenv_keys"] = list(self.dotenv_keys)
+        # What the .env files put in os.environ here, for code reading it with os.getenv on the worker
+        data["dotenv"] = {k: os.environ[k] for k in self.dotenv_keys if k in os.environ}
+        return data
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "Settings":
+        """
+        Rebuild from to_snapshot() output without re-reading .env / JSON files
+        or re-running validators (the controller already did all of that).
+        The .env values go into os.environ the way load_dotenv(override=False)
+        would have put them there.
+        """
+        data = dict(data)
+        os.environ["TEST_ENV"] = data.get("environment") or os.getenv("TEST_ENV", "dev")
+        for key, value in (data.pop("dotenv", None) or {}).items():
+            if value is not None:
+                os.environ.setdefault(key, value)
+        return cls.model_construct(**data)
+
+
+_primed_settings: Settings | None = None
+
+
+def prime_settings(snapshot: Dict[str, Any]) -> Settings:
+    """Install a pre-resolved snapshot so get_settings() skips the full build (xdist workers)."""
+    global _primed_settings
+    _primed_settings = Settings.from_snapshot(snapshot)
+    get_settings.cache_clear()
+    return _primed_settings
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    if _primed_settings is not None:
+        return _primed_settings
     return Settings()
\ No newline at end of file
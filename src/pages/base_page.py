@@ -1,23 +1,35 @@
+from typing import Optional
+
 from playwright.sync_api import Page
 from abc import ABC, abstractmethod
 from src.utils.logger import get_logger
+from src.utils.ui.readiness import Readiness, default_readiness, open_until_ready, wait_until_ready
 
 
 logger = get_logger(__name__)
 
 class BasePage(ABC):
+    # When the page counts as loaded (see src/utils/ui/readiness.py); None: UI_READINESS / "quiet"
+    readiness: Optional[Readiness] = None
+
     def __init__(self, page: Page):
         self.page = page
         self.logger = logger
+        if self.readiness is None:
+            self.readiness = default_readiness()
 
     @abstractmethod
     def navigate(self):
         """Navigate to the page"""
         pass
 
-    def wait_for_page_load(self, timeout: int = 30000):
-        """Wait for page to load"""
-        self.page.wait_for_load_state("networkidle", timeout=timeout)
+    def open(self, path: str) -> float:
+        """Navigate to path and wait until the page is ready, within readiness.timeout_ms; returns the ms it took"""
+        return open_until_ready(self.page, path, self.readiness, type(self).__name__, logger=self.logger)
+
+    def wait_for_page_load(self, timeout: Optional[int] = None) -> float:
+        """Wait for page to load (per self.readiness); returns the ms it took"""
+        return wait_until_ready(self.page, self.readiness, type(self).__name__, timeout_ms=timeout, logger=self.logger)
 
     def take_screenshot(self, name: str):
         """Take screenshot"""
@@ -1,7 +1,11 @@
 from playwright.sync_api import Page, expect
 from src.pages.base_page import BasePage
+from src.utils.ui.readiness import Readiness
 
 class LoginPage(BasePage):
+    # Ready once the form is usable; doesn't wait for the rest of the page's traffic
+    readiness = Readiness("dom", locator="#username")
+
     def __init__(self, page: Page):
         super().__init__(page)
         self.username_input = "#username"
@@ -11,8 +15,7 @@ class LoginPage(BasePage):
 
     def navigate(self):
         """Navigate to login page"""
-        self.page.goto("/login")
-        self.wait_for_page_load()
+        self.open("/login")
 
     def enter_username(self, username: str):
         """Enter username"""
@@ -0,0 +1,132 @@
+# src/performance/load_test/api_load_test.py
+# Native load run from the command line:
+#
+#   python -m src.performance.load_test.api_load_test --profile constant --rps 50 --duration 60
+#   python -m src.performance.load_test.api_load_test --profile ramp --rps 10 --to-rps 200 --duration 120
+#   python -m src.performance.load_test.api_load_test --profile spike --rps 20 --peak-rps 300 \
+#       --duration 60 --spike-at 30 --spike-length 5 --scenario journeys --gevent
+#
+#   python -m src.performance.load_test.api_load_test --processes 0 --rps 2000 --duration 120
+#       (one worker process per core, see distributed.py)
+#
+# Writes reports/performance/<prefix>_stats.csv / _stats_history.csv /
+# _failures.csv / _report.html / .json (Locust layout, prefix api_performance)
+# and, with --baseline, compares per-task response times and throughput with
+# perf-baselines/<env>/native-<scenario>.json (baselines.py).
+# Nothing heavy is imported before --gevent had the chance to monkey-patch.
+# --gevent is single-process only (see distributed.py).
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Open-model load run driving the framework's API wrappers")
+    p.add_argument("--scenario", choices=["api", "journeys"], default="api")
+    p.add_argument("--profile", choices=["constant", "ramp", "spike"], default="constant")
+    p.add_argument("--rps", type=float, default=10.0, help="Rate (constant), start rate (ramp) or base rate (spike)")
+    p.add_argument("--to-rps", type=float, default=None, help="ramp: final rate")
+    p.add_argument("--hold", type=float, default=0.0, help="ramp: seconds to hold the final rate")
+    p.add_argument("--peak-rps", type=float, default=None, help="spike: rate during the spike")
+    p.add_argument("--spike-at", type=float, default=None, help="spike: start offset (s), default mid-run")
+    p.add_argument("--spike-length", type=float, default=5.0)
+    p.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    p.add_argument("--poisson", action="store_true", help="Exponential inter-arrival gaps instead of even spacing")
+    p.add_argument("--concurrency", type=int, default=64, help="Max in-flight tasks per process (worker threads/greenlets)")
+    p.add_argument("--processes", type=int, default=1, help="Load processes (0 = one per core); >1 splits the rate between them")
+    p.add_argument("--client", choices=["requests", "mock"], default=os.getenv("API_CLIENT", "requests"))
+    p.add_argument("--weight", action="append", default=[], metavar="TASK=N", help="Override a task weight (repeatable)")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--gevent", action="store_true", help="Run workers on greenlets (gevent.monkey.patch_all; one process only)")
+    p.add_argument("--env", default=os.getenv("TEST_ENV", "dev"))
+    p.add_argument("--baseline", choices=["off", "compare", "update"], default="compare")
+    p.add_argument("--results-dir", type=Path, default=Path("reports") / "performance")
+    p.add_argument("--prefix", default="api_performance", help="Output file prefix (Locust's for the API run by default)")
+    args = p.parse_args(argv)
+    if args.gevent and args.processes != 1:
+        p.error("--gevent runs in a single process; use --processes 1, or more processes without --gevent")
+    return args
+
+
+def _profile(args):
+    from src.performance.load_test.engine import ArrivalProfile
+
+    if args.profile == "ramp":
+        return ArrivalProfile.ramp(args.rps, args.to_rps if args.to_rps is not None else args.rps * 10, args.duration, args.hold)
+    if args.profile == "spike":
+        at = args.spike_at if args.spike_at is not None else args.duration / 2
+        return ArrivalProfile.spike(args.rps, args.peak_rps or args.rps * 10, args.duration, at, args.spike_length)
+    return ArrivalProfile.constant(args.rps, args.duration)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    if args.gevent:
+        from gevent import monkey
+
+        monkey.patch_all()
+
+    from src.performance.load_test.distributed import DistributedLoadRunner, build_scenario, write_reports
+    from src.performance.load_test.engine import LoadEngine
+    from src.utils.performance import baselines
+    from src.utils.performance.latency_histogram import latency_registry
+
+    weights = {}
+    for item in args.weight:
+        name, _, n = item.rpartition("=")
+        weights[name.strip()] = int(n)
+
+    os.environ["TEST_ENV"] = args.env
+    profile = _profile(args)
+    print(f"[load] {args.scenario}: {profile.name} for {profile.duration_s:g}s "
+          f"(~{profile.expected_arrivals:.0f} arrivals), client={args.client}")
+
+    history = []
+    if args.processes == 1:
+        scenario = build_scenario(args.scenario, args.client, args.concurrency, weights)
+        result = LoadEngine(scenario, profile, max_concurrency=args.concurrency, poisson=args.poisson, seed=args.seed).run()
+        result.endpoints.merge(latency_registry())
+    else:
+        runner = DistributedLoadRunner(
+            profile, scenario=args.scenario, processes=args.processes or None, concurrency=args.concurrency,
+            client=args.client, poisson=args.poisson, seed=args.seed, weights=weights,
+        )
+        result = runner.run()
+        history = runner.history
+    for line in result.format_rows():
+        print(line)
+    for name, err in result.error_samples.items():
+        print(f"[load] ⚠️ {name}: {err}")
+
+    baseline_rows = None
+
+    status = 0
+    if args.baseline != "off":
+        store = baselines.BaselineStore(args.env, f"native-{result.scenario}")
+        current = dict(result.response.items())
+        rps = {r["task"]: r["rps"] for r in result.rows()}
+        base, base_rps = store.baseline()
+        rows = baselines.compare(current, base, rps=rps, baseline_rps=base_rps) if base else []
+        baseline_rows = {"path": str(store.path), "tasks": rows}
+        for line in baselines.format_comparison(rows):
+            print(line)
+        if any(r["status"] == "regression" for r in rows):
+            print(f"[load] ❌ regression against {store.path}")
+            status = 1
+        elif args.baseline == "update":
+            print(f"[load] added this run to {store.add_run(current, rps)}")
+
+    out = write_reports(result, history, args.results_dir, args.prefix)
+    if baseline_rows is not None:
+        data = json.loads(out["json"].read_text(encoding="utf-8"))
+        data["baseline"] = baseline_rows
+        out["json"].write_text(json.dumps(data, indent=2), encoding="utf-8")
+    print(f"[load] wrote {args.results_dir}/{args.prefix}_* (stats/history/failures csv, report html, json)")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+# src/performance/load_test/distributed.py
+# Run the load engine in N local processes (default: one per core) and merge.
+#
+# One Python process tops out well below what most targets can take (GIL,
+# JSON, TLS). The controller here:
+#   1. spawns N workers; each builds its scenario (and logs in) and says "ready"
+#   2. sends every worker the same wall-clock start time once all are ready
+#   3. each worker runs the profile at 1/N of the rate with phase k/N, so the
+#      union of their arrivals is exactly the single-process schedule
+#      (ramps and spikes stay in step across processes)
+#   4. workers send histogram snapshots every `interval_s`; the controller
+#      merges them for a live line and the stats history
+#   5. "stop" (Ctrl+C) stops scheduling everywhere; in-flight tasks finish
+#
+# Control channel: one multiprocessing queue per worker (controller -> worker)
+# and one shared event queue (workers -> controller). Workers are started with
+# the "spawn" method: forking a process that already runs threads (logger
+# writer, executor pools) is not safe. No --gevent here: the queues arrive in the
+# worker before monkey.patch_all() could run, and their feeder threads hang
+# once patched; each process runs the engine on OS threads.
+#
+# Outputs use the Locust layout under reports/performance/, so
+# PerformanceTestRunner.analyze_results() and compare_with_baseline() read them:
+#   <prefix>_stats.csv          per endpoint template (+ Aggregated)
+#   <prefix>_stats_history.csv  Aggregated row per interval
+#   <prefix>_failures.csv       first error per task, with counts
+#   <prefix>_report.html        summary, tasks (CO-corrected), endpoints
+#   <prefix>.json               LoadResult.to_dict() + history
+
+from __future__ import annotations
+
+import csv
+import html
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils.performance.latency_histogram import LatencyHistogram, LatencyRegistry, latency_registry
+from .engine import ArrivalProfile, LoadEngine, LoadResult, Stage
+
+RESULTS_DIR = Path("reports") / "performance"
+
+
+@dataclass
+class WorkerSpec:
+    """Everything a worker needs, picklable (the scenario is rebuilt in the worker)."""
+    scenario: str = "api"
+    client: str = "requests"
+    stages: List[tuple] = field(default_factory=list)   # (duration_s, start_rps, end_rps)
+    profile_name: str = "custom"
+    concurrency: int = 64                                # per process
+    poisson: bool = False
+    seed: Optional[int] = None
+    weights: Dict[str, int] = field(default_factory=dict)
+    interval_s: float = 1.0
+    drain_s: float = 30.0
+
+
+def build_scenario(name: str, client: str, pool_size: int, weights: Optional[Dict[str, int]] = None):
+    from src.performance.scenarios.api_load import api_scenario
+    from src.performance.scenarios.user_journey import journey_scenario
+
+    build = journey_scenario if name == "journeys" else api_scenario
+    return build(client=client, pool_size=pool_size, weights=weights)
+
+
+def _snapshot(engine: LoadEngine) -> Dict[str, Any]:
+    result = engine.snapshot()
+    result.endpoints = LatencyRegistry.from_dict(latency_registry().to_dict())
+    return result.to_dict()
+
+
+def _worker_main(index: int, count: int, spec: WorkerSpec, commands, events) -> None:
+    try:
+        scenario = build_scenario(spec.scenario, spec.client, spec.concurrency, spec.weights)
+        profile = ArrivalProfile([Stage(*s) for s in spec.stages], spec.profile_name).scaled(1.0 / count)
+        engine = LoadEngine(
+            scenario, profile,
+            max_concurrency=spec.concurrency,
+            poisson=spec.poisson,
+            seed=None if spec.seed is None else spec.seed + index,
+            phase=index / count,
+            drain_s=spec.drain_s,
+        )
+    except Exception as e:
+        events.put(("failed", index, f"{type(e).__name__}: {e}"))
+        return
+    events.put(("ready", index, os.getpid()))
+
+    cmd = commands.get()
+    if cmd[0] != "start":
+        events.put(("done", index, _snapshot(engine)))
+        return
+    delay = cmd[1] - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+    finished = threading.Event()
+
+    def listen():
+        while not finished.is_set():
+            try:
+                if commands.get(timeout=0.2)[0] == "stop":
+                    engine.stop()
+            except queue.Empty:
+                pass
+
+    def report():
+        while not finished.wait(spec.interval_s):
+            events.put(("tick", index, _snapshot(engine)))
+
+    for fn in (listen, report):
+        threading.Thread(target=fn, daemon=True).start()
+    try:
+        engine.run()
+    finally:
+        finished.set()
+        events.put(("done", index, _snapshot(engine)))
+
+
+class DistributedLoadRunner:
+    """
+    runner = DistributedLoadRunner(ArrivalProfile.ramp(50, 2000, 120), processes=8)
+    result = runner.run()            # merged LoadResult
+    runner.write_reports(result)     # reports/performance/api_performance_*
+    """
+
+    def __init__(
+        self,
+        profile: ArrivalProfile,
+        *,
+        scenario: str = "api",
+        processes: Optional[int] = None,
+        concurrency: int = 64,
+        client: str = "requests",
+        poisson: bool = False,
+        seed: Optional[int] = None,
+        weights: Optional[Dict[str, int]] = None,
+        interval_s: float = 1.0,
+        ready_timeout_s: float = 60.0,
+        drain_s: float = 30.0,
+        verbose: bool = True,
+    ):
+        self.profile = profile
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.spec = WorkerSpec(
+            scenario=scenario, client=client,
+            stages=[(s.duration_s, s.start_rps, s.end_rps) for s in profile.stages],
+            profile_name=profile.name, concurrency=concurrency, poisson=poisson, seed=seed,
+            weights=dict(weights or {}), interval_s=interval_s, drain_s=drain_s,
+        )
+        self.ready_timeout_s = ready_timeout_s
+        self.verbose = verbose
+        self.history: List[Dict[str, Any]] = []
+        self.failures: Dict[int, str] = {}
+        self._stopped = False
+
+    def _say(self, msg: str) -> None:
+        if self.verbose:
+            print(msg, flush=True)
+
+    def run(self) -> LoadResult:
+        ctx = mp.get_context("spawn")
+        events = ctx.Queue()
+        commands = [ctx.Queue() for _ in range(self.processes)]
+        procs = [
+            ctx.Process(target=_worker_main, args=(i, self.processes, self.spec, commands[i], events),
+                        name=f"load-worker-{i}", daemon=True)
+            for i in range(self.processes)
+        ]
+        for p in procs:
+            p.start()
+        self._say(f"[load] {self.processes} worker processes, {self.spec.concurrency} in flight each: {self.profile.name}")
+
+        latest: Dict[int, Dict[str, Any]] = {}
+        done: Dict[int, Dict[str, Any]] = {}
+        try:
+            ready = self._wait_ready(events, procs)
+            start_at = time.time() + 0.5
+            for i in ready:
+                commands[i].put(("start", start_at))
+            for i in set(range(self.processes)) - set(ready):
+                done[i] = {}
+
+            # a history row per round, once every running worker has reported it
+            limit = start_at + self.profile.duration_s + self.spec.drain_s + 10 * self.spec.interval_s
+            ticks = {i: 0 for i in ready}
+            rounds = 0
+            while len(done) < self.processes and time.time() < limit:
+                try:
+                    kind, index, payload = events.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if kind == "tick":
+                    latest[index] = payload
+                    ticks[index] += 1
+                elif kind == "done":
+                    latest[index] = done[index] = payload
+                elif kind == "failed":
+                    self.failures[index] = payload
+                    done[index] = {}
+                running = [i for i in ticks if i not in done]
+                if running and min(ticks[i] for i in running) > rounds:
+                    rounds += 1
+                    self._record_tick(latest)
+        except KeyboardInterrupt:
+            self.stop(commands)
+            raise
+        finally:
+            for p in procs:
+                p.join(timeout=5)
+                if p.is_alive():
+                    p.terminate()
+
+        if len(done) < self.processes:
+            self._say(f"[load] ⚠️ {self.processes - len(done)} worker(s) did not finish; using their last snapshot")
+        merged = self._merge(latest)
+        self._record_tick(latest, final=True)
+        return merged
+
+    def stop(self, commands) -> None:
+        """Stop scheduling in every worker (sent on Ctrl+C)."""
+        if not self._stopped:
+            self._stopped = True
+            for q in commands:
+                q.put(("stop",))
+
+    def _wait_ready(self, events, procs) -> List[int]:
+        ready: List[int] = []
+        deadline = time.time() + self.ready_timeout_s
+        while len(ready) + len(self.failures) < self.processes and time.time() < deadline:
+            try:
+                kind, index, payload = events.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in procs):
+                    break
+                continue
+            if kind == "ready":
+                ready.append(index)
+            elif kind == "failed":
+                self.failures[index] = payload
+                self._say(f"[load] ❌ worker {index}: {payload}")
+        if not ready:
+            raise RuntimeError(f"no load worker became ready: {self.failures or 'timeout'}")
+        return ready
+
+    @staticmethod
+    def _merge(snapshots: Dict[int, Dict[str, Any]]) -> LoadResult:
+        merged: Optional[LoadResult] = None
+        for _, data in sorted(snapshots.items()):
+            if not data:
+                continue
+            part = LoadResult.from_dict(data)
+            merged = part if merged is None else merged.merge(part)
+        return merged or LoadResult("", "")
+
+    def _record_tick(self, latest: Dict[int, Dict[str, Any]], final: bool = False) -> None:
+        merged = self._merge(latest)
+        if final and self.history and merged.elapsed_s - self.history[-1]["elapsed_s"] < self.spec.interval_s / 2:
+            self.history.pop()   # the last tick and the final snapshot share one interval
+        total = LatencyHistogram()
+        for _, hist in merged.response.items():
+            total.merge(hist)
+        prev = self.history[-1] if self.history else {"completed": 0, "errors": 0, "elapsed_s": 0.0}
+        dt = max(1e-6, merged.elapsed_s - prev["elapsed_s"])
+        row = {
+            "timestamp": int(time.time()),
+            "elapsed_s": round(merged.elapsed_s, 3),
+            "completed": merged.completed,
+            "errors": merged.errors,
+            "rps": round((merged.completed - prev["completed"]) / dt, 2),
+            "fps": round((merged.errors - prev["errors"]) / dt, 2),
+            "hist": total,
+        }
+        self.history.append(row)
+        p99 = total.percentile(99)
+        self._say(
+            f"[load] t={row['elapsed_s']:.0f}s done={row['completed']} err={row['errors']} "
+            f"rps={row['rps']:.0f} p99={'-' if p99 is None else f'{p99:.0f}'}ms (from intended start)"
+        )
+
+    # ---------- outputs ----------
+
+    def write_reports(self, result: LoadResult, results_dir: Path = RESULTS_DIR, prefix: str = "api_performance") -> Dict[str, Path]:
+        return write_reports(result, self.history, results_dir, prefix)
+
+
+_PCTS = ("50%", "66%", "75%", "80%", "90%", "95%", "98%", "99%", "99.9%", "99.99%", "100%")
+
+
+def _stats_row(method: str, name: str, hist: LatencyHistogram, elapsed_s: float) -> List[Any]:
+    s = hist.summary()
+    rate = elapsed_s if elapsed_s > 0 else 1.0
+    pcts = [hist.percentile(float(p[:-1])) for p in _PCTS] if hist.count else [0] * len(_PCTS)
+    return [
+        method, name, hist.count, hist.errors,
+        s.get("p50_ms", 0), s.get("mean_ms", 0), s.get("min_ms", 0), s.get("max_ms", 0), 0,
+        round(hist.count / rate, 3), round(hist.errors / rate, 3), *pcts,
+    ]
+
+
+def write_reports(result: LoadResult, history: List[Dict[str, Any]], results_dir: Path = RESULTS_DIR,
+                  prefix: str = "api_performance") -> Dict[str, Path]:
+    results_dir.mkdir(parents=True, exist_ok=True)
+    out = {
+        "stats": results_dir / f"{prefix}_stats.csv",
+        "history": results_dir / f"{prefix}_stats_history.csv",
+        "failures": results_dir / f"{prefix}_failures.csv",
+        "html": results_dir / f"{prefix}_report.html",
+        "json": results_dir / f"{prefix}.json",
+    }
+
+    # Locust column layout (per endpoint template; service time as seen by the executor)
+    header = ["Type", "Name", "Request Count", "Failure Count", "Median Response Time", "Average Response Time",
+              "Min Response Time", "Max Response Time", "Average Content Size", "Requests/s", "Failures/s", *_PCTS]
+    aggregated = LatencyHistogram()
+    with open(out["stats"], "w", newline="", encoding="utf-8") as fh:
+        w = csv.writer(fh)
+        w.writerow(header)
+        for key, hist in result.endpoints.items():
+            method, _, path = key.partition(" ")
+            w.writerow(_stats_row(method, path, hist, result.elapsed_s))
+            aggregated.merge(hist)
+        w.writerow(_stats_row("", "Aggregated", aggregated, result.elapsed_s))
+
+    with open(out["history"], "w", newline="", encoding="utf-8") as fh:
+        w = csv.writer(fh)
+        w.writerow(["Timestamp", "Type", "Name", "Requests/s", "Failures/s", *_PCTS, "Total Request Count", "Total Failure Count"])
+        for row in history:
+            hist = row["hist"]
+            pcts = [hist.percentile(float(p[:-1])) for p in _PCTS] if hist.count else ["N/A"] * len(_PCTS)
+            w.writerow([row["timestamp"], "", "Aggregated", row["rps"], row["fps"], *pcts, row["completed"], row["errors"]])
+
+    with open(out["failures"], "w", newline="", encoding="utf-8") as fh:
+        w = csv.writer(fh)
+        w.writerow(["Method", "Name", "Error", "Occurrences"])
+        errors = {name: hist.errors for name, hist in result.response.items()}
+        for name, err in sorted(result.error_samples.items()):
+            w.writerow(["task", name, err, errors.get(name, 0)])
+
+    data = result.to_dict()
+    data["history"] = [{k: v for k, v in row.items() if k != "hist"} for row in history]
+    out["json"].write_text(json.dumps(data, indent=2), encoding="utf-8")
+    out["html"].write_text(render_html(result, data["history"]), encoding="utf-8")
+    return out
+
+
+def render_html(result: LoadResult, history: List[Dict[str, Any]]) -> str:
+    def ms(v):
+        return "-" if v is None else f"{v:.1f}"
+
+    def table(title, head, rows):
+        body = "".join("<tr>" + "".join(f"<td>{html.escape(str(c))}</td>" for c in r) + "</tr>" for r in rows)
+        ths = "".join(f"<th>{h}</th>" for h in head)
+        return f"<section><h2>{title}</h2><table><thead><tr>{ths}</tr></thead><tbody>{body}</tbody></table></section>"
+
+    tasks = table(
+        "Tasks (ms from intended start: coordinated-omission corrected)",
+        ["Task", "Count", "Errors", "rps", "p50", "p90", "p99", "max", "service p99"],
+        [[r["task"], r["count"], r["errors"], r["rps"], ms(r["p50_ms"]), ms(r["p90_ms"]), ms(r["p99_ms"]),
+          ms(r["max_ms"]), ms(r["service_p99_ms"])] for r in result.rows()],
+    )
+    endpoints = table(
+        "Endpoints (ms, executor service time)",
+        ["Endpoint", "Count", "Errors", "p50", "p90", "p99", "max"],
+        [[r["endpoint"], r["count"], r["errors"], ms(r.get("p50_ms")), ms(r.get("p90_ms")), ms(r.get("p99_ms")),
+          ms(r.get("max_ms"))] for r in result.endpoints.summary_rows()],
+    )
+    timeline = table(
+        "Timeline", ["t (s)", "done", "errors", "rps", "failures/s"],
+        [[h["elapsed_s"], h["completed"], h["errors"], h["rps"], h["fps"]] for h in history],
+    )
+    summary = (
+        f"{html.escape(result.scenario)} / {html.escape(result.profile)}: {result.completed}/{result.intended} done, "
+        f"{result.errors} errors, {result.achieved_rps:.1f} rps over {result.elapsed_s:.1f}s, "
+        f"start lag p99 {ms(result.lag.percentile(99))} ms"
+    )
+    css = ("body{font-family:system-ui,sans-serif;margin:1.5rem;background:#0b1220;color:#e6edf3}"
+           "table{border-collapse:collapse;width:100%;margin-bottom:1.5rem}"
+           "th,td{text-align:right;padding:.2rem .6rem;border-bottom:1px solid #24324a}"
+           "th:first-child,td:first-child{text-align:left}")
+    return (f"<!doctype html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Load report</title>"
+            f"<style>{css}</style></head><body><h1>Load report</h1><p>{summary}</p>"
+            f"{tasks}{endpoints}{timeline}</body></html>")
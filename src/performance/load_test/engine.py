@@ -0,0 +1,403 @@
+# src/performance/load_test/engine.py
+# Open-model load engine for the framework's own API wrappers.
+#
+# Open model: requests arrive on a schedule (constant / ramp / spike rate),
+# whether or not earlier ones have finished. A closed model (N users, each
+# waiting for its previous call, like Locust's wait_time) slows down with the
+# system under test. It then under-reports latency exactly when the system is
+# struggling ("coordinated omission").
+#
+# Latency is therefore measured from the *intended* start of each arrival:
+#   response  intended start -> done   (what a user arriving then would see)
+#   service   actual start   -> done   (what the client measured)
+#   lag       intended start -> actual start (scheduler/worker backlog)
+# response = lag + service; a gap between response and service percentiles
+# means the generator or the system could not keep up with the offered rate.
+#
+# Workers are plain threads pulling from a queue (the executor and requests are
+# blocking). Under `gevent.monkey.patch_all()` (api_load_test.py --gevent)
+# the same code runs on greenlets.
+
+from __future__ import annotations
+
+import math
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from src.utils.performance.latency_histogram import LatencyHistogram, LatencyRegistry
+
+
+# ---------- arrival profiles ----------
+
+@dataclass(frozen=True)
+class Stage:
+    """`duration_s` seconds with the rate going linearly from `start_rps` to `end_rps`."""
+    duration_s: float
+    start_rps: float
+    end_rps: float
+
+    def area(self, t: float) -> float:
+        """Expected arrivals in the first t seconds of the stage."""
+        return self.start_rps * t + (self.end_rps - self.start_rps) * t * t / (2.0 * self.duration_s)
+
+    def time_at(self, area: float) -> float:
+        """Inverse of area(): offset where `area` arrivals have been reached."""
+        a = (self.end_rps - self.start_rps) / (2.0 * self.duration_s)
+        b = self.start_rps
+        if abs(a) < 1e-12:
+            return area / b if b > 0 else math.inf
+        disc = b * b + 4.0 * a * area
+        if disc < 0:
+            return math.inf
+        return (-b + math.sqrt(disc)) / (2.0 * a)
+
+
+class ArrivalProfile:
+    """
+    Piecewise-linear arrival rate.
+        ArrivalProfile.constant(50, 60)             50 rps for 60 s
+        ArrivalProfile.ramp(10, 200, 120)           10 -> 200 rps over 120 s
+        ArrivalProfile.spike(20, 300, 60, at=30, length=5)
+    Arrivals are evenly spaced by default; poisson=True draws exponential gaps
+    (time-rescaled for the changing rate).
+    """
+
+    def __init__(self, stages: Sequence[Stage], name: str = "custom"):
+        self.stages = [s for s in stages if s.duration_s > 0]
+        self.name = name
+
+    @property
+    def duration_s(self) -> float:
+        return sum(s.duration_s for s in self.stages)
+
+    @property
+    def expected_arrivals(self) -> float:
+        return sum(s.area(s.duration_s) for s in self.stages)
+
+    def scaled(self, factor: float) -> "ArrivalProfile":
+        """Same shape at `factor` times the rate (one of N load processes gets 1/N)."""
+        return ArrivalProfile(
+            [Stage(s.duration_s, s.start_rps * factor, s.end_rps * factor) for s in self.stages], self.name
+        )
+
+    @classmethod
+    def constant(cls, rps: float, duration_s: float) -> "ArrivalProfile":
+        return cls([Stage(duration_s, rps, rps)], f"constant {rps:g} rps")
+
+    @classmethod
+    def ramp(cls, start_rps: float, end_rps: float, duration_s: float, hold_s: float = 0.0) -> "ArrivalProfile":
+        return cls(
+            [Stage(duration_s, start_rps, end_rps), Stage(hold_s, end_rps, end_rps)],
+            f"ramp {start_rps:g}->{end_rps:g} rps",
+        )
+
+    @classmethod
+    def spike(cls, base_rps: float, peak_rps: float, duration_s: float, at: float, length: float) -> "ArrivalProfile":
+        at = max(0.0, min(at, duration_s))
+        length = max(0.0, min(length, duration_s - at))
+        return cls(
+            [Stage(at, base_rps, base_rps), Stage(length, peak_rps, peak_rps),
+             Stage(duration_s - at - length, base_rps, base_rps)],
+            f"spike {base_rps:g}/{peak_rps:g} rps",
+        )
+
+    def arrivals(self, poisson: bool = False, rng: Optional[random.Random] = None, phase: float = 0.0) -> Iterator[float]:
+        """
+        Intended start offsets (seconds from the start of the run), increasing.
+        `phase` (0..1) shifts even spacing: N processes at rate/N with phases
+        k/N together produce exactly the single-process schedule.
+        """
+        rng = rng or random.Random()
+        offset = 0.0
+        target = rng.expovariate(1.0) if poisson else phase  # cumulative expected arrivals of the next one
+        for stage in self.stages:
+            total = stage.area(stage.duration_s)
+            while target < total:
+                yield offset + min(stage.time_at(target), stage.duration_s)
+                target += rng.expovariate(1.0) if poisson else 1.0
+            target -= total
+            offset += stage.duration_s
+
+
+# ---------- scenario ----------
+
+@dataclass
+class LoadTask:
+    """One weighted unit of work. `fn(user)` returns (status, data), a status or None."""
+    name: str
+    fn: Callable[[Any], Any]
+    weight: int = 1
+
+
+@dataclass
+class LoadScenario:
+    """
+    `make_user()` is called once per worker thread (wrappers keep per-user state
+    such as auth tokens); `on_start(user)` runs once after it, untimed.
+    """
+    name: str
+    tasks: List[LoadTask]
+    make_user: Callable[[], Any]
+    on_start: Optional[Callable[[Any], None]] = None
+
+    def picker(self, rng: random.Random) -> Callable[[], LoadTask]:
+        tasks = [t for t in self.tasks if t.weight > 0]
+        if not tasks:
+            raise ValueError(f"scenario {self.name!r} has no task with a positive weight")
+        cum, total = [], 0
+        for t in tasks:
+            total += t.weight
+            cum.append(total)
+        return lambda: rng.choices(tasks, cum_weights=cum)[0]
+
+
+def _status_of(result: Any) -> Optional[int]:
+    if isinstance(result, tuple) and result and isinstance(result[0], int):
+        return result[0]
+    return result if isinstance(result, int) and not isinstance(result, bool) else None
+
+
+# ---------- result ----------
+
+@dataclass
+class LoadResult:
+    scenario: str
+    profile: str
+    intended: int = 0
+    completed: int = 0
+    errors: int = 0
+    elapsed_s: float = 0.0
+    peak_backlog: int = 0
+    response: LatencyRegistry = field(default_factory=LatencyRegistry)
+    service: LatencyRegistry = field(default_factory=LatencyRegistry)
+    lag: LatencyHistogram = field(default_factory=LatencyHistogram)
+    error_samples: Dict[str, str] = field(default_factory=dict)
+    # per endpoint template (executor service time), filled by the load runners
+    endpoints: LatencyRegistry = field(default_factory=LatencyRegistry)
+
+    @property
+    def achieved_rps(self) -> float:
+        return self.completed / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Per task: response-time percentiles (CO-corrected) next to service time."""
+        service = dict(self.service.items())
+        rows = []
+        for name, hist in self.response.items():
+            s = hist.summary()
+            svc = service.get(name)
+            rows.append({
+                "task": name,
+                "count": s["count"],
+                "errors": s["errors"],
+                "rps": round(s["count"] / self.elapsed_s, 2) if self.elapsed_s > 0 else None,
+                "p50_ms": s.get("p50_ms"),
+                "p90_ms": s.get("p90_ms"),
+                "p99_ms": s.get("p99_ms"),
+                "max_ms": s.get("max_ms"),
+                "service_p99_ms": svc.percentile(99) if svc else None,
+            })
+        rows.sort(key=lambda r: r["count"], reverse=True)
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scenario": self.scenario,
+            "profile": self.profile,
+            "intended": self.intended,
+            "completed": self.completed,
+            "errors": self.errors,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "achieved_rps": round(self.achieved_rps, 2),
+            "peak_backlog": self.peak_backlog,
+            "lag": self.lag.summary(),
+            "tasks": self.rows(),
+            "endpoints": self.endpoints.summary_rows(),
+            "error_samples": self.error_samples,
+            "histograms": {
+                "response": self.response.to_dict(),
+                "service": self.service.to_dict(),
+                "lag": self.lag.to_dict(),
+                "endpoints": self.endpoints.to_dict(),
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LoadResult":
+        hists = data.get("histograms", {})
+        return cls(
+            scenario=data.get("scenario", ""),
+            profile=data.get("profile", ""),
+            intended=int(data.get("intended", 0)),
+            completed=int(data.get("completed", 0)),
+            errors=int(data.get("errors", 0)),
+            elapsed_s=float(data.get("elapsed_s", 0.0)),
+            peak_backlog=int(data.get("peak_backlog", 0)),
+            response=LatencyRegistry.from_dict(hists.get("response", {})),
+            service=LatencyRegistry.from_dict(hists.get("service", {})),
+            lag=LatencyHistogram.from_dict(hists["lag"]) if hists.get("lag") else LatencyHistogram(),
+            error_samples=dict(data.get("error_samples", {})),
+            endpoints=LatencyRegistry.from_dict(hists.get("endpoints", {})),
+        )
+
+    def merge(self, other: "LoadResult") -> "LoadResult":
+        """Add another process's result (same scenario and run)."""
+        self.intended += other.intended
+        self.completed += other.completed
+        self.errors += other.errors
+        self.elapsed_s = max(self.elapsed_s, other.elapsed_s)
+        self.peak_backlog += other.peak_backlog
+        self.response.merge(other.response)
+        self.service.merge(other.service)
+        self.lag.merge(other.lag)
+        self.endpoints.merge(other.endpoints)
+        for name, err in other.error_samples.items():
+            self.error_samples.setdefault(name, err)
+        return self
+
+    def format_rows(self) -> List[str]:
+        def ms(v):
+            return "-" if v is None else f"{v:.1f}"
+
+        lines = [
+            f"{self.scenario} / {self.profile}: {self.completed}/{self.intended} done, {self.errors} errors, "
+            f"{self.achieved_rps:.1f} rps over {self.elapsed_s:.1f}s, "
+            f"start lag p99 {ms(self.lag.percentile(99))} ms, peak backlog {self.peak_backlog}",
+            f"{'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'svc p99':>9} {'count':>7} {'err':>5}  task (ms, from intended start)",
+        ]
+        for r in self.rows():
+            lines.append(
+                f"{ms(r['p50_ms']):>9} {ms(r['p90_ms']):>9} {ms(r['p99_ms']):>9} {ms(r['max_ms']):>9} "
+                f"{ms(r['service_p99_ms']):>9} {r['count']:>7} {r['errors']:>5}  {r['task']}"
+            )
+        return lines
+
+
+# ---------- engine ----------
+
+_STOP = object()
+
+
+class LoadEngine:
+    """
+    engine = LoadEngine(scenario, ArrivalProfile.constant(50, 60), max_concurrency=64)
+    result = engine.run()
+    """
+
+    def __init__(
+        self,
+        scenario: LoadScenario,
+        profile: ArrivalProfile,
+        *,
+        max_concurrency: int = 64,
+        poisson: bool = False,
+        seed: Optional[int] = None,
+        phase: float = 0.0,
+        drain_s: float = 30.0,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.scenario = scenario
+        self.profile = profile
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.poisson = poisson
+        self.rng = random.Random(seed)
+        self.phase = phase
+        self.drain_s = drain_s
+        self.clock = clock
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._t0: Optional[float] = None
+        self._result = LoadResult(scenario.name, profile.name)
+
+    def stop(self) -> None:
+        """Stop scheduling new arrivals; in-flight tasks still finish (thread-safe)."""
+        self._stop.set()
+
+    def snapshot(self) -> LoadResult:
+        """Copy of the result so far (safe while running)."""
+        with self._lock:
+            data = self._result.to_dict()
+        if self._t0 is not None and not self._result.elapsed_s:
+            data["elapsed_s"] = self.clock() - self._t0
+        return LoadResult.from_dict(data)
+
+    def run(self) -> LoadResult:
+        result = self._result
+        pick = self.scenario.picker(self.rng)
+        workers = [
+            threading.Thread(target=self._worker, name=f"load-{i}", daemon=True)
+            for i in range(self.max_concurrency)
+        ]
+        for w in workers:
+            w.start()
+
+        t0 = self._t0 = self.clock()
+        for offset in self.profile.arrivals(self.poisson, self.rng, self.phase):
+            intended = t0 + offset
+            wait = intended - self.clock()
+            if self._stop.wait(wait) if wait > 0 else self._stop.is_set():
+                break
+            self._queue.put((intended, pick()))
+            result.intended += 1
+            backlog = self._queue.qsize()
+            if backlog > result.peak_backlog:
+                result.peak_backlog = backlog
+
+        for _ in workers:
+            self._queue.put(_STOP)
+        deadline = self.clock() + self.drain_s
+        for w in workers:
+            w.join(max(0.0, deadline - self.clock()))
+        result.elapsed_s = self.clock() - t0
+        return result
+
+    def _worker(self) -> None:
+        user = None
+        result = self._result
+        clock = self.clock
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            intended, task = item
+            if user is None:
+                # Per-thread user (its own wrappers/token), set up before the first task, untimed.
+                # If that fails the arrival counts as failed and the next one tries again.
+                try:
+                    user = self.scenario.make_user()
+                except Exception as e:
+                    self._note_error("make_user", e)
+                else:
+                    if self.scenario.on_start:
+                        try:
+                            self.scenario.on_start(user)
+                        except Exception as e:
+                            self._note_error("on_start", e)
+            started = clock()
+            if user is None:
+                failed = True
+            else:
+                try:
+                    status = _status_of(task.fn(user))
+                    failed = status is not None and (status == 0 or status >= 400)
+                except Exception as e:
+                    failed = True
+                    self._note_error(task.name, e)
+            done = clock()
+
+            result.response.record(task.name, (done - intended) * 1000.0, error=failed)
+            result.service.record(task.name, (done - started) * 1000.0, error=failed)
+            with self._lock:
+                result.lag.record(max(0.0, started - intended) * 1000.0)
+                result.completed += 1
+                result.errors += 1 if failed else 0
+
+    def _note_error(self, name: str, exc: Exception) -> None:
+        with self._lock:
+            if name not in self._result.error_samples:
+                self._result.error_samples[name] = f"{type(exc).__name__}: {exc}"
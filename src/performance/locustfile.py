@@ -1,37 +1,62 @@
+# src/performance/locustfile.py
+# Locust front-end over the same API definitions as the functional tests and
+# the native engine (scenarios/api_load.py): the wrappers run on an executor
+# whose session is Locust's client, so every call lands in Locust's stats,
+# grouped by endpoint template (/users/{user_id}, not one row per id).
+#
+#   locust -f src/performance/locustfile.py APIUser --host "$API_BASE_URL"
+#
+# Locust is a closed model (users wait for their previous call); for fixed
+# arrival rates and coordinated-omission-corrected latency use
+# src/performance/load_test/api_load_test.py.
+
 from locust import HttpUser, task, between
-import json
-import random
-from src.config.settings import Settings
 
-settings = Settings()
+from src.api.execution.endpoints import get_normalizer
+from src.config.settings import get_settings
+from src.performance.scenarios.api_load import API_TASKS, ApiLoadUser, make_load_executor
+
+settings = get_settings()
+
+
+class _TemplateNamedSession:
+    """Locust's HttpSession, naming each request by its endpoint template."""
+
+    def __init__(self, client):
+        self._client = client
+        self._normalizer = get_normalizer()
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("name", self._normalizer.normalize(url))
+        return self._client.request(method, url, **kwargs)
+
+
+def _locust_task(load_task):
+    def run(user):
+        load_task.fn(user.api_user)
+
+    run.__name__ = load_task.name
+    return run
+
+
+class APIUser(HttpUser):
+    """Weighted wrapper tasks from scenarios/api_load.py, logged in once per user."""
+
+    wait_time = between(1, 3)
+    host = settings.api_base_url
+    tasks = {_locust_task(t): t.weight for t in API_TASKS if t.weight > 0}
+
+    def on_start(self):
+        executor = make_load_executor(settings, "requests", session=_TemplateNamedSession(self.client))
+        self.api_user = ApiLoadUser(executor, settings)
+        self.api_user.login()
+
 
 class WebsiteUser(HttpUser):
     wait_time = between(1, 3)
     host = settings.base_url
 
-    def on_start(self):
-        """Login before starting tests"""
-        response = self.client.post("/api/auth/login", json={
-            "username": settings.test_username,
-            "password": settings.test_password
-        })
-        if response.status_code == 200:
-            self.auth_token = response.json().get("token")
-        else:
-            self.auth_token = None
-
-    @task(3)
+    @task
     def view_homepage(self):
-        """View homepage - highest weight"""
-        self.client.post("/users", json=user_data, headers=self.headers)
-
-    @task(1)
-    def update_user(self):
-        user_id = random.randint(1, 100)
-        update_data = {"name": f"updated_user_{random.randint(1000, 9999)}"}
-        self.client.put(f"/users/{user_id}", json=update_data, headers=self.headers)
-
-    @task(1)
-    def delete_user(self):
-        user_id = random.randint(1, 100)
-        self.client.delete(f"/users/{user_id}", headers=self.headers)
\ No newline at end of file
+        """View homepage"""
+        self.client.get("/")
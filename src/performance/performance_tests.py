@@ -1,8 +1,10 @@
 import subprocess
 import time
 from pathlib import Path
+from typing import Optional
 from src.config.settings import Settings
 from src.utils.logger import get_logger
+from src.utils.performance import baselines
 
 logger = get_logger(__name__)
 
@@ -17,7 +19,8 @@ class PerformanceTestRunner:
         """Run web application performance test"""
         cmd = [
             "locust",
-            "-f", "performance/locustfile.py",
+            "-f", "src/performance/locustfile.py",
+            "WebsiteUser",
             "--host", self.settings.base_url,
             "--users", str(self.settings.performance_users),
             "--spawn-rate", str(self.settings.performance_spawn_rate),
@@ -41,7 +44,7 @@ class PerformanceTestRunner:
         """Run API performance test"""
         cmd = [
             "locust",
-            "-f", "performance/locustfile.py",
+            "-f", "src/performance/locustfile.py",
             "APIUser",
             "--host", self.settings.api_base_url,
             "--users", str(self.settings.performance_users),
@@ -62,6 +65,46 @@ class PerformanceTestRunner:
 
         return result.returncode == 0
 
+    def run_native_load_test(self, profile, scenario: str = "api", max_concurrency: int = 64, poisson: bool = False):
+        """
+        Open-model run of the wrapper tasks (load_test/engine.py), no Locust involved.
+        `profile` is an ArrivalProfile, e.g. ArrivalProfile.constant(50, 60).
+        """
+        import json
+        from src.performance.load_test.engine import LoadEngine
+        from src.performance.scenarios.api_load import api_scenario
+        from src.performance.scenarios.user_journey import journey_scenario
+
+        build = journey_scenario if scenario == "journeys" else api_scenario
+        load_scenario = build(self.settings, pool_size=max_concurrency)
+        logger.info(f"Starting native {load_scenario.name} load test: {profile.name} for {profile.duration_s:g}s")
+        result = LoadEngine(load_scenario, profile, max_concurrency=max_concurrency, poisson=poisson).run()
+        for line in result.format_rows():
+            logger.info(line)
+
+        out = self.results_dir / f"load_{load_scenario.name}.json"
+        out.write_text(json.dumps(result.to_dict(), indent=2), encoding="utf-8")
+        return result
+
+    def run_distributed_load_test(self, profile, processes: Optional[int] = None, scenario: str = "api",
+                                  max_concurrency: int = 64, poisson: bool = False):
+        """
+        run_native_load_test() over `processes` local worker processes (default: one per core),
+        merged and written in the Locust layout (api_performance_*), so analyze_results()
+        and compare_with_baseline() pick it up like a Locust API run.
+        """
+        from src.performance.load_test.distributed import DistributedLoadRunner
+
+        runner = DistributedLoadRunner(profile, scenario=scenario, processes=processes,
+                                       concurrency=max_concurrency, poisson=poisson, verbose=False)
+        logger.info(f"Starting distributed {scenario} load test: {profile.name} for {profile.duration_s:g}s "
+                    f"on {runner.processes} processes")
+        result = runner.run()
+        for line in result.format_rows():
+            logger.info(line)
+        runner.write_reports(result, self.results_dir, "api_performance")
+        return result
+
     def analyze_results(self):
         """Analyze performance test results"""
         web_stats_file = self.results_dir / "web_performance_stats.csv"
@@ -91,4 +134,39 @@ class PerformanceTestRunner:
             "requests_per_second": df["Requests/s"].mean()
         }
 
-        return summary
\ No newline at end of file
+        return summary
+
+    def compare_with_baseline(self, update: bool = False):
+        """
+        Compare the latest Locust stats with the rolling baseline for this environment
+        (per endpoint template: latency distribution + requests/s, see baselines.py).
+        update=True adds the run to the baseline when nothing regressed.
+        """
+        env = getattr(self.settings, "environment", "dev")
+        comparisons = {}
+
+        for kind in ("web", "api"):
+            stats_file = self.results_dir / f"{kind}_performance_stats.csv"
+            if not stats_file.exists():
+                continue
+            hists, rps = baselines.histograms_from_locust(stats_file)
+            store = baselines.BaselineStore(env, f"locust-{kind}")
+            base_hists, base_rps = store.baseline()
+            rows = baselines.compare(hists, base_hists, rps=rps, baseline_rps=base_rps) if base_hists else []
+            comparisons[kind] = rows
+
+            regressions = [r for r in rows if r["status"] == "regression"]
+            for line in baselines.format_comparison(rows):
+                logger.info(line)
+            if regressions:
+                logger.error(f"{kind}: {len(regressions)} endpoint(s) regressed against {store.path}")
+            elif update:
+                logger.info(f"{kind}: added run to baseline {store.add_run(hists, rps)}")
+
+        if comparisons:
+            baselines.write_comparison(
+                [dict(r, kind=kind) for kind, rows in comparisons.items() for r in rows],
+                self.results_dir / "baseline_comparison.json",
+                env=env,
+            )
+        return comparisons
@@ -0,0 +1,88 @@
+# src/performance/scenarios/api_load.py
+# Weighted API tasks for the native load engine (load_test/engine.py), built
+# on the wrappers the functional tests use: AuthAPI, UserAPI, RetryTestAPI.
+# One executor (and connection pool) is shared by all worker threads, created
+# with recording=False: no logging, exchange buffer or recorder per call.
+
+from __future__ import annotations
+
+import random
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.api.execution.executor import make_api_executor
+from src.api.wrappers.auth_api import AuthAPI
+from src.api.wrappers.retry_api import RetryTestAPI
+from src.api.wrappers.user_api import UserAPI
+from src.performance.load_test.engine import LoadScenario, LoadTask
+
+
+def make_load_executor(settings, client: str = "requests", pool_size: int = 64, session=None):
+    """Executor for load runs; `session` may be any requests-compatible session (e.g. Locust's client)."""
+    if client == "requests" and session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return make_api_executor(pw_api=None, rq_session=session, settings=settings, recorder=None, recording=False)
+
+
+class ApiLoadUser:
+    """Per-worker state: its own wrappers (and auth token) on the shared executor."""
+
+    def __init__(self, executor, settings, client: str = "requests"):
+        self.settings = settings
+        self.ctx: Dict[str, Any] = {"api_client": client}
+        self.auth = AuthAPI(executor)
+        self.users = UserAPI(executor)
+        self.retry = RetryTestAPI(executor)
+        self.rng = random.Random()
+
+    def login(self):
+        status, data = self.auth.login(self.ctx, self.settings.test_username, self.settings.test_password)
+        token = data.get("access_token") if isinstance(data, dict) else None
+        if token:
+            self.users.set_auth_token(token)
+        return status, data
+
+    def user_id(self) -> str:
+        return str(self.rng.randint(1, 100))
+
+
+API_TASKS: List[LoadTask] = [
+    LoadTask("users: get user", lambda u: u.users.get_user(u.ctx, u.user_id()), 5),
+    LoadTask("users: list users", lambda u: u.users.get_all_users(u.ctx, page=u.rng.randint(1, 5)), 3),
+    LoadTask("users: search", lambda u: u.users.search_users(u.ctx, "test"), 2),
+    LoadTask("users: get profile", lambda u: u.users.get_user_profile(u.ctx, u.user_id()), 2),
+    LoadTask("auth: login", lambda u: u.login(), 1),
+    LoadTask(
+        "retry: endpoint",
+        lambda u: u.retry.test_retry_endpoint(u.ctx, max_failures=0, endpoint_id=f"load-{threading.get_ident()}"),
+        1,
+    ),
+]
+
+
+def api_scenario(
+    settings=None,
+    client: str = "requests",
+    pool_size: int = 64,
+    weights: Optional[Dict[str, int]] = None,
+    tasks: Optional[List[LoadTask]] = None,
+) -> LoadScenario:
+    """`weights` overrides task weights by name (0 disables a task)."""
+    if settings is None:
+        from src.config.settings import get_settings
+
+        settings = get_settings()
+    executor = make_load_executor(settings, client, pool_size)
+    tasks = [LoadTask(t.name, t.fn, (weights or {}).get(t.name, t.weight)) for t in (tasks or API_TASKS)]
+    return LoadScenario(
+        name="api",
+        tasks=tasks,
+        make_user=lambda: ApiLoadUser(executor, settings, client),
+        on_start=ApiLoadUser.login,
+    )
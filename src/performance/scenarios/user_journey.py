@@ -0,0 +1,59 @@
+# src/performance/scenarios/user_journey.py
+# Feature scenarios as load tasks: each journey replays the wrapper calls
+# behind a .feature scenario, so one iteration = one scenario run.
+#   auth_api.feature              "Successful login"      -> journey_login
+#   user.management.feature       create / get / delete    -> journey_user_crud
+#   retry_functionality.feature   retry until success      -> journey_retry
+# A journey returns the first failing status (or the last one), so a failed
+# step counts the whole iteration as an error.
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.performance.load_test.engine import LoadScenario, LoadTask
+from src.performance.scenarios.api_load import ApiLoadUser, api_scenario
+
+
+def _first_failure(*results: Tuple[int, Any]) -> Tuple[int, Any]:
+    for status, data in results:
+        if status == 0 or status >= 400:
+            return status, data
+    return results[-1]
+
+
+def journey_login(u: ApiLoadUser):
+    return u.login()
+
+
+def journey_user_crud(u: ApiLoadUser):
+    status, data = u.users.create_user(u.ctx, {"name": "Load User", "email": "load@example.com", "role": "user"})
+    if status == 0 or status >= 400:
+        return status, data
+    user_id = str(data.get("id", u.user_id())) if isinstance(data, dict) else u.user_id()
+    return _first_failure(
+        (status, data),
+        u.users.get_user(u.ctx, user_id),
+        u.users.delete_user(u.ctx, user_id),
+    )
+
+
+def journey_retry(u: ApiLoadUser):
+    return u.retry.test_retry_until_success(
+        u.ctx, max_failures=1, endpoint_id=f"journey-{threading.get_ident()}", max_attempts=3, delay=0.1
+    )
+
+
+JOURNEYS: List[LoadTask] = [
+    LoadTask("journey: login", journey_login, 3),
+    LoadTask("journey: user crud", journey_user_crud, 2),
+    LoadTask("journey: retry", journey_retry, 1),
+]
+
+
+def journey_scenario(settings=None, client: str = "requests", pool_size: int = 64,
+                     weights: Optional[Dict[str, int]] = None) -> LoadScenario:
+    scenario = api_scenario(settings, client, pool_size, weights, tasks=JOURNEYS)
+    scenario.name = "journeys"
+    return scenario
@@ -4,6 +4,9 @@ import json
 import time
 import random
 
+from src.api.execution.deadline import Deadline, sleep_within, stop_retrying
+from src.api.execution.timing import response_time_ms
+
 
 class APIHelpers:
     """API-specific helper functions with enhanced retry capabilities"""
@@ -33,11 +36,17 @@ class APIHelpers:
         assert actual_code == expected_code, f"Expected {expected_code}, got {actual_code}"
 
     @staticmethod
-    def assert_response_time(response: Response, max_time_ms: int = 5000):
-        """Assert response time is within limits"""
-        # Note: Playwright doesn't directly expose response time
-        # This could be implemented with timing decorators
-        pass
+    def assert_response_time(response: Any, max_time_ms: float = 5000, phase: str = "total_ms"):
+        """
+        Assert response time is within limits.
+
+        `response` is what the executor measured: `api_executor` itself (its
+        last_response), a `last_response` dict, or a requests.Response.
+        `phase` is "total_ms" (default) or "ttfb_ms" where the transport reports it.
+        """
+        actual_ms = response_time_ms(response, phase)
+        assert actual_ms is not None, f"No {phase} timing recorded for {type(response).__name__}"
+        assert actual_ms <= max_time_ms, f"Response took {actual_ms:.1f} ms ({phase}), limit {max_time_ms} ms"
 
     @staticmethod
     def extract_json_path(response: Response, json_path: str):
@@ -55,7 +64,8 @@ class APIHelpers:
         delay: float = 1.0,
         retry_on_statuses: Optional[List[int]] = None,
         timeout: Optional[float] = None,
-        description: str = "API call"
+        description: str = "API call",
+        deadline: Optional[Deadline] = None,
     ) -> Tuple[int, Dict[str, Any]]:
         """
         Simple retry utility with linear backoff and exception handling
@@ -67,6 +77,7 @@ class APIHelpers:
             retry_on_statuses: List of status codes to retry on (default: comprehensive list)
             timeout: Total timeout in seconds (default: None for no timeout)
             description: Description for logging
+            deadline: Scenario/step deadline from ctx (get_deadline(ctx)); stops retrying when spent
             
         Returns:
             Tuple of (status_code, response_data) from the final attempt
@@ -77,6 +88,10 @@ class APIHelpers:
         start_time = time.time()
         
         for attempt in range(1, max_attempts + 1):
+            spent = stop_retrying(deadline, description, attempt)
+            if spent:
+                return spent
+            
             # Check timeout
             if timeout and (time.time() - start_time) > timeout:
                 print(f"❌ {description} timed out after {timeout}s")
@@ -101,7 +116,7 @@ class APIHelpers:
                     return status, data
                 
                 print(f"🔄 Retrying {description} in {delay}s...")
-                time.sleep(delay)
+                sleep_within(delay, deadline)
                 continue
             
             # Success or non-retryable status
@@ -117,7 +132,7 @@ class APIHelpers:
             
             # Wait and retry
             print(f"🔄 {description} attempt {attempt} failed (status: {status}). Retrying in {delay}s...")
-            time.sleep(delay)
+            sleep_within(delay, deadline)
         
         return status, data
 
@@ -131,7 +146,8 @@ class APIHelpers:
         jitter: bool = True,
         retry_on_statuses: Optional[List[int]] = None,
         timeout: Optional[float] = None,
-        description: str = "API call"
+        description: str = "API call",
+        deadline: Optional[Deadline] = None,
     ) -> Tuple[int, Dict[str, Any]]:
         """
         Enhanced retry with exponential backoff, jitter, and exception handling
@@ -146,6 +162,7 @@ class APIHelpers:
             retry_on_statuses: List of status codes to retry on (default: comprehensive list)
             timeout: Total timeout in seconds
             description: Description for logging
+            deadline: Scenario/step deadline from ctx (get_deadline(ctx)); stops retrying when spent
             
         Returns:
             Tuple of (status_code, response_data) from the final attempt
@@ -157,6 +174,10 @@ class APIHelpers:
         delay = initial_delay
         
         for attempt in range(1, max_attempts + 1):
+            spent = stop_retrying(deadline, description, attempt)
+            if spent:
+                return spent
+            
             # Check timeout
             if timeout and (time.time() - start_time) > timeout:
                 elapsed = time.time() - start_time
@@ -190,7 +211,7 @@ class APIHelpers:
                     actual_delay = max(0.1, actual_delay)
                 
                 print(f"🔄 Retrying {description} in {actual_delay:.1f}s...")
-                time.sleep(actual_delay)
+                sleep_within(actual_delay, deadline)
                 
                 # Exponential backoff for next iteration
                 delay = min(delay * backoff_factor, max_delay)
@@ -218,7 +239,7 @@ class APIHelpers:
                 actual_delay = max(0.1, actual_delay)  # Minimum 100ms
             
             print(f"🔄 {description} attempt {attempt} failed (status: {status}). Retrying in {actual_delay:.1f}s...")
-            time.sleep(actual_delay)
+            sleep_within(actual_delay, deadline)
             
             # Exponential backoff for next iteration
             delay = min(delay * backoff_factor, max_delay)
@@ -231,7 +252,8 @@ class APIHelpers:
         expected_status: int = 200,
         max_attempts: int = 5,
         delay: float = 1.0,
-        description: str = "API call"
+        description: str = "API call",
+        deadline: Optional[Deadline] = None,
     ) -> Tuple[int, Dict[str, Any]]:
         """
         Retry API call until a specific status code is returned
@@ -242,11 +264,16 @@ class APIHelpers:
             max_attempts: Maximum number of attempts
             delay: Delay between attempts in seconds
             description: Description for logging
+            deadline: Scenario/step deadline from ctx (get_deadline(ctx)); stops retrying when spent
             
         Returns:
             Tuple of (status_code, response_data) from the final attempt
         """
         for attempt in range(1, max_attempts + 1):
+            spent = stop_retrying(deadline, description, attempt)
+            if spent:
+                return spent
+            
             try:
                 status, data = api_call()
             except Exception as e:
@@ -257,7 +284,7 @@ class APIHelpers:
                         "exception_type": type(e).__name__,
                         "exception_message": str(e)
                     }
-                time.sleep(delay)
+                sleep_within(delay, deadline)
                 continue
             
             # Got expected status
@@ -273,7 +300,7 @@ class APIHelpers:
             
             # Wait and retry
             print(f"🔄 {description} attempt {attempt} got status {status}, waiting for {expected_status}. Retrying in {delay}s...")
-            time.sleep(delay)
+            sleep_within(delay, deadline)
         
         return status, data
 
@@ -283,7 +310,8 @@ class APIHelpers:
         condition: Callable[[int, Dict[str, Any]], bool],
         max_attempts: int = 5,
         delay: float = 1.0,
-        description: str = "API call"
+        description: str = "API call",
+        deadline: Optional[Deadline] = None,
     ) -> Tuple[int, Dict[str, Any]]:
         """
         Retry API call until a custom condition is met
@@ -294,11 +322,16 @@ class APIHelpers:
             max_attempts: Maximum number of attempts
             delay: Delay between attempts in seconds
             description: Description for logging
+            deadline: Scenario/step deadline from ctx (get_deadline(ctx)); stops retrying when spent
             
         Returns:
             Tuple of (status_code, response_data) from the final attempt
         """
         for attempt in range(1, max_attempts + 1):
+            spent = stop_retrying(deadline, description, attempt)
+            if spent:
+                return spent
+            
             try:
                 status, data = api_call()
             except Exception as e:
@@ -309,7 +342,7 @@ class APIHelpers:
                         "exception_type": type(e).__name__,
                         "exception_message": str(e)
                     }
-                time.sleep(delay)
+                sleep_within(delay, deadline)
                 continue
             
             # Check if condition is satisfied
@@ -328,6 +361,6 @@ class APIHelpers:
             
             # Wait and retry
             print(f"🔄 {description} attempt {attempt} condition not met. Retrying in {delay}s...")
-            time.sleep(delay)
+            sleep_within(delay, deadline)
         
         return status, data
\ No newline at end of file
@@ -1,10 +1,14 @@
 #  utils/api/api_reporting.py
 
 from __future__ import annotations
-from typing import Any, Dict, Optional
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
 import base64, os, html, json
 from string import Template
 
+from src.api.execution.endpoints import endpoint_key
+from src.utils.performance import hotpath
+
 try:
     import allure
 except Exception:
@@ -31,6 +35,9 @@ def _safe_json_text(obj: Any) -> str:
     except TypeError:
         return json.dumps({"_repr": repr(obj)}, indent=2, ensure_ascii=False)
 
+RECORD_MODES = {"always", "on_failure"}
+
+
 class ApiRecorder:
     """
     Capture a single API call into (a) your trace store via `add_trace`, and
@@ -39,13 +46,24 @@ class ApiRecorder:
     - Lazily creates a Playwright BrowserContext to render JSON → PNG when enabled.
     - Gracefully no-ops PNG generation if no browser is available.
     - Call `close()` to dispose of the context at the end of the session.
+    - `API_RECORD=on_failure` (deferred): calls are buffered per test and only
+      written by `finish(failed=True)` (or `force=True`, the `api_record` marker);
+      passing tests get a single summary attachment instead.
     """
 
-    def __init__(self, add_trace, browser, make_png: bool = True):
+    def __init__(self, add_trace, browser, make_png: bool = True, deferred: Optional[bool] = None):
         self._add_trace = add_trace
         self._browser = browser
         self._ctx = None
 
+        # Record mode (default: always)
+        if deferred is None:
+            mode = (os.getenv("API_RECORD", "always") or "always").lower()
+            deferred = mode == "on_failure"
+        self.deferred = deferred
+        self._pending: List[Callable[[], Dict[str, Any]]] = []
+        self._calls: List[tuple] = []  # (method, url, status) for the passing-test summary
+
         # Attachment mode for Allure (default: json)
         self._attach_mode = (os.getenv("ALLURE_API_ATTACH", "json") or "json").lower()
         if self._attach_mode not in {"json", "png", "both", "none"}:
@@ -66,6 +84,7 @@ class ApiRecorder:
                 self._make_png = False
                 self._ctx = None
 
+    @hotpath.timed("png")
     def _json_to_png(self, payload: Dict[str, Any], title: str) -> Optional[bytes]:
         if not self._make_png:
             return None
@@ -87,6 +106,44 @@ class ApiRecorder:
             except Exception:
                 pass
 
+    # ---- deferred mode ----
+
+    def record_lazy(self, build: Callable[[], Dict[str, Any]], *, method: str, url: str, status: Optional[int]) -> None:
+        """
+        Like record(**build()), but in deferred mode `build` (redaction etc.) only
+        runs if the records are flushed.
+        """
+        if not self.deferred:
+            self.record(**build())
+            return
+        self._pending.append(build)
+        self._calls.append((method, url, status))
+
+    def finish(self, *, failed: bool, force: bool = False) -> None:
+        """End of test: flush buffered records (failure / forced) or attach the summary."""
+        if not self.deferred:
+            return
+        pending, calls = self._pending, self._calls
+        self._pending, self._calls = [], []
+        try:
+            if failed or force:
+                for build in pending:
+                    self._emit(**build())
+            elif calls and allure and self._attach_mode != "none":
+                allure.attach(self.summarize(calls), "api-calls (summary)", allure.attachment_type.TEXT)
+        except Exception as e:
+            # Don't fail the test for a reporting glitch (e.g. no open Allure test item)
+            print(f"[api] ⚠️ could not write deferred API records: {e}")
+
+    @staticmethod
+    def summarize(calls: List[tuple]) -> str:
+        """'3 API calls (2xx: 2, 4xx: 1): GET /users/{id} x2, POST /login x1'"""
+        classes = Counter("err" if not status else f"{status // 100}xx" for _, _, status in calls)
+        endpoints = Counter(endpoint_key(method, url) for method, url, _ in calls)
+        by_class = ", ".join(f"{k}: {v}" for k, v in sorted(classes.items()))
+        by_endpoint = ", ".join(f"{k} x{v}" for k, v in endpoints.most_common())
+        return f"{len(calls)} API calls ({by_class}): {by_endpoint}"
+
     def record(
         self,
         *,
@@ -98,6 +155,27 @@ class ApiRecorder:
         req_json: Optional[Dict[str, Any]] = None,
         resp_headers: Optional[Dict[str, Any]] = None,
         resp_json: Optional[Dict[str, Any]] = None,
+        timing: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        kwargs = dict(step=step, method=method, url=url, status=status, req_headers=req_headers,
+                      req_json=req_json, resp_headers=resp_headers, resp_json=resp_json, timing=timing)
+        if self.deferred:
+            self.record_lazy(lambda: kwargs, method=method, url=url, status=status)
+            return
+        self._emit(**kwargs)
+
+    def _emit(
+        self,
+        *,
+        step: str,
+        method: str,
+        url: str,
+        status: Optional[int],
+        req_headers: Optional[Dict[str, Any]] = None,
+        req_json: Optional[Dict[str, Any]] = None,
+        resp_headers: Optional[Dict[str, Any]] = None,
+        resp_json: Optional[Dict[str, Any]] = None,
+        timing: Optional[Dict[str, Any]] = None,
     ) -> None:
         # Enhancement #1: Include URL context in attachments
         
@@ -113,6 +191,7 @@ class ApiRecorder:
         resp_context = {
             "url": url,
             "status": status,
+            "timing": timing or {},
             "headers": resp_headers or {},
             "body": resp_json or {}
         }
@@ -122,6 +201,7 @@ class ApiRecorder:
         resp_png_b = self._json_to_png(resp_context, f"Response: {status} {url}") if self._make_png else None
 
         # 1) Feed your unified trace (strings for PNGs; headers/json forwarded as dicts)
+        hotpath.begin("trace_store")
         self._add_trace(
             step=step,
             method=method,
@@ -131,10 +211,13 @@ class ApiRecorder:
             resp_json=resp_json,
             req_png_b64=(base64.b64encode(req_png_b).decode("ascii") if req_png_b else None),
             resp_png_b64=(base64.b64encode(resp_png_b).decode("ascii") if resp_png_b else None),
+            timing=timing,
         )
+        hotpath.end("trace_store")
 
         # 2) Enhanced Allure attachments with URL context
         if allure and self._attach_mode != "none":
+            hotpath.begin("allure")
             if self._attach_mode in {"json", "both"}:
                 # Enhancement #1: Attach request context (includes URL)
                 if req_json is not None or req_headers:
@@ -158,6 +241,7 @@ class ApiRecorder:
                     allure.attach(req_png_b, f"{step} - request.png", allure.attachment_type.PNG)
                 if resp_png_b:
                     allure.attach(resp_png_b, f"{step} - response.png", allure.attachment_type.PNG)
+            hotpath.end("allure")
 
     def close(self):
         if self._ctx:
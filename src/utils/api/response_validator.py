@@ -1,5 +1,4 @@
 from playwright.sync_api import Response
-import jsonschema
 from typing import Dict, Any, Mapping, Optional
 
 try:
@@ -25,6 +24,7 @@ class ResponseValidator:
     def assert_json_schema(self, schema: Dict[str, Any]):
         if not self.data:
             raise ValueError("Response is not JSON")
+        import jsonschema  # only needed by schema assertions
         jsonschema.validate(instance=self.data, schema=schema)
 
     def assert_response_headers(self, expected_headers: Dict[str, str]):
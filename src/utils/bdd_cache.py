@@ -0,0 +1,264 @@
+# src/utils/bdd_cache.py
+# Collection speedups for pytest-bdd.
+#
+# FeatureCache
+#   Persistent cache of parsed .feature files under .pytest_cache/d/bdd/,
+#   keyed by absolute path + mtime_ns + size. Unchanged files are unpickled
+#   straight into pytest-bdd's in-process feature dict, so `scenarios()`
+#   never re-runs the gherkin parser (or our validity line-scan) for them.
+#   Every xdist worker collects on its own, so this is paid once per change
+#   instead of once per worker per run.
+#
+# StepIndex
+#   Replaces pytest_bdd.scenario.find_fixturedefs_for_step (a scan over
+#   *every* fixture, running every step parser, for every step of every
+#   scenario) with a bucketed index: exact dict for plain-string steps,
+#   buckets by first word for parse/re patterns, plus a memo per step text.
+#   The index rebuilds itself whenever fixtures are added (late step plugin
+#   registration, conftest parsing). BDD_STEP_INDEX=0 turns it off.
+
+from __future__ import annotations
+
+import importlib
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils import fileio
+
+STEP_INDEX_ENV = "BDD_STEP_INDEX"
+CACHE_FILE = "features.pickle"
+
+
+def _cache_version() -> str:
+    try:
+        from importlib.metadata import version
+        bdd = version("pytest-bdd")
+    except Exception:
+        bdd = "?"
+    return f"1:{bdd}:{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+# ---------- feature parse cache ----------
+
+def is_valid_feature(p: Path) -> bool:
+    """Has a Feature: line and at least one Scenario (empty/draft files are skipped)."""
+    text = p.read_text(encoding="utf-8", errors="strict")
+    lines = [ln.strip().lower() for ln in text.splitlines() if ln.strip() and not ln.strip().startswith("#")]
+    return any(ln.startswith("feature:") for ln in lines) and any(
+        ln.startswith(("scenario:", "scenario outline:")) for ln in lines
+    )
+
+
+class FeatureCache:
+    """
+    cache = FeatureCache(cache_dir)
+    if cache.is_valid(path, is_valid_feature):   # primes pytest-bdd's feature dict
+        scenarios(...)
+    cache.save()
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.path = Path(cache_dir) / CACHE_FILE if cache_dir else None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with self.path.open("rb") as fh:
+                data = pickle.load(fh)
+            if data.get("version") == _cache_version():
+                self._entries = data.get("entries", {})
+        except Exception:
+            self._entries = {}  # corrupt/old cache: rebuild
+
+    def is_valid(self, path: Path, validate: Callable[[Path], bool]) -> bool:
+        """
+        Return validate(path), cached. For valid files also make sure the parsed
+        Feature is in pytest_bdd.feature.features (from cache, or parsed now).
+        """
+        from pytest_bdd import feature as bdd_feature
+
+        full = os.path.abspath(str(path))
+        st = os.stat(full)
+        entry = self._entries.get(full)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            self.hits += 1
+            if entry["valid"] and full not in bdd_feature.features:
+                bdd_feature.features[full] = entry["feature"]
+            return entry["valid"]
+
+        self.misses += 1
+        valid = validate(Path(path))
+        parsed = bdd_feature.get_feature(*os.path.split(full)) if valid else None
+        self._entries[full] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "valid": valid, "feature": parsed}
+        self._dirty = True
+        return valid
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        # Forget files that were deleted since the last run
+        entries = {k: v for k, v in self._entries.items() if os.path.exists(k)}
+        try:
+            # atomic; xdist workers may race on a cold cache
+            fileio.atomic_write(self.path, pickle.dumps({"version": _cache_version(), "entries": entries},
+                                                        protocol=pickle.HIGHEST_PROTOCOL))
+            self._dirty = False
+        except Exception as e:
+            print(f"[bdd] ⚠️ could not write feature cache: {e}")
+
+
+_cache_dir: Optional[Path] = None
+
+
+def configure(config) -> None:
+    """Called from conftest's pytest_configure; no cacheprovider -> in-memory only."""
+    global _cache_dir
+    cache = getattr(config, "cache", None)
+    _cache_dir = Path(cache.mkdir("bdd")) if cache is not None else None
+    if os.getenv(STEP_INDEX_ENV, "1").lower() not in ("0", "false", "no"):
+        install_step_index()
+
+
+def feature_cache() -> FeatureCache:
+    return FeatureCache(_cache_dir)
+
+
+# ---------- step index ----------
+
+_RE_META = set(".^$*+?{}[]\\|()")
+
+
+def _first_word(prefix: str) -> Optional[str]:
+    """Lower-cased first word of a literal prefix, only if the prefix contains all of it."""
+    if " " not in prefix.lstrip():
+        return None
+    word = prefix.lstrip().split(" ", 1)[0]
+    return word.lower() or None
+
+
+def _literal_prefix(parser) -> Tuple[str, Optional[str]]:
+    """("exact", text) | ("word", first word) | ("any", None) for a StepParser."""
+    name = getattr(parser, "name", None)
+    if not isinstance(name, str):
+        return "any", None
+    return literal_prefix(type(parser).__name__, name)
+
+
+def literal_prefix(kind: str, name: str) -> Tuple[str, Optional[str]]:
+    """Same as _literal_prefix, from the parser kind + pattern (used by the static step index)."""
+    if kind == "string":
+        return "exact", name
+    if kind in ("parse", "cfparse"):
+        return "word", _first_word(name.split("{", 1)[0])
+    if kind == "re":
+        if "|" in name:  # top-level alternation could start with anything
+            return "any", None
+        body = name[1:] if name.startswith("^") else name
+        i = 0
+        while i < len(body) and body[i] not in _RE_META:
+            i += 1
+        prefix = body[:i]
+        if i < len(body) and body[i] in "?*{" and prefix:
+            prefix = prefix[:-1]  # quantifier applies to the last literal char
+        return "word", _first_word(prefix)
+    return "any", None
+
+
+class StepIndex:
+    """Bucketed, memoized replacement for pytest-bdd's linear step lookup."""
+
+    def __init__(self):
+        self._signature: Optional[Tuple[int, int]] = None
+        self._exact: Dict[str, List[tuple]] = {}
+        self._by_word: Dict[str, List[tuple]] = {}
+        self._any: List[tuple] = []
+        self._memo: Dict[Tuple[str, str], List[tuple]] = {}
+
+    def _rebuild(self, fixturemanager, signature) -> None:
+        from pytest_bdd.steps import StepNamePrefix, step_function_context_registry
+
+        impl_prefix = StepNamePrefix.step_impl.value
+        self._exact, self._by_word, self._any, self._memo = {}, {}, [], {}
+        order = 0
+        for fixturename, fixturedefs in list(fixturemanager._arg2fixturedefs.items()):
+            if fixturename.startswith(impl_prefix):  # transient names injected during a lookup
+                continue
+            for fixturedef in fixturedefs:
+                ctx = step_function_context_registry.get(fixturedef.func)
+                if ctx is None:
+                    continue
+                entry = (order, fixturename, fixturedef, ctx)
+                order += 1
+                how, key = _literal_prefix(ctx.parser)
+                if how == "exact":
+                    self._exact.setdefault(key, []).append(entry)
+                elif how == "word" and key:
+                    self._by_word.setdefault(key, []).append(entry)
+                else:
+                    self._any.append(entry)
+        self._signature = signature
+
+    @staticmethod
+    def _signature_of(fixturemanager) -> Tuple[int, int]:
+        from pytest_bdd.steps import StepNamePrefix
+
+        impl_prefix = StepNamePrefix.step_impl.value
+        total = sum(len(v) for k, v in fixturemanager._arg2fixturedefs.items() if not k.startswith(impl_prefix))
+        return id(fixturemanager), total
+
+    def candidates(self, step, fixturemanager) -> List[tuple]:
+        signature = self._signature_of(fixturemanager)
+        if signature != self._signature:
+            self._rebuild(fixturemanager, signature)
+        key = (step.type, step.name)
+        hit = self._memo.get(key)
+        if hit is None:
+            words = step.name.split(" ", 1)
+            pool = (
+                self._exact.get(step.name, [])
+                + self._by_word.get(words[0].lower(), [])
+                + self._any
+            )
+            hit = sorted(
+                (e for e in pool
+                 if (e[3].type is None or e[3].type == step.type) and e[3].parser.is_matching(step.name)),
+                key=lambda e: e[0],  # same order as pytest-bdd's scan
+            )
+            self._memo[key] = hit
+        return hit
+
+    def find_fixturedefs_for_step(self, step, fixturemanager, node) -> Iterable[Any]:
+        from pytest_bdd.compat import getfixturedefs
+
+        for _, fixturename, fixturedef, _ctx in self.candidates(step, fixturemanager):
+            visible = list(getfixturedefs(fixturemanager, fixturename, node) or [])
+            if fixturedef in visible:
+                yield fixturedef
+
+
+_step_index: Optional[StepIndex] = None
+
+
+def install_step_index() -> Optional[StepIndex]:
+    """Swap pytest-bdd's lookup for the index (no-op if pytest-bdd's internals moved)."""
+    global _step_index
+    try:
+        # import_module: `pytest_bdd.scenario` as an attribute is the decorator, not the module
+        bdd_scenario = importlib.import_module("pytest_bdd.scenario")
+    except Exception:
+        return None
+    if not hasattr(bdd_scenario, "find_fixturedefs_for_step"):
+        return None
+    if _step_index is None:
+        _step_index = StepIndex()
+        bdd_scenario.find_fixturedefs_for_step = _step_index.find_fixturedefs_for_step
+    return _step_index
@@ -1,9 +1,21 @@
-from faker import Faker
 import random
 import string
 from datetime import datetime, timedelta
 
-fake = Faker()
+
+class _LazyFaker:
+    """Builds the Faker instance on first use; importing faker costs ~100ms at collection."""
+
+    _faker = None
+
+    def __getattr__(self, name):
+        if _LazyFaker._faker is None:
+            from faker import Faker
+            _LazyFaker._faker = Faker()
+        return getattr(_LazyFaker._faker, name)
+
+
+fake = _LazyFaker()
 
 
 class DataFactory:
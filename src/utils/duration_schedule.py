@@ -0,0 +1,333 @@
+# src/utils/duration_schedule.py
+# --schedule=durations: xdist scheduling from recorded test durations.
+#
+# --dist=worksteal starts from an even split by count and only rebalances
+# once a worker runs dry, so a few long UI scenarios that happen to sit at the
+# end of a queue still make the tail. With --schedule=durations:
+#
+#   - the controller records setup+call+teardown seconds per test (EWMA over
+#     runs) and which expensive session fixtures each test used, plus what
+#     each of those fixtures costs to set up, in
+#     <TEST_DURATIONS_DIR>/<env>.json (default test-durations/);
+#   - the next run plans each worker's queue up front (plan()): tests that
+#     need a heavy fixture (browser, mobile_driver) go, as a group, to only as
+#     many workers as their share of the work calls for, instead of every
+#     worker launching a browser; the other tests fill the queues, longest
+#     first onto the worker that would finish earliest. Queues keep collection
+#     order, so module fixtures are still set up once per worker and tests of
+#     one @pytest.mark.xdist_group (pinned to a single worker) keep theirs;
+#   - xdist's work stealing stays on top as the safety net: an idle worker
+#     takes the last half of the busiest queue (by collection order, not by
+#     duration). Members of an xdist_group are never stolen, so the group
+#     stays on the worker it was planned on.
+#
+# Tests with no history are estimated at the median of the known ones and
+# dealt in contiguous runs, as worksteal does. Group membership is learnt from
+# the history too: on the first run with a new group, its tests are dealt like
+# any other unknown test and may be split across workers.
+# --schedule=record only updates the store (e.g. a serial run to seed it);
+# an existing pytest-json-report file can be imported too:
+#
+#   python -m src.utils.duration_schedule --import reports/json/report.json --env dev
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from xdist.scheduler import WorkStealingScheduling
+from xdist.scheduler.worksteal import MIN_PENDING
+
+from src.utils import fileio
+
+DURATIONS_DIR_ENV = "TEST_DURATIONS_DIR"
+DEFAULT_DIR = Path("test-durations")
+
+# Session fixtures worth keeping on as few workers as possible
+HEAVY_FIXTURES = ("browser", "mobile_driver")
+# @pytest.mark.xdist_group("name") is recorded as a pseudo-fixture: the whole group runs on one worker
+GROUP_PREFIX = "xdist_group:"
+
+ALPHA = 0.3             # weight of the newest run in the moving average
+DEFAULT_TEST_S = 1.0    # estimate when nothing at all is known
+FORGET_DAYS = 60        # entries not seen for this long are dropped
+
+
+# ---------- store ----------
+
+class DurationStore:
+    """Moving average of test durations and heavy-fixture setup times for one environment."""
+
+    def __init__(self, env: str, root: Optional[Path] = None):
+        self.env = env
+        self.root = Path(root or os.getenv(DURATIONS_DIR_ENV) or DEFAULT_DIR)
+        self.path = self.root / f"{env}.json"
+        self.tests: Dict[str, Dict[str, Any]] = {}     # nodeid -> {"s", "n", "fixtures", "seen"}
+        self.fixtures: Dict[str, Dict[str, Any]] = {}  # fixture -> {"s", "n", "seen"}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[schedule] ignoring unreadable {self.path}: {e}")
+            return
+        self.tests = data.get("tests", {})
+        self.fixtures = data.get("fixtures", {})
+
+    @staticmethod
+    def _average(entry: Optional[Dict[str, Any]], seconds: float, today: str) -> Dict[str, Any]:
+        if entry is None:
+            return {"s": round(seconds, 4), "n": 1, "seen": today}
+        s = entry["s"] + ALPHA * (seconds - entry["s"])
+        return dict(entry, s=round(s, 4), n=entry.get("n", 0) + 1, seen=today)
+
+    def update(self, tests: Dict[str, Tuple[float, Sequence[str]]], fixtures: Optional[Dict[str, float]] = None) -> None:
+        """tests: nodeid -> (seconds, heavy fixtures used); fixtures: fixture -> setup seconds."""
+        today = time.strftime("%Y-%m-%d")
+        for nodeid, (seconds, used) in tests.items():
+            entry = self._average(self.tests.get(nodeid), seconds, today)
+            entry["fixtures"] = sorted(used)
+            self.tests[nodeid] = entry
+        for name, seconds in (fixtures or {}).items():
+            self.fixtures[name] = self._average(self.fixtures.get(name), seconds, today)
+
+    def import_json_report(self, report: Path) -> int:
+        """Seed from a pytest-json-report file (no fixture information there)."""
+        data = json.loads(Path(report).read_text(encoding="utf-8"))
+        tests = {}
+        for t in data.get("tests", []):
+            seconds = sum((t.get(when) or {}).get("duration", 0.0) for when in ("setup", "call", "teardown"))
+            known = self.tests.get(t["nodeid"], {})
+            tests[t["nodeid"]] = (seconds, known.get("fixtures", ()))
+        self.update(tests)
+        return len(tests)
+
+    def save(self) -> Path:
+        cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - FORGET_DAYS * 86400))
+        self.tests = {k: v for k, v in self.tests.items() if v.get("seen", cutoff) >= cutoff}
+        data = {"env": self.env, "tests": self.tests, "fixtures": self.fixtures}
+        return fileio.atomic_write_json(self.path, data, indent=1, sort_keys=True)
+
+    def estimates(self, nodeids: Sequence[str]) -> Tuple[List[float], List[Tuple[str, ...]], List[int]]:
+        """(seconds per test, heavy fixtures per test, indices of the tests without history)."""
+        known = [e["s"] for e in self.tests.values()]
+        default = statistics.median(known) if known else DEFAULT_TEST_S
+        seconds, fixtures, unknown = [], [], []
+        for i, nodeid in enumerate(nodeids):
+            entry = self.tests.get(nodeid)
+            if entry is None:
+                unknown.append(i)
+                seconds.append(default)
+                fixtures.append(())
+            else:
+                seconds.append(entry["s"])
+                fixtures.append(tuple(entry.get("fixtures", ())))
+        return seconds, fixtures, unknown
+
+    def fixture_costs(self) -> Dict[str, float]:
+        return {name: e["s"] for name, e in self.fixtures.items()}
+
+
+# ---------- planning ----------
+
+def plan(seconds: Sequence[float], fixtures: Sequence[Iterable[str]], workers: int,
+         fixture_costs: Optional[Dict[str, float]] = None,
+         unknown: Sequence[int] = ()) -> Tuple[List[List[int]], List[float]]:
+    """
+    Pack test indices onto `workers` queues; returns (queues, predicted seconds per queue).
+
+    1. Tests sharing a heavy fixture set go, as a group, to only as many workers as
+       their total needs at the ideal makespan (all work / workers), preferring
+       workers that already hold those fixtures; an xdist_group goes to one worker.
+    2. The other known tests fill every queue.
+       In 1 and 2: longest test first, onto the allowed worker where it would
+       finish earliest, a fixture setup the worker still needs included.
+    3. Tests without history (`unknown`) are dealt in contiguous runs, as
+       worksteal does, to the least loaded workers.
+    Each queue is returned in collection order.
+    """
+    costs = fixture_costs or {}
+    queues: List[List[int]] = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    hosted: List[set] = [set() for _ in range(workers)]
+
+    def setup(w: int, needs: frozenset) -> float:
+        return sum(costs.get(f, 0.0) for f in needs - hosted[w])
+
+    def place(indices: Iterable[int], allowed: Sequence[int], needs: frozenset) -> None:
+        for i in sorted(indices, key=lambda i: seconds[i], reverse=True):
+            w = min(allowed, key=lambda w: loads[w] + setup(w, needs))
+            loads[w] += seconds[i] + setup(w, needs)
+            hosted[w] |= needs
+            queues[w].append(i)
+
+    skip = set(unknown)
+    groups: Dict[Any, List[Any]] = {}               # fixture set or xdist_group -> [needs, indices]
+    for i, used in enumerate(fixtures):
+        if i in skip:
+            continue
+        used = frozenset(used)
+        key = next((f for f in used if f.startswith(GROUP_PREFIX)), used)
+        group = groups.setdefault(key, [frozenset(), []])
+        group[0] |= used
+        group[1].append(i)
+    plain = groups.pop(frozenset(), [None, []])[1]
+    heavy = set().union(*(needs for needs, _ in groups.values()))
+    target = (sum(seconds) + sum(costs.get(f, 0.0) for f in heavy)) / max(1, workers)
+
+    for key, (needs, indices) in sorted(groups.items(), key=lambda kv: sum(seconds[i] for i in kv[1][1]), reverse=True):
+        if isinstance(key, str):
+            k = 1
+        else:
+            k = min(workers, max(1, math.ceil(sum(seconds[i] for i in indices) / target))) if target > 0 else workers
+        allowed = sorted(range(workers), key=lambda w: loads[w] + setup(w, needs))[:k]
+        place(indices, allowed, needs)
+    place(plain, range(workers), frozenset())
+
+    if unknown:
+        target = (sum(loads) + sum(seconds[i] for i in unknown)) / workers
+        pos = 0
+        for n, w in enumerate(sorted(range(workers), key=lambda w: loads[w])):
+            while pos < len(unknown) and (n == workers - 1 or loads[w] + seconds[unknown[pos]] / 2 <= target):
+                loads[w] += seconds[unknown[pos]]
+                queues[w].append(unknown[pos])
+                pos += 1
+    return [sorted(q) for q in queues], loads
+
+
+# ---------- xdist scheduler ----------
+
+class DurationScheduling(WorkStealingScheduling):
+    """
+    Work stealing whose initial distribution is plan() instead of an even split,
+    and which never steals a member of an xdist_group (`pinned`).
+    Created from conftest's pytest_xdist_make_scheduler hook.
+    """
+
+    def __init__(self, config, log=None, store: Optional[DurationStore] = None):
+        super().__init__(config, log)
+        self.store = store or DurationStore(os.getenv("TEST_ENV", "dev"))
+        self.predicted: Dict[str, float] = {}   # worker id -> planned seconds
+        self.unknown = 0
+        self.steals = 0
+        self.pinned: set = set()                # indices of xdist_group members: never stolen
+
+    def schedule(self) -> None:
+        assert self.collection_is_completed
+        if self.collection is not None:
+            self.check_schedule()
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        if not self.collection:
+            return
+        seconds, fixtures, unknown = self.store.estimates(self.collection)
+        self.unknown = len(unknown)
+        self.pinned = {i for i, used in enumerate(fixtures) if any(f.startswith(GROUP_PREFIX) for f in used)}
+        nodes = sorted(self.nodes, key=lambda n: n.gateway.id)
+        queues, loads = plan(seconds, fixtures, len(nodes), self.store.fixture_costs(), unknown)
+        for node, queue, load in zip(nodes, queues, loads):
+            self.predicted[node.gateway.id] = load
+            if queue:
+                self.node2pending[node].extend(queue)
+                node.send_runtest_some(queue)
+        self.check_schedule()
+
+    def remove_pending_tests_from_node(self, node, indices) -> None:
+        self.steals += len(indices)
+        super().remove_pending_tests_from_node(node, indices)
+
+    def check_schedule(self) -> None:
+        """WorkStealingScheduling.check_schedule, stealing only tests that are not pinned."""
+        if not self.pinned:
+            return super().check_schedule()
+        nodes_up = [(node, pending) for node, pending in self.node2pending.items() if not node.shutting_down]
+
+        def idle_nodes():
+            return [node for node, pending in nodes_up if len(pending) < MIN_PENDING]
+
+        if not idle_nodes():
+            return
+        if self.pending:
+            idle = idle_nodes()
+            for i, node in enumerate(idle):
+                self._send_tests(node, len(self.pending) // (len(idle) - i))
+            if not idle_nodes():
+                return
+        if self.steal_requested_from_node is not None:
+            return
+
+        stealable = {node: [i for i in pending if i not in self.pinned] for node, pending in nodes_up}
+        steal_from = max(nodes_up, key=lambda np: len(stealable[np[0]]), default=None)
+        num_steal = 0
+        if steal_from is not None:
+            node, pending = steal_from
+            # Half of what may move, and the node keeps MIN_PENDING tests in total
+            num_steal = min(len(stealable[node]) // 2, max(0, len(pending) - MIN_PENDING))
+        if num_steal == 0:
+            # Nothing left to take: idle nodes run their last tests and stop; pinned ones finish where they are
+            for node in idle_nodes():
+                node.shutdown()
+            return
+        steal_from[0].send_steal(stealable[steal_from[0]][-num_steal:])
+        self.steal_requested_from_node = steal_from[0]
+
+
+_SCHEDULER: Optional[DurationScheduling] = None
+
+
+def make_scheduler(config, log, env: str) -> DurationScheduling:
+    global _SCHEDULER
+    _SCHEDULER = DurationScheduling(config, log, DurationStore(env))
+    return _SCHEDULER
+
+
+def get_scheduler() -> Optional[DurationScheduling]:
+    return _SCHEDULER
+
+
+def format_summary(actual: Dict[str, List[float]], scheduler: Optional[DurationScheduling] = None) -> List[str]:
+    """Terminal lines: planned vs measured seconds per worker. actual: worker -> [seconds, tests]."""
+    if not actual:
+        return []
+    predicted = scheduler.predicted if scheduler is not None else {}
+    lines = [f"{'planned s':>10} {'actual s':>10} {'tests':>6}  worker"]
+    for worker in sorted(set(actual) | set(predicted)):
+        seconds, count = actual.get(worker, (0.0, 0))
+        plan_s = f"{predicted[worker]:.1f}" if worker in predicted else "-"
+        lines.append(f"{plan_s:>10} {seconds:>10.1f} {int(count):>6}  {worker}")
+    busiest = max(s for s, _ in actual.values())
+    mean = sum(s for s, _ in actual.values()) / len(actual)
+    line = f"busiest worker {busiest:.1f}s vs mean {mean:.1f}s (tail {busiest - mean:.1f}s)"
+    if scheduler is not None:
+        line += f"; {scheduler.unknown} test(s) without history, {scheduler.steals} stolen"
+    lines.append(line)
+    return lines
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Seed the test duration store from a pytest-json-report file")
+    p.add_argument("--import", dest="report", type=Path, required=True, metavar="REPORT_JSON")
+    p.add_argument("--env", default=os.getenv("TEST_ENV", "dev"))
+    args = p.parse_args(argv)
+    store = DurationStore(args.env)
+    n = store.import_json_report(args.report)
+    print(f"[schedule] imported {n} test duration(s) into {store.save()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# src/utils/fileio.py
+# File writes shared by the caches and reports that xdist workers touch at the
+# same time.
+#
+#   atomic_write(path, text_or_bytes)   temp file + os.replace: readers see the
+#                                       old file or the new one, never half of it
+#   write_worker_file / clear_worker_files / read_worker_files
+#                                       the per-worker report files the
+#                                       controller merges at session end
+#                                       (reports/latency/<worker>.json, ...)
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Union
+
+
+def atomic_write(path: Path, data: Union[str, bytes]) -> Path:
+    """Write `data` to `path` through a temp file in the same directory (parents are created)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if isinstance(data, bytes):
+            tmp.write_bytes(data)
+        else:
+            tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def atomic_write_json(path: Path, obj: Any, **dumps_kwargs: Any) -> Path:
+    return atomic_write(path, json.dumps(obj, **dumps_kwargs))
+
+
+# ---------- per-worker report files ----------
+
+def write_worker_file(report_dir: Path, worker: str, data: Any, suffix: str = ".json", **dumps_kwargs: Any) -> Path:
+    """<report_dir>/<worker><suffix>, written atomically."""
+    return atomic_write_json(Path(report_dir) / f"{worker}{suffix}", data, **dumps_kwargs)
+
+
+def clear_worker_files(report_dir: Path, pattern: str = "*.json") -> None:
+    """Controller, before workers start: drop files left by a previous run."""
+    for fp in Path(report_dir).glob(pattern):
+        try:
+            fp.unlink()
+        except OSError:
+            pass
+
+
+def read_worker_files(report_dir: Path, pattern: str = "*.json", files: Optional[Iterable[Path]] = None,
+                      tag: str = "report") -> List[Any]:
+    """Parsed worker files in name order; unreadable ones are reported as `[tag] skip ...` and left out."""
+    out = []
+    for fp in sorted(files if files is not None else Path(report_dir).glob(pattern)):
+        try:
+            out.append(json.loads(Path(fp).read_text(encoding="utf-8")))
+        except Exception as e:
+            print(f"[{tag}] skip {fp}: {e}")
+    return out
@@ -0,0 +1,277 @@
+# src/utils/har.py
+# --har=record|replay: run scenarios against recorded HTTP traffic instead of the backend.
+#
+#   pytest -m ui --har=record        # against a live env: one HAR per scenario
+#   pytest -m ui --har=replay -n 8   # no backend needed
+#
+# Files: <HAR_DIR or hars>/<env>/<test dir>/<scenario>.ui.har  (Playwright record_har, minimal + embedded bodies)
+#                                               <scenario>.api.har (the executor's requests / Playwright API calls)
+#
+# Replay answers every request from the scenario's HAR (UI: a context route,
+# API: in the executor, before the transport). Matching rules:
+#   - method + path + query string must match, minus volatile query params
+#     (cache busters, timestamps: DEFAULT_IGNORE_PARAMS + HAR_IGNORE_PARAMS);
+#   - among the entries left, one whose JSON body is equal once volatile fields
+#     are dropped (DEFAULT_IGNORE_FIELDS + HAR_IGNORE_FIELDS, at any depth) is
+#     preferred, then one on the same host. Bodies don't have to match: test
+#     data generated per run (Faker) still finds its recorded response;
+#   - repeated requests get the recorded responses in order (GET /users before
+#     and after a POST), the last one once they run out.
+# Unmatched UI requests are aborted and API calls get a status-0 error; both
+# are listed at the end of the test. A UI scenario without a recording is skipped.
+#
+# The API HAR is written redacted: sensitive request headers and Set-Cookie are
+# left out, and request/response bodies go through the executor's DataRedactor
+# (passwords, tokens -> "***"). The raw request body is kept only as a hash,
+# for matching. Playwright's UI HAR keeps everything.
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from src.utils import fileio
+
+DIR_ENV = "HAR_DIR"
+DEFAULT_DIR = Path("hars")
+DEFAULT_IGNORE_PARAMS = ("_", "t", "ts", "timestamp", "cb", "cachebust", "nonce", "rnd", "random")
+DEFAULT_IGNORE_FIELDS = ("timestamp", "requestId", "request_id", "nonce", "traceId", "trace_id",
+                         "correlationId", "correlation_id")
+SENSITIVE_HEADERS = {"authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key", "api-key",
+                     "x-auth-token", "x-session-id"}
+# Not replayed: bodies are stored decoded
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _env_list(name: str) -> List[str]:
+    return [v.strip() for v in os.getenv(name, "").split(",") if v.strip()]
+
+
+def scenario_path(nodeid: str, env: str, kind: str, root: Optional[Path] = None) -> Path:
+    """
+    hars/<env>/<test file's dir>/<test file>__<test name>.<kind>.har: the directory keeps
+    same-named modules apart (long names shortened with a hash of the full node id).
+    """
+    file, sep, test = nodeid.partition("::")
+    dirs = [p for p in file.split("/")[:-1] if p not in ("", ".", "..")]
+    parts = [re.sub(r"[^\w.\[\]-]+", "_", p) for p in dirs + [file.split("/")[-1] + sep.replace("::", "__") + test]]
+    name = parts.pop()
+    if len(name) > 150:
+        name = f"{name[:130]}-{hashlib.sha1(nodeid.encode('utf-8')).hexdigest()[:12]}"
+    return Path(root or os.getenv(DIR_ENV) or DEFAULT_DIR, env, *parts) / f"{name}.{kind}.har"
+
+
+def record_args(path: Path) -> Dict[str, Any]:
+    """browser_context_args additions for recording a UI HAR (written when the context closes)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return {"record_har_path": str(path), "record_har_mode": "minimal", "record_har_content": "embed"}
+
+
+# ---------- matching ----------
+
+class MatchRules:
+    def __init__(self, ignore_params=None, ignore_fields=None):
+        self.ignore_params = set(ignore_params if ignore_params is not None
+                                 else DEFAULT_IGNORE_PARAMS + tuple(_env_list("HAR_IGNORE_PARAMS")))
+        self.ignore_fields = set(ignore_fields if ignore_fields is not None
+                                 else DEFAULT_IGNORE_FIELDS + tuple(_env_list("HAR_IGNORE_FIELDS")))
+
+    def key(self, method: str, url: str) -> Tuple[str, str]:
+        parts = urlsplit(url)
+        query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in self.ignore_params)
+        return method.upper(), f"{parts.path or '/'}?{urlencode(query)}"
+
+    def _strip(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: self._strip(v) for k, v in value.items() if k not in self.ignore_fields}
+        if isinstance(value, list):
+            return [self._strip(v) for v in value]
+        return value
+
+    def body_hash(self, body: Any) -> Optional[str]:
+        """What a redacted entry stores instead of its raw request body (`_bodyHash`)."""
+        canonical = self.body(body)
+        return None if canonical is None else hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def body(self, body: Any) -> Optional[str]:
+        """Canonical form of a request body (JSON with volatile fields dropped, or the raw text)."""
+        if body is None or body == "":
+            return None
+        if isinstance(body, (bytes, bytearray)):
+            body = body.decode("utf-8", errors="replace")
+        if isinstance(body, str):
+            try:
+                body = json.loads(body)
+            except ValueError:
+                return body
+        return json.dumps(self._strip(body), sort_keys=True)
+
+
+class HarReplay:
+    """
+    replay = HarReplay.load(path)
+    entry = replay.match("GET", "https://app/api/users?_=123", body=None)
+    replay.install(context)       # UI: answer the context's requests from it
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], rules: Optional[MatchRules] = None, source: str = ""):
+        self.rules = rules or MatchRules()
+        self.source = source
+        self.misses: List[str] = []
+        self.hits = 0
+        self._by_key: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._used: Dict[int, bool] = {}
+        for entry in entries:
+            req = entry["request"]
+            self._by_key.setdefault(self.rules.key(req["method"], req["url"]), []).append(entry)
+
+    @classmethod
+    def load(cls, path: Path, rules: Optional[MatchRules] = None) -> "HarReplay":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(data.get("log", {}).get("entries", []), rules, source=str(path))
+
+    def match(self, method: str, url: str, body: Any = None) -> Optional[Dict[str, Any]]:
+        candidates = self._by_key.get(self.rules.key(method, url))
+        if not candidates:
+            self.misses.append(f"{method.upper()} {url}")
+            return None
+        want_body, want_hash, host = self.rules.body(body), self.rules.body_hash(body), urlsplit(url).netloc
+
+        def score(entry: Dict[str, Any]) -> Tuple[bool, bool]:
+            req = entry["request"]
+            same_body = (req["_bodyHash"] == want_hash if "_bodyHash" in req
+                         else self.rules.body((req.get("postData") or {}).get("text")) == want_body)
+            return same_body, urlsplit(req["url"]).netloc == host
+
+        unused = [e for e in candidates if not self._used.get(id(e))]
+        if unused:
+            best = max(unused, key=score)       # max() keeps the first (recorded order) among equals
+            self._used[id(best)] = True
+        else:
+            best = candidates[-1]
+        self.hits += 1
+        return best
+
+    # ---------- UI ----------
+
+    def install(self, context) -> None:
+        context.route("**/*", self._handle)
+
+    def _handle(self, route) -> None:
+        request = route.request
+        entry = self.match(request.method, request.url, request.post_data)
+        if entry is None:
+            route.abort()
+            return
+        status, headers, body = response_of(entry)
+        route.fulfill(status=status, headers=headers, body=body)
+
+    def report(self) -> Optional[str]:
+        if not self.misses:
+            return None
+        shown = "\n  ".join(self.misses[:10])
+        more = f"\n  ... {len(self.misses) - 10} more" if len(self.misses) > 10 else ""
+        return f"[har] ⚠️ {len(self.misses)} request(s) not in {self.source}:\n  {shown}{more}"
+
+
+def response_of(entry: Dict[str, Any]) -> Tuple[int, Dict[str, str], bytes]:
+    resp = entry["response"]
+    content = resp.get("content") or {}
+    text = content.get("text") or ""
+    body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+    headers = {h["name"]: h["value"] for h in resp.get("headers", []) if h["name"].lower() not in _DROP_HEADERS}
+    return int(resp.get("status") or 0), headers, body
+
+
+# ---------- API (executor side) ----------
+
+class ApiHar:
+    """
+    The executor's HAR for one test: mode 'record' collects exchanges and save()
+    writes them; mode 'replay' answers calls from the file written by a recording.
+    """
+
+    def __init__(self, mode: str, path: Path, rules: Optional[MatchRules] = None):
+        self.mode = mode
+        self.path = Path(path)
+        self.rules = rules or MatchRules()
+        self.entries: List[Dict[str, Any]] = []
+        self.replayer: Optional[HarReplay] = None
+        if mode == "replay":
+            try:
+                self.replayer = HarReplay.load(self.path, self.rules)
+            except FileNotFoundError:
+                self.replayer = HarReplay([], self.rules, source=f"{self.path} (not recorded)")
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.replayer is not None
+
+    def record(self, *, method: str, url: str, req_headers: Dict[str, str], req_body: Any, status: int,
+               resp_headers: Dict[str, str], resp_body: Any, time_ms: float,
+               redact: Optional[Callable[[Any], Any]] = None) -> None:
+        """`redact` (the executor's DataRedactor) is applied to both bodies before they are stored."""
+        body_hash = self.rules.body_hash(req_body)
+        if redact is not None:
+            req_body, resp_body = redact(req_body), redact(resp_body)
+        req_text = None if req_body is None else json.dumps(req_body)
+        resp_text = resp_body if isinstance(resp_body, str) else json.dumps(resp_body)
+        mime = next((v for k, v in resp_headers.items() if k.lower() == "content-type"), "application/json")
+        entry = {
+            "startedDateTime": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "time": time_ms,
+            "request": {
+                "method": method.upper(), "url": url, "httpVersion": "HTTP/1.1", "cookies": [],
+                "headers": [{"name": k, "value": v} for k, v in req_headers.items() if k.lower() not in SENSITIVE_HEADERS],
+                "queryString": [{"name": k, "value": v} for k, v in parse_qsl(urlsplit(url).query, keep_blank_values=True)],
+                "headersSize": -1, "bodySize": len(req_text or ""),
+            },
+            "response": {
+                "status": status, "statusText": "", "httpVersion": "HTTP/1.1", "cookies": [], "redirectURL": "",
+                "headers": [{"name": k, "value": v} for k, v in resp_headers.items() if k.lower() != "set-cookie"],
+                "content": {"size": len(resp_text), "mimeType": mime, "text": resp_text},
+                "headersSize": -1, "bodySize": len(resp_text),
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": time_ms, "receive": 0},
+        }
+        if req_text is not None:
+            entry["request"]["postData"] = {"mimeType": "application/json", "text": req_text}
+            entry["request"]["_bodyHash"] = body_hash
+        self.entries.append(entry)
+
+    def replay(self, method: str, url: str, req_body: Any) -> Tuple[int, Dict[str, str], Any]:
+        entry = self.replayer.match(method, url, req_body)
+        if entry is None:
+            return 0, {"Content-Type": "application/json"}, {
+                "error": "Not in HAR", "url": url, "method": method.upper(), "har": self.replayer.source,
+            }
+        status, headers, body = response_of(entry)
+        text = body.decode("utf-8", errors="replace")
+        ctype = next((v for k, v in headers.items() if k.lower() == "content-type"), "")
+        if "json" in ctype.lower():
+            try:
+                return status, headers, json.loads(text)
+            except ValueError:
+                pass
+        return status, headers, text
+
+    def save(self) -> Optional[Path]:
+        if not self.recording or not self.entries:
+            return None
+        har = {"log": {"version": "1.2", "creator": {"name": "api-executor", "version": "1.0"}, "entries": self.entries}}
+        return fileio.atomic_write_json(self.path, har, indent=1)
+
+    def report(self) -> Optional[str]:
+        return self.replayer.report() if self.replayer is not None else None
@@ -0,0 +1,254 @@
+# src/utils/impact.py
+# Test impact analysis: run only the scenarios a change can affect.
+#
+#   pytest --impact-record -m regression          # full run, refreshes the index
+#   pytest --changed-since=origin/main -m regression
+#
+# What a test depends on comes from two places:
+#   - static, computed at collection (always current): the test module, the
+#     scenario's .feature file, the step definition files its steps match
+#     (step_index) and the modules defining the fixtures it requests;
+#   - recorded, by --impact-record: every repo file whose code ran during the
+#     test's setup/call/teardown (page objects, API wrappers, helpers...),
+#     stored in <TEST_IMPACT_INDEX> (default test-impact/index.json).
+#
+# --changed-since=<ref> diffs the working tree against merge-base(ref, HEAD)
+# (uncommitted and untracked files included) and deselects every test none
+# of whose files changed. Conservative by design:
+#   - tests the index has never seen run (new tests, or no index at all);
+#   - conftest.py, pytest.ini, requirements, src/config/ and any changed file
+#     that is neither Python nor a feature (test data, .env, json...) run
+#     everything;
+#   - docs and markdown never select anything.
+#
+# Recording sets a call-only tracer (sys.settrace, no line events) while each
+# test runs: a Python-level callback per function call, so expect the
+# recording run to be noticeably slower. Session fixtures are only traced in the test that first
+# set them up; their modules are covered statically for the other tests.
+
+from __future__ import annotations
+
+import fnmatch
+import inspect
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.utils import fileio
+
+INDEX_ENV = "TEST_IMPACT_INDEX"
+DEFAULT_INDEX = Path("test-impact") / "index.json"
+REPORT_DIR = Path("reports") / "impact"
+
+# A change to one of these can affect any test
+RUN_ALL = ("conftest.py", "*/conftest.py", "pytest.ini", "requirements*.txt", "setup.py", "setup.cfg",
+           "pyproject.toml", "tox.ini", "src/config/*")
+# ... and to these (docs, CI, run output), none
+IGNORE = ("docs/*", "*.md", "*.rst", "*.png", "*.jpg", "*.svg", "LICENSE*", ".gitignore", "Jenkinsfile",
+          "reports/*", "allure-results/*", "allure-report/*", "test-impact/*", "test-durations/*", "perf-baselines/*",
+          "hars/*")
+SELECTIVE_SUFFIXES = (".py", ".feature")
+
+_SKIP_DIRS = ("site-packages", os.sep + ".venv" + os.sep, os.sep + "venv" + os.sep)
+
+
+def index_path() -> Path:
+    return Path(os.getenv(INDEX_ENV) or DEFAULT_INDEX)
+
+
+# ---------- recording ----------
+
+class ImpactRecorder:
+    """
+    rec = ImpactRecorder(root).start()
+    rec.begin(nodeid); ...; rec.end(nodeid)     # around each test
+    rec.tests                                   # nodeid -> {repo files whose code ran}
+    """
+
+    def __init__(self, root: Path):
+        self.root = str(Path(root).resolve()) + os.sep
+        self.tests: Dict[str, Set[str]] = {}
+        self._current: Optional[Set[str]] = None
+        self._files: Dict[str, Optional[str]] = {}    # co_filename -> repo-relative path or None
+        self._tracing = False
+
+    def _relative(self, filename: str) -> Optional[str]:
+        if not filename.startswith(self.root) or filename == __file__ or any(d in filename for d in _SKIP_DIRS):
+            return None
+        return filename[len(self.root):].replace(os.sep, "/")
+
+    def _trace(self, frame, event, arg):
+        current = self._current
+        if current is not None:
+            filename = frame.f_code.co_filename
+            rel = self._files.get(filename, "")
+            if rel == "":
+                rel = self._files[filename] = self._relative(filename)
+            if rel is not None:
+                current.add(rel)
+        return None   # no line events
+
+    def start(self) -> "ImpactRecorder":
+        if sys.gettrace() is not None:
+            print("[impact] ⚠️ another tracer (debugger/coverage) is active: not recording")
+            return self
+        threading.settrace(self._trace)   # threads started from now on (executor pools, servers)
+        self._tracing = True
+        return self
+
+    def stop(self) -> None:
+        if self._tracing:
+            threading.settrace(None)
+            self._tracing = False
+
+    def begin(self, key: str) -> None:
+        # The test's own thread is only traced between begin() and end()
+        self._current = set()
+        if self._tracing:
+            sys.settrace(self._trace)
+
+    def end(self, key: str) -> None:
+        if self._tracing:
+            sys.settrace(None)
+        if self._current is not None:
+            self.tests[key] = self.tests.get(key, set()) | self._current
+        self._current = None
+
+
+_RECORDER: Optional[ImpactRecorder] = None
+
+
+def start_recorder(root: Path) -> ImpactRecorder:
+    global _RECORDER
+    if _RECORDER is None:
+        _RECORDER = ImpactRecorder(root).start()
+    return _RECORDER
+
+
+def get_recorder() -> Optional[ImpactRecorder]:
+    return _RECORDER
+
+
+def write_worker_file(worker: str, recorder: Optional[ImpactRecorder] = None, report_dir: Path = REPORT_DIR) -> Optional[Path]:
+    recorder = recorder or _RECORDER
+    if recorder is None:
+        return None
+    recorder.stop()
+    return fileio.write_worker_file(report_dir, worker, {k: sorted(v) for k, v in recorder.tests.items()})
+
+
+def clear_worker_files(report_dir: Path = REPORT_DIR) -> None:
+    fileio.clear_worker_files(report_dir)
+
+
+def merge_worker_files(report_dir: Path = REPORT_DIR) -> Dict[str, List[str]]:
+    tests: Dict[str, List[str]] = {}
+    for data in fileio.read_worker_files(report_dir, tag="impact"):
+        tests.update(data)
+    return tests
+
+
+def load_index(path: Optional[Path] = None) -> Dict[str, Any]:
+    path = Path(path or index_path())
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"[impact] ignoring unreadable {path}: {e}")
+        return {}
+
+
+def update_index(tests: Dict[str, List[str]], root: Path, path: Optional[Path] = None) -> Path:
+    """Replace the entries of the tests that just ran; the others keep their last recording."""
+    path = Path(path or index_path())
+    data = load_index(path)
+    merged = dict(data.get("tests", {}))
+    merged.update(tests)
+    data = {
+        "commit": _git(root, "rev-parse", "HEAD").strip() or None,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tests": merged,
+    }
+    return fileio.atomic_write_json(path, data, indent=1, sort_keys=True)
+
+
+# ---------- selection ----------
+
+def _git(root: Path, *args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def changed_files(ref: str, root: Path) -> List[str]:
+    """Files changed since merge-base(ref, HEAD), working tree and untracked files included (IGNORE dropped)."""
+    try:
+        base = subprocess.run(["git", "merge-base", ref, "HEAD"], cwd=root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"cannot diff against {ref!r}: {e.stderr.strip() or e}") from None
+    diff = _git(root, "diff", "--name-only", "--no-renames", base)
+    untracked = _git(root, "ls-files", "--others", "--exclude-standard")
+    return sorted({line for line in (diff + untracked).splitlines() if line and not _matches(line, IGNORE)})
+
+
+def _matches(path: str, patterns: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatch(path, pat) for pat in patterns)
+
+
+def static_files(item, root: Path) -> Set[str]:
+    """The test module, the scenario's feature file and the modules of the fixtures it requests."""
+    root = Path(root).resolve()
+    files: Set[Path] = {Path(item.path)}
+    try:
+        from pytest_bdd.scenario import scenario_wrapper_template_registry
+
+        template = scenario_wrapper_template_registry.get(item.obj)
+        if template is not None:
+            files.add(Path(template.feature.filename))
+    except Exception:
+        pass
+    info = getattr(item, "_fixtureinfo", None)
+    for defs in (info.name2fixturedefs.values() if info else ()):
+        for d in defs:
+            try:
+                files.add(Path(inspect.getsourcefile(d.func)))
+            except (TypeError, OSError):
+                continue
+    out = set()
+    for f in files:
+        try:
+            out.add(f.resolve().relative_to(root).as_posix())
+        except ValueError:
+            continue     # plugin fixtures outside the repo
+    return out
+
+
+def select(tests: Dict[str, Set[str]], changed: Iterable[str], index: Dict[str, Any]) -> Tuple[Set[str], Optional[str]]:
+    """
+    tests: nodeid -> static files. Returns (nodeids to run, reason everything runs or None).
+    """
+    recorded = index.get("tests")
+    if not recorded:
+        return set(tests), f"no impact index at {index_path()} (record one with --impact-record)"
+    selective = []
+    for path in changed:
+        if _matches(path, IGNORE):
+            continue
+        if _matches(path, RUN_ALL) or not path.endswith(SELECTIVE_SUFFIXES):
+            return set(tests), f"{path} can affect every test"
+        selective.append(path)
+    changed_set = set(selective)
+    selected = set()
+    for nodeid, files in tests.items():
+        seen = recorded.get(nodeid)
+        if seen is None or changed_set & files or changed_set.intersection(seen):
+            selected.add(nodeid)
+    return selected, None
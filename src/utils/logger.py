@@ -1,36 +1,269 @@
 from loguru import logger
+import atexit
+import json
+import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 
+# Configured once per process. Sinks never do I/O on the calling thread:
+# loguru formats the line, then a single background writer thread (fed by a
+# SimpleQueue) writes the console, the rotating text log and the JSON log.
+# (loguru's own enqueue=True pickles every record through a multiprocessing
+# pipe, which costs more than the print() calls it would replace.)
+#
+#   LOG_LEVEL=DEBUG         console level (default INFO; DEBUG_API=true also lowers it)
+#   LOG_FILE_LEVEL=DEBUG    file + JSON level (default INFO; it was DEBUG before the
+#                           background writer). While both levels are INFO,
+#                           debug-only work (API header/body dumps) is skipped;
+#                           Allure attachments still carry the full exchanges
+#   LOG_JSON=false          disable reports/logs/<worker>.jsonl (one JSON object per line)
+#   LOG_ENQUEUE=false       write on the calling thread (debugging the logger itself)
 
-def setup_logger():
-    """Setup logger configuration"""
-    log_dir = Path("reports/logs")
-    log_dir.mkdir(parents=True, exist_ok=True)
+LOG_DIR = Path("reports/logs")
 
-    # Remove default handler
-    logger.remove()
+_lock = threading.Lock()
+_configured = False
+_min_level_no = 0
 
-    # Add console handler
-    logger.add(
-        sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level="INFO"
-    )
 
-    # Add file handler
-    logger.add(
-        log_dir / "test_execution.log",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        level="DEBUG",
-        rotation="10 MB",
-        retention="10 days"
-    )
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    return default if raw is None else raw.lower() in ("1", "true", "yes")
 
+
+def _worker_id() -> str:
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+# ---------- background writer ----------
+
+class _BackgroundWriter:
+    """One daemon thread per process draining (write_fn, payload) jobs; flushes when idle."""
+
+    def __init__(self):
+        self._q: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = None
+        self._streams = set()
+        self._start_lock = threading.Lock()
+
+    def submit(self, fn, payload, stream=None) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                    self._thread.start()
+        if stream is not None:
+            self._streams.add(stream)
+        self._q.put((fn, payload))
+
+    def _run(self) -> None:
+        while True:
+            job = self._q.get()
+            if isinstance(job, threading.Event):
+                self._flush()
+                job.set()
+                continue
+            fn, payload = job
+            try:
+                fn(payload)
+            except Exception:
+                pass
+            if self._q.empty():
+                self._flush()
+
+    def _flush(self) -> None:
+        for s in list(self._streams):
+            try:
+                s.flush()
+            except Exception:
+                pass
+
+    def drain(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._q.put(done)
+        done.wait(timeout)
+
+
+_writer = _BackgroundWriter()
+
+
+class _QueuedStream:
+    """loguru stream sink: write() only enqueues; the writer thread does the I/O."""
+
+    def __init__(self, stream, enqueue: bool = True):
+        self._stream = stream
+        self._enqueue = enqueue
+
+    def write(self, message: str) -> None:
+        if self._enqueue:
+            _writer.submit(self._stream.write, str(message), stream=self._stream)
+        else:
+            self._stream.write(message)
+
+    def flush(self) -> None:
+        if not self._enqueue:
+            self._stream.flush()
+
+    def isatty(self) -> bool:
+        return getattr(self._stream, "isatty", lambda: False)()
+
+
+class _RotatingFile:
+    """
+    Append-only text file with size rotation (name.log -> name.1.log, name.2.log ...).
+    Rotated files older than retention_days are deleted, as loguru's retention="10 days" did.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, retention_days: float = 10):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.retention_s = retention_days * 86400
+        self._fh = None
+        self._size = 0
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._purge()
+        self._fh = open(self.path, "a", encoding="utf-8")
+        self._size = self._fh.tell()
+
+    def write(self, text: str) -> None:
+        if self._fh is None:
+            self._open()
+        if self._size + len(text) > self.max_bytes and self._size > 0:
+            self._rotate()
+        self._fh.write(text)
+        self._size += len(text)
+
+    def _rotated(self):
+        """{index: path} of this file's rotated copies."""
+        out = {}
+        for p in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"):
+            index = p.name[len(self.path.stem) + 1:-len(self.path.suffix) or None]
+            if index.isdigit():
+                out[int(index)] = p
+        return out
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.retention_s
+        for p in self._rotated().values():
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+            except OSError:
+                pass
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        for i, src in sorted(self._rotated().items(), reverse=True):
+            os.replace(src, self.path.with_suffix(f".{i + 1}{self.path.suffix}"))
+        os.replace(self.path, self.path.with_suffix(f".1{self.path.suffix}"))
+        self._open()
+
+    def flush(self) -> None:
+        if self._fh is not None:
+            self._fh.flush()
+
+
+class _JsonSink:
+    """Callable sink: the record is serialized on the writer thread, not the caller's."""
+
+    def __init__(self, target: _RotatingFile, enqueue: bool = True):
+        self._target = target
+        self._enqueue = enqueue
+
+    def _write(self, record) -> None:
+        out = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "worker": _worker_id(),
+            "module": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+            "message": record["message"],
+        }
+        extra = record["extra"]
+        if extra:
+            out.update(extra)
+        if record["exception"] is not None:
+            out["exception"] = repr(record["exception"].value)
+        self._target.write(json.dumps(out, default=str) + "\n")
+
+    def __call__(self, message) -> None:
+        if self._enqueue:
+            _writer.submit(self._write, message.record, stream=self._target)
+        else:
+            self._write(message.record)
+            self._target.flush()
+
+
+def setup_logger(force: bool = False):
+    """Setup logger configuration (first call wins; force=True reconfigures)"""
+    global _configured, _min_level_no
+    if _configured and not force:
+        return logger
+    with _lock:
+        if _configured and not force:
+            return logger
+
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        worker = _worker_id()
+        enqueue = _env_flag("LOG_ENQUEUE", True)
+        console_level = os.getenv("LOG_LEVEL", "DEBUG" if _env_flag("DEBUG_API", False) else "INFO").upper()
+        file_level = os.getenv("LOG_FILE_LEVEL", "INFO").upper()
+
+        # Remove default handler
+        logger.remove()
+
+        # Add console handler
+        logger.add(
+            _QueuedStream(sys.stdout, enqueue),
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+            level=console_level,
+            colorize=sys.stdout.isatty() and os.getenv("NO_COLOR") is None,
+        )
+
+        # Add file handler (one per xdist worker so rotation never races)
+        suffix = "" if worker == "master" else f"_{worker}"
+        logger.add(
+            _QueuedStream(_RotatingFile(LOG_DIR / f"test_execution{suffix}.log", 10 * 1024 * 1024), enqueue),
+            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+            level=file_level,
+            colorize=False,
+        )
+
+        # Structured JSON per worker (bound fields such as method/url/status are top-level keys)
+        if _env_flag("LOG_JSON", True):
+            logger.add(
+                _JsonSink(_RotatingFile(LOG_DIR / f"{worker}.jsonl", 50 * 1024 * 1024), enqueue),
+                level=file_level,
+                format="{message}",
+            )
+
+        _min_level_no = min(logger.level(console_level).no, logger.level(file_level).no)
+        _configured = True
+        atexit.register(shutdown_logger)
     return logger
 
 
+def level_enabled(level: str) -> bool:
+    """Cheap check before building an expensive message (json.dumps of a body, etc.)."""
+    if not _configured:
+        setup_logger()
+    return logger.level(level).no >= _min_level_no
+
+
+def shutdown_logger() -> None:
+    """Wait for the writer thread to drain (session end / interpreter exit)."""
+    _writer.drain()
+
+
 def get_logger(name: str):
     """Get logger instance"""
     setup_logger()
-    return logger.bind(name=name)
\ No newline at end of file
+    return logger.bind(name=name)
@@ -0,0 +1,358 @@
+# src/utils/performance/baselines.py
+# Performance baselines per environment and endpoint template, and the
+# comparison of a run against them.
+#
+# Store: <PERF_BASELINE_DIR>/<env>/<source>.json (default perf-baselines/),
+# holding the last PERF_BASELINE_RUNS runs (default 5). Each run stores one
+# LatencyHistogram per endpoint, plus requests/s when the source measures it
+# (Locust). The baseline is the merge of those runs, so every update rolls it
+# forward.
+#
+# Sources:
+#   pytest-api     the session's merged per-endpoint histograms (conftest)
+#   locust-api/-web  Locust stats CSVs (PerformanceTestRunner); histograms are
+#                  rebuilt from Locust's percentile columns
+#
+# For each endpoint found in both the run and the baseline:
+#   - Mann-Whitney U on the two histograms, one-sided (is this run slower?),
+#     with tie correction. Values in the same bucket (<0.8% apart) are ties.
+#   - a bootstrap CI of the p90 ratio (run / baseline). A resampled quantile
+#     is drawn from the binomial law of order statistics, so one resample
+#     costs O(log buckets), not O(samples).
+#   - regression: p < alpha, ratio > 1 + threshold and CI lower bound > 1
+#   - throughput (when both sides have it): rps below every baseline run by
+#     more than the threshold
+#
+# stdlib only: scipy/numpy are not runtime dependencies.
+
+from __future__ import annotations
+
+import bisect
+import csv
+import json
+import math
+import os
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils import fileio
+
+from .latency_histogram import LatencyHistogram, _upper_bound
+
+BASELINE_DIR_ENV = "PERF_BASELINE_DIR"
+DEFAULT_DIR = Path("perf-baselines")
+COMPARISON_FILE = Path("reports") / "perf-baseline.json"
+
+_SQRT2 = math.sqrt(2.0)
+
+
+@dataclass
+class Thresholds:
+    percentile: float = 90.0   # compared quantile
+    max_ratio: float = 0.10    # flag when it is more than 10% slower ...
+    alpha: float = 0.01        # ... and the Mann-Whitney test is significant
+    confidence: float = 0.95   # bootstrap CI level
+    min_samples: int = 20      # per side, below that: "insufficient"
+    rps_drop: float = 0.10     # throughput drop vs. the slowest baseline run
+    resamples: int = 2000
+
+    @classmethod
+    def from_env(cls) -> "Thresholds":
+        """PERF_BASELINE_PERCENTILE, PERF_REGRESSION_PCT, PERF_ALPHA, PERF_MIN_SAMPLES."""
+        t = cls()
+        t.percentile = float(os.getenv("PERF_BASELINE_PERCENTILE", t.percentile))
+        t.max_ratio = float(os.getenv("PERF_REGRESSION_PCT", t.max_ratio * 100)) / 100.0
+        t.rps_drop = t.max_ratio
+        t.alpha = float(os.getenv("PERF_ALPHA", t.alpha))
+        t.min_samples = int(os.getenv("PERF_MIN_SAMPLES", t.min_samples))
+        return t
+
+
+# ---------- statistics on histograms ----------
+
+def mann_whitney(current: LatencyHistogram, baseline: LatencyHistogram) -> Tuple[float, float, float]:
+    """
+    (p_slower, p_faster, effect) for `current` vs `baseline`.
+    p_* are one-sided normal-approximation p-values; effect is P(current > baseline)
+    with ties counted half (0.5 = same distribution).
+    """
+    n1, n2 = current.count, baseline.count
+    if not n1 or not n2:
+        return 1.0, 1.0, 0.5
+    rank_sum = 0.0  # of `current`
+    ties = 0.0
+    below = 0
+    for idx in sorted(set(current.counts) | set(baseline.counts)):
+        a = current.counts.get(idx, 0)
+        t = a + baseline.counts.get(idx, 0)
+        rank_sum += a * (below + (t + 1) / 2.0)
+        ties += t ** 3 - t
+        below += t
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    mean = n1 * n2 / 2.0
+    var = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1)))
+    effect = u / (n1 * n2)
+    if var <= 0:  # everything in one bucket
+        return 1.0, 1.0, effect
+    sd = math.sqrt(var)
+    p_slower = 0.5 * math.erfc((u - mean - 0.5) / sd / _SQRT2)
+    p_faster = 0.5 * math.erfc((mean - u - 0.5) / sd / _SQRT2)
+    return min(1.0, p_slower), min(1.0, p_faster), effect
+
+
+def _binom_sf(n: int, p: float, r: int) -> float:
+    """P(Binomial(n, p) >= r)."""
+    if p <= 0.0:
+        return 0.0 if r > 0 else 1.0
+    if p >= 1.0:
+        return 1.0
+    if n > 500:
+        mu = n * p
+        return 0.5 * math.erfc((r - 0.5 - mu) / math.sqrt(mu * (1.0 - p)) / _SQRT2)
+    lp, lq, lgn = math.log(p), math.log1p(-p), math.lgamma(n + 1)
+    total = sum(
+        math.exp(lgn - math.lgamma(k + 1) - math.lgamma(n - k + 1) + k * lp + (n - k) * lq)
+        for k in range(r, n + 1)
+    )
+    return min(1.0, total)
+
+
+def _quantile_law(hist: LatencyHistogram, q: float) -> Tuple[List[float], List[float]]:
+    """
+    Values (ms) and CDF of the bootstrap distribution of hist's q-quantile:
+    the resampled quantile is <= bucket b  iff  at least `rank` of n draws land
+    at or below b, i.e. Binomial(n, F(b)) >= rank.
+    """
+    n = hist.count
+    rank = max(1, math.ceil(q * n / 100.0))
+    values: List[float] = []
+    cdf: List[float] = []
+    seen = 0
+    for idx in sorted(hist.counts):
+        seen += hist.counts[idx]
+        values.append(min(_upper_bound(idx), hist.max_us) / 1000.0)
+        cdf.append(_binom_sf(n, seen / n, rank))
+    return values, cdf
+
+
+def bootstrap_ratio_ci(
+    current: LatencyHistogram,
+    baseline: LatencyHistogram,
+    q: float = 90.0,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> Tuple[float, float]:
+    """Percentile-bootstrap CI of quantile(current, q) / quantile(baseline, q)."""
+    rng = random.Random(seed)
+    cur = _quantile_law(current, q)
+    base = _quantile_law(baseline, q)
+
+    def draw(law):
+        values, cdf = law
+        return values[min(len(values) - 1, bisect.bisect_left(cdf, rng.random()))]
+
+    ratios = sorted(draw(cur) / max(draw(base), 1e-3) for _ in range(resamples))
+    tail = (1.0 - confidence) / 2.0
+    return ratios[int(tail * resamples)], ratios[max(0, int(math.ceil((1.0 - tail) * resamples)) - 1)]
+
+
+# ---------- comparison ----------
+
+_ORDER = {"regression": 0, "improvement": 1, "ok": 2, "insufficient": 3, "new": 4}
+
+
+def compare(
+    current: Dict[str, LatencyHistogram],
+    baseline: Dict[str, LatencyHistogram],
+    *,
+    rps: Optional[Dict[str, float]] = None,
+    baseline_rps: Optional[Dict[str, List[float]]] = None,
+    thresholds: Optional[Thresholds] = None,
+) -> List[Dict[str, Any]]:
+    """One row per endpoint of `current`; regressions first, then slowest ratio."""
+    t = thresholds or Thresholds.from_env()
+    rps = rps or {}
+    baseline_rps = baseline_rps or {}
+    rows: List[Dict[str, Any]] = []
+    for key, cur in current.items():
+        base = baseline.get(key)
+        row: Dict[str, Any] = {
+            "endpoint": key,
+            "status": "new",
+            "percentile": t.percentile,
+            "count": cur.count,
+            "current_ms": cur.percentile(t.percentile),
+            "baseline_count": base.count if base else 0,
+            "baseline_ms": base.percentile(t.percentile) if base else None,
+            "reasons": [],
+        }
+        rows.append(row)
+        if base is None or not base.count:
+            continue
+        if cur.count < t.min_samples or base.count < t.min_samples:
+            row["status"] = "insufficient"
+            continue
+
+        p_slower, p_faster, effect = mann_whitney(cur, base)
+        lo, hi = bootstrap_ratio_ci(cur, base, t.percentile, t.confidence, t.resamples)
+        ratio = row["current_ms"] / max(row["baseline_ms"], 1e-3)
+        row.update(ratio=round(ratio, 4), ci=[round(lo, 4), round(hi, 4)],
+                   p_value=p_slower, effect=round(effect, 4))
+
+        if p_slower < t.alpha and ratio > 1.0 + t.max_ratio and lo > 1.0:
+            row["reasons"].append(f"p{t.percentile:g} +{(ratio - 1) * 100:.0f}%")
+        elif p_faster < t.alpha and ratio < 1.0 / (1.0 + t.max_ratio) and hi < 1.0:
+            row["status"] = "improvement"
+
+        run_rps, base_rps = rps.get(key), baseline_rps.get(key)
+        if run_rps is not None and base_rps:
+            row.update(rps=run_rps, baseline_rps=min(base_rps))
+            if run_rps < min(base_rps) * (1.0 - t.rps_drop):
+                row["reasons"].append(f"throughput -{(1 - run_rps / min(base_rps)) * 100:.0f}%")
+
+        if row["reasons"]:
+            row["status"] = "regression"
+        elif row["status"] == "new":
+            row["status"] = "ok"
+
+    rows.sort(key=lambda r: (_ORDER[r["status"]], -(r.get("ratio") or 0.0), r["endpoint"]))
+    return rows
+
+
+# ---------- store ----------
+
+class BaselineStore:
+    """Rolling window of runs for one environment and source."""
+
+    def __init__(self, env: str, source: str, root: Optional[Path] = None, max_runs: Optional[int] = None):
+        self.env = env
+        self.source = source
+        self.root = Path(root or os.getenv(BASELINE_DIR_ENV) or DEFAULT_DIR)
+        self.path = self.root / env / f"{source}.json"
+        self.max_runs = max(1, int(max_runs or os.getenv("PERF_BASELINE_RUNS", "5")))
+
+    def runs(self) -> List[Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            print(f"[perf-baseline] ignoring unreadable {self.path}: {e}")
+            return []
+        return list(data.get("runs", []))
+
+    def baseline(self) -> Tuple[Dict[str, LatencyHistogram], Dict[str, List[float]]]:
+        """(merged histogram per endpoint, requests/s of each run per endpoint)."""
+        hists: Dict[str, LatencyHistogram] = {}
+        rps: Dict[str, List[float]] = {}
+        for run in self.runs():
+            for key, entry in run.get("endpoints", {}).items():
+                try:
+                    hist = LatencyHistogram.from_dict(entry["hist"])
+                except (KeyError, ValueError) as e:
+                    print(f"[perf-baseline] skip {key} of run {run.get('at')}: {e}")
+                    continue
+                if key in hists:
+                    hists[key].merge(hist)
+                else:
+                    hists[key] = hist
+                if entry.get("rps") is not None:
+                    rps.setdefault(key, []).append(float(entry["rps"]))
+        return hists, rps
+
+    def add_run(self, hists: Dict[str, LatencyHistogram], rps: Optional[Dict[str, float]] = None, **meta: Any) -> Path:
+        endpoints: Dict[str, Any] = {}
+        for key, hist in hists.items():
+            if not hist.count:
+                continue
+            endpoints[key] = {"hist": hist.to_dict()}
+            if rps and rps.get(key) is not None:
+                endpoints[key]["rps"] = rps[key]
+        runs = self.runs()
+        runs.append({"at": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta, "endpoints": endpoints})
+        data = {"env": self.env, "source": self.source, "runs": runs[-self.max_runs:]}
+        return fileio.atomic_write_json(self.path, data)
+
+
+def write_comparison(rows: List[Dict[str, Any]], out: Path = COMPARISON_FILE, **meta: Any) -> Path:
+    return fileio.atomic_write_json(out, {**meta, "endpoints": rows}, indent=2)
+
+
+def format_comparison(rows: List[Dict[str, Any]], top: int = 20) -> List[str]:
+    """Terminal table lines (regressions first)."""
+    if not rows:
+        return []
+
+    def ms(v):
+        return "-" if v is None else f"{v:.1f}"
+
+    q = f"p{rows[0]['percentile']:g}"
+    lines = [f"{'status':<12} {q + ' now':>9} {q + ' base':>9} {'ratio':>6} {'95% CI':>13} {'p-value':>8}  endpoint (ms)"]
+    for r in rows[:top]:
+        ci = r.get("ci")
+        ci_s = f"{ci[0]:.2f}-{ci[1]:.2f}" if ci else "-"
+        ratio = f"{r['ratio']:.2f}" if r.get("ratio") is not None else "-"
+        p = f"{r['p_value']:.1e}" if r.get("p_value") is not None else "-"
+        status = r["status"].upper() if r["status"] == "regression" else r["status"]
+        note = f"  [{', '.join(r['reasons'])}]" if r.get("reasons") else ""
+        lines.append(
+            f"{status:<12} {ms(r.get('current_ms')):>9} {ms(r.get('baseline_ms')):>9} {ratio:>6} {ci_s:>13} {p:>8}  {r['endpoint']}{note}"
+        )
+    if len(rows) > top:
+        lines.append(f"... {len(rows) - top} more in {COMPARISON_FILE}")
+    return lines
+
+
+# ---------- Locust stats CSV -> histograms ----------
+
+LOCUST_PERCENTILES = ("50%", "66%", "75%", "80%", "90%", "95%", "98%", "99%", "99.9%", "99.99%", "100%")
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def histograms_from_locust(stats_csv: Path) -> Tuple[Dict[str, LatencyHistogram], Dict[str, float]]:
+    """
+    ({endpoint: histogram}, {endpoint: requests/s}) from a Locust *_stats.csv.
+    Locust only keeps percentiles there, so each row's count is spread evenly
+    between consecutive percentile points (min -> p50 -> p66 ... -> max).
+    """
+    from src.api.execution.endpoints import get_normalizer
+
+    normalizer = get_normalizer()
+    hists: Dict[str, LatencyHistogram] = {}
+    rps: Dict[str, float] = {}
+    with open(stats_csv, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            name = row.get("Name") or ""
+            count = int(_float(row.get("Request Count")) or 0)
+            if name == "Aggregated" or not count:
+                continue
+            path = normalizer.normalize(name) if name.startswith("/") or "://" in name else name
+            key = f"{(row.get('Type') or 'GET').upper()} {path}"
+
+            points = [(0.0, _float(row.get("Min Response Time")))]
+            points += [(float(col[:-1]), _float(row.get(col))) for col in LOCUST_PERCENTILES]
+            points = [(q, v) for q, v in points if v is not None]
+            hist = hists.setdefault(key, LatencyHistogram())
+            placed = 0
+            for (q0, v0), (q1, v1) in zip(points, points[1:]):
+                n = round(count * q1 / 100.0) - placed
+                steps = max(1, min(n, 4))
+                for j in range(steps):
+                    hist.record(v0 + (v1 - v0) * (j + 1) / steps, count=n // steps + (1 if j < n % steps else 0))
+                placed += n
+            hist.record(points[-1][1] if points else 0.0, count=count - placed)
+            hist.errors += min(count, int(_float(row.get("Failure Count")) or 0))
+            if _float(row.get("Requests/s")) is not None:
+                rps[key] = rps.get(key, 0.0) + float(row["Requests/s"])
+    return hists, rps
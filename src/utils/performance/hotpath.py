@@ -0,0 +1,299 @@
+# src/utils/performance/hotpath.py
+# pytest --profile: where the time goes inside tests, steps and API calls.
+#
+# Code marks phases with begin(kind, label) / end(kind), `with phase(...)` or
+# @timed(kind). With no profiler active these return after one global check,
+# so the marks stay in the executor and recorder permanently.
+#
+# Phases nest per thread (setup/call/teardown > fixture | step > api >
+# transport | recording > redaction | png | allure | trace_store). For every
+# phase the profiler keeps
+#   - total and self time per kind (the breakdown: "recording 61% of call"),
+#   - totals per label (which step, which endpoint, which fixture),
+#   - self time per stack, written as collapsed stacks ("call;step: When I
+#     create a user;api: POST /users;recording;png 1234" - microseconds), the
+#     input format of flamegraph.pl, speedscope and inferno.
+#
+# --profile-sample also runs a stdlib sampling profiler (sys._current_frames()
+# every 5 ms) and writes Python stacks under the same phase prefix, for the
+# time the marks don't break down.
+#
+#   workers    -> reports/profile/<worker>.json, .folded, .sampled.folded
+#   controller -> reports/profile.json, reports/profile.folded,
+#                 reports/profile-sampled.folded + terminal summary
+
+from __future__ import annotations
+
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.utils import fileio
+
+REPORT_DIR = Path("reports") / "profile"
+MERGED_FILE = Path("reports") / "profile.json"
+FOLDED_FILE = Path("reports") / "profile.folded"
+SAMPLED_FILE = Path("reports") / "profile-sampled.folded"
+
+_NULL = nullcontext()
+_SKIP_SAMPLED = ("pluggy", "_pytest", "runpy", os.sep + "__main__.py", os.sep + "threading.py", "hotpath.py")
+
+
+class PhaseProfiler:
+    """
+    prof = PhaseProfiler()
+    prof.begin("api", "GET /users/{user_id}"); ...; prof.end("api")
+    prof.to_dict()   # {"kinds": ..., "labels": ..., "stacks": ...}
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._stacks: Dict[int, List[list]] = {}       # thread ident -> [[kind, label, start, child_s], ...]
+        self._lock = threading.Lock()
+        self.kinds: Dict[str, List[float]] = {}         # kind -> [count, total_s, self_s]
+        self.labels: Dict[str, List[float]] = {}        # "kind: label" -> [count, total_s]
+        self.stacks: Dict[str, float] = {}              # "a;b;c" -> self_s
+        self.sampled: Dict[str, int] = {}               # "phases;py frames" -> samples
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.sample_interval_s = 0.005
+
+    def _stack(self) -> List[list]:
+        ident = threading.get_ident()
+        stack = self._stacks.get(ident)
+        if stack is None:
+            stack = self._stacks[ident] = []
+        return stack
+
+    def begin(self, kind: str, label: Optional[str] = None) -> None:
+        self._stack().append([kind, label, self._clock(), 0.0])
+
+    def end(self, kind: str) -> None:
+        stack = self._stack()
+        # unwind to the matching frame (a phase whose end() was skipped by an exception)
+        if not any(f[0] == kind for f in stack):
+            return
+        now = self._clock()
+        while stack:
+            frame = stack.pop()
+            total = now - frame[2]
+            if stack:
+                stack[-1][3] += total
+            self._account(stack, frame, total)
+            if frame[0] == kind:
+                return
+
+    def _account(self, parents: List[list], frame: list, total: float) -> None:
+        kind, label = frame[0], frame[1]
+        self_s = max(0.0, total - frame[3])
+        path = ";".join(_frame_name(f) for f in parents)
+        path = f"{path};{_frame_name(frame)}" if path else _frame_name(frame)
+        with self._lock:
+            k = self.kinds.get(kind)
+            if k is None:
+                k = self.kinds[kind] = [0, 0.0, 0.0]
+            # a kind nested in itself (api inside api) is counted once, at the outer level
+            if not any(p[0] == kind for p in parents):
+                k[0] += 1
+                k[1] += total
+            k[2] += self_s
+            if label:
+                key = f"{kind}: {label}"
+                lab = self.labels.get(key)
+                if lab is None:
+                    lab = self.labels[key] = [0, 0.0]
+                lab[0] += 1
+                lab[1] += total
+            self.stacks[path] = self.stacks.get(path, 0.0) + self_s
+
+    @contextmanager
+    def phase(self, kind: str, label: Optional[str] = None):
+        self.begin(kind, label)
+        try:
+            yield
+        finally:
+            self.end(kind)
+
+    # ---------- statistical sampling ----------
+
+    def start_sampling(self, interval_s: float = 0.005) -> None:
+        if self._sampler is None:
+            self.sample_interval_s = interval_s
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="hotpath-sampler", daemon=True)
+            self._sampler.start()
+
+    def stop_sampling(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.sample_interval_s):
+            frames = sys._current_frames()
+            for ident, stack in list(self._stacks.items()):
+                if ident == me or not stack or ident not in frames:
+                    continue
+                prefix = ";".join(_frame_name(f) for f in list(stack))
+                py = []
+                f = frames[ident]
+                while f is not None:
+                    code = f.f_code
+                    if not any(s in code.co_filename for s in _SKIP_SAMPLED):
+                        py.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    f = f.f_back
+                key = prefix + (";" + ";".join(reversed(py)) if py else "")
+                with self._lock:
+                    self.sampled[key] = self.sampled.get(key, 0) + 1
+            del frames
+
+    # ---------- report ----------
+
+    def to_dict(self, worker: str = "") -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "worker": worker,
+                "kinds": {k: {"count": int(c), "total_ms": round(t * 1000, 3), "self_ms": round(s * 1000, 3)}
+                          for k, (c, t, s) in self.kinds.items()},
+                "labels": {k: {"count": int(c), "total_ms": round(t * 1000, 3)} for k, (c, t) in self.labels.items()},
+                "stacks": {k: round(v * 1e6) for k, v in self.stacks.items()},
+                "sampled": dict(self.sampled),
+                "sample_interval_ms": self.sample_interval_s * 1000 if self.sampled else None,
+            }
+
+
+def _frame_name(frame: list) -> str:
+    kind, label = frame[0], frame[1]
+    # ';' separates frames in collapsed stacks
+    return f"{kind}: {label.replace(';', ',')}" if label else kind
+
+
+# ---------- process-wide profiler (what the marks talk to) ----------
+
+_PROFILER: Optional[PhaseProfiler] = None
+
+
+def start_profiler(sample: bool = False) -> PhaseProfiler:
+    global _PROFILER
+    if _PROFILER is None:
+        _PROFILER = PhaseProfiler()
+    if sample:
+        _PROFILER.start_sampling()
+    return _PROFILER
+
+
+def get_profiler() -> Optional[PhaseProfiler]:
+    return _PROFILER
+
+
+def active() -> bool:
+    return _PROFILER is not None
+
+
+def begin(kind: str, label: Optional[str] = None) -> None:
+    if _PROFILER is not None:
+        _PROFILER.begin(kind, label)
+
+
+def end(kind: str) -> None:
+    if _PROFILER is not None:
+        _PROFILER.end(kind)
+
+
+def phase(kind: str, label: Optional[str] = None):
+    return _NULL if _PROFILER is None else _PROFILER.phase(kind, label)
+
+
+def timed(kind: str):
+    """Decorator: the function's calls are a `kind` phase (checked per call, not at import)."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            prof = _PROFILER
+            if prof is None:
+                return fn(*args, **kwargs)
+            prof.begin(kind)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                prof.end(kind)
+        return inner
+    return wrap
+
+
+# ---------- xdist files ----------
+
+def write_worker_file(worker: str, profiler: Optional[PhaseProfiler] = None, report_dir: Path = REPORT_DIR) -> Optional[Path]:
+    profiler = profiler or _PROFILER
+    if profiler is None:
+        return None
+    profiler.stop_sampling()
+    data = profiler.to_dict(worker)
+    out = fileio.write_worker_file(report_dir, worker, data)
+    _write_folded(report_dir / f"{worker}.folded", data["stacks"])
+    if data["sampled"]:
+        _write_folded(report_dir / f"{worker}.sampled.folded", data["sampled"])
+    return out
+
+
+def _write_folded(path: Path, stacks: Dict[str, int]) -> None:
+    fileio.atomic_write(path, "".join(f"{k} {v}\n" for k, v in sorted(stacks.items()) if v > 0))
+
+
+def clear_worker_files(report_dir: Path = REPORT_DIR) -> None:
+    fileio.clear_worker_files(report_dir, "*")
+
+
+def merge_worker_files(report_dir: Path = REPORT_DIR, files: Optional[Iterable[Path]] = None) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {"workers": [], "kinds": {}, "labels": {}, "stacks": {}, "sampled": {}}
+    for data in fileio.read_worker_files(report_dir, files=files, tag="profile"):
+        merged["workers"].append(data["worker"])
+        for section in ("kinds", "labels"):
+            for key, row in data[section].items():
+                into = merged[section].setdefault(key, dict.fromkeys(row, 0))
+                for field, value in row.items():
+                    into[field] = round(into[field] + value, 3)
+        for section in ("stacks", "sampled"):
+            for key, value in data[section].items():
+                merged[section][key] = merged[section].get(key, 0) + value
+    return merged
+
+
+def write_merged(merged: Dict[str, Any], out: Path = MERGED_FILE) -> List[Path]:
+    summary = {k: v for k, v in merged.items() if k not in ("stacks", "sampled")}
+    fileio.atomic_write_json(out, summary, indent=2)
+    written = [out, out.with_suffix(".folded")]
+    _write_folded(written[1], merged["stacks"])
+    if merged["sampled"]:
+        written.append(out.with_name(f"{out.stem}-sampled.folded"))
+        _write_folded(written[2], merged["sampled"])
+    return written
+
+
+def format_summary(merged: Dict[str, Any], top: int = 10) -> List[str]:
+    """Terminal lines: self time per phase kind, then the slowest steps / endpoints / fixtures."""
+    kinds = merged.get("kinds") or {}
+    if not kinds:
+        return []
+    profiled = sum(row["self_ms"] for row in kinds.values()) or 1.0
+    lines = [f"{'self ms':>10} {'%':>6} {'total ms':>10} {'count':>7}  phase"]
+    for kind, row in sorted(kinds.items(), key=lambda kv: kv[1]["self_ms"], reverse=True):
+        lines.append(f"{row['self_ms']:>10.1f} {100 * row['self_ms'] / profiled:>5.1f}% "
+                     f"{row['total_ms']:>10.1f} {row['count']:>7}  {kind}")
+    for kind in ("step", "api", "fixture"):
+        rows = sorted(((k, v) for k, v in merged.get("labels", {}).items() if k.startswith(f"{kind}: ")),
+                      key=lambda kv: kv[1]["total_ms"], reverse=True)[:top]
+        if rows:
+            lines.append(f"{'total ms':>10} {'mean ms':>9} {'count':>7}  slowest {kind}s")
+            for key, v in rows:
+                lines.append(f"{v['total_ms']:>10.1f} {v['total_ms'] / max(1, v['count']):>9.1f} "
+                             f"{v['count']:>7}  {key[len(kind) + 2:]}")
+    lines.append(f"flamegraph input: {FOLDED_FILE}" + (f", {SAMPLED_FILE}" if merged.get("sampled") else ""))
+    return lines
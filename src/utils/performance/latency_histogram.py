@@ -0,0 +1,241 @@
+# src/utils/performance/latency_histogram.py
+# Constant-memory, mergeable latency histograms per endpoint.
+#
+# LatencyHistogram is HDR-style: values (microseconds) below 2**SUB_BITS are
+# counted exactly; above that each power-of-two range is split into
+# 2**(SUB_BITS-1) linear sub-buckets, so any recorded value is off by at most
+# 1/2**(SUB_BITS-1) (< 0.8%). The number of buckets is fixed by the range
+# (1 us .. ~19 h -> ~3.9k), whatever the number of samples; counts are kept
+# sparse, so an endpoint that always answers in 20-40 ms uses a few dozen.
+#
+# Histograms merge by adding counts, which is how per-worker files become
+# one report on the controller:
+#   workers/controller  -> reports/latency/<worker>.json   (write_worker_file)
+#   controller          -> reports/api-latency.json        (merge_worker_files)
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils import fileio
+
+SUB_BITS = 8
+_SUB_COUNT = 1 << SUB_BITS          # exact region: 0 .. 255 us
+_HALF = _SUB_COUNT >> 1              # sub-buckets per power of two above it
+MAX_US = (1 << 36) - 1               # ~19 hours; larger values are clamped
+
+REPORT_DIR = Path("reports") / "latency"
+MERGED_FILE = Path("reports") / "api-latency.json"
+PERCENTILES = (50, 90, 99)
+
+
+def _index(us: int) -> int:
+    if us < _SUB_COUNT:
+        return us
+    shift = us.bit_length() - SUB_BITS
+    return _SUB_COUNT + (shift - 1) * _HALF + ((us >> shift) - _HALF)
+
+
+def _upper_bound(index: int) -> int:
+    """Highest value (us) that lands in bucket `index`."""
+    if index < _SUB_COUNT:
+        return index
+    shift, sub = divmod(index - _SUB_COUNT, _HALF)
+    shift += 1
+    return ((sub + _HALF + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Counts per log-linear bucket + exact count/min/max/sum. Values in and out are ms."""
+
+    __slots__ = ("counts", "count", "errors", "min_us", "max_us", "sum_us")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.errors = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+        self.sum_us = 0
+
+    def record(self, value_ms: float, *, error: bool = False, count: int = 1) -> None:
+        if count <= 0:
+            return
+        us = min(MAX_US, max(0, int(round(value_ms * 1000.0))))
+        idx = _index(us)
+        self.counts[idx] = self.counts.get(idx, 0) + count
+        self.count += count
+        self.errors += count if error else 0
+        self.sum_us += us * count
+        self.max_us = max(self.max_us, us)
+        self.min_us = us if self.min_us is None else min(self.min_us, us)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for idx, n in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + n
+        self.count += other.count
+        self.errors += other.errors
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        return self
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Value (ms) at or below which q% of samples fall (bucket upper bound, capped at max)."""
+        if not self.count:
+            return None
+        rank = max(1, int(-(-q * self.count // 100)))  # ceil(q% of count)
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                return min(_upper_bound(idx), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"count": self.count, "errors": self.errors}
+        if self.count:
+            out["mean_ms"] = round(self.sum_us / self.count / 1000.0, 3)
+            out["min_ms"] = self.min_us / 1000.0
+            for q in PERCENTILES:
+                out[f"p{q}_ms"] = self.percentile(q)
+            out["max_ms"] = self.max_us / 1000.0
+        return out
+
+    # ---- serialization (sparse; JSON keys are strings) ----
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sub_bits": SUB_BITS,
+            "count": self.count,
+            "errors": self.errors,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "sum_us": self.sum_us,
+            "counts": {str(k): v for k, v in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        if data.get("sub_bits", SUB_BITS) != SUB_BITS:
+            raise ValueError(f"histogram precision mismatch: {data.get('sub_bits')} != {SUB_BITS}")
+        h = cls()
+        h.counts = {int(k): int(v) for k, v in data.get("counts", {}).items()}
+        h.count = int(data.get("count", 0))
+        h.errors = int(data.get("errors", 0))
+        h.min_us = data.get("min_us")
+        h.max_us = int(data.get("max_us", 0))
+        h.sum_us = int(data.get("sum_us", 0))
+        return h
+
+
+class LatencyRegistry:
+    """Thread-safe {endpoint key: LatencyHistogram} for one process."""
+
+    def __init__(self):
+        self._hists: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, value_ms: Optional[float], *, error: bool = False) -> None:
+        if value_ms is None:
+            return
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = LatencyHistogram()
+            hist.record(value_ms, error=error)
+
+    def merge(self, other: "LatencyRegistry") -> "LatencyRegistry":
+        for key, hist in other.items():
+            with self._lock:
+                mine = self._hists.get(key)
+                if mine is None:
+                    mine = self._hists[key] = LatencyHistogram()
+                mine.merge(hist)
+        return self
+
+    def items(self) -> List[Tuple[str, LatencyHistogram]]:
+        with self._lock:
+            return sorted(self._hists.items())
+
+    def __len__(self) -> int:
+        return len(self._hists)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hists.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:  # histograms keep changing while other threads record
+            return {key: hist.to_dict() for key, hist in sorted(self._hists.items())}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyRegistry":
+        reg = cls()
+        reg._hists = {key: LatencyHistogram.from_dict(h) for key, h in data.items()}
+        return reg
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """One row per endpoint, slowest p99 first."""
+        rows = [dict(endpoint=key, **hist.summary()) for key, hist in self.items()]
+        rows.sort(key=lambda r: r.get("p99_ms") or 0.0, reverse=True)
+        return rows
+
+
+_registry = LatencyRegistry()
+
+
+def latency_registry() -> LatencyRegistry:
+    """Process-wide registry the executor records into."""
+    return _registry
+
+
+# ---------- per-worker files + controller merge ----------
+
+def write_worker_file(worker: str, registry: Optional[LatencyRegistry] = None, report_dir: Path = REPORT_DIR) -> Optional[Path]:
+    registry = registry if registry is not None else _registry
+    if not len(registry):
+        return None
+    return fileio.write_worker_file(report_dir, worker, registry.to_dict())
+
+
+def clear_worker_files(report_dir: Path = REPORT_DIR) -> None:
+    """Controller, before workers start: drop files left by a previous run."""
+    fileio.clear_worker_files(report_dir)
+
+
+def merge_worker_files(report_dir: Path = REPORT_DIR, files: Optional[Iterable[Path]] = None) -> LatencyRegistry:
+    merged = LatencyRegistry()
+    for data in fileio.read_worker_files(report_dir, files=files, tag="latency"):
+        try:
+            merged.merge(LatencyRegistry.from_dict(data))
+        except Exception as e:
+            print(f"[latency] skip a worker file: {e}")
+    return merged
+
+
+def write_merged(registry: LatencyRegistry, out: Path = MERGED_FILE) -> Path:
+    """{"endpoints": [summary rows], "histograms": {...}} - rows for people, histograms for tools."""
+    return fileio.atomic_write_json(out, {"endpoints": registry.summary_rows(), "histograms": registry.to_dict()}, indent=2)
+
+
+def format_rows(rows: List[Dict[str, Any]], top: int = 20, label: str = "endpoint", source: Path = MERGED_FILE) -> List[str]:
+    """Terminal table lines (label/source: for other registries in this format, e.g. page readiness)."""
+    if not rows:
+        return []
+
+    def ms(v):
+        return "-" if v is None else f"{v:.1f}"
+
+    lines = [f"{'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'count':>7} {'err':>5}  {label} (ms)"]
+    for r in rows[:top]:
+        lines.append(
+            f"{ms(r.get('p50_ms')):>9} {ms(r.get('p90_ms')):>9} {ms(r.get('p99_ms')):>9} "
+            f"{ms(r.get('max_ms')):>9} {r['count']:>7} {r['errors']:>5}  {r['endpoint']}"
+        )
+    if len(rows) > top:
+        lines.append(f"... {len(rows) - top} more in {source}")
+    return lines
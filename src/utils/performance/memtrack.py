@@ -0,0 +1,244 @@
+# src/utils/performance/memtrack.py
+# pytest --memtrack: Python heap growth per test, with allocation sites.
+#
+# tracemalloc traces every allocation (10 frames by default) from
+# pytest_configure on. After each test (teardown included) the tracker runs
+# gc, takes one snapshot and compares the traced total with the previous
+# test's: that is the test's *net* growth, i.e. memory it left behind. Only
+# when it exceeds the threshold are the two snapshots diffed (by line, and by
+# full traceback for the top sites); the snapshot then becomes the baseline of
+# the next test, so there is one snapshot per test, not two.
+#
+# The first test on a worker carries session fixtures (settings, browser,
+# api_trace_store...), so the session diff is taken against the snapshot after
+# it: whatever grows from there to the end of the worker's run is listed as
+# "session growth" - that is where session-scoped accumulation shows up.
+#
+#   workers    -> reports/workers/<worker>.memtrack.json  (next to the API trace JSON)
+#   controller -> reports/memtrack.json + terminal summary
+#
+# tracemalloc slows allocation-heavy code down noticeably (often 1.5-3x) and
+# only sees the Python heap (not browsers, not C libraries' own allocators).
+
+from __future__ import annotations
+
+import gc
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.utils import fileio
+
+WORKERS_DIR = Path("reports") / "workers"
+MERGED_FILE = Path("reports") / "memtrack.json"
+SUFFIX = ".memtrack.json"
+KB = 1024
+
+_SKIP_FILES = {tracemalloc.__file__, __file__, "<unknown>",
+               "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>"}
+
+
+def _site(frame) -> str:
+    return f"{frame[0]}:{frame[1]}"
+
+
+def _grouped(snapshot, by_traceback: bool) -> Dict[Any, List[int]]:
+    # tracemalloc's own compare_to()/filter_traces() build a Frame and a
+    # Traceback object per trace: tens of seconds on a 200k-block heap. The raw
+    # traces are (domain, size, frames, nframe) tuples with the frames most
+    # recent first, which group cheaply; fall back to the public API if that
+    # layout ever changes.
+    raw = getattr(snapshot.traces, "_traces", None)
+    if raw is None:
+        raw = [(0, t.size, tuple((f.filename, f.lineno) for f in reversed(t.traceback))) for t in snapshot.traces]
+    groups: Dict[Any, List[int]] = {}
+    for trace in raw:
+        size, frames = trace[1], trace[2]
+        if not frames or frames[0][0] in _SKIP_FILES:
+            continue
+        g = groups.get(frames if by_traceback else frames[0])
+        if g is None:
+            groups[frames if by_traceback else frames[0]] = [size, 1]
+        else:
+            g[0] += size
+            g[1] += 1
+    return groups
+
+
+def _diff(snapshot, baseline, by_traceback: bool, top: int):
+    """[(key, size_diff, count_diff)] of what grew most between the two snapshots."""
+    new, old = _grouped(snapshot, by_traceback), _grouped(baseline, by_traceback)
+    grew = []
+    for key, (size, count) in new.items():
+        size0, count0 = old.get(key, (0, 0))
+        if size > size0:
+            grew.append((key, size - size0, count - count0))
+    grew.sort(key=lambda g: g[1], reverse=True)
+    return grew[:top]
+
+
+def _top_sites(snapshot, baseline, top: int) -> List[Dict[str, Any]]:
+    return [
+        {"where": _site(site), "size_kb": round(size / KB, 1), "blocks": count}
+        for site, size, count in _diff(snapshot, baseline, False, top)
+    ]
+
+
+def _top_tracebacks(snapshot, baseline, top: int) -> List[Dict[str, Any]]:
+    return [
+        {"size_kb": round(size / KB, 1), "blocks": count, "traceback": [_site(f) for f in frames]}  # allocation site first
+        for frames, size, count in _diff(snapshot, baseline, True, top)
+    ]
+
+
+class MemTracker:
+    """
+    tracker = MemTracker(threshold_kb=256).start()
+    tracker.begin(nodeid); ...; tracker.end(nodeid)     # around each test
+    tracker.to_dict("gw0")                               # per-worker leak report
+    """
+
+    def __init__(self, threshold_kb: float = 256, top: int = 10, frames: int = 10):
+        self.threshold_kb = threshold_kb
+        self.top = top
+        self.frames = frames
+        self.tests: List[Dict[str, Any]] = []         # every test: growth / peak
+        self.flagged: List[Dict[str, Any]] = []       # growth > threshold: + allocation sites
+        self._prev = None
+        self._prev_traced = 0
+        self._warm = None                             # snapshot after the first test
+        self._warm_traced = 0
+        self._start_traced = 0
+        self._started_here = False
+
+    def _snapshot(self):
+        gc.collect()
+        return tracemalloc.take_snapshot()
+
+    def start(self) -> "MemTracker":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_here = True
+        self._prev = self._snapshot()
+        self._prev_traced = self._start_traced = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def stop(self) -> None:
+        if self._started_here and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._started_here = False
+
+    def begin(self, key: str) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def end(self, key: str) -> Optional[Dict[str, Any]]:
+        if not tracemalloc.is_tracing() or self._prev is None:
+            return None
+        overhead = time.perf_counter()
+        peak = tracemalloc.get_traced_memory()[1]
+        snap = self._snapshot()
+        traced = tracemalloc.get_traced_memory()[0]
+        growth = traced - self._prev_traced
+        row = {
+            "test": key,
+            "growth_kb": round(growth / KB, 1),
+            "peak_kb": round(max(0, peak - self._prev_traced) / KB, 1),
+            "traced_mb": round(traced / KB / KB, 2),
+        }
+        self.tests.append(row)
+        if growth > self.threshold_kb * KB:
+            self.flagged.append(dict(row,
+                                     top=_top_sites(snap, self._prev, self.top),
+                                     tracebacks=_top_tracebacks(snap, self._prev, 3)))
+        if self._warm is None:
+            self._warm, self._warm_traced = snap, traced
+        self._prev, self._prev_traced = snap, traced
+        row["snapshot_ms"] = round((time.perf_counter() - overhead) * 1000, 1)
+        return row
+
+    def to_dict(self, worker: str = "") -> Dict[str, Any]:
+        if tracemalloc.is_tracing():
+            snap, traced = self._snapshot(), tracemalloc.get_traced_memory()[0]
+        else:
+            snap, traced = self._prev, self._prev_traced
+        session_top = _top_sites(snap, self._warm, self.top) if snap is not None and self._warm is not None else []
+        after_first = self._warm_traced if self._warm is not None else self._start_traced
+        return {
+            "worker": worker,
+            "threshold_kb": self.threshold_kb,
+            "tests_run": len(self.tests),
+            "start_mb": round(self._start_traced / KB / KB, 2),
+            "after_first_test_mb": round(after_first / KB / KB, 2),
+            "end_mb": round(traced / KB / KB, 2),
+            "session_growth_kb": round((traced - after_first) / KB, 1),
+            "session_top": session_top,
+            "flagged": self.flagged,
+            "tests": self.tests,
+        }
+
+
+# ---------- process-wide tracker + xdist files ----------
+
+_TRACKER: Optional[MemTracker] = None
+
+
+def start_tracker(threshold_kb: float = 256, top: int = 10, frames: int = 10) -> MemTracker:
+    global _TRACKER
+    if _TRACKER is None:
+        _TRACKER = MemTracker(threshold_kb=threshold_kb, top=top, frames=frames).start()
+    return _TRACKER
+
+
+def get_tracker() -> Optional[MemTracker]:
+    return _TRACKER
+
+
+def write_worker_file(worker: str, tracker: Optional[MemTracker] = None, workers_dir: Path = WORKERS_DIR) -> Optional[Path]:
+    tracker = tracker or _TRACKER
+    if tracker is None:
+        return None
+    data = tracker.to_dict(worker)
+    tracker.stop()
+    return fileio.write_worker_file(workers_dir, worker, data, suffix=SUFFIX, indent=2)
+
+
+def clear_worker_files(workers_dir: Path = WORKERS_DIR) -> None:
+    fileio.clear_worker_files(workers_dir, f"*{SUFFIX}")
+
+
+def merge_worker_files(workers_dir: Path = WORKERS_DIR, files: Optional[Iterable[Path]] = None) -> Dict[str, Any]:
+    workers = fileio.read_worker_files(workers_dir, f"*{SUFFIX}", files=files, tag="memtrack")
+    flagged = [dict(t, worker=w["worker"]) for w in workers for t in w.get("flagged", [])]
+    return {
+        "workers": {w["worker"]: {k: v for k, v in w.items() if k not in ("flagged", "tests")} for w in workers},
+        "flagged": sorted(flagged, key=lambda t: t["growth_kb"], reverse=True),
+        "tests": [dict(t, worker=w["worker"]) for w in workers for t in w.get("tests", [])],
+    }
+
+
+def write_merged(merged: Dict[str, Any], out: Path = MERGED_FILE) -> Path:
+    return fileio.atomic_write_json(out, merged, indent=2)
+
+
+def format_summary(merged: Dict[str, Any], top: int = 10) -> List[str]:
+    """Terminal lines: Python heap per worker, then the tests that left the most behind."""
+    if not merged.get("workers"):
+        return []
+    lines = [f"{'start MB':>9} {'1st test':>9} {'end MB':>8} {'growth KB':>10} {'tests':>6}  worker"]
+    for name, w in sorted(merged["workers"].items()):
+        lines.append(f"{w['start_mb']:>9.2f} {w['after_first_test_mb']:>9.2f} {w['end_mb']:>8.2f} "
+                     f"{w['session_growth_kb']:>10.1f} {w['tests_run']:>6}  {name}")
+        for site in w.get("session_top", [])[:3]:
+            lines.append(f"{'':>9} +{site['size_kb']:.1f} KB  {site['where']}")
+    flagged = merged.get("flagged", [])
+    if flagged:
+        lines.append(f"{'+KB':>9} {'peak KB':>9}  test (net growth over the threshold) / top allocation site")
+        for t in flagged[:top]:
+            where = t["top"][0]["where"] if t.get("top") else "-"
+            lines.append(f"{t['growth_kb']:>9.1f} {t['peak_kb']:>9.1f}  {t['test']} [{t['worker']}]")
+            lines.append(f"{'':>20}{where}")
+        if len(flagged) > top:
+            lines.append(f"... {len(flagged) - top} more in {MERGED_FILE}")
+    return lines
@@ -1,56 +1,54 @@
 import time
-import psutil
-from typing import Dict, List, Any
+from typing import Dict, Any, Optional
+
+from src.utils.performance.latency_histogram import LatencyRegistry
+from src.utils.performance.resource_sampler import ResourceSampler
 
 
 class MetricsCollector:
-    """Collect performance metrics during test execution"""
+    """
+    Collect performance metrics during test execution.
+    Resources come from a background ResourceSampler (ring buffer, see
+    resource_sampler.py); response times go into per-operation histograms.
+    """
 
-    def __init__(self):
-        self.metrics = []
-        self.start_time = None
+    def __init__(self, interval_s: float = 0.5, children: bool = False):
+        self.sampler = ResourceSampler(interval_s=interval_s, children=children)
+        self.response_times = LatencyRegistry()
+        self.start_time: Optional[float] = None
 
     def start_collection(self):
-        """Start metrics collection"""
+        """Start sampling in the background"""
         self.start_time = time.time()
-        self.collect_baseline_metrics()
-
-    def collect_baseline_metrics(self):
-        """Collect baseline system metrics"""
-        baseline = {
-            "timestamp": time.time(),
-            "type": "baseline",
-            "cpu_percent": psutil.cpu_percent(),
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage('/').percent,
-            "network_io": psutil.net_io_counters()._asdict()
-        }
-        self.metrics.append(baseline)
+        self.sampler.start()
+
+    def stop_collection(self):
+        self.sampler.stop()
 
     def record_response_time(self, operation: str, response_time_ms: float):
         """Record response time for specific operation"""
-        metric = {
-            "timestamp": time.time(),
-            "type": "response_time",
-            "operation": operation,
-            "response_time_ms": response_time_ms,
-            "elapsed_time": time.time() - self.start_time if self.start_time else 0
-        }
-        self.metrics.append(metric)
+        self.response_times.record(operation, response_time_ms)
 
     def get_performance_summary(self) -> Dict[str, Any]:
         """Generate performance summary"""
-        response_times = [m for m in self.metrics if m["type"] == "response_time"]
-
-        if not response_times:
-            return {"message": "No response time data collected"}
+        resources = self.sampler.to_dict()["session"] if len(self.sampler) else {}
+        merged = None
+        for _, hist in self.response_times.items():
+            if merged is None:
+                merged = type(hist)()
+            merged.merge(hist)
 
-        times = [rt["response_time_ms"] for rt in response_times]
+        if merged is None or not merged.count:
+            return {"message": "No response time data collected", "resources": resources}
 
+        summary = merged.summary()
         return {
-            "total_operations": len(response_times),
-            "avg_response_time": sum(times) / len(times),
-            "min_response_time": min(times),
-            "max_response_time": max(times),
-            "total_execution_time": response_times[-1]["elapsed_time"] if response_times else 0
-        }
\ No newline at end of file
+            "total_operations": merged.count,
+            "avg_response_time": summary["mean_ms"],
+            "min_response_time": summary["min_ms"],
+            "max_response_time": summary["max_ms"],
+            "p99_response_time": summary["p99_ms"],
+            "total_execution_time": time.time() - self.start_time if self.start_time else 0,
+            "operations": self.response_times.summary_rows(),
+            "resources": resources,
+        }
@@ -1,15 +1,17 @@
 import time
-import statistics
-from typing import List, Dict, Any, Callable
+from typing import Dict, Any, Callable
 import structlog
 
+from src.utils.performance.latency_histogram import LatencyHistogram
+
 logger = structlog.get_logger(__name__)
 
 class PerformanceMetrics:
     """Utility class for performance measurements"""
 
     def __init__(self):
-        self.response_times = []
+        # Constant memory however many calls are measured (percentiles within <1%)
+        self.histogram = LatencyHistogram()
         self.error_count = 0
         self.success_count = 0
 
@@ -21,7 +23,7 @@ class PerformanceMetrics:
             end_time = time.time()
             response_time = end_time - start_time
 
-            self.response_times.append(response_time)
+            self.histogram.record(response_time * 1000.0)
             self.success_count += 1
 
             logger.info("Performance measurement",
@@ -44,35 +46,27 @@ class PerformanceMetrics:
             raise e
 
     def get_statistics(self) -> Dict[str, Any]:
-        """Get performance statistics"""
-        if not self.response_times:
+        """Get performance statistics (seconds)"""
+        h = self.histogram
+        if not h.count:
             return {"error": "No measurements recorded"}
 
         return {
-            "total_requests": len(self.response_times),
+            "total_requests": h.count,
             "successful_requests": self.success_count,
             "failed_requests": self.error_count,
             "success_rate": (self.success_count / (self.success_count + self.error_count)) * 100,
-            "avg_response_time": statistics.mean(self.response_times),
-            "min_response_time": min(self.response_times),
-            "max_response_time": max(self.response_times),
-            "median_response_time": statistics.median(self.response_times),
-            "p95_response_time": self._percentile(self.response_times, 95),
-            "p99_response_time": self._percentile(self.response_times, 99)
+            "avg_response_time": h.sum_us / h.count / 1e6,
+            "min_response_time": h.min_us / 1e6,
+            "max_response_time": h.max_us / 1e6,
+            "median_response_time": self._percentile(50),
+            "p95_response_time": self._percentile(95),
+            "p99_response_time": self._percentile(99)
         }
 
-    def _percentile(self, data: List[float], percentile: float) -> float:
-        """Calculate percentile"""
-        sorted_data = sorted(data)
-        index = (percentile / 100) * (len(sorted_data) - 1)
-
-        if index.is_integer():
-            return sorted_data[int(index)]
-        else:
-            lower_index = int(index)
-            upper_index = lower_index + 1
-            weight = index - lower_index
-            return sorted_data[lower_index] * (1 - weight) + sorted_data[upper_index] * weight
+    def _percentile(self, percentile: float) -> float:
+        """Calculate percentile (seconds)"""
+        return self.histogram.percentile(percentile) / 1000.0
 
 def benchmark_api_endpoint(api_client, endpoint: str, method: str = "GET",
                            iterations: int = 100, **kwargs) -> Dict[str, Any]:
@@ -0,0 +1,323 @@
+# src/utils/performance/resource_sampler.py
+# Background resource sampler for the test process (and, optionally, its
+# children: the Playwright driver and browsers, Appium clients...).
+#
+# One daemon thread reads CPU time, RSS, open file descriptors, threads and
+# disk/network byte counters every `interval_s` into preallocated array('d')
+# columns used as a ring buffer: no per-sample objects, constant memory
+# (capacity * columns * 8 bytes; 7200 samples = 1 h at 0.5 s, ~630 KB).
+#
+# begin(nodeid) / end(nodeid) take an extra sample inline at test start and
+# stop; end() returns the per-test delta (RSS, FDs, threads, CPU seconds, IO
+# bytes) plus the RSS peak seen by the thread in between. Growth that is still
+# there when the next test starts is what a leak looks like; steady growth
+# across many tests shows up in the session trend (MB per 100 tests).
+#
+# Under xdist every worker samples itself and writes its own file, the
+# controller merges them (same layout as the latency histograms):
+#   workers/controller  -> reports/resources/<worker>.json   (write_worker_file)
+#   controller          -> reports/resources.json            (merge_worker_files)
+#
+# Network counters are host-wide (psutil has no per-process socket bytes);
+# disk counters are per process (read_bytes/write_bytes, Linux/Windows only).
+
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import psutil
+
+from src.utils import fileio
+
+COLUMNS = ("t", "cpu_s", "rss", "fds", "threads", "children", "child_rss",
+           "read_bytes", "write_bytes", "net_sent", "net_recv")
+
+REPORT_DIR = Path("reports") / "resources"
+MERGED_FILE = Path("reports") / "resources.json"
+MB = 1024 * 1024
+
+
+class ResourceSampler:
+    """
+    sampler = ResourceSampler(interval_s=0.5, children=True).start()
+    sampler.begin("tests/test_x.py::test_y")
+    ...
+    delta = sampler.end("tests/test_x.py::test_y")   # {"rss_delta_mb": ..., "fds_delta": ...}
+    sampler.stop()
+    """
+
+    def __init__(self, interval_s: float = 0.5, capacity: int = 7200, children: bool = False,
+                 pid: Optional[int] = None):
+        self.interval_s = interval_s
+        self.capacity = max(2, capacity)
+        self.children = children
+        self._proc = psutil.Process(pid)
+        self._child_procs: Dict[int, psutil.Process] = {}
+        self._cols = {c: array("d", bytes(8 * self.capacity)) for c in COLUMNS}
+        self._n = 0                      # samples written so far (ring index = n % capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._open: Dict[str, Dict[str, float]] = {}
+        self.tests: List[Dict[str, Any]] = []
+        self.first: Optional[Dict[str, float]] = None
+
+    # ---------- sampling ----------
+
+    def _read(self) -> Dict[str, float]:
+        p = self._proc
+        with p.oneshot():
+            cpu = p.cpu_times()
+            row = {
+                "t": time.time(),
+                "cpu_s": cpu.user + cpu.system,
+                "rss": float(p.memory_info().rss),
+                "fds": float(_fd_count(p)),
+                "threads": float(p.num_threads()),
+            }
+            io = _io(p)
+        row["read_bytes"], row["write_bytes"] = io
+        kids = self._read_children() if self.children else (0, 0.0, 0.0)
+        row["children"], row["child_rss"] = float(kids[0]), kids[1]
+        row["cpu_s"] += kids[2]
+        net = psutil.net_io_counters()
+        row["net_sent"], row["net_recv"] = (float(net.bytes_sent), float(net.bytes_recv)) if net else (0.0, 0.0)
+        return row
+
+    def _read_children(self):
+        try:
+            current = {c.pid: c for c in self._proc.children(recursive=True)}
+        except psutil.Error:
+            current = {}
+        # keep the Process objects (psutil caches per-object state)
+        self._child_procs = {pid: self._child_procs.get(pid, proc) for pid, proc in current.items()}
+        rss = cpu = 0.0
+        for proc in list(self._child_procs.values()):
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    t = proc.cpu_times()
+                    cpu += t.user + t.system
+            except psutil.Error:
+                self._child_procs.pop(proc.pid, None)
+        return len(self._child_procs), rss, cpu
+
+    def sample(self) -> Dict[str, float]:
+        """Take one sample now, store it in the ring and return it."""
+        try:
+            row = self._read()
+        except psutil.Error:
+            return {}
+        with self._lock:
+            i = self._n % self.capacity
+            for c in COLUMNS:
+                self._cols[c][i] = row[c]
+            self._n += 1
+            if self.first is None:
+                self.first = row
+        return row
+
+    def start(self) -> "ResourceSampler":
+        if self._thread is None:
+            self.sample()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="resource-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.sample()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_s + 1)
+            self._thread = None
+        self.sample()
+
+    def __len__(self) -> int:
+        return min(self._n, self.capacity)
+
+    def samples(self, since: float = 0.0) -> Dict[str, List[float]]:
+        """Columns (oldest first) of the samples still in the ring, taken at or after `since`."""
+        with self._lock:
+            n, cap = self._n, self.capacity
+            idx = [(n - k) % cap for k in range(min(n, cap), 0, -1)]
+            t = self._cols["t"]
+            idx = [i for i in idx if t[i] >= since]
+            return {c: [self._cols[c][i] for i in idx] for c in COLUMNS}
+
+    def _peak_rss(self, start: float, end: float) -> float:
+        # newest first; stop at the first sample older than the test
+        peak = 0.0
+        with self._lock:
+            t, rss = self._cols["t"], self._cols["rss"]
+            for k in range(1, min(self._n, self.capacity) + 1):
+                i = (self._n - k) % self.capacity
+                if t[i] < start:
+                    break
+                if t[i] <= end:
+                    peak = max(peak, rss[i])
+        return peak
+
+    # ---------- per test ----------
+
+    def begin(self, key: str) -> None:
+        row = self.sample()
+        if row:
+            self._open[key] = row
+
+    def end(self, key: str, **extra: Any) -> Optional[Dict[str, Any]]:
+        before = self._open.pop(key, None)
+        after = self.sample()
+        if not before or not after:
+            return None
+        delta = {
+            "test": key,
+            "duration_s": round(after["t"] - before["t"], 3),
+            "cpu_s": round(after["cpu_s"] - before["cpu_s"], 3),
+            "rss_mb": round(after["rss"] / MB, 1),
+            "rss_delta_mb": round((after["rss"] - before["rss"]) / MB, 2),
+            "peak_rss_mb": round(max(self._peak_rss(before["t"], after["t"]), before["rss"], after["rss"]) / MB, 1),
+            "fds_delta": int(after["fds"] - before["fds"]),
+            "threads_delta": int(after["threads"] - before["threads"]),
+            "read_mb": round((after["read_bytes"] - before["read_bytes"]) / MB, 2),
+            "write_mb": round((after["write_bytes"] - before["write_bytes"]) / MB, 2),
+            "net_mb": round((after["net_sent"] + after["net_recv"] - before["net_sent"] - before["net_recv"]) / MB, 2),
+        }
+        if self.children:
+            delta["children_delta"] = int(after["children"] - before["children"])
+            delta["child_rss_delta_mb"] = round((after["child_rss"] - before["child_rss"]) / MB, 2)
+        delta.update(extra)
+        self.tests.append(delta)
+        return delta
+
+    # ---------- report ----------
+
+    def to_dict(self, worker: str = "") -> Dict[str, Any]:
+        cols = self.samples()
+        last = {c: (cols[c][-1] if cols[c] else 0.0) for c in COLUMNS}
+        first = self.first or last
+        return {
+            "worker": worker,
+            "pid": self._proc.pid,
+            "interval_s": self.interval_s,
+            "samples": self._n,
+            "session": {
+                "duration_s": round(last["t"] - first["t"], 1),
+                "cpu_s": round(last["cpu_s"] - first["cpu_s"], 2),
+                "rss_start_mb": round(first["rss"] / MB, 1),
+                "rss_end_mb": round(last["rss"] / MB, 1),
+                "peak_rss_mb": round(max(cols["rss"] + [first["rss"]]) / MB, 1),
+                "fds_start": int(first["fds"]),
+                "fds_end": int(last["fds"]),
+                "threads_end": int(last["threads"]),
+                "children_end": int(last["children"]),
+                "rss_mb_per_100_tests": growth_per_100(self.tests),
+            },
+            # the ring, thinned to at most ~500 points for the report
+            "timeline": {c: v[:: max(1, len(v) // 500)] for c, v in cols.items()},
+            "tests": self.tests,
+        }
+
+
+def _fd_count(p: psutil.Process) -> int:
+    try:
+        return p.num_fds() if hasattr(p, "num_fds") else p.num_handles()
+    except psutil.Error:
+        return 0
+
+
+def _io(p: psutil.Process):
+    try:
+        io = p.io_counters()
+        return float(io.read_bytes), float(io.write_bytes)
+    except (psutil.Error, AttributeError, NotImplementedError):
+        return 0.0, 0.0
+
+
+def growth_per_100(tests: List[Dict[str, Any]]) -> Optional[float]:
+    """Least-squares slope of RSS after each test, per 100 tests (the first test, with session fixtures, is skipped)."""
+    ys = [t["rss_mb"] for t in tests[1:]]
+    n = len(ys)
+    if n < 10:
+        return None
+    mean_x, mean_y = (n - 1) / 2, sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in range(n))
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(ys))
+    return round(100 * sxy / sxx, 2)
+
+
+# ---------- process-wide sampler + xdist files ----------
+
+_SAMPLER: Optional[ResourceSampler] = None
+
+
+def start_sampler(interval_s: float = 0.5, children: bool = False) -> ResourceSampler:
+    global _SAMPLER
+    if _SAMPLER is None:
+        _SAMPLER = ResourceSampler(interval_s=interval_s, children=children).start()
+    return _SAMPLER
+
+
+def get_sampler() -> Optional[ResourceSampler]:
+    return _SAMPLER
+
+
+def write_worker_file(worker: str, sampler: Optional[ResourceSampler] = None, report_dir: Path = REPORT_DIR) -> Optional[Path]:
+    sampler = sampler or _SAMPLER
+    if sampler is None:
+        return None
+    sampler.stop()
+    return fileio.write_worker_file(report_dir, worker, sampler.to_dict(worker))
+
+
+def clear_worker_files(report_dir: Path = REPORT_DIR) -> None:
+    """Controller, before workers start: drop files left by a previous run."""
+    fileio.clear_worker_files(report_dir)
+
+
+def merge_worker_files(report_dir: Path = REPORT_DIR, files: Optional[Iterable[Path]] = None) -> Dict[str, Any]:
+    workers = fileio.read_worker_files(report_dir, files=files, tag="resources")
+    tests = [dict(t, worker=w["worker"]) for w in workers for t in w.get("tests", [])]
+    return {
+        "workers": {w["worker"]: dict(w["session"], pid=w["pid"], samples=w["samples"]) for w in workers},
+        "top_rss": sorted(tests, key=lambda t: t["rss_delta_mb"], reverse=True)[:20],
+        "fd_growth": [t for t in tests if t["fds_delta"] > 0],
+        "thread_growth": [t for t in tests if t["threads_delta"] > 0],
+        "tests": tests,
+        "timelines": {w["worker"]: w.get("timeline", {}) for w in workers},
+    }
+
+
+def write_merged(merged: Dict[str, Any], out: Path = MERGED_FILE) -> Path:
+    return fileio.atomic_write_json(out, merged, indent=2)
+
+
+def format_summary(merged: Dict[str, Any], top: int = 10) -> List[str]:
+    """Terminal lines: session trend per worker, then the tests that grew RSS / FDs / threads the most."""
+    if not merged.get("workers"):
+        return []
+    lines = [f"{'rss start':>10} {'end':>8} {'peak':>8} {'fds':>9} {'MB/100 tests':>13}  worker"]
+    for name, s in sorted(merged["workers"].items()):
+        trend = s.get("rss_mb_per_100_tests")
+        lines.append(
+            f"{s['rss_start_mb']:>10.1f} {s['rss_end_mb']:>8.1f} {s['peak_rss_mb']:>8.1f} "
+            f"{s['fds_start']:>4}->{s['fds_end']:<4} {'-' if trend is None else f'{trend:+.1f}':>13}  {name}"
+        )
+    grew = [t for t in merged["top_rss"] if t["rss_delta_mb"] > 0][:top]
+    if grew:
+        lines.append(f"{'+rss MB':>10} {'peak':>8} {'+fds':>5} {'+thr':>5}  test (largest RSS growth)")
+        for t in grew:
+            lines.append(f"{t['rss_delta_mb']:>10.2f} {t['peak_rss_mb']:>8.1f} {t['fds_delta']:>5} "
+                         f"{t['threads_delta']:>5}  {t['test']} [{t['worker']}]")
+    for key, label in (("fd_growth", "file descriptors"), ("thread_growth", "threads")):
+        if merged.get(key):
+            lines.append(f"{len(merged[key])} test(s) ended with more open {label} than they started with "
+                         f"(see {MERGED_FILE})")
+    return lines
@@ -0,0 +1,217 @@
+# src/utils/startup_profiler.py
+# Opt-in startup profiling for `pytest --profile-startup`.
+#
+# - Import time per module (self + cumulative), via a meta-path finder that
+#   wraps loaders. It must be installed before conftest's heavy imports, so
+#   conftest calls `maybe_start_import_timer()` right at the top.
+# - Fixture setup time per defining module (fed from pytest_fixture_setup).
+# - Milestones (conftest loaded, settings ready, collection done, first test).
+#
+# Each process writes reports/startup/<worker>.json; the controller prints a
+# merged summary. Workers inherit PROFILE_STARTUP=1 from the controller.
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ENV_FLAG = "PROFILE_STARTUP"
+CLI_FLAG = "--profile-startup"
+REPORT_DIR = Path("reports") / "startup"
+
+
+class _TimedLoader:
+    """Delegating loader that times exec_module; everything else passes through."""
+
+    def __init__(self, loader, name: str, timer: "ImportTimer"):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Leave the real loader on the spec so tools that inspect it (pytest's
+        # assertion rewriter, importlib.resources) see the original
+        spec = getattr(module, "__spec__", None)
+        if spec is not None and spec.loader is self:
+            spec.loader = self._loader
+        if getattr(module, "__loader__", None) is self:
+            module.__loader__ = self._loader
+        self._timer._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer._exit(self._name)
+
+
+class ImportTimer:
+    """sys.meta_path hook recording self/cumulative import time per module."""
+
+    def __init__(self):
+        self.records: Dict[str, Dict[str, float]] = {}
+        self._stack: List[List[Any]] = []  # [name, start, child_time]
+        self._resolving = False
+
+    # --- finder protocol ---
+    def find_spec(self, fullname, path=None, target=None):
+        if self._resolving:
+            return None
+        self._resolving = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self:
+                    continue
+                find = getattr(finder, "find_spec", None)
+                if find is None:
+                    continue
+                spec = find(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._resolving = False
+        loader = getattr(spec, "loader", None)
+        if loader is not None and hasattr(loader, "exec_module"):
+            spec.loader = _TimedLoader(loader, fullname, self)
+        return spec
+
+    # --- timing ---
+    def _enter(self, name: str) -> None:
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str) -> None:
+        _, start, child = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        self.records[name] = {"self_s": cumulative - child, "cumulative_s": cumulative}
+        if self._stack:
+            self._stack[-1][2] += cumulative
+
+    def install(self) -> "ImportTimer":
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        try:
+            sys.meta_path.remove(self)
+        except ValueError:
+            pass
+
+
+class StartupProfile:
+    """Per-process collector for imports, fixture setup and milestones."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.imports: Optional[ImportTimer] = None
+        self.fixtures: Dict[str, Dict[str, float]] = {}
+        self.milestones: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        self.milestones.setdefault(name, round(time.perf_counter() - self.t0, 4))
+
+    def add_fixture(self, module: str, name: str, seconds: float) -> None:
+        key = f"{module}::{name}"
+        rec = self.fixtures.setdefault(key, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+        rec["count"] += 1
+        rec["total_s"] += seconds
+        rec["max_s"] = max(rec["max_s"], seconds)
+
+    def to_dict(self, worker: str) -> Dict[str, Any]:
+        imports = self.imports.records if self.imports else {}
+        return {
+            "worker": worker,
+            "milestones": self.milestones,
+            "imports": imports,
+            "fixtures": self.fixtures,
+        }
+
+    def write(self, worker: str) -> Path:
+        REPORT_DIR.mkdir(parents=True, exist_ok=True)
+        out = REPORT_DIR / f"{worker}.json"
+        out.write_text(json.dumps(self.to_dict(worker), indent=2), encoding="utf-8")
+        return out
+
+
+_profile: Optional[StartupProfile] = None
+
+
+def is_requested(argv: Optional[List[str]] = None) -> bool:
+    argv = sys.argv if argv is None else argv
+    if os.getenv(ENV_FLAG, "").lower() in ("1", "true", "yes"):
+        return True
+    return CLI_FLAG in argv or CLI_FLAG in os.getenv("PYTEST_ADDOPTS", "")
+
+
+def maybe_start_import_timer(argv: Optional[List[str]] = None) -> Optional[StartupProfile]:
+    """Call as early as possible (top of conftest). No-op unless profiling was requested."""
+    global _profile
+    if _profile is None and is_requested(argv):
+        _profile = StartupProfile()
+        _profile.imports = ImportTimer().install()
+        os.environ[ENV_FLAG] = "1"  # xdist workers inherit this and profile themselves
+    return _profile
+
+
+def get_profile() -> Optional[StartupProfile]:
+    return _profile
+
+
+# ---------- summary (controller) ----------
+
+def load_reports(report_dir: Path = REPORT_DIR) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for fp in sorted(report_dir.glob("*.json")):
+        try:
+            out.append(json.loads(fp.read_text(encoding="utf-8")))
+        except Exception:
+            continue
+    return out
+
+
+def summarize(reports: List[Dict[str, Any]], top: int = 15) -> List[str]:
+    """Text lines for the terminal summary: milestones per process, slowest imports/fixtures."""
+    lines: List[str] = []
+    if not reports:
+        return lines
+
+    lines.append("milestones (s since conftest import):")
+    for r in reports:
+        ms = ", ".join(f"{k}={v:.2f}" for k, v in sorted(r.get("milestones", {}).items(), key=lambda kv: kv[1]))
+        lines.append(f"  {r.get('worker', '?'):>8}: {ms}")
+
+    imports: Dict[str, List[float]] = {}
+    for r in reports:
+        for mod, rec in r.get("imports", {}).items():
+            imports.setdefault(mod, []).append(rec.get("self_s", 0.0))
+    if imports:
+        lines.append(f"slowest imports (self time, mean over {len(reports)} process(es)):")
+        ranked = sorted(imports.items(), key=lambda kv: sum(kv[1]) / len(kv[1]), reverse=True)[:top]
+        for mod, vals in ranked:
+            lines.append(f"  {sum(vals) / len(vals) * 1000:9.1f} ms  {mod}")
+
+    fixtures: Dict[str, Dict[str, float]] = {}
+    for r in reports:
+        for key, rec in r.get("fixtures", {}).items():
+            agg = fixtures.setdefault(key, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            agg["count"] += rec.get("count", 0)
+            agg["total_s"] += rec.get("total_s", 0.0)
+            agg["max_s"] = max(agg["max_s"], rec.get("max_s", 0.0))
+    if fixtures:
+        lines.append("slowest fixture setup (total over all processes):")
+        ranked_f = sorted(fixtures.items(), key=lambda kv: kv[1]["total_s"], reverse=True)[:top]
+        for key, rec in ranked_f:
+            lines.append(
+                f"  {rec['total_s'] * 1000:9.1f} ms  x{int(rec['count']):<4} max {rec['max_s'] * 1000:7.1f} ms  {key}"
+            )
+    return lines
@@ -0,0 +1,454 @@
+# src/utils/step_index.py
+# Static index of BDD step definitions vs. the step lines in our .feature files.
+#
+# Used by scripts/check_duplicates.py (pre-push) and by conftest's
+# --check-steps collection hook. Nothing here imports the step modules:
+# definitions are read with `ast`, features with pytest-bdd's parser through
+# bdd_cache.FeatureCache, and both are cached per file (mtime_ns + size), so
+# a re-run only re-reads the files that changed.
+#
+# Findings:
+#   duplicates  - same type + pattern defined twice (the old check)
+#   ambiguous   - a feature step matched by more than one definition
+#   overlaps    - parse/string patterns that can match each other's text
+#                 (caught even before a feature uses them)
+#   unused      - definitions no feature step matches
+#   unmatched   - feature steps with no definition of the right type
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.utils import fileio
+from src.utils.bdd_cache import FeatureCache, is_valid_feature, literal_prefix
+
+INDEX_VERSION = 1
+STEP_DECORATORS = {"given", "when", "then", "step"}
+PARSER_KINDS = {"parse", "cfparse", "re", "string"}
+
+
+@dataclass(frozen=True)
+class StepDef:
+    type: Optional[str]  # given/when/then; None for @step (matches any type)
+    kind: str            # string | parse | cfparse | re
+    pattern: str
+    file: str
+    line: int
+    func: str
+
+    @property
+    def where(self) -> str:
+        return f"{self.file}:{self.line} in {self.func}()"
+
+    @property
+    def label(self) -> str:
+        return f"{(self.type or 'step').upper()} {self.kind}:'{self.pattern}'"
+
+
+@dataclass(frozen=True)
+class FeatureStep:
+    type: str
+    text: str
+    file: str
+    line: int
+    scenario: str
+
+
+@lru_cache(maxsize=None)
+def _is_matching(kind: str, pattern: str):
+    """Same semantics as pytest_bdd.parsers.<kind>(pattern).is_matching, without importing pytest."""
+    if kind == "string":
+        return lambda text: text == pattern
+    if kind == "re":
+        rx = re.compile(pattern)
+        return lambda text: rx.fullmatch(text) is not None
+    if kind == "cfparse":
+        from parse_type import cfparse
+        parser = cfparse.Parser(pattern)
+    else:
+        import parse
+        parser = parse.compile(pattern)
+
+    def _match(text: str) -> bool:
+        try:
+            return bool(parser.parse(text))
+        except ValueError:
+            return False
+
+    return _match
+
+
+def matches(d: StepDef, step_type: str, text: str) -> bool:
+    if d.type is not None and d.type != step_type:
+        return False
+    try:
+        return _is_matching(d.kind, d.pattern)(text)
+    except Exception:
+        return False
+
+
+# ---------- step definitions (ast) ----------
+
+def _decorator_name(func: ast.expr) -> Optional[str]:
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):  # pytest_bdd.given(...)
+        return func.attr
+    return None
+
+
+def _pattern_of(arg: ast.expr) -> Optional[Tuple[str, str]]:
+    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+        return "string", arg.value
+    if isinstance(arg, ast.Call):
+        kind = _decorator_name(arg.func)
+        if kind in PARSER_KINDS and arg.args:
+            inner = arg.args[0]
+            if isinstance(inner, ast.Constant) and isinstance(inner.value, str):
+                return kind, inner.value
+    return None
+
+
+def extract_step_defs(path: Path, rel: str) -> List[StepDef]:
+    """All @given/@when/@then/@step definitions in one file (patterns we cannot read statically are skipped)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    out: List[StepDef] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for dec in node.decorator_list:
+            if not isinstance(dec, ast.Call) or not dec.args:
+                continue
+            name = _decorator_name(dec.func)
+            if name not in STEP_DECORATORS:
+                continue
+            found = _pattern_of(dec.args[0])
+            if found is None:
+                continue
+            kind, pattern = found
+            out.append(StepDef(
+                type=None if name == "step" else name,
+                kind=kind, pattern=pattern, file=rel, line=node.lineno, func=node.name,
+            ))
+    return out
+
+
+# ---------- cached index ----------
+
+class StepIndexCache:
+    """
+    JSON cache keyed by rel path -> {mtime_ns, size, steps}:
+      files    - step definitions from the ast pass
+      features - flattened feature steps (outlines rendered)
+    A warm run reads one small JSON file and never imports pytest/pytest-bdd.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.features: Dict[str, Dict[str, Any]] = {}
+        self.parsed = 0
+        self.reused = 0
+        self.errors: List[str] = []   # step files that could not be read (skipped, not cached)
+        self._dirty = False
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == INDEX_VERSION:
+                    self.files = data.get("files", {})
+                    self.features = data.get("features", {})
+            except Exception:
+                self.files, self.features = {}, {}
+
+    def step_defs(self, steps_dir: Path, root: Path) -> List[StepDef]:
+        defs: List[StepDef] = []
+        seen = set()
+        for py in sorted(steps_dir.rglob("*_steps.py")):
+            rel = py.relative_to(root).as_posix()
+            seen.add(rel)
+            try:
+                st = py.stat()
+                entry = self.files.get(rel)
+                if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                    self.reused += 1
+                    defs.extend(StepDef(**s) for s in entry["steps"])
+                    continue
+                self.parsed += 1
+                found = extract_step_defs(py, rel)
+            except (SyntaxError, OSError, ValueError) as e:   # ValueError: undecodable source
+                print(f"[bdd] ⚠️ could not parse {rel}: {e}")
+                self.errors.append(f"{rel}: {e}")
+                if self.files.pop(rel, None) is not None:
+                    self._dirty = True
+                continue
+            self.files[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "steps": [asdict(d) for d in found]}
+            self._dirty = True
+            defs.extend(found)
+        for gone in set(self.files) - seen:
+            del self.files[gone]
+            self._dirty = True
+        return defs
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        fileio.atomic_write_json(self.path, {"version": INDEX_VERSION, "files": self.files, "features": self.features})
+        self._dirty = False
+
+
+# ---------- feature steps ----------
+
+def scenario_steps(template, example: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str, int]]:
+    """(type, text, line) for a rendered scenario (background included)."""
+    scenario = template.render(example or {})
+    return [(s.type, s.name, s.line_number) for s in scenario.steps]
+
+
+def _parse_feature_steps(path: Path, rel: str, feature_cache: FeatureCache) -> List[FeatureStep]:
+    from pytest_bdd import feature as bdd_feature
+
+    if not feature_cache.is_valid(path, is_valid_feature):
+        return []
+    feature = bdd_feature.features[os.path.abspath(str(path))]
+    out: List[FeatureStep] = []
+    for template in feature.scenarios.values():
+        contexts = [c for ex in template.examples for c in ex.as_contexts()] or [{}]
+        seen = set()
+        for ctx in contexts:
+            for step_type, text, line in scenario_steps(template, ctx):
+                if (step_type, text, line) not in seen:
+                    seen.add((step_type, text, line))
+                    out.append(FeatureStep(step_type, text, rel, line, template.name))
+    return out
+
+
+def feature_steps(
+    features_dir: Path,
+    root: Path,
+    index: Optional[StepIndexCache] = None,
+    cache_dir: Optional[Path] = None,
+) -> List[FeatureStep]:
+    """Every concrete step line: outlines are rendered once per Examples row."""
+    index = index or StepIndexCache(None)
+    feature_cache: Optional[FeatureCache] = None  # only built (and pytest-bdd imported) on a miss
+    out: List[FeatureStep] = []
+    seen = set()
+    for path in sorted(features_dir.rglob("*.feature")):
+        rel = path.relative_to(root).as_posix()
+        seen.add(rel)
+        st = path.stat()
+        entry = index.features.get(rel)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            out.extend(FeatureStep(**s) for s in entry["steps"])
+            continue
+        if feature_cache is None:
+            feature_cache = FeatureCache(cache_dir)
+        try:
+            found = _parse_feature_steps(path, rel, feature_cache)
+        except Exception as e:
+            print(f"[bdd] ⚠️ could not parse {rel}: {e}")
+            continue
+        index.features[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "steps": [asdict(f) for f in found]}
+        index._dirty = True
+        out.extend(found)
+    for gone in set(index.features) - seen:
+        del index.features[gone]
+        index._dirty = True
+    if feature_cache is not None:
+        feature_cache.save()
+    return out
+
+
+# ---------- matching + analysis ----------
+
+class Matcher:
+    """First-word buckets so each feature line only runs the parsers that could match."""
+
+    def __init__(self, defs: Iterable[StepDef]):
+        self.defs = list(defs)
+        self._exact: Dict[str, List[StepDef]] = {}
+        self._by_word: Dict[str, List[StepDef]] = {}
+        self._any: List[StepDef] = []
+        for d in self.defs:
+            how, key = literal_prefix(d.kind, d.pattern)
+            if how == "exact":
+                self._exact.setdefault(key, []).append(d)
+            elif how == "word" and key:
+                self._by_word.setdefault(key, []).append(d)
+            else:
+                self._any.append(d)
+
+    def match(self, step_type: str, text: str) -> List[StepDef]:
+        pool = self._exact.get(text, []) + self._by_word.get(text.split(" ", 1)[0].lower(), []) + self._any
+        return [d for d in pool if matches(d, step_type, text)]
+
+    def match_any_type(self, text: str) -> List[StepDef]:
+        pool = self._exact.get(text, []) + self._by_word.get(text.split(" ", 1)[0].lower(), []) + self._any
+        return [d for d in pool if matches(d, d.type or "given", text)]
+
+
+_SAMPLES = {"d": "7", "n": "7", "g": "1.5", "f": "1.5", "e": "1.5", "w": "word", "l": "word", "S": "text"}
+_FIELD = re.compile(r"\{(?!\{)([^{}]*)\}")
+
+
+def sample_text(d: StepDef) -> Optional[str]:
+    """A string the definition accepts, for static overlap checks (re patterns: None)."""
+    if d.kind == "string":
+        return d.pattern
+    if d.kind not in ("parse", "cfparse"):
+        return None
+
+    def fill(m: re.Match) -> str:
+        spec = m.group(1).split(":", 1)
+        fmt = spec[1] if len(spec) > 1 else ""
+        return _SAMPLES.get(fmt[-1:] if fmt else "", "sample")
+
+    return _FIELD.sub(fill, d.pattern).replace("{{", "{").replace("}}", "}")
+
+
+@dataclass
+class StepReport:
+    definitions: int = 0
+    feature_steps: int = 0
+    duplicates: List[Tuple[StepDef, StepDef]] = field(default_factory=list)
+    ambiguous: List[Tuple[FeatureStep, List[StepDef]]] = field(default_factory=list)
+    overlaps: List[Tuple[StepDef, StepDef]] = field(default_factory=list)
+    unused: List[StepDef] = field(default_factory=list)
+    unmatched: List[Tuple[FeatureStep, List[StepDef]]] = field(default_factory=list)  # + wrong-type candidates
+
+
+def analyse(defs: List[StepDef], steps: List[FeatureStep]) -> StepReport:
+    report = StepReport(definitions=len(defs), feature_steps=len(steps))
+    matcher = Matcher(defs)
+
+    first: Dict[Tuple[Optional[str], str, str], StepDef] = {}
+    for d in defs:
+        key = (d.type, d.kind, d.pattern)
+        if key in first:
+            report.duplicates.append((first[key], d))
+        else:
+            first[key] = d
+
+    used = set()
+    memo: Dict[Tuple[str, str], List[StepDef]] = {}
+    reported = set()
+    for fs in steps:
+        key = (fs.type, fs.text)
+        hits = memo.get(key)
+        if hits is None:
+            hits = memo[key] = matcher.match(fs.type, fs.text)
+        used.update(hits)
+        where = (fs.file, fs.line, fs.type, fs.text)  # background steps repeat per scenario
+        if where in reported:
+            continue
+        reported.add(where)
+        if not hits:
+            report.unmatched.append((fs, matcher.match_any_type(fs.text)))
+        elif len({(h.kind, h.pattern, h.type) for h in hits}) > 1:
+            report.ambiguous.append((fs, hits))
+
+    dup_pairs = {(a, b) for a, b in report.duplicates}
+    seen_pairs = set()
+    for d in defs:
+        text = sample_text(d)
+        if text is None:
+            continue
+        for other in matcher.match(d.type or "given", text):
+            if other is d or (d, other) in dup_pairs or (other, d) in dup_pairs:
+                continue
+            if (other.kind, other.pattern, other.type) == (d.kind, d.pattern, d.type):
+                continue
+            pair = tuple(sorted((d, other), key=lambda x: (x.file, x.line)))
+            if pair not in seen_pairs:
+                seen_pairs.add(pair)
+                report.overlaps.append(pair)
+
+    report.unused = [d for d in defs if d not in used]
+    return report
+
+
+def build_report(root: Path, cache_dir: Optional[Path] = None) -> Tuple[StepReport, StepIndexCache]:
+    cache = StepIndexCache(Path(cache_dir) / "step_index.json" if cache_dir else None)
+    defs = cache.step_defs(root / "step_definitions", root)
+    steps = feature_steps(root / "features", root, cache, cache_dir)
+    cache.save()
+    return analyse(defs, steps), cache
+
+
+# ---------- collection-time check (conftest --check-steps) ----------
+
+def _item_steps(items: Iterable):
+    """(item, [(type, text, line), ...]) for the pytest-bdd scenarios among items."""
+    try:
+        from pytest_bdd.scenario import scenario_wrapper_template_registry
+    except Exception:
+        return
+    for item in items:
+        obj = getattr(item, "obj", None)
+        if obj is None:
+            continue
+        try:
+            template = scenario_wrapper_template_registry.get(obj)
+        except TypeError:
+            continue
+        if template is None:
+            continue
+        callspec = getattr(item, "callspec", None)
+        example = callspec.params.get("_pytest_bdd_example", {}) if callspec else {}
+        yield item, scenario_steps(template, example)
+
+
+def _matcher(root: Path, cache_dir: Optional[Path]) -> Matcher:
+    cache = StepIndexCache(Path(cache_dir) / "step_index.json" if cache_dir else None)
+    matcher = Matcher(cache.step_defs(root / "step_definitions", root))
+    cache.save()
+    return matcher
+
+
+def unmatched_for_items(items: Iterable, root: Path, cache_dir: Optional[Path] = None) -> Dict[str, List[str]]:
+    """
+    {nodeid: ["GIVEN some text (line 8; defined as THEN ...)", ...]} for selected
+    pytest-bdd items whose rendered steps have no definition. Runs before any
+    fixture is set up, so these fail fast instead of after browser/API setup.
+    """
+    matcher = None
+    out: Dict[str, List[str]] = {}
+    memo: Dict[Tuple[str, str], bool] = {}
+    for item, steps in _item_steps(items):
+        matcher = matcher or _matcher(root, cache_dir)
+        missing: List[str] = []
+        for step_type, text, line in steps:
+            key = (step_type, text)
+            if key not in memo:
+                memo[key] = bool(matcher.match(step_type, text))
+            if not memo[key]:
+                other = matcher.match_any_type(text)
+                hint = f"; defined as {', '.join(d.label for d in other)}" if other else ""
+                missing.append(f"{step_type.upper()} {text} (line {line}{hint})")
+        if missing:
+            out[item.nodeid] = missing
+    return out
+
+
+def step_files_for_items(items: Iterable, root: Path, cache_dir: Optional[Path] = None) -> Dict[str, Set[str]]:
+    """{nodeid: {step definition files its steps match}} for pytest-bdd items (test impact analysis)."""
+    matcher = None
+    out: Dict[str, Set[str]] = {}
+    memo: Dict[Tuple[str, str], Set[str]] = {}
+    for item, steps in _item_steps(items):
+        matcher = matcher or _matcher(root, cache_dir)
+        files: Set[str] = set()
+        for step_type, text, _ in steps:
+            key = (step_type, text)
+            if key not in memo:
+                memo[key] = {d.file for d in matcher.match(step_type, text)}
+            files |= memo[key]
+        out[item.nodeid] = files
+    return out
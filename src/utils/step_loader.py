@@ -0,0 +1,124 @@
+# src/utils/step_loader.py
+# Deferred, selection-aware registration of the step_definitions/* plugins.
+#
+# Registering every *_steps.py through `pytest_plugins` imports the whole
+# UI/mobile stack (Appium, Selenium, page objects, Faker...) even for
+# `pytest -m api` or `pytest --collect-only`. Instead conftest calls
+# `register_for_items()` once collection and deselection are done, and only
+# the step packages the selected scenarios can use get imported.
+#
+# Step lookup in pytest-bdd happens at run time (fixture lookup on the
+# session), so plugins registered after collection are still found.
+# Step modules must not define autouse fixtures or hooks (they would be
+# registered too late to apply) - keep those in conftest.py.
+#
+# BDD_EAGER_STEPS=1 restores the old behaviour (everything at import).
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+EAGER_ENV = "BDD_EAGER_STEPS"
+
+# Step packages every scenario may use
+ALWAYS = ("shared", "environments_specific")
+
+# features/<top>/... (or the scenario's marker) -> step packages it needs.
+# None means "load everything" (mixed journeys drive API + UI together).
+STACK_PACKAGES: Dict[str, Optional[tuple]] = {
+    "api": ("api",),
+    "ui": ("ui",),
+    "mobile": ("mobile",),
+    "mixed": None,
+    "e2e": None,
+}
+
+
+def discover(steps_dir: Path, root: Path) -> Dict[str, List[str]]:
+    """{package: [dotted module names]} for every *_steps.py under steps_dir."""
+    out: Dict[str, List[str]] = {}
+    if not steps_dir.is_dir():
+        return out
+    for py in sorted(steps_dir.rglob("*_steps.py")):
+        rel = py.relative_to(root).with_suffix("")
+        package = rel.parts[1] if len(rel.parts) > 2 else ""
+        out.setdefault(package, []).append(".".join(rel.parts))  # e.g. step_definitions.api.auth_api_steps
+    return out
+
+
+def eager_requested() -> bool:
+    return os.getenv(EAGER_ENV, "").lower() in ("1", "true", "yes")
+
+
+def _feature_stack(item) -> Optional[str]:
+    """Top-level features/ folder of a pytest-bdd item, from its scenario template."""
+    try:
+        from pytest_bdd.scenario import scenario_wrapper_template_registry
+    except Exception:
+        return None
+    try:
+        template = scenario_wrapper_template_registry.get(getattr(item, "obj", None))
+    except TypeError:  # weak-keyed registry; item.obj may be None or not weakref-able
+        return None
+    if template is None:
+        return None
+    # feature.rel_filename is relative to the feature's own folder, so use the
+    # absolute path: .../features/<stack>/...
+    parts = Path(template.feature.filename).parts
+    if "features" not in parts:
+        return None
+    idx = len(parts) - 1 - parts[::-1].index("features")
+    return parts[idx + 1] if len(parts) > idx + 2 else None
+
+
+def _is_bdd_item(item) -> bool:
+    return "_pytest_bdd_example" in getattr(item, "fixturenames", ())
+
+
+def packages_for_items(items: Iterable, available: Iterable[str]) -> Set[str]:
+    """
+    Step packages the selected items need. Anything we cannot classify
+    (unknown folder, untagged scenario) falls back to all packages.
+    """
+    available = set(available)
+    needed: Set[str] = set()
+    for item in items:
+        if not _is_bdd_item(item):
+            continue
+        needed.update(p for p in ALWAYS if p in available)
+        stack = _feature_stack(item)
+        if stack not in STACK_PACKAGES:
+            marks = {m.name for m in item.iter_markers()}
+            stack = next((s for s in ("mixed", "e2e", "mobile", "ui", "api") if s in marks), None)
+        packages = STACK_PACKAGES.get(stack) if stack else None
+        if packages is None:
+            return available
+        needed.update(p for p in packages if p in available)
+    return needed
+
+
+# module -> "SyntaxError: ..." for step modules that failed to import (their scenarios fail with it)
+IMPORT_ERRORS: Dict[str, str] = {}
+
+
+def register(config, modules: Iterable[str]) -> List[str]:
+    """Import + register step modules as plugins (already registered ones are skipped)."""
+    loaded = []
+    for mod in modules:
+        if config.pluginmanager.get_plugin(mod) is None and mod not in IMPORT_ERRORS:
+            print(f"[bdd] registering step plugin: {mod}")
+            try:
+                config.pluginmanager.import_plugin(mod)
+            except Exception as e:      # runs inside a hook: an exception here would be an INTERNALERROR
+                IMPORT_ERRORS[mod] = f"{type(e).__name__}: {e}"
+                print(f"[bdd] ❌ could not import step plugin {mod}: {IMPORT_ERRORS[mod]}")
+                continue
+            loaded.append(mod)
+    return loaded
+
+
+def register_for_items(config, items: Iterable, discovered: Dict[str, List[str]]) -> List[str]:
+    packages = packages_for_items(items, discovered)
+    return register(config, [m for p in sorted(packages) for m in discovered[p]])
@@ -0,0 +1,225 @@
+# src/utils/ui/asset_cache.py
+# --asset-cache / --block-third-party: cut the network work of UI tests.
+#
+# --asset-cache routes static resources (scripts, styles, fonts, images, by
+# extension) through an on-disk cache shared by all workers and runs:
+#   <ASSET_CACHE_DIR or .asset-cache>/<sha1(url)>.json          current version
+#                                     <sha1(url)>-<sha1(etag)>.body
+#   - fresh (Cache-Control immutable, or max-age not elapsed): served from disk;
+#   - stale but with an ETag / Last-Modified: revalidated with If-None-Match /
+#     If-Modified-Since; a 304 serves the body from disk;
+#   - otherwise fetched, served and stored if cacheable (200, no no-store,
+#     an expiry or a validator, under MAX_BODY).
+# Writes go through fileio.atomic_write (temp file + os.replace), so workers
+# can share the directory.
+#
+# --block-third-party aborts requests to analytics/ads/session-replay domains
+# (DEFAULT_BLOCKED plus the comma-separated UI_BLOCK_DOMAINS).
+#
+# Both are context.route() handlers with a regex URL matcher: Playwright
+# matches it in the driver, so other requests never reach Python. Note that
+# Playwright turns the browser's own HTTP cache off once a context has routes.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from src.utils import fileio
+
+DIR_ENV = "ASSET_CACHE_DIR"
+DEFAULT_DIR = Path(".asset-cache")
+BLOCK_ENV = "UI_BLOCK_DOMAINS"
+MAX_BODY = 20 * 1024 * 1024
+MAX_IMMUTABLE_AGE_S = 7 * 24 * 3600
+
+STATIC_RE = re.compile(
+    r"^https?://[^?#]+\.(?:js|mjs|css|woff2?|ttf|otf|eot|png|jpe?g|gif|svg|webp|avif|ico|map)(?:[?#].*)?$",
+    re.IGNORECASE,
+)
+DEFAULT_BLOCKED = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "facebook.net", "connect.facebook.net", "hotjar.com", "segment.io", "segment.com",
+    "mixpanel.com", "amplitude.com", "fullstory.com", "clarity.ms", "intercom.io", "optimizely.com",
+    "adsrvr.org", "criteo.com", "taboola.com", "outbrain.com", "newrelic.com", "nr-data.net",
+)
+# Not replayed: fetch() hands the body over decoded, and cookies belong to the test that got them
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive", "set-cookie"}
+
+
+def blocked_pattern(domains: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    """Regex matching http(s) URLs on any of the domains or their subdomains."""
+    domains = sorted({d.strip().lower().lstrip(".") for d in domains if d.strip()})
+    if not domains:
+        return None
+    alternatives = "|".join(re.escape(d) for d in domains)
+    return re.compile(rf"^https?://(?:[^/?#@]*\.)?(?:{alternatives})(?::\d+)?(?:[/?#]|$)", re.IGNORECASE)
+
+
+def block_list() -> list:
+    """DEFAULT_BLOCKED plus UI_BLOCK_DOMAINS."""
+    return list(DEFAULT_BLOCKED) + [d for d in os.getenv(BLOCK_ENV, "").split(",") if d.strip()]
+
+
+def _cache_control(headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+    out: Dict[str, Optional[str]] = {}
+    for part in (headers.get("cache-control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            out[name.lower()] = value.strip('"') or None
+    return out
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class AssetCache:
+    """
+    cache = AssetCache(block=DEFAULT_BLOCKED)      # store=False: only block
+    cache.install(context)                         # per context (routes go with unroute_all)
+    cache.summary()
+    """
+
+    def __init__(self, root: Optional[Path] = None, store: bool = True, block: Iterable[str] = (), clock=time.time):
+        self.dir = Path(root or os.getenv(DIR_ENV) or DEFAULT_DIR)
+        self.store = store
+        self.block_re = blocked_pattern(block)
+        self._clock = clock
+        self.stats: Dict[str, int] = {"hits": 0, "revalidated": 0, "fetched": 0, "stored": 0, "bytes_served": 0, "blocked": 0}
+
+    def install(self, context) -> None:
+        if self.store:
+            context.route(STATIC_RE, self._handle)
+        if self.block_re is not None:
+            context.route(self.block_re, self._block)   # added last, so it runs first
+
+    # ---------- disk ----------
+
+    def _meta_path(self, url: str) -> Path:
+        return self.dir / f"{_sha(url)}.json"
+
+    def _body_path(self, url: str, validator: str) -> Path:
+        return self.dir / f"{_sha(url)}-{_sha(validator)[:16]}.body"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        fileio.atomic_write(path, data)
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(self._meta_path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def _body(self, entry: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            return self._body_path(entry["url"], entry["validator"]).read_bytes()
+        except OSError:
+            return None
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        return self._clock() < entry["stored_at"] + entry["max_age"]
+
+    def _expiry(self, headers: Dict[str, str]) -> Optional[int]:
+        """Seconds the response may be served without revalidation; None when it must not be stored."""
+        cc = _cache_control(headers)
+        if "no-store" in cc:
+            return None
+        if "immutable" in cc:
+            return MAX_IMMUTABLE_AGE_S
+        if "no-cache" in cc:
+            return 0
+        try:
+            return max(0, min(int(cc.get("max-age") or 0), MAX_IMMUTABLE_AGE_S))
+        except ValueError:
+            return 0
+
+    def save(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> bool:
+        max_age = self._expiry(headers)
+        validator = headers.get("etag") or headers.get("last-modified") or ""
+        if status != 200 or max_age is None or (not max_age and not validator) or len(body) > MAX_BODY:
+            return False
+        validator = validator or f"t{int(self._clock())}"
+        old = self.lookup(url)
+        self._write(self._body_path(url, validator), body)
+        entry = {
+            "url": url, "status": status, "validator": validator,
+            "etag": headers.get("etag"), "last_modified": headers.get("last-modified"),
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+            "stored_at": self._clock(), "max_age": max_age,
+        }
+        self._write(self._meta_path(url), json.dumps(entry).encode("utf-8"))
+        if old and old.get("validator") != validator:
+            try:
+                self._body_path(url, old["validator"]).unlink()
+            except (OSError, KeyError):
+                pass
+        return True
+
+    # ---------- route handlers ----------
+
+    def _block(self, route) -> None:
+        self.stats["blocked"] += 1
+        route.abort("blockedbyclient")
+
+    def _serve(self, route, entry: Dict[str, Any], body: bytes) -> None:
+        self.stats["bytes_served"] += len(body)
+        route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+
+    def _handle(self, route) -> None:
+        request = route.request
+        if request.method != "GET":
+            route.fallback()
+            return
+        url = request.url
+        entry = self.lookup(url)
+        body = self._body(entry) if entry else None
+        if entry and body is not None and self._fresh(entry):
+            self.stats["hits"] += 1
+            self._serve(route, entry, body)
+            return
+
+        conditional: Dict[str, str] = {}
+        if body is not None:
+            if entry.get("etag"):
+                conditional["if-none-match"] = entry["etag"]
+            if entry.get("last_modified"):
+                conditional["if-modified-since"] = entry["last_modified"]
+        try:
+            response = route.fetch(headers=dict(request.headers, **conditional)) if conditional else route.fetch()
+        except Exception:
+            route.fallback()      # let the browser try (and report) it
+            return
+        if response.status == 304 and body is not None:
+            self.stats["revalidated"] += 1
+            entry["stored_at"] = self._clock()
+            refreshed = self._expiry(response.headers)
+            if refreshed is not None:
+                entry["max_age"] = refreshed
+            self._write(self._meta_path(url), json.dumps(entry).encode("utf-8"))
+            self._serve(route, entry, body)
+            return
+        self.stats["fetched"] += 1
+        fetched = response.body()
+        if self.save(url, response.status, response.headers, fetched):
+            self.stats["stored"] += 1
+        route.fulfill(status=response.status, body=fetched,
+                      headers={k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS})
+
+    def summary(self) -> str:
+        s = self.stats
+        parts = []
+        if self.store:
+            parts.append(f"{s['hits']} hit(s) + {s['revalidated']} revalidated (304), "
+                         f"{s['bytes_served'] / 1024 / 1024:.1f} MB served from disk; "
+                         f"{s['fetched']} fetched ({s['stored']} stored)")
+        if self.block_re is not None:
+            parts.append(f"{s['blocked']} third-party request(s) blocked")
+        return "[asset-cache] " + "; ".join(parts)
+
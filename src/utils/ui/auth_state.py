@@ -0,0 +1,193 @@
+# src/utils/ui/auth_state.py
+# Logged-in browser state per role, so UI tests don't go through the login form.
+#
+#   @pytest.mark.auth_role("admin")          # or @auth_role:admin on a scenario/feature
+#   def test_admin_dashboard(page): ...      # page starts logged in as admin
+#
+# The first test needing a role logs in through LoginPage (credentials from
+# settings.get_test_user(role)), saves the context's storage_state (cookies +
+# localStorage) to <AUTH_STATE_DIR or .auth>/<env>/<role>.json and hands it to
+# `context` as storage_state. Later tests reuse it:
+#   - per worker, from memory;
+#   - per run, through the shared KVStore: the first worker claims the login,
+#     the others wait for its file instead of logging in too;
+#   - across runs, from the file, while it is still valid.
+#
+# A saved state is valid until the earliest of: AUTH_STATE_TTL seconds (default
+# 1800), the expiry of its cookies, and the `exp` of any JWT found in its
+# localStorage - minus a minute, so a token does not expire mid-test. After that
+# the next test logs in again. invalidate(role) forces it (e.g. when the app
+# rejects the session early).
+#
+# Playwright's storage_state has no sessionStorage: apps keeping their session
+# there still need the form login. The files hold live session tokens - .auth/
+# is git-ignored.
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src.utils import fileio
+
+DIR_ENV = "AUTH_STATE_DIR"
+DEFAULT_DIR = Path(".auth")
+TTL_ENV = "AUTH_STATE_TTL"
+DEFAULT_TTL_S = 1800.0
+REFRESH_MARGIN_S = 60.0       # re-login this long before the state expires
+LOGIN_WAIT_S = 120.0          # how long other workers wait for the claiming worker's login
+POLL_S = 0.25
+TAG_PREFIX = "auth_role:"     # feature tag -> @pytest.mark.auth_role("<role>")
+
+_JWT = re.compile(r"eyJ[\w-]+\.(eyJ[\w-]+)\.[\w-]*")
+_LOGIN_SKIPS = ("storage_state", "record_har_path", "record_video_dir")
+
+
+def _jwt_exp(value: str) -> Optional[float]:
+    m = _JWT.search(value or "")
+    if not m:
+        return None
+    payload = m.group(1)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def expires_at(state: Dict[str, Any], now: float, ttl_s: float = DEFAULT_TTL_S) -> float:
+    """The earliest of now + ttl_s, the cookies' expiry and any JWT exp in localStorage."""
+    found = [float(c["expires"]) for c in state.get("cookies", []) if (c.get("expires") or -1) > 0]
+    for origin in state.get("origins", []):
+        for item in origin.get("localStorage", []):
+            exp = _jwt_exp(item.get("value", ""))
+            if exp is not None:
+                found.append(exp)
+    # Cookies that were already (nearly) expired at login are not what keeps the session
+    # alive; counting them would make every test log in again
+    return min([now + ttl_s] + [exp for exp in found if exp > now + 2 * REFRESH_MARGIN_S])
+
+
+def _safe(role: str) -> str:
+    return re.sub(r"[^\w.-]", "_", role)
+
+
+class AuthStateCache:
+    """
+    cache = AuthStateCache("dev", login=lambda role: <storage_state dict>, store=testdata_store, worker="gw0")
+    cache.get("admin")          # storage_state for new_context(storage_state=...)
+    cache.invalidate("admin")   # next get() logs in again
+    """
+
+    def __init__(self, env: str, login: Callable[[str], Dict[str, Any]], store=None, root: Optional[Path] = None,
+                 ttl_s: Optional[float] = None, worker: str = "master", clock=time.time, sleep=time.sleep):
+        self.env = env
+        self.dir = Path(root or os.getenv(DIR_ENV) or DEFAULT_DIR) / env
+        self.login = login
+        self.store = store
+        self.ttl_s = float(ttl_s if ttl_s is not None else os.getenv(TTL_ENV, DEFAULT_TTL_S))
+        self.worker = worker
+        self._clock = clock
+        self._sleep = sleep
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, Any] = {"logins": 0, "login_s": 0.0, "from_disk": 0, "reused": 0, "waited_s": 0.0}
+
+    def path(self, role: str) -> Path:
+        return self.dir / f"{_safe(role)}.json"
+
+    def _fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        return entry is not None and self._clock() < entry["expires_at"] - REFRESH_MARGIN_S
+
+    def _read(self, role: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self.path(role).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[auth-state] ignoring unreadable {self.path(role)}: {e}")
+            return None
+
+    def get(self, role: str) -> Dict[str, Any]:
+        entry = self._states.get(role)
+        if self._fresh(entry):
+            self.stats["reused"] += 1
+            return entry["storage_state"]
+        entry = self._read(role)
+        if self._fresh(entry):
+            self.stats["from_disk"] += 1
+        else:
+            entry = self._login_once(role)
+        self._states[role] = entry
+        return entry["storage_state"]
+
+    def invalidate(self, role: str) -> None:
+        self._states.pop(role, None)
+        try:
+            self.path(role).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _login_once(self, role: str) -> Dict[str, Any]:
+        if self.store is None:
+            return self._login(role)
+        key = f"auth_login:{self.env}:{role}"
+        started = self._clock()
+        while True:
+            now = self._clock()
+
+            def _claim(cur):
+                if cur and cur.get("owner") != self.worker and cur.get("until", 0) > now:
+                    return cur      # another worker is logging in
+                return {"owner": self.worker, "until": now + LOGIN_WAIT_S}
+
+            if self.store.update(key, _claim)["owner"] == self.worker:
+                try:
+                    entry = self._read(role)    # the previous owner may have finished since get() looked
+                    return entry if self._fresh(entry) else self._login(role)
+                finally:
+                    self.store.delete(key)
+            self._sleep(POLL_S)
+            entry = self._read(role)
+            if self._fresh(entry):
+                self.stats["waited_s"] += self._clock() - started
+                return entry
+
+    def _login(self, role: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        state = self.login(role)
+        now = self._clock()
+        entry = {"role": role, "saved_at": now, "expires_at": expires_at(state, now, self.ttl_s), "storage_state": state}
+        path = self.path(role)
+        fileio.atomic_write_json(path, entry)
+        elapsed = time.perf_counter() - started
+        self.stats["logins"] += 1
+        self.stats["login_s"] += elapsed
+        print(f"[auth-state] 🔑 logged in as '{role}' in {elapsed:.1f}s, reusable for "
+              f"{(entry['expires_at'] - now) / 60:.0f} min ({path})")
+        return entry
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"[auth-state] {s['logins']} login(s) ({s['login_s']:.1f}s), {s['reused'] + s['from_disk']} reuse(s) "
+                f"({s['from_disk']} from disk), {s['waited_s']:.1f}s waiting on other workers")
+
+
+def form_login(browser, context_args: Dict[str, Any], user: Dict[str, str], timeout_ms: float = 30_000) -> Dict[str, Any]:
+    """Log in through LoginPage in a throwaway context and return its storage_state."""
+    from src.pages.login_page import LoginPage
+
+    ctx = browser.new_context(**{k: v for k, v in context_args.items() if k not in _LOGIN_SKIPS})
+    try:
+        page = ctx.new_page()
+        login_page = LoginPage(page)
+        login_page.navigate()
+        login_page.login(user["username"], user["password"])
+        page.wait_for_url(lambda url: "/login" not in url, timeout=timeout_ms)
+        return ctx.storage_state()
+    finally:
+        ctx.close()
@@ -0,0 +1,333 @@
+# src/utils/ui/context_pool.py
+# --context-pool: reuse BrowserContexts across the tests of a worker instead of
+# creating and closing one per test.
+#
+# Between tests a context is reset, not closed:
+#   - every page is closed (sessionStorage goes with them);
+#   - cookies, granted permissions and routes (context.route, route_from_har)
+#     are cleared; offline, extra HTTP headers, geolocation and permissions are
+#     put back to what the context args say;
+#   - localStorage, IndexedDB, Cache Storage and service workers are wiped on
+#     every origin the test stored something on or had open. A blank page is
+#     routed onto each origin (no request leaves the browser) and clears it from
+#     there, then re-seeds the args' storage_state.
+# A context is recycled (closed and replaced) after --context-pool-max-uses
+# tests, after a failed test, and when a leak shows up: a page that will not
+# close, event listeners the test added (context.on handlers can't be removed
+# from outside), or cookies/storage that differ from a fresh context's after
+# the reset.
+#
+# Pre-warming: the replacement for a context about to be recycled is created
+# while the current test runs. The sync Playwright API is single-threaded, so
+# this is an asyncio task on Playwright's own loop, not a thread: it advances
+# whenever the test waits on Playwright (goto, clicks, expect), which is most of
+# a UI test. It relies on private sync-API internals (Browser.new_context
+# wrapping `self._sync(self._impl_obj.new_context(...))`), so it only runs on
+# the Playwright versions in PREWARM_VERIFIED; on others, or if the internals
+# fail anyway, contexts are created synchronously. Tasks still pending at
+# close() are awaited and their contexts closed, or cancelled.
+#
+# Contexts recording a HAR (record_har_path) are written on close, so they are
+# never pooled.
+
+from __future__ import annotations
+
+import json
+import time
+from importlib import metadata
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+NOT_POOLED_ARGS = ("record_har_path",)
+# Playwright major.minor versions whose sync internals pre-warming was checked against
+# (tests/test_context_pool.py runs the installed Browser.new_context wrapper)
+PREWARM_VERIFIED = {(1, 64)}
+
+_WIPE_JS = """async (seed) => {
+  try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+  try {
+    for (const db of (indexedDB.databases ? await indexedDB.databases() : [])) {
+      await new Promise(done => { const q = indexedDB.deleteDatabase(db.name); q.onsuccess = q.onerror = q.onblocked = done; });
+    }
+  } catch (e) {}
+  try { for (const r of await navigator.serviceWorker.getRegistrations()) await r.unregister(); } catch (e) {}
+  try { for (const k of await caches.keys()) await caches.delete(k); } catch (e) {}
+  for (const item of seed) localStorage.setItem(item.name, item.value);
+}"""
+_BLANK = {"status": 200, "content_type": "text/html", "body": "<html><head></head><body></body></html>"}
+
+
+@dataclass
+class _Entry:
+    ctx: Any
+    key: str
+    args: Dict[str, Any]
+    uses: int = 0
+    listeners: Optional[int] = None        # event listeners right after creation
+    fingerprint: Any = None                # cookies/storage of the fresh context
+    seed: Dict[str, List[Dict[str, str]]] = field(default_factory=dict)   # origin -> localStorage to restore
+
+
+def _key(args: Dict[str, Any]) -> str:
+    return json.dumps(args, sort_keys=True, default=str)
+
+
+def _origin(url: str) -> Optional[str]:
+    parts = urlsplit(url or "")
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme in ("http", "https") and parts.netloc else None
+
+
+def _storage_state(ctx) -> Dict[str, Any]:
+    try:
+        return ctx.storage_state(indexed_db=True)
+    except TypeError:       # Playwright < 1.51
+        return ctx.storage_state()
+
+
+def _fingerprint(state: Dict[str, Any]) -> Tuple[frozenset, frozenset]:
+    cookies = frozenset((c.get("name"), c.get("domain"), c.get("path")) for c in state.get("cookies", []))
+    origins = frozenset(
+        (o.get("origin"),
+         tuple(sorted((i["name"], i["value"]) for i in o.get("localStorage", []))),
+         tuple(sorted(db.get("name", "") for db in o.get("indexedDB", []))))
+        for o in state.get("origins", [])
+    )
+    return cookies, origins
+
+
+def _playwright_version() -> Optional[Tuple[int, int]]:
+    try:
+        major, minor = metadata.version("playwright").split(".")[:2]
+        return int(major), int(minor)
+    except (metadata.PackageNotFoundError, ValueError):
+        return None
+
+
+def _listener_count(ctx) -> Optional[int]:
+    # The sync wrapper's impl object is the event emitter the handlers end up on
+    try:
+        impl = ctx._impl_obj
+        return sum(len(impl.listeners(event)) for event in impl.event_names())
+    except Exception:
+        return None
+
+
+class ContextPool:
+    """
+    pool = ContextPool(browser, max_uses=25)
+    ctx = pool.acquire(browser_context_args); ...; pool.release(ctx, failed=False)
+    pool.close(); pool.summary()
+    """
+
+    def __init__(self, browser, max_uses: int = 25, max_idle: int = 4, prewarm: bool = True):
+        self.browser = browser
+        self.max_uses = max(1, max_uses)
+        self.max_idle = max(1, max_idle)
+        self.prewarm_enabled = prewarm
+        self._idle: Dict[str, List[_Entry]] = {}
+        self._busy: Dict[int, _Entry] = {}
+        self._pending: Dict[str, Tuple[Any, Dict[str, Any]]] = {}    # key -> (asyncio task, args)
+        self.stats: Dict[str, Any] = {
+            "tests": 0, "reused": 0, "created": 0, "prewarmed": 0, "prewarm_wait_s": 0.0,
+            "create_s": 0.0, "resets": 0, "reset_s": 0.0, "recycled": {},
+        }
+
+    @staticmethod
+    def poolable(args: Dict[str, Any]) -> bool:
+        return not any(args.get(name) for name in NOT_POOLED_ARGS)
+
+    # ---------- creation / pre-warming ----------
+
+    def prewarm(self, args: Dict[str, Any]) -> bool:
+        """Start creating a context for `args` on Playwright's loop; False if it can't be done in the background."""
+        key = _key(args)
+        if not self.prewarm_enabled or key in self._pending:
+            return key in self._pending
+        version = _playwright_version()
+        if version not in PREWARM_VERIFIED:
+            shown = ".".join(map(str, version)) if version else "unknown"
+            print(f"[context-pool] pre-warming not verified on Playwright {shown}; creating contexts in line")
+            self.prewarm_enabled = False
+            return False
+        try:
+            from playwright.sync_api import Browser as SyncBrowser
+
+            # Browser.new_context's own argument mapping, with a _sync that
+            # schedules the coroutine instead of waiting for it
+            deferred = SimpleNamespace(_impl_obj=self.browser._impl_obj, _sync=self.browser._loop.create_task)
+            task = SyncBrowser.new_context(deferred, **args)
+        except Exception as e:
+            print(f"[context-pool] ⚠️ pre-warming unavailable ({type(e).__name__}: {e}); creating contexts in line")
+            self.prewarm_enabled = False
+            return False
+        self._pending[key] = (task, args)
+        return True
+
+    def _collect(self, task) -> Any:
+        from playwright._impl._sync_base import mapping
+
+        if not task.done():
+            async def _wait():
+                return await task
+
+            started = time.perf_counter()
+            impl = self.browser._sync(_wait())
+            self.stats["prewarm_wait_s"] += time.perf_counter() - started
+        else:
+            impl = task.result()
+        return mapping.from_impl(impl)
+
+    def _create(self, key: str, args: Dict[str, Any]) -> _Entry:
+        started = time.perf_counter()
+        ctx = None
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            try:
+                ctx = self._collect(pending[0])
+                self.stats["prewarmed"] += 1
+            except Exception as e:
+                pending[0].cancel()     # don't leave it on Playwright's loop
+                print(f"[context-pool] ⚠️ pre-warmed context failed ({type(e).__name__}: {e}); creating it again")
+        if ctx is None:
+            ctx = self.browser.new_context(**args)
+        entry = _Entry(ctx=ctx, key=key, args=args)
+        state = _storage_state(ctx)
+        entry.fingerprint = _fingerprint(state)
+        entry.seed = {o["origin"]: list(o.get("localStorage", [])) for o in state.get("origins", [])}
+        entry.listeners = _listener_count(ctx)
+        self.stats["created"] += 1
+        self.stats["create_s"] += time.perf_counter() - started
+        return entry
+
+    # ---------- acquire / release ----------
+
+    def acquire(self, args: Dict[str, Any]):
+        key = _key(args)
+        self.stats["tests"] += 1
+        idle = self._idle.get(key)
+        if idle:
+            entry = idle.pop()
+            self.stats["reused"] += 1
+        else:
+            entry = self._create(key, args)
+        entry.uses += 1
+        if entry.uses >= self.max_uses:
+            self.prewarm(args)      # its replacement, ready by the next test
+        self._busy[id(entry.ctx)] = entry
+        return entry.ctx
+
+    def release(self, ctx, failed: bool = False) -> Optional[str]:
+        """Reset ctx for the next test, or close it. Returns why it was recycled, if it was."""
+        entry = self._busy.pop(id(ctx), None)
+        if entry is None:
+            _close(ctx)
+            return None
+        reason = "failed test" if failed else "max uses" if entry.uses >= self.max_uses else None
+        if reason is None:
+            started = time.perf_counter()
+            try:
+                reason = self._reset(entry)
+            except Exception as e:
+                reason = f"reset error ({type(e).__name__})"
+            self.stats["resets"] += 1
+            self.stats["reset_s"] += time.perf_counter() - started
+        if reason is not None:
+            self._recycle(entry, reason)
+            return reason
+        self._idle.setdefault(entry.key, []).append(entry)
+        while sum(len(v) for v in self._idle.values()) > self.max_idle:
+            oldest_key = next(k for k, v in self._idle.items() if v)
+            _close(self._idle[oldest_key].pop(0).ctx)
+        return None
+
+    def _recycle(self, entry: _Entry, reason: str) -> None:
+        recycled = self.stats["recycled"]
+        recycled[reason] = recycled.get(reason, 0) + 1
+        _close(entry.ctx)
+        self.prewarm(entry.args)
+
+    def _reset(self, entry: _Entry) -> Optional[str]:
+        ctx, args = entry.ctx, entry.args
+        origins = {o["origin"] for o in _storage_state(ctx).get("origins", [])}
+        for p in list(ctx.pages):
+            for frame in p.frames:
+                origin = _origin(frame.url)
+                if origin:
+                    origins.add(origin)
+            p.close(run_before_unload=False)
+        if ctx.pages:
+            return "leak: page would not close"
+        if entry.listeners is not None and (_listener_count(ctx) or 0) > entry.listeners:
+            return "leak: event listeners"
+
+        if hasattr(ctx, "unroute_all"):
+            ctx.unroute_all(behavior="ignoreErrors")
+        ctx.clear_cookies()
+        ctx.clear_permissions()
+        if args.get("permissions"):
+            ctx.grant_permissions(args["permissions"])
+        ctx.set_offline(bool(args.get("offline")))
+        ctx.set_extra_http_headers(args.get("extra_http_headers") or {})
+        if args.get("geolocation"):
+            ctx.set_geolocation(args["geolocation"])
+
+        origins |= set(entry.seed)
+        if origins:
+            page = ctx.new_page()
+            try:
+                page.route("**/*", lambda route: route.fulfill(**_BLANK))
+                for origin in sorted(origins):
+                    page.goto(f"{origin}/__context_pool_reset__", wait_until="commit")
+                    page.evaluate(_WIPE_JS, entry.seed.get(origin, []))
+            finally:
+                page.close()
+        state = self._seed_state(args)
+        if state.get("cookies"):
+            ctx.add_cookies(state["cookies"])
+
+        if _fingerprint(_storage_state(ctx)) != entry.fingerprint:
+            return "leak: state survived reset"
+        return None
+
+    @staticmethod
+    def _seed_state(args: Dict[str, Any]) -> Dict[str, Any]:
+        state = args.get("storage_state")
+        if isinstance(state, dict):
+            return state
+        if state:
+            with open(state, encoding="utf-8") as fh:
+                return json.load(fh)
+        return {}
+
+    # ---------- shutdown ----------
+
+    def close(self) -> None:
+        for task, _args in list(self._pending.values()):
+            try:
+                _close(self._collect(task))
+            except Exception:
+                task.cancel()
+        self._pending.clear()
+        for entries in self._idle.values():
+            for entry in entries:
+                _close(entry.ctx)
+        self._idle.clear()
+        for entry in self._busy.values():
+            _close(entry.ctx)
+        self._busy.clear()
+
+    def summary(self) -> str:
+        s = self.stats
+        recycled = ", ".join(f"{n} {reason}" for reason, n in sorted(s["recycled"].items())) or "none"
+        return (f"[context-pool] {s['tests']} test(s): {s['created']} context(s) created ({s['prewarmed']} pre-warmed, "
+                f"{s['create_s'] * 1000 / max(1, s['created']):.0f} ms each, {s['prewarm_wait_s'] * 1000:.0f} ms waited), "
+                f"{s['reused']} reused (reset {s['reset_s'] * 1000 / max(1, s['resets']):.0f} ms each); recycled: {recycled}")
+
+
+def _close(ctx) -> None:
+    try:
+        ctx.close()
+    except Exception:
+        pass
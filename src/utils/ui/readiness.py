@@ -0,0 +1,213 @@
+# src/utils/ui/readiness.py
+# When is a page "loaded"? Per page object, instead of networkidle everywhere.
+#
+#   class LoginPage(BasePage):
+#       readiness = Readiness("dom", locator="#username")
+#
+# Strategies (all but "load"/"networkidle" start from DOMContentLoaded):
+#   dom          - DOMContentLoaded, then `locator` visible (if given)
+#   signal       - the app's own flag: `signal` is a JS expression, or a bare
+#                  name looked up on window ("appReady" -> window.appReady)
+#   quiet        - no request in flight for `idle_ms` (default 250 ms). Requests
+#                  open longer than LONG_REQUEST_MS (long polling, SSE) and URLs
+#                  matching `ignore` (polling endpoints) don't count, so pages
+#                  that poll or hold a websocket still settle - networkidle
+#                  waits 500 ms with *no* traffic and never gets there on them.
+#                  Not reaching quiet before the timeout is logged, not raised:
+#                  the DOM is loaded by then.
+#   load         - the load event
+#   networkidle  - the old behaviour
+# `locator` is checked last with any strategy. `timeout_ms` is for the whole wait,
+# shared by its stages; open_until_ready() (BasePage.open) starts it before
+# goto, so the navigation spends from the same budget.
+#
+# Pages without their own `readiness` use UI_READINESS (default "quiet").
+# Every wait is timed into a per-page histogram (same format as the API
+# latency ones): reports/page-ready/<worker>.json, merged by the controller to
+# reports/page-ready.json and the "UI page readiness" terminal table. Waits
+# that timed out, and navigations that failed, count as errors.
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.utils.performance.latency_histogram import LatencyRegistry
+
+STRATEGIES = ("dom", "signal", "quiet", "load", "networkidle")
+ENV = "UI_READINESS"
+DEFAULT_STRATEGY = "quiet"
+LONG_REQUEST_MS = 5_000       # in flight longer than this: background traffic, not page load
+POLL_MS = 50
+REPORT_DIR = Path("reports") / "page-ready"
+MERGED_FILE = Path("reports") / "page-ready.json"
+
+_BACKGROUND_TYPES = {"eventsource", "websocket"}
+_IDENTIFIER = re.compile(r"^[A-Za-z_$][\w$]*$")
+
+
+@dataclass(frozen=True)
+class Readiness:
+    strategy: str = DEFAULT_STRATEGY
+    locator: Optional[str] = None
+    signal: Optional[str] = None
+    idle_ms: int = 250
+    timeout_ms: int = 30_000
+    ignore: Tuple[str, ...] = ()      # URL regexes left out of "quiet"
+
+    def __post_init__(self):
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"unknown readiness strategy {self.strategy!r} (one of {', '.join(STRATEGIES)})")
+        if self.strategy == "signal" and not self.signal:
+            raise ValueError("readiness strategy 'signal' needs signal=<JS expression or window flag>")
+
+    @property
+    def goto_wait_until(self) -> str:
+        return self.strategy if self.strategy in ("load", "networkidle") else "domcontentloaded"
+
+    @property
+    def signal_js(self) -> str:
+        expr = f"window.{self.signal}" if _IDENTIFIER.match(self.signal or "") else self.signal
+        return f"() => Boolean({expr})"
+
+
+def default_readiness() -> Readiness:
+    return Readiness(os.getenv(ENV) or DEFAULT_STRATEGY)
+
+
+class NetworkTracker:
+    """Requests in flight on a page, from its request / requestfinished / requestfailed events."""
+
+    def __init__(self, page, ignore: Iterable[str] = (), long_ms: float = LONG_REQUEST_MS, clock=time.monotonic):
+        self.page = page
+        self.ignore = [re.compile(p) for p in ignore]
+        self.long_s = long_ms / 1000.0
+        self._clock = clock
+        self._inflight: Dict[Any, float] = {}
+        self.last_activity = clock()
+        self.requests = 0
+
+    def attach(self) -> "NetworkTracker":
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_done)
+        self.page.on("requestfailed", self._on_done)
+        return self
+
+    def detach(self) -> None:
+        for event, handler in (("request", self._on_request), ("requestfinished", self._on_done),
+                               ("requestfailed", self._on_done)):
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+
+    def _on_request(self, request) -> None:
+        if request.resource_type in _BACKGROUND_TYPES or any(p.search(request.url) for p in self.ignore):
+            return
+        self._inflight[request] = self._clock()
+        self.requests += 1
+        self.last_activity = self._clock()
+
+    def _on_done(self, request) -> None:
+        if self._inflight.pop(request, None) is not None:
+            self.last_activity = self._clock()
+
+    def busy(self) -> int:
+        now = self._clock()
+        return sum(1 for started in self._inflight.values() if now - started < self.long_s)
+
+    def wait_quiet(self, idle_ms: float, timeout_ms: float, sleep: Callable[[float], None]) -> bool:
+        """True once nothing (short-lived) was in flight for idle_ms; False at the timeout."""
+        deadline = self._clock() + timeout_ms / 1000.0
+        while True:
+            now = self._clock()
+            if not self.busy() and now - self.last_activity >= idle_ms / 1000.0:
+                return True
+            if now >= deadline:
+                return False
+            sleep(min(POLL_MS, max(1.0, (deadline - now) * 1000.0)))     # page.wait_for_timeout: events keep flowing
+
+
+_registry = LatencyRegistry()
+
+
+def readiness_registry() -> LatencyRegistry:
+    """Process-wide {"<Page> (<strategy>)": histogram of ms until ready}."""
+    return _registry
+
+
+def _key(name: str, readiness: Readiness) -> str:
+    return f"{name} ({readiness.strategy})"
+
+
+def wait_until_ready(page, readiness: Readiness, name: str, *, tracker: Optional[NetworkTracker] = None,
+                     started: Optional[float] = None, timeout_ms: Optional[float] = None, logger=None,
+                     clock=time.monotonic) -> float:
+    """
+    Wait for `page` per `readiness` and record how long it took under `name`.
+    `started` (time.perf_counter) lets the caller include the navigation itself.
+    The timeout covers all stages together: each one gets what the earlier ones left.
+    Returns the milliseconds until ready.
+    """
+    started = time.perf_counter() if started is None else started
+    timeout = readiness.timeout_ms if timeout_ms is None else timeout_ms
+    deadline = clock() + timeout / 1000.0
+
+    def left() -> float:        # ms; never 0, which Playwright reads as "no timeout"
+        return max(1.0, (deadline - clock()) * 1000.0)
+
+    key = _key(name, readiness)
+    own_tracker = readiness.strategy == "quiet" and tracker is None
+    if own_tracker:     # requests already in flight are missed; BasePage.open() attaches before goto
+        tracker = NetworkTracker(page, readiness.ignore).attach()
+    ready = settled = False
+    try:
+        if readiness.strategy in ("load", "networkidle"):
+            page.wait_for_load_state(readiness.strategy, timeout=left())
+        else:
+            page.wait_for_load_state("domcontentloaded", timeout=left())
+        if readiness.strategy == "signal":
+            page.wait_for_function(readiness.signal_js, timeout=left())
+        settled = readiness.strategy != "quiet" or tracker.wait_quiet(readiness.idle_ms, left(), page.wait_for_timeout)
+        if readiness.locator:
+            page.locator(readiness.locator).first.wait_for(state="visible", timeout=left())
+        ready = True
+    finally:
+        if own_tracker:
+            tracker.detach()
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        _registry.record(key, elapsed_ms, error=not (ready and settled))
+    if logger is not None:
+        if settled:
+            logger.debug(f"📄 {key} ready in {elapsed_ms:.0f} ms")
+        else:
+            logger.warning(f"⏳ {key}: {tracker.busy()} request(s) still in flight after {timeout / 1000:.0f}s, continuing")
+    return elapsed_ms
+
+
+def open_until_ready(page, url: str, readiness: Readiness, name: str, *, logger=None,
+                     clock=time.monotonic) -> float:
+    """
+    page.goto(url) then wait_until_ready(), both within readiness.timeout_ms:
+    the wait gets what the navigation left. A failed goto is recorded as an
+    error under `name` and re-raised. Returns the milliseconds until ready.
+    """
+    started = time.perf_counter()
+    deadline = clock() + readiness.timeout_ms / 1000.0
+    # attached before goto, so requests the navigation starts are seen
+    tracker = NetworkTracker(page, readiness.ignore, clock=clock).attach() if readiness.strategy == "quiet" else None
+    try:
+        try:
+            page.goto(url, wait_until=readiness.goto_wait_until, timeout=readiness.timeout_ms)
+        except Exception:
+            _registry.record(_key(name, readiness), (time.perf_counter() - started) * 1000.0, error=True)
+            raise
+        return wait_until_ready(page, readiness, name, tracker=tracker, started=started,
+                                timeout_ms=max(1.0, (deadline - clock()) * 1000.0), logger=logger, clock=clock)
+    finally:
+        if tracker is not None:
+            tracker.detach()
@@ -4,6 +4,7 @@ from pytest_bdd import given, when, then, parsers
 import logging
 from typing import Any, Dict
 from src.api.wrappers.auth_api import AuthAPI
+from src.utils.api.api_helpers import APIHelpers
 # Add logging to see if steps are being registered
 logger = logging.getLogger(__name__)
 
@@ -78,6 +79,11 @@ def assert_response_status(ctx, expected_status, api_executor):
     actual_status = ctx.get("resp_status")
     assert actual_status == expected_status, f"Expected {expected_status} but got {actual_status}"
 
+@then(parsers.parse("the response time should be under {max_ms:d} ms"))
+def assert_response_time_under(max_ms, api_executor):
+    # Measured by the executor on the last call of this scenario
+    APIHelpers.assert_response_time(api_executor, max_ms)
+
 # If you have E2E scenarios that need shared browser state, add alternative steps:
 @when("I send a login request with shared browser state")
 def send_login_request_shared(ctx, auth_api, api_shared, page):
@@ -0,0 +1,97 @@
+# tests/conftest.py
+# Fixtures for the unit tests in this directory (the BDD scenarios get theirs from the root conftest.py).
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.execution.executor import make_api_executor
+from src.utils.performance import latency_histogram
+
+
+@pytest.fixture(autouse=True)
+def isolated_latency_registry(request, monkeypatch):
+    """
+    Unit tests drive the executor with fake sessions: keep those calls out of the
+    process-wide registry (the "API latency per endpoint" table, reports/api-latency.json
+    and --perf-baseline). BDD scenarios keep recording into the real one.
+    """
+    if "_pytest_bdd_example" in request.fixturenames:
+        yield latency_histogram.latency_registry()
+        return
+    registry = latency_histogram.LatencyRegistry()
+    monkeypatch.setattr(latency_histogram, "_registry", registry)
+    yield registry
+
+
+# ---------- fake transport for the executor ----------
+
+class FakeResponse:
+    headers = {"content-type": "application/json"}
+
+    def __init__(self, status=200, elapsed_ms=None):
+        self.status_code = status
+        if elapsed_ms is not None:      # requests sets it: sent -> headers parsed (TTFB)
+            self.elapsed = timedelta(milliseconds=elapsed_ms)
+
+    def json(self):
+        return {"ok": self.status_code < 400}
+
+
+class FakeSession:
+    """requests.Session stand-in: answers with `statuses` in order (the last one repeats), keeps the kwargs."""
+
+    def __init__(self, statuses=(200,), elapsed_ms=None):
+        self.statuses = list(statuses)
+        self.elapsed_ms = elapsed_ms
+        self.calls = []
+
+    def request(self, **kwargs):
+        self.calls.append(kwargs)
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return FakeResponse(status, self.elapsed_ms)
+
+
+class RecorderStub:
+    def __init__(self):
+        self.calls = []
+
+    def record(self, **kwargs):
+        self.calls.append(kwargs)
+
+
+@pytest.fixture
+def fake_executor():
+    """
+    Factory for an executor on a FakeSession:
+
+        ex = fake_executor(statuses=[200, 500], elapsed_ms=40, api_log_sampling="failure")
+        ex.rq.calls, ex.recorder.calls
+
+    Keyword arguments other than statuses / elapsed_ms / session / recorder are Settings attributes.
+    """
+
+    def build(statuses=(200,), elapsed_ms=None, session=None, recorder=None, **settings):
+        settings = SimpleNamespace(**{"api_base_url": "http://api.local", "timeout": 30, "connect_timeout": 5.0,
+                                      **settings})
+        return make_api_executor(pw_api=None, rq_session=session or FakeSession(statuses, elapsed_ms),
+                                 settings=settings, recorder=recorder or RecorderStub())
+
+    return build
+
+
+# ---------- time ----------
+
+class FakeClock:
+    """time.monotonic stand-in for the `clock=` parameters; move it with `clock.now += seconds`."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
@@ -0,0 +1,47 @@
+# tests/test_api_recorder.py
+import pytest
+
+from src.utils.api.api_reporting import ApiRecorder
+
+
+@pytest.fixture(autouse=True)
+def _no_allure(monkeypatch):
+    # allure-pytest-bdd only has an open test item inside scenarios
+    monkeypatch.setenv("ALLURE_API_ATTACH", "none")
+
+
+def _recorder(deferred):
+    traces = []
+    return ApiRecorder(lambda **kw: traces.append(kw), None, make_png=False, deferred=deferred), traces
+
+
+def test_deferred_recorder_skips_builds_for_passing_tests():
+    rec, traces = _recorder(deferred=True)
+    built = []
+
+    def build():
+        built.append(1)
+        return dict(step="s", method="GET", url="http://h/users/1", status=200)
+
+    rec.record_lazy(build, method="GET", url="http://h/users/1", status=200)
+    rec.record(step="s", method="POST", url="http://h/login", status=401)
+    rec.finish(failed=False)
+    assert traces == [] and built == []
+
+
+def test_deferred_recorder_flushes_on_failure_or_force():
+    for kwargs in ({"failed": True}, {"failed": False, "force": True}):
+        rec, traces = _recorder(deferred=True)
+        rec.record_lazy(lambda: dict(step="a", method="GET", url="/a", status=200), method="GET", url="/a", status=200)
+        rec.record(step="b", method="GET", url="/b", status=500)
+        rec.finish(**kwargs)
+        assert [t["step"] for t in traces] == ["a", "b"]
+
+
+def test_eager_recorder_writes_immediately_and_summary_is_compact():
+    rec, traces = _recorder(deferred=False)
+    rec.record_lazy(lambda: dict(step="a", method="GET", url="/a", status=200), method="GET", url="/a", status=200)
+    assert len(traces) == 1
+
+    summary = ApiRecorder.summarize([("GET", "http://h/users/1", 200), ("GET", "http://h/users/2", 200), ("POST", "/login", 401)])
+    assert summary == "3 API calls (2xx: 2, 4xx: 1): GET /users/{user_id} x2, POST /login x1"
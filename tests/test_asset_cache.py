@@ -0,0 +1,83 @@
+# tests/test_asset_cache.py
+from types import SimpleNamespace
+
+from src.utils.ui.asset_cache import STATIC_RE, AssetCache, blocked_pattern
+
+
+class _Response:
+    def __init__(self, status, headers, body=b""):
+        self.status, self.headers, self._body = status, headers, body
+
+    def body(self):
+        return self._body
+
+
+class _Route:
+    def __init__(self, url, server):
+        self.request = SimpleNamespace(url=url, method="GET", headers={"accept": "*/*"})
+        self.server, self.fetched_with, self.fulfilled = server, None, None
+
+    def fetch(self, headers=None):
+        self.fetched_with = headers
+        return self.server(headers or {})
+
+    def fulfill(self, status=200, headers=None, body=b""):
+        self.fulfilled = (status, headers, body)
+
+    def fallback(self):
+        self.fulfilled = "fallback"
+
+
+def test_static_assets_are_served_from_disk_and_revalidated(tmp_path, fake_clock):
+    clock = fake_clock
+    served = []
+
+    def server(headers):
+        served.append(headers)
+        if headers.get("if-none-match") == '"v1"':
+            return _Response(304, {"cache-control": "max-age=60"})
+        return _Response(200, {"etag": '"v1"', "cache-control": "max-age=60", "content-encoding": "gzip",
+                               "content-type": "text/javascript"}, b"console.log(1)")
+
+    url = "http://app/static/main.js?v=3"
+    assert STATIC_RE.match(url) and not STATIC_RE.match("http://app/api/users")
+
+    gw0 = AssetCache(root=tmp_path, clock=clock)
+    route = _Route(url, server)
+    gw0._handle(route)
+    assert route.fulfilled[0] == 200 and "content-encoding" not in route.fulfilled[1]
+    assert gw0.stats["stored"] == 1
+
+    gw1 = AssetCache(root=tmp_path, clock=clock)          # another worker, same directory
+    route = _Route(url, server)
+    gw1._handle(route)
+    assert route.fulfilled[2] == b"console.log(1)" and route.fetched_with is None and gw1.stats["hits"] == 1
+
+    clock.now += 120                                       # stale: conditional request, 304 -> body from disk
+    route = _Route(url, server)
+    gw1._handle(route)
+    assert route.fetched_with["if-none-match"] == '"v1"' and route.fulfilled[2] == b"console.log(1)"
+    assert gw1.stats["revalidated"] == 1 and gw1.lookup(url)["stored_at"] == clock.now
+
+    def no_store(headers):
+        return _Response(200, {"cache-control": "no-store", "etag": '"x"'}, b"secret")
+
+    gw1._handle(_Route("http://app/avatar.png", no_store))
+    assert gw1.lookup("http://app/avatar.png") is None
+
+
+def test_third_party_domains_are_blocked_first_party_is_not():
+    pattern = blocked_pattern(["google-analytics.com", "hotjar.com"])
+    assert pattern.match("https://www.google-analytics.com/g/collect?v=2")
+    assert pattern.match("https://static.hotjar.com/c/hotjar-1.js")
+    assert not pattern.match("https://app.example.com/google-analytics.com.js")
+    assert not pattern.match("https://nothotjar.com/")
+
+    routes = []
+    context = SimpleNamespace(route=lambda matcher, handler: routes.append((matcher, handler)))
+    cache = AssetCache(store=False, block=["hotjar.com"])
+    cache.install(context)
+    assert [m for m, _ in routes] == [cache.block_re]
+    aborted = []
+    routes[0][1](SimpleNamespace(abort=aborted.append))
+    assert aborted == ["blockedbyclient"] and cache.summary() == "[asset-cache] 1 third-party request(s) blocked"
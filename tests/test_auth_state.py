@@ -0,0 +1,75 @@
+# tests/test_auth_state.py
+import base64
+import json
+
+from src.utils.ui.auth_state import AuthStateCache, expires_at
+
+
+def _jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"sub": "admin", "exp": exp}).encode()).decode().rstrip("=")
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload}.sig"
+
+
+def test_expiry_is_the_earliest_cookie_or_jwt_within_the_ttl():
+    now = 1_000_000.0
+    state = {
+        "cookies": [{"name": "sid", "expires": now + 900}, {"name": "pref", "expires": -1},
+                    {"name": "csrf", "expires": now + 30}],          # too short-lived to be the session
+        "origins": [{"origin": "http://app", "localStorage": [{"name": "auth", "value": json.dumps({"token": _jwt(now + 600)})}]}],
+    }
+    assert expires_at(state, now, ttl_s=1800) == now + 600
+    assert expires_at({"cookies": [], "origins": []}, now, ttl_s=1800) == now + 1800
+
+
+def test_logs_in_once_then_reuses_memory_and_disk_until_expiry(tmp_path, fake_clock):
+    clock, logins = fake_clock, []
+
+    def login(role):
+        logins.append(role)
+        return {"cookies": [{"name": "sid", "value": str(len(logins)), "expires": clock.now + 900}], "origins": []}
+
+    cache = AuthStateCache("dev", login, root=tmp_path, ttl_s=1800, clock=clock)
+    first = cache.get("admin")
+    assert cache.get("admin") is first and logins == ["admin"]
+    assert json.loads(cache.path("admin").read_text())["storage_state"] == first
+
+    # another worker / a later run: from the file
+    other = AuthStateCache("dev", login, root=tmp_path, ttl_s=1800, clock=clock)
+    assert other.get("admin") == first and logins == ["admin"] and other.stats["from_disk"] == 1
+
+    clock.now += 900 - 30            # within the refresh margin of the cookie's expiry
+    assert cache.get("admin")["cookies"][0]["value"] == "2"
+    cache.invalidate("admin")
+    assert not cache.path("admin").exists()
+    cache.get("admin")
+    assert logins == ["admin"] * 3
+
+
+class _Store:
+    def __init__(self):
+        self.data = {}
+
+    def update(self, key, fn, default=None):
+        self.data[key] = fn(self.data.get(key, default))
+        return self.data[key]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_workers_wait_for_the_login_another_worker_claimed(tmp_path, fake_clock):
+    clock, store = fake_clock, _Store()
+    gw0 = AuthStateCache("dev", lambda role: {"cookies": [], "origins": []}, store=store, root=tmp_path,
+                         worker="gw0", clock=clock)
+    store.update("auth_login:dev:admin", lambda cur: {"owner": "gw0", "until": clock.now + 120})
+
+    def gw0_finishes(seconds):
+        clock.now += seconds
+        gw0._login("admin")
+
+    def no_login(role):
+        raise AssertionError("gw1 should not log in")
+
+    gw1 = AuthStateCache("dev", no_login, store=store, root=tmp_path, worker="gw1", clock=clock, sleep=gw0_finishes)
+    assert gw1.get("admin") == {"cookies": [], "origins": []}
+    assert gw1.stats["waited_s"] == 0.25 and gw0.stats["logins"] == 1
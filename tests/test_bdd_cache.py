@@ -0,0 +1,40 @@
+# tests/test_bdd_cache.py
+from pytest_bdd import feature as bdd_feature
+from pytest_bdd import parsers
+
+from src.utils.bdd_cache import FeatureCache, _literal_prefix
+
+FEATURE = """Feature: Cached
+  Scenario: One
+    Given I have a valid username "bob"
+"""
+
+
+def _always_valid(_path):
+    return True
+
+
+def test_feature_cache_hits_until_file_changes(tmp_path):
+    f = tmp_path / "cached.feature"
+    f.write_text(FEATURE, encoding="utf-8")
+
+    first = FeatureCache(tmp_path / "cache")
+    assert first.is_valid(f, _always_valid) and first.misses == 1
+    first.save()
+
+    bdd_feature.features.pop(str(f), None)
+    second = FeatureCache(tmp_path / "cache")
+    assert second.is_valid(f, _always_valid) and second.hits == 1
+    assert bdd_feature.features[str(f)].name == "Cached"
+
+    f.write_text(FEATURE + "  Scenario: Two\n    Given I have a valid username \"al\"\n", encoding="utf-8")
+    third = FeatureCache(tmp_path / "cache")
+    assert third.is_valid(f, _always_valid) and third.misses == 1
+
+
+def test_step_patterns_bucket_by_first_literal_word():
+    assert _literal_prefix(parsers.string("the API is available")) == ("exact", "the API is available")
+    assert _literal_prefix(parsers.parse('I have a valid username "{username}"')) == ("word", "i")
+    assert _literal_prefix(parsers.parse("{count:d} users exist"))[1] is None  # scanned for every step
+    assert _literal_prefix(parsers.re(r"the (?P<n>\d+) item")) == ("word", "the")
+    assert _literal_prefix(parsers.re(r"users? exist|none exist"))[0] == "any"
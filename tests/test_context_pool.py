@@ -0,0 +1,198 @@
+# tests/test_context_pool.py
+from src.utils.ui import context_pool
+from src.utils.ui.context_pool import ContextPool
+
+
+class _Frame:
+    def __init__(self, url):
+        self.url = url
+
+
+class _Page:
+    def __init__(self, ctx, url="about:blank", sticky=False):
+        self.ctx, self.frames, self.sticky = ctx, [_Frame(url)], sticky
+
+    def close(self, run_before_unload=False):
+        if not self.sticky and self in self.ctx.pages:
+            self.ctx.pages.remove(self)
+
+    def route(self, pattern, handler):
+        pass
+
+    def goto(self, url, wait_until=None):
+        self.frames[0].url = url
+
+    def evaluate(self, js, seed):
+        origin = "/".join(self.frames[0].url.split("/")[:3])
+        self.ctx.local.pop(origin, None)
+        for item in seed:
+            self.ctx.local.setdefault(origin, {})[item["name"]] = item["value"]
+
+
+class _Context:
+    def __init__(self, **args):
+        self.args, self.pages, self.local, self.closed = args, [], {}, False
+        self.cookies = list((args.get("storage_state") or {}).get("cookies", []))
+
+    def new_page(self):
+        page = _Page(self)
+        self.pages.append(page)
+        return page
+
+    def storage_state(self, indexed_db=False):
+        return {"cookies": list(self.cookies),
+                "origins": [{"origin": o, "localStorage": [{"name": k, "value": v} for k, v in kv.items()]}
+                            for o, kv in self.local.items() if kv]}
+
+    def clear_cookies(self):
+        self.cookies = []
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    def unroute_all(self, behavior=None):
+        pass
+
+    def clear_permissions(self):
+        pass
+
+    def set_offline(self, offline):
+        pass
+
+    def set_extra_http_headers(self, headers):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class _Browser:
+    def __init__(self):
+        self.created = []
+
+    def new_context(self, **args):
+        ctx = _Context(**args)
+        self.created.append(ctx)
+        return ctx
+
+
+def test_context_is_reset_and_reused_between_tests():
+    browser = _Browser()
+    pool = ContextPool(browser, max_uses=10, prewarm=False)
+    ctx = pool.acquire({"base_url": "http://app"})
+    page = ctx.new_page()
+    page.goto("http://app/login")
+    ctx.cookies.append({"name": "sid", "domain": "app", "path": "/"})
+    ctx.local["http://app"] = {"token": "abc"}
+
+    assert pool.release(ctx) is None
+    assert ctx.pages == [] and ctx.cookies == [] and ctx.local == {} and not ctx.closed
+    assert pool.acquire({"base_url": "http://app"}) is ctx
+    assert pool.acquire({"base_url": "http://other"}) is not ctx       # different args, different context
+    assert pool.stats["created"] == 2 and pool.stats["reused"] == 1
+
+
+def test_recycles_after_max_uses_failures_and_leaks():
+    browser = _Browser()
+    pool = ContextPool(browser, max_uses=2, prewarm=False)
+    first = pool.acquire({})
+    pool.release(first)
+    assert pool.acquire({}) is first
+    assert pool.release(first) == "max uses" and first.closed
+
+    ctx = pool.acquire({})
+    assert pool.release(ctx, failed=True) == "failed test" and ctx.closed
+
+    ctx = pool.acquire({})
+    ctx.pages.append(_Page(ctx, sticky=True))
+    assert pool.release(ctx) == "leak: page would not close" and ctx.closed
+
+    # storage_state seeded from the args survives the reset; anything else is a leak
+    seeded = {"storage_state": {"cookies": [{"name": "role", "domain": "app", "path": "/"}], "origins": []}}
+    ctx = pool.acquire(seeded)
+    ctx.cookies.append({"name": "tracking", "domain": "app", "path": "/"})
+    assert pool.release(ctx) is None and [c["name"] for c in ctx.cookies] == ["role"]
+    assert pool.stats["recycled"] == {"max uses": 1, "failed test": 1, "leak: page would not close": 1}
+    pool.close()
+    assert all(c.closed for c in browser.created)
+
+
+class _BrowserImpl:
+    def __init__(self):
+        self.params = []
+
+    async def new_context(self, **params):
+        self.params.append(params)
+        return _Context(**params)
+
+
+class _Task:
+    """asyncio.Task stand-in: its coroutine runs when awaited, no event loop needed."""
+
+    def __init__(self, coro):
+        self.coro, self.cancelled = coro, False
+
+    def done(self):
+        return False
+
+    def cancel(self):
+        self.cancelled = True
+        self.coro.close()
+
+    def __await__(self):
+        return self.coro.__await__()
+
+
+class _Loop:
+    def __init__(self):
+        self.tasks = []
+
+    def create_task(self, coro):
+        self.tasks.append(_Task(coro))
+        return self.tasks[-1]
+
+
+def _run(coro):
+    """Browser._sync stand-in: the fake coroutines never suspend."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise AssertionError("coroutine suspended")
+
+
+def _prewarm_browser():
+    browser = _Browser()
+    browser._impl_obj, browser._loop, browser._sync = _BrowserImpl(), _Loop(), _run
+    return browser
+
+
+def test_prewarm_creates_the_next_context_through_the_installed_playwright_wrapper(monkeypatch):
+    # The real sync Browser.new_context maps the args (base_url -> baseURL) and hands the coroutine to _sync
+    monkeypatch.setattr(context_pool, "_playwright_version", lambda: next(iter(context_pool.PREWARM_VERIFIED)))
+    browser = _prewarm_browser()
+    pool = ContextPool(browser, max_uses=1)
+
+    assert pool.prewarm({"base_url": "http://app"})
+    ctx = pool.acquire({"base_url": "http://app"})
+    assert ctx.args["baseURL"] == "http://app" and browser.created == []     # came from the task, not in line
+    assert pool.stats["prewarmed"] == 1
+    assert pool.release(ctx) == "max uses" and "{\"base_url\": \"http://app\"}" in pool._pending
+    pool.close()
+    assert pool._pending == {} and browser._impl_obj.params[-1]["baseURL"] == "http://app"
+    assert pool.summary().startswith("[context-pool] 1 test(s): 1 context(s) created (1 pre-warmed")
+
+
+def test_prewarm_falls_back_in_line_off_the_verified_versions_and_cancels_on_close(monkeypatch):
+    monkeypatch.setattr(context_pool, "_playwright_version", lambda: (9, 0))
+    browser = _prewarm_browser()
+    pool = ContextPool(browser, max_uses=1)
+    assert not pool.prewarm({}) and not pool.prewarm_enabled
+    assert pool.acquire({}) is browser.created[0] and browser._loop.tasks == []
+
+    monkeypatch.setattr(context_pool, "_playwright_version", lambda: next(iter(context_pool.PREWARM_VERIFIED)))
+    pool = ContextPool(browser, max_uses=1)
+    pool.prewarm({})
+    pool._collect = lambda task: (_ for _ in ()).throw(RuntimeError("loop is closed"))
+    pool.close()
+    assert browser._loop.tasks[0].cancelled and pool._pending == {}
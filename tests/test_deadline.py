@@ -0,0 +1,61 @@
+# tests/test_deadline.py
+from src.api.execution.deadline import (
+    MIN_PLAYWRIGHT_TIMEOUT_MS, Deadline, get_deadline, playwright_timeout_ms, start_deadline, step_budget,
+)
+from src.utils.api.api_helpers import APIHelpers
+
+
+def test_deadline_shrinks_and_caps(fake_clock):
+    clock = fake_clock
+    dl = Deadline(10, clock=clock)
+    clock.now += 4
+    assert dl.remaining() == 6
+    assert dl.cap(30) == 6
+    assert dl.cap(2) == 2
+    assert playwright_timeout_ms(30, dl) == 6_000 and playwright_timeout_ms(3) == 3_000
+    clock.now += 10
+    assert dl.expired and dl.remaining() == 0
+    assert playwright_timeout_ms(30, dl) == MIN_PLAYWRIGHT_TIMEOUT_MS  # 0 would mean "no timeout"
+
+
+def test_step_budget_restores_scenario_deadline():
+    ctx = {}
+    scenario = start_deadline(ctx, 60)
+    with step_budget(ctx, 1) as step:
+        assert get_deadline(ctx) is step
+        assert step.remaining() <= 1
+    assert get_deadline(ctx) is scenario
+    assert start_deadline(ctx, 0) is None and get_deadline(ctx) is None
+
+
+def test_requests_call_gets_connect_read_split_capped_by_deadline(fake_executor):
+    ex = fake_executor()
+    ctx = {"api_client": "requests"}
+    start_deadline(ctx, 2)
+    status, _ = ex(ctx=ctx, step="s", method="GET", path="/ping")
+    assert status == 200
+    connect_s, read_s = ex.rq.calls[0]["timeout"]
+    assert connect_s <= 2 and read_s <= 2
+
+
+def test_expired_deadline_returns_synthetic_response_without_sending(fake_executor):
+    ex = fake_executor()
+    ctx = {"api_client": "requests"}
+    dl = start_deadline(ctx, 1)
+    dl._expires = dl._started  # already spent
+    status, data = ex(ctx=ctx, step="s", method="GET", path="/ping")
+    assert status == 408 and data["deadline_exceeded"] is True
+    assert ex.rq.calls == []
+
+
+def test_retry_helper_stops_when_deadline_spent():
+    dl = Deadline(0.05)
+    calls = []
+
+    def call():
+        calls.append(1)
+        return 503, {}
+
+    status, data = APIHelpers.retry_api_call(call, max_attempts=50, delay=0.02, deadline=dl)
+    assert status == 408 and data["deadline_exceeded"] is True
+    assert len(calls) < 50
@@ -0,0 +1,106 @@
+# tests/test_duration_schedule.py
+import json
+from types import SimpleNamespace
+
+from src.utils import duration_schedule
+from src.utils.duration_schedule import DurationScheduling, DurationStore, plan
+
+
+def test_plan_packs_longest_first_and_groups_browser_tests():
+    # split by count: 8+7+6 / 5+4 = 21s; longest first: 8+5+4 / 7+6
+    queues, loads = plan([8, 7, 6, 5, 4], [()] * 5, 2)
+    assert loads == [17, 13] and queues == [[0, 3, 4], [1, 2]]
+
+    # four 1s browser tests + four 1s API tests, launching a browser costs 3s:
+    # one worker gets every browser test instead of both launching one
+    fixtures = [("browser",)] * 4 + [()] * 4
+    queues, loads = plan([1.0] * 8, fixtures, 2, {"browser": 3.0})
+    browser_workers = {w for w, q in enumerate(queues) for i in q if i < 4}
+    assert len(browser_workers) == 1 and max(loads) == 7.0
+
+    # an xdist_group stays on one worker; tests without history go in contiguous runs
+    fixtures = [("xdist_group:kv",), ("xdist_group:kv",), (), (), (), ()]
+    queues, loads = plan([1, 1, 1, 1, 1, 1], fixtures, 2, unknown=[4, 5])
+    assert queues == [[0, 1, 4], [2, 3, 5]] and loads == [3, 3]
+
+
+def test_store_averages_runs_and_imports_json_report(tmp_path):
+    store = DurationStore("dev", root=tmp_path)
+    store.update({"t.py::slow": (10.0, ["browser"]), "t.py::fast": (1.0, [])}, {"browser": 4.0})
+    store.save()
+
+    store = DurationStore("dev", root=tmp_path)
+    store.update({"t.py::slow": (20.0, ["browser"])})
+    assert store.tests["t.py::slow"]["s"] == 13.0 and store.tests["t.py::slow"]["n"] == 2
+    assert store.fixture_costs() == {"browser": 4.0}
+
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps({"tests": [
+        {"nodeid": "t.py::fast", "setup": {"duration": 0.5}, "call": {"duration": 2.5}, "teardown": {"duration": 0.0}},
+    ]}), encoding="utf-8")
+    assert store.import_json_report(report) == 1
+    assert store.tests["t.py::fast"]["s"] == 1.6
+
+    seconds, fixtures, unknown = store.estimates(["t.py::slow", "t.py::new"])
+    assert seconds == [13.0, (13.0 + 1.6) / 2] and fixtures == [("browser",), ()] and unknown == [1]
+
+
+class _Node:
+    def __init__(self, gid):
+        self.gateway = SimpleNamespace(id=gid)
+        self.shutting_down = False
+        self.sent, self.steal = [], None
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def send_steal(self, indices):
+        self.steal = list(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def test_scheduler_sends_planned_queues_and_still_steals(tmp_path):
+    collection = [f"t.py::t{i}" for i in range(6)]
+    store = DurationStore("dev", root=tmp_path)
+    store.update({nodeid: (s, ()) for nodeid, s in zip(collection, [1, 9, 1, 1, 8, 1])})
+    config = SimpleNamespace(getvalue=lambda name: ["2*popen"])
+
+    sched = DurationScheduling(config, store=store)
+    gw0, gw1 = _Node("gw0"), _Node("gw1")
+    for node in (gw1, gw0):
+        sched.add_node(node)
+        sched.add_node_collection(node, collection)
+    sched.schedule()
+
+    assert gw0.sent == [1, 2, 5] and gw1.sent == [0, 3, 4]     # 9+1+1 / 8+1+1, in collection order
+    assert sched.predicted == {"gw0": 11.0, "gw1": 10.0}
+
+    for i in (0, 3):
+        sched.mark_test_complete(gw1, i)
+    assert gw0.steal == [5] and sched.steals == 0               # gw1 is running dry: take gw0's last
+    sched.remove_pending_tests_from_node(gw0, [5])
+    assert sched.steals == 1 and gw1.sent[-1] == 5
+    assert duration_schedule.format_summary({"gw0": [11.0, 2], "gw1": [10.5, 4]}, sched)[-1].startswith("busiest worker 11.0s")
+
+
+def test_stealing_leaves_xdist_group_members_where_they_were_planned(tmp_path):
+    collection = [f"t.py::t{i}" for i in range(8)]
+    store = DurationStore("dev", root=tmp_path)
+    group = ("xdist_group:kv",)
+    seconds = [6, 1, 1, 1, 1, 1, 1, 1]
+    store.update({nodeid: (s, group if i >= 5 else ()) for i, (nodeid, s) in enumerate(zip(collection, seconds))})
+    config = SimpleNamespace(getvalue=lambda name: ["2*popen"])
+
+    sched = DurationScheduling(config, store=store)
+    gw0, gw1 = _Node("gw0"), _Node("gw1")
+    for node in (gw0, gw1):
+        sched.add_node(node)
+        sched.add_node_collection(node, collection)
+    sched.schedule()
+    assert sched.pinned == {5, 6, 7}
+    assert gw0.sent == [1, 2, 3, 4, 5, 6, 7] and gw1.sent == [0]
+
+    sched.mark_test_complete(gw1, 0)
+    assert gw0.steal == [3, 4]                                  # plain worksteal would take 5, 6, 7
@@ -0,0 +1,24 @@
+# tests/test_endpoints.py
+from src.api.execution.endpoints import EndpointNormalizer, looks_like_id, templates_from_wrappers
+
+
+def test_templates_are_learned_from_wrapper_fstrings():
+    found = templates_from_wrappers()
+    assert "/users/{user_id}" in found and "/users/{user_id}/profile" in found
+    assert "/users/search" in found  # literal paths are kept too
+
+
+def test_literal_segments_beat_parameters_and_templates_match_under_a_base_path():
+    n = EndpointNormalizer(["/users/{user_id}", "/users/search", "/users/{user_id}/orders/{order_id}"])
+    assert n.normalize("/users/search") == "/users/search"
+    assert n.normalize("/users/alice") == "/users/{user_id}"
+    assert n.normalize("https://h/api/v1/users/7/orders/9?expand=1") == "/api/v1/users/{user_id}/orders/{order_id}"
+    assert n.key("get", "/users/42/") == "GET /users/{user_id}"
+
+
+def test_id_heuristics_for_unknown_paths():
+    n = EndpointNormalizer()
+    assert n.normalize("/orders/3f2b8c1e-1111-2222-3333-444455556666/items/12") == "/orders/{id}/items/{id}"
+    assert n.normalize("/files/a1b2c3d4e5f6a7b8c9d0e1f2") == "/files/{id}"
+    assert looks_like_id("a1B2c3D4e5F6g7H8i9J0kk") and not looks_like_id("internationalization-settings")
+    assert EndpointNormalizer(heuristics=False).normalize("/orders/12") == "/orders/12"
@@ -0,0 +1,48 @@
+# tests/test_exchange_buffer.py
+import json
+import threading
+
+from src.api.execution.exchange_buffer import ExchangeBuffer
+from src.api.execution.executor import DataRedactor
+
+
+def test_buffer_is_bounded_and_safe_under_concurrent_appends():
+    buf = ExchangeBuffer(maxlen=50)
+
+    def worker(n):
+        for i in range(500):
+            buf.append({"step": f"{n}-{i}", "status": 200})
+            buf.snapshot()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(buf) == 50 and buf.total == 4000
+
+
+def test_redaction_happens_only_on_render():
+    buf = ExchangeBuffer(maxlen=2)
+    buf.append({"step": "login", "req_headers": {"Authorization": "Bearer abc"}, "req_json": {"password": "p"}})
+    raw = buf.snapshot()[0]
+    assert raw["req_headers"]["Authorization"] == "Bearer abc"  # stored untouched
+
+    rendered = json.loads(buf.to_json(DataRedactor()))
+    ex = rendered["exchanges"][0]
+    assert "abc" not in json.dumps(ex) and ex["step"] == "login"
+    assert rendered["total_calls"] == 1 and rendered["kept"] == 1
+
+
+def test_last_response_is_per_thread_but_buffer_is_shared(fake_executor):
+    ex = fake_executor()
+
+    t = threading.Thread(target=lambda: ex(ctx={"api_client": "requests"}, step="bg", method="GET", path="/bg"))
+    t.start()
+    t.join()
+    assert ex.last_response is None  # the call happened on another thread
+    assert ex.exchanges.last()["step"] == "bg"
+
+    ex(ctx={"api_client": "requests"}, step="main", method="GET", path="/main")
+    assert ex.last_response["step"] == "main"
+    assert [e["step"] for e in ex.exchanges.snapshot()] == ["bg", "main"]
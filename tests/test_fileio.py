@@ -0,0 +1,37 @@
+# tests/test_fileio.py
+import json
+
+import pytest
+
+from src.utils import fileio
+
+
+def test_atomic_write_replaces_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "sub" / "data.json"
+    fileio.atomic_write_json(path, {"a": 1})
+    fileio.atomic_write(path, b'{"a": 2}')
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 2}
+    assert [p.name for p in path.parent.iterdir()] == ["data.json"]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / "data.json"
+    fileio.atomic_write_json(path, {"a": 1})
+    with pytest.raises(TypeError):
+        fileio.atomic_write(path, 42)
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+
+def test_worker_files_round_trip_and_skip_unreadable(tmp_path, capsys):
+    fileio.write_worker_file(tmp_path, "gw1", {"n": 1})
+    fileio.write_worker_file(tmp_path, "gw0", {"n": 0})
+    (tmp_path / "gw2.json").write_text("{truncated", encoding="utf-8")
+
+    assert fileio.read_worker_files(tmp_path, tag="latency") == [{"n": 0}, {"n": 1}]
+    assert "[latency] skip" in capsys.readouterr().out
+
+    fileio.clear_worker_files(tmp_path)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,77 @@
+# tests/test_har.py
+import json
+from types import SimpleNamespace
+
+from src.utils.har import ApiHar, HarReplay, MatchRules, scenario_path
+
+
+class _Session:
+    def __init__(self):
+        self.calls = []
+
+    def request(self, **kwargs):
+        self.calls.append((kwargs["method"], kwargs["url"]))
+        user = {"id": len(self.calls), "name": (kwargs.get("json") or {}).get("name"), "requestId": "r-1",
+                "access_token": "tok-live"}
+        return SimpleNamespace(status_code=201 if kwargs["method"] == "POST" else 200,
+                               headers={"content-type": "application/json", "set-cookie": "sid=1"},
+                               json=lambda: user)
+
+
+def _entry(method, url, status, body=None, text="{}"):
+    req = {"method": method, "url": url}
+    if body is not None:
+        req["postData"] = {"text": json.dumps(body)}
+    return {"request": req, "response": {"status": status, "headers": [{"name": "Content-Type", "value": "application/json"}],
+                                         "content": {"text": text}}}
+
+
+def test_matching_ignores_volatile_params_and_fields_and_replays_in_order():
+    rules = MatchRules(ignore_params=["_"], ignore_fields=["requestId"])
+    replay = HarReplay([
+        _entry("GET", "https://app/api/users?page=1&_=111", 200, text="[]"),
+        _entry("POST", "https://app/api/users", 400, body={"name": "bob", "requestId": "a"}),
+        _entry("POST", "https://app/api/users", 201, body={"name": "ann", "requestId": "b"}),
+        _entry("GET", "https://app/api/users?page=1&_=222", 200, text='[{"name": "ann"}]'),
+    ], rules)
+
+    assert replay.match("GET", "http://other/api/users?_=999&page=1")["response"]["content"]["text"] == "[]"
+    # the body picks the entry, not the recorded order
+    assert replay.match("POST", "https://app/api/users", '{"requestId": "z", "name": "ann"}')["response"]["status"] == 201
+    assert replay.match("GET", "https://app/api/users?page=1")["response"]["content"]["text"] == '[{"name": "ann"}]'
+    assert replay.match("GET", "https://app/api/users?page=1")["response"]["content"]["text"] == '[{"name": "ann"}]'
+    assert replay.match("GET", "https://app/api/users?page=2") is None
+    assert "GET https://app/api/users?page=2" in replay.report()
+
+
+def test_executor_records_a_har_and_replays_it_without_the_backend(tmp_path, monkeypatch, fake_executor):
+    monkeypatch.setenv("ALLURE_API_ATTACH", "none")
+    path = scenario_path("tests/features/users.feature::test_create_user[ann]", "dev", "api", root=tmp_path)
+    assert path == tmp_path / "dev" / "tests" / "features" / "users.feature__test_create_user[ann].api.har"
+    # same-named modules in different directories get different files
+    assert scenario_path("tests/admin/test_users.py::test_a", "dev", "ui") != \
+        scenario_path("tests/test_users.py::test_a", "dev", "ui")
+    assert scenario_path("tests/test_x.py::test_a[api/v2]", "dev", "ui", root=tmp_path).parent == tmp_path / "dev" / "tests"
+    ctx = {"api_client": "requests"}
+
+    session = _Session()
+    ex = fake_executor(session=session)
+    ex.har = ApiHar("record", path)
+    ex(ctx=ctx, step="create", method="POST", path="/users", req_json={"name": "ann", "password": "pw-live"},
+       req_headers={"Authorization": "Bearer secret"})
+    ex(ctx=ctx, step="create", method="POST", path="/users", req_json={"name": "bob", "password": "pw-live"})
+    ex(ctx=ctx, step="get", method="GET", path="/users/3")
+    assert ex.har.save() == path
+    saved = path.read_text()
+    assert not any(raw in saved for raw in ("secret", "sid=1", "pw-live", "tok-live"))
+
+    offline = _Session()
+    ex = fake_executor(session=offline)
+    ex.har = ApiHar("replay", path)
+    # the redacted body still picks its entry: matching uses a hash of the raw one
+    assert ex(ctx=ctx, step="create", method="POST", path="/users", req_json={"name": "bob", "password": "pw-live"}) == \
+        (201, {"id": 2, "name": "bob", "requestId": "r-1", "access_token": "***REDACTED***"})
+    assert ex(ctx=ctx, step="get", method="GET", path="/users/3")[0] == 200
+    status, data = ex(ctx=ctx, step="delete", method="DELETE", path="/users/1")
+    assert status == 0 and data["error"] == "Not in HAR"
+    assert offline.calls == [] and ex.har.save() is None
@@ -0,0 +1,47 @@
+# tests/test_hotpath.py
+from src.utils.api.api_reporting import ApiRecorder
+from src.utils.performance import hotpath
+from src.utils.performance.hotpath import PhaseProfiler
+
+
+def test_nested_phases_split_self_and_total_time():
+    ticks = iter([0.0, 1.0, 3.0, 4.0, 10.0, 11.0, 12.0])
+    prof = PhaseProfiler(clock=lambda: next(ticks))
+    prof.begin("call")                       # 0
+    prof.begin("step", "When I do it")       # 1
+    prof.begin("api", "GET /users")          # 3
+    prof.begin("png")                        # 4 - end() skipped, e.g. by an exception
+    prof.end("api")                          # 10: unwinds png, then api
+    prof.end("step")                         # 11
+    prof.end("call")                         # 12
+    prof.end("call")                         # no open frame: ignored (no tick left to take)
+
+    kinds = prof.to_dict()["kinds"]
+    assert kinds["png"]["self_ms"] == 6000 and kinds["api"]["self_ms"] == 1000
+    assert kinds["step"]["total_ms"] == 10000 and kinds["step"]["self_ms"] == 3000
+    assert kinds["call"]["total_ms"] == 12000 and kinds["call"]["self_ms"] == 2000
+    stacks = prof.to_dict()["stacks"]
+    assert stacks["call;step: When I do it;api: GET /users;png"] == 6_000_000
+
+
+def test_executor_and_recorder_phases(monkeypatch, tmp_path, fake_executor):
+    monkeypatch.setenv("ALLURE_API_ATTACH", "none")
+    monkeypatch.setattr(hotpath, "_PROFILER", PhaseProfiler())
+    traces = []
+    recorder = ApiRecorder(lambda **kw: traces.append(kw), browser=None, make_png=False, deferred=False)
+    ex = fake_executor(recorder=recorder)
+    with hotpath.phase("call"):
+        for user_id in (1, 2):
+            ex(ctx={"api_client": "requests"}, step="get", method="GET", path=f"/users/{user_id}")
+
+    data = hotpath.get_profiler().to_dict("gw0")
+    assert {"api", "transport", "recording", "redaction", "trace_store", "logging"} <= set(data["kinds"])
+    assert data["kinds"]["api"]["count"] == 2 and data["labels"]["api: GET /users/{user_id}"]["count"] == 2
+    assert any(k.startswith("call;api: GET /users/{user_id};recording") for k in data["stacks"])
+
+    hotpath.write_worker_file("gw0", report_dir=tmp_path)
+    merged = hotpath.merge_worker_files(tmp_path)
+    out = hotpath.write_merged(merged, tmp_path / "profile.json")
+    folded = out[1].read_text().splitlines()
+    assert folded and all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+    assert any("recording" in line for line in hotpath.format_summary(merged))
@@ -0,0 +1,66 @@
+# tests/test_impact.py
+import subprocess
+from pathlib import Path
+
+from src.api.execution.endpoints import endpoint_key
+from src.utils import impact
+from src.utils.impact import ImpactRecorder
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_recorder_lists_repo_files_run_by_each_test(tmp_path):
+    rec = ImpactRecorder(ROOT).start()
+    try:
+        rec.begin("t::a")
+        endpoint_key("GET", "/users/42")
+        rec.end("t::a")
+        rec.begin("t::b")
+        rec.end("t::b")
+    finally:
+        rec.stop()
+    assert "src/api/execution/endpoints.py" in rec.tests["t::a"]
+    assert "src/utils/impact.py" not in rec.tests["t::a"] and rec.tests["t::b"] == set()
+
+    impact.write_worker_file("gw0", rec, tmp_path)
+    index = tmp_path / "index" / "index.json"
+    impact.update_index({"t::old": ["x.py"]}, ROOT, index)
+    impact.update_index(impact.merge_worker_files(tmp_path), ROOT, index)
+    assert set(impact.load_index(index)["tests"]) == {"t::old", "t::a", "t::b"}
+
+
+def test_select_runs_affected_unknown_or_everything():
+    tests = {
+        "t::login": {"features/auth.feature", "step_definitions/api/auth_api_steps.py"},
+        "t::product": {"features/product.feature"},
+        "t::new": {"features/new.feature"},
+    }
+    index = {"tests": {"t::login": ["src/api/wrappers/auth_api.py"], "t::product": ["src/api/wrappers/product_api.py"]}}
+
+    assert impact.select(tests, ["src/api/wrappers/product_api.py", "docs/api.md"], index) == ({"t::product", "t::new"}, None)
+    assert impact.select(tests, ["step_definitions/api/auth_api_steps.py"], index) == ({"t::login", "t::new"}, None)
+    assert impact.select(tests, ["src/unused.py"], index) == ({"t::new"}, None)
+
+    for change in ("conftest.py", "src/config/settings.py", "data/users.json"):
+        selected, reason = impact.select(tests, [change], index)
+        assert selected == set(tests) and change in reason
+    assert impact.select(tests, [], {})[1].startswith("no impact index")
+
+
+def test_changed_files_include_uncommitted_and_untracked(tmp_path):
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q", "-b", "main")
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    git("add", ".")
+    git("commit", "-qm", "base")
+    git("checkout", "-qb", "feature")
+    (tmp_path / "a.py").write_text("a = 2\n")
+    git("commit", "-qam", "change a")
+    (tmp_path / "b.py").write_text("b = 2\n")               # uncommitted
+    (tmp_path / "c.feature").write_text("Feature: c\n")     # untracked
+    (tmp_path / "notes.md").write_text("ignored\n")
+
+    assert impact.changed_files("main", tmp_path) == ["a.py", "b.py", "c.feature"]
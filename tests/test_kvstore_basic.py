@@ -1,4 +1,9 @@
 # tests/test_kvstore_basic.py
+import pytest
+
+# test_b reads what test_a wrote: keep them on one xdist worker (--dist=loadgroup; --schedule=durations once
+# the group is in the duration history)
+pytestmark = pytest.mark.xdist_group("kvstore")
 
 def test_a(testdata_store):
     """Writes a key into the shared KV store."""
@@ -0,0 +1,58 @@
+# tests/test_latency_histogram.py
+import json
+import math
+import random
+
+from src.utils.performance.latency_histogram import (
+    LatencyHistogram,
+    LatencyRegistry,
+    merge_worker_files,
+    write_merged,
+    write_worker_file,
+)
+
+
+def _exact(values, q):
+    s = sorted(values)
+    return s[math.ceil(q / 100 * len(s)) - 1]
+
+
+def test_percentiles_within_bucket_precision():
+    rnd = random.Random(7)
+    values = [rnd.lognormvariate(3, 1) for _ in range(20000)]
+    h = LatencyHistogram()
+    for v in values:
+        h.record(v)
+    for q in (50, 90, 99):
+        assert abs(h.percentile(q) / _exact(values, q) - 1) < 0.01
+    assert h.summary()["max_ms"] == round(max(values), 3)
+    assert len(h.counts) < 4000  # fixed bucket range, whatever the sample count
+
+
+def test_merge_matches_single_histogram_and_survives_json():
+    rnd = random.Random(1)
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i in range(5000):
+        v = rnd.uniform(0.05, 3000)
+        (a if i % 2 else b).record(v, error=i % 10 == 0)
+        both.record(v, error=i % 10 == 0)
+    merged = LatencyHistogram.from_dict(json.loads(json.dumps(a.to_dict()))).merge(b)
+    assert merged.summary() == both.summary()
+
+
+def test_worker_files_merge_per_endpoint(tmp_path):
+    gw0, gw1 = LatencyRegistry(), LatencyRegistry()
+    gw0.record("GET /users/{id}", 10.0)
+    gw0.record("POST /login", 200.0, error=True)
+    gw1.record("GET /users/{id}", 30.0)
+    write_worker_file("gw0", gw0, tmp_path)
+    write_worker_file("gw1", gw1, tmp_path)
+    assert write_worker_file("gw2", LatencyRegistry(), tmp_path) is None
+
+    merged = merge_worker_files(tmp_path)
+    rows = {r["endpoint"]: r for r in merged.summary_rows()}
+    assert rows["GET /users/{id}"]["count"] == 2 and rows["GET /users/{id}"]["max_ms"] == 30.0
+    assert rows["POST /login"]["errors"] == 1
+
+    out = json.loads(write_merged(merged, tmp_path / "api-latency.json").read_text())
+    assert out["endpoints"][0]["endpoint"] == "POST /login"  # slowest p99 first
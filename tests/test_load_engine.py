@@ -0,0 +1,82 @@
+# tests/test_load_engine.py
+import json
+import time
+from types import SimpleNamespace
+
+from src.performance.load_test.engine import ArrivalProfile, LoadEngine, LoadScenario, LoadTask
+from src.performance.scenarios.api_load import api_scenario
+
+
+def test_arrival_profiles_follow_the_rate():
+    assert len(list(ArrivalProfile.constant(10, 2).arrivals())) == 20
+    ramp = list(ArrivalProfile.ramp(0, 10, 2).arrivals())
+    assert len(ramp) == 10 and ramp[5] > 1.0  # more arrivals late in an upward ramp
+    spike = list(ArrivalProfile.spike(10, 100, 3, at=1, length=1).arrivals())
+    assert len(spike) == 120 and sum(1 <= t < 2 for t in spike) == 100
+    poisson = list(ArrivalProfile.constant(200, 5).arrivals(poisson=True))
+    assert 850 < len(poisson) < 1150 and poisson == sorted(poisson)
+
+
+def test_latency_is_measured_from_intended_start():
+    # 100 rps offered, one worker, 20 ms per task: the backlog grows, and the
+    # response time (from intended start) must show it while service time does not
+    scenario = LoadScenario("slow", [LoadTask("sleep", lambda u: time.sleep(0.02) or 200)], make_user=object)
+    result = LoadEngine(scenario, ArrivalProfile.constant(100, 0.2), max_concurrency=1).run()
+    assert result.completed == result.intended == 20 and result.errors == 0
+    response = dict(result.response.items())["sleep"]
+    service = dict(result.service.items())["sleep"]
+    assert service.percentile(99) < 60
+    assert response.percentile(99) > 150  # last arrival waited for ~19 others
+    assert result.peak_backlog > 5
+
+
+def test_failed_make_user_fails_the_arrival_and_is_retried():
+    attempts = []
+
+    def make_user():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("auth service down")
+        return object()
+
+    scenario = LoadScenario("flaky", [LoadTask("ok", lambda u: 200)], make_user=make_user)
+    result = LoadEngine(scenario, ArrivalProfile.constant(50, 0.1), max_concurrency=1).run()
+    assert result.completed == result.intended == 5 and result.errors == 1 and len(attempts) == 2
+    assert result.error_samples == {"make_user": "ConnectionError: auth service down"}
+
+
+def test_api_scenario_drives_the_wrappers_without_recording():
+    settings = SimpleNamespace(api_base_url="http://mock", timeout=5, connect_timeout=1,
+                               test_username="u", test_password="p")
+    scenario = api_scenario(settings, client="mock")
+    result = LoadEngine(scenario, ArrivalProfile.constant(300, 0.2), max_concurrency=4, seed=1).run()
+    assert result.completed == 60 and not result.error_samples
+    assert {r["task"] for r in result.rows()} <= {t.name for t in scenario.tasks}
+    user = scenario.make_user()
+    assert user.users._exec.skip_recording and user.users._exec.exchanges.total == 0
+
+
+def test_phase_shifted_workers_share_the_single_schedule():
+    profile = ArrivalProfile.spike(20, 200, 3, at=1, length=1)
+    single = list(profile.arrivals())
+    n = 3
+    union = sorted(t for k in range(n) for t in profile.scaled(1 / n).arrivals(phase=k / n))
+    assert len(union) == len(single)
+    assert max(abs(a - b) for a, b in zip(union, single)) < 1e-6
+
+
+def test_distributed_run_merges_workers_into_locust_layout(tmp_path):
+    from src.performance.load_test.distributed import DistributedLoadRunner, write_reports
+    from src.utils.performance.baselines import histograms_from_locust
+
+    runner = DistributedLoadRunner(ArrivalProfile.constant(200, 1), processes=2, concurrency=4,
+                                   client="mock", seed=1, interval_s=0.5, verbose=False)
+    result = runner.run()
+    assert result.completed == result.intended == 200 and result.errors == 0
+    assert runner.history and runner.history[-1]["completed"] == 200
+
+    out = write_reports(result, runner.history, tmp_path)
+    hists, rps = histograms_from_locust(out["stats"])
+    assert "GET /users/{user_id}" in hists and sum(h.count for h in hists.values()) >= 200
+    again = type(result).from_dict(json.loads(out["json"].read_text()))
+    assert again.completed == 200 and dict(again.response.items()).keys() == dict(result.response.items()).keys()
@@ -0,0 +1,46 @@
+# tests/test_log_sampling.py
+import pytest
+
+from src.api.execution.endpoints import endpoint_key
+from src.api.execution.log_sampling import LogSampler
+
+
+def test_endpoint_key_collapses_ids_and_query():
+    assert endpoint_key("get", "http://h/users/42?x=1") == "GET /users/{user_id}"  # UserAPI.get_user template
+    assert endpoint_key("GET", "/orders/3f2b8c1e-1111-2222-3333-444455556666/items") == "GET /orders/{id}/items"
+
+
+def test_first_n_and_every_k_are_per_endpoint_and_keep_failures():
+    first = LogSampler("first", first_n=2)
+    kept = [first.should_log("GET", f"/users/{i}", 200) for i in range(4)]
+    assert kept == [True, True, False, False]
+    assert first.should_log("GET", "/orders", 200)  # separate budget
+    assert first.should_log("GET", "/users/9", 500)
+    assert first.suppressed == 2
+
+    every = LogSampler("every", every_k=3)
+    assert [every.should_log("POST", "/login", 200) for _ in range(7)] == [True, False, False, True, False, False, True]
+
+
+def test_errors_and_failure_modes():
+    errors = LogSampler("errors")
+    assert not errors.should_log("GET", "/a", 200)
+    assert errors.should_log("GET", "/a", 404) and errors.should_log("GET", "/a", 0)
+    failure = LogSampler("failure")
+    assert not failure.should_log("GET", "/a", 500)
+    with pytest.raises(ValueError):
+        LogSampler("sometimes")
+
+
+def test_recent_calls_buffer_is_bounded_and_dumped_on_failure(capsys, fake_executor):
+    ex = fake_executor(statuses=[200, 200, 200, 200, 500], api_log_sampling="failure", api_log_buffer_size=3)
+    for i in range(5):
+        ex(ctx={"api_client": "requests"}, step=f"step {i}", method="GET", path=f"/items/{i}")
+
+    assert [c["step"] for c in ex.exchanges.snapshot()] == ["step 2", "step 3", "step 4"]
+    assert not any(c["logged"] for c in ex.exchanges.snapshot())
+
+    ex.log_last_response_on_failure()
+    out = capsys.readouterr().out
+    assert "RECENT API CALLS" in out and "/items/2" in out and "/items/3" in out
+    assert "/items/1" not in out
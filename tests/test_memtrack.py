@@ -0,0 +1,34 @@
+# tests/test_memtrack.py
+from src.utils.performance import memtrack
+from src.utils.performance.memtrack import MemTracker
+
+_LEAK = []
+
+
+def _leaky():
+    _LEAK.extend(bytearray(1024) for _ in range(600))   # ~600 KB kept alive
+
+
+def test_growth_over_threshold_names_the_allocation_site(tmp_path):
+    tracker = MemTracker(threshold_kb=256).start()
+    try:
+        tracker.begin("clean")
+        [bytearray(1024) for _ in range(600)]              # allocated, then freed
+        clean = tracker.end("clean")
+        tracker.begin("leaky")
+        _leaky()
+        leaky = tracker.end("leaky")
+    finally:
+        tracker.stop()
+        _LEAK.clear()
+
+    assert clean["growth_kb"] < 256 and clean["peak_kb"] > 500
+    assert leaky["growth_kb"] > 500
+    [flagged] = tracker.flagged
+    assert flagged["test"] == "leaky" and flagged["top"][0]["where"].endswith("test_memtrack.py:9")
+    assert flagged["tracebacks"][0]["traceback"][0].endswith("test_memtrack.py:9")
+
+    out = memtrack.write_worker_file("gw0", tracker, tmp_path)
+    merged = memtrack.merge_worker_files(tmp_path)
+    assert out.name == "gw0.memtrack.json" and merged["flagged"][0]["worker"] == "gw0"
+    assert any("leaky" in line for line in memtrack.format_summary(merged))
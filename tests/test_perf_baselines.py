@@ -0,0 +1,74 @@
+# tests/test_perf_baselines.py
+import random
+
+from src.utils.performance.baselines import (
+    BaselineStore,
+    Thresholds,
+    compare,
+    histograms_from_locust,
+    mann_whitney,
+)
+from src.utils.performance.latency_histogram import LatencyHistogram
+
+
+def _hist(rnd, n, scale=1.0):
+    h = LatencyHistogram()
+    for _ in range(n):
+        h.record(rnd.lognormvariate(3, 0.4) * scale)
+    return h
+
+
+def test_slowdown_is_flagged_and_noise_is_not():
+    rnd = random.Random(3)
+    base = _hist(rnd, 2000)
+    rows = compare(
+        {"GET /slow": _hist(rnd, 300, 1.25), "GET /same": _hist(rnd, 300), "GET /few": _hist(rnd, 5), "GET /new": _hist(rnd, 50)},
+        {"GET /slow": base, "GET /same": base, "GET /few": base},
+        thresholds=Thresholds(),
+    )
+    status = {r["endpoint"]: r["status"] for r in rows}
+    assert status == {"GET /slow": "regression", "GET /same": "ok", "GET /few": "insufficient", "GET /new": "new"}
+    slow = rows[0]
+    assert slow["endpoint"] == "GET /slow" and slow["ci"][0] > 1.0 and slow["p_value"] < 1e-6
+
+    false_positives = sum(
+        compare({"x": _hist(rnd, 200)}, {"x": base}, thresholds=Thresholds())[0]["status"] == "regression"
+        for _ in range(50)
+    )
+    assert false_positives == 0
+
+
+def test_mann_whitney_is_symmetric():
+    rnd = random.Random(5)
+    a, b = _hist(rnd, 200), _hist(rnd, 200, 0.8)
+    p_slower, p_faster, effect = mann_whitney(a, b)
+    q_slower, q_faster, back = mann_whitney(b, a)
+    assert p_slower < 1e-6 and abs(p_slower - q_faster) < 1e-12 and abs(effect + back - 1) < 1e-9
+
+
+def test_store_keeps_a_rolling_window_and_throughput_drop_regresses(tmp_path):
+    rnd = random.Random(9)
+    store = BaselineStore("dev", "locust-api", root=tmp_path, max_runs=2)
+    for rps in (100.0, 90.0, 95.0):
+        store.add_run({"GET /users/{user_id}": _hist(rnd, 200)}, {"GET /users/{user_id}": rps})
+    assert len(store.runs()) == 2
+    hists, base_rps = store.baseline()
+    assert hists["GET /users/{user_id}"].count == 400 and base_rps["GET /users/{user_id}"] == [90.0, 95.0]
+
+    rows = compare(hists, {**hists}, rps={"GET /users/{user_id}": 70.0}, baseline_rps=base_rps, thresholds=Thresholds())
+    assert rows[0]["status"] == "regression" and rows[0]["reasons"] == ["throughput -22%"]
+
+
+def test_locust_stats_become_histograms(tmp_path):
+    csv_path = tmp_path / "api_performance_stats.csv"
+    csv_path.write_text(
+        "Type,Name,Request Count,Failure Count,Min Response Time,Max Response Time,Requests/s,"
+        "50%,66%,75%,80%,90%,95%,98%,99%,99.9%,99.99%,100%\n"
+        "GET,/users/42,1000,10,5,400,25.5,20,24,27,30,40,60,90,120,300,400,400\n"
+        ",Aggregated,1000,10,5,400,25.5,20,24,27,30,40,60,90,120,300,400,400\n"
+    )
+    hists, rps = histograms_from_locust(csv_path)
+    h = hists["GET /users/{user_id}"]
+    assert h.count == 1000 and h.errors == 10 and rps == {"GET /users/{user_id}": 25.5}
+    assert abs(h.percentile(50) / 20 - 1) < 0.01 and abs(h.percentile(90) / 40 - 1) < 0.01
+    assert h.summary()["max_ms"] == 400.0
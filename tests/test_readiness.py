@@ -0,0 +1,145 @@
+# tests/test_readiness.py
+from types import SimpleNamespace
+
+import pytest
+
+from src.pages.base_page import BasePage
+from src.pages.login_page import LoginPage
+from src.utils.performance.latency_histogram import format_rows
+from src.utils.ui.readiness import NetworkTracker, Readiness, open_until_ready, readiness_registry, wait_until_ready
+
+
+class _Page:
+    """Replays scripted network events as time passes in wait_for_timeout()."""
+
+    def __init__(self, clock, script=()):
+        self.clock, self.script, self.calls, self.handlers = clock, sorted(script, key=lambda e: e[0]), [], {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.handlers[event].remove(handler)
+
+    def wait_for_timeout(self, ms):
+        self.clock.now += ms / 1000.0
+        while self.script and self.script[0][0] <= self.clock.now:
+            _, event, request = self.script.pop(0)
+            for handler in self.handlers.get(event, []):
+                handler(request)
+
+    def goto(self, url, wait_until=None, timeout=None):
+        self.calls.append(("goto", url, wait_until))
+
+    def wait_for_load_state(self, state, timeout=None):
+        self.calls.append(("load_state", state))
+
+    def wait_for_function(self, js, timeout=None):
+        self.calls.append(("function", js))
+
+    def locator(self, selector):
+        first = SimpleNamespace(wait_for=lambda state, timeout: self.calls.append(("visible", selector)))
+        return SimpleNamespace(first=first)
+
+
+class _Request:
+    def __init__(self, url, resource_type="fetch"):
+        self.url, self.resource_type = url, resource_type
+
+
+def test_quiet_ignores_polling_and_long_lived_requests(fake_clock):
+    clock = fake_clock
+    api, poll, sse = _Request("http://app/api/me"), _Request("http://app/api/poll?n=1"), _Request("http://app/events", "xhr")
+    page = _Page(clock, [(0.01, "request", api), (0.02, "request", sse), (0.3, "requestfinished", api)]
+                 + [(0.1 * i, "request", poll) for i in range(1, 100)])
+    tracker = NetworkTracker(page, ignore=[r"/api/poll"], long_ms=200, clock=clock).attach()
+    assert tracker.wait_quiet(idle_ms=250, timeout_ms=5_000, sleep=page.wait_for_timeout)
+    # the API call ended at 0.3 s; the SSE stream (open since 0.02 s) stopped counting at 0.22 s
+    assert 0.55 <= clock.now < 0.65 and tracker.requests == 2 and tracker.busy() == 0
+
+    busy = _Page(clock, [(clock.now + 0.1 * i, "request", _Request(f"http://app/api/{i}")) for i in range(1, 100)])
+    never = NetworkTracker(busy, clock=clock).attach()
+    assert not never.wait_quiet(idle_ms=250, timeout_ms=1_000, sleep=busy.wait_for_timeout)
+    never.detach()
+    assert busy.handlers == {"request": [], "requestfinished": [], "requestfailed": []}
+
+
+def test_page_objects_wait_per_their_strategy_and_are_timed(monkeypatch, fake_clock):
+    class _AppPage(BasePage):
+        readiness = Readiness("signal", signal="appReady", locator="main")
+
+        def navigate(self):
+            return self.open("/app")
+
+    readiness_registry().clear()
+    page = _Page(fake_clock)
+    LoginPage(page).navigate()
+    assert page.calls == [("goto", "/login", "domcontentloaded"), ("load_state", "domcontentloaded"),
+                          ("visible", "#username")]
+    page.calls.clear()
+    _AppPage(page).navigate()
+    assert ("function", "() => Boolean(window.appReady)") in page.calls and page.calls[-1] == ("visible", "main")
+
+    monkeypatch.setenv("UI_READINESS", "networkidle")
+    legacy = _Page(fake_clock)
+
+    class _Plain(BasePage):
+        def navigate(self):
+            self.page.goto("/")
+            return self.wait_for_page_load(timeout=5_000)
+
+    _Plain(legacy).navigate()
+    assert legacy.calls == [("goto", "/", None), ("load_state", "networkidle")]
+
+    rows = readiness_registry().summary_rows()
+    assert sorted(r["endpoint"] for r in rows) == ["LoginPage (dom)", "_AppPage (signal)", "_Plain (networkidle)"]
+    assert "page (strategy)" in format_rows(rows, label="page (strategy)")[0]
+    readiness_registry().clear()
+
+    with pytest.raises(ValueError):
+        Readiness("signal")
+
+
+def test_stages_share_one_timeout(fake_clock):
+    clock, timeouts = fake_clock, []
+
+    class _SlowPage(_Page):
+        def wait_for_load_state(self, state, timeout=None):
+            timeouts.append(timeout)
+            self.clock.now += 4.0
+
+        def wait_for_function(self, js, timeout=None):
+            timeouts.append(timeout)
+            self.clock.now += 5.5
+
+        def locator(self, selector):
+            return SimpleNamespace(first=SimpleNamespace(wait_for=lambda state, timeout: timeouts.append(timeout)))
+
+    wait_until_ready(_SlowPage(clock), Readiness("signal", signal="appReady", locator="main"), "Slow",
+                     timeout_ms=10_000, clock=clock)
+    assert timeouts == [10_000, 6_000, 500]
+    readiness_registry().clear()
+
+
+def test_goto_spends_from_the_same_timeout_and_failures_are_recorded(fake_clock):
+    clock, timeouts = fake_clock, []
+
+    class _SlowGoto(_Page):
+        def goto(self, url, wait_until=None, timeout=None):
+            timeouts.append(timeout)
+            self.clock.now += 7.0
+            if url == "/down":
+                raise TimeoutError("net::ERR_CONNECTION_REFUSED")
+
+        def wait_for_load_state(self, state, timeout=None):
+            timeouts.append(timeout)
+
+    readiness_registry().clear()
+    open_until_ready(_SlowGoto(clock), "/app", Readiness("dom"), "Slow", clock=clock)
+    assert timeouts == [30_000, 23_000]
+
+    with pytest.raises(TimeoutError):
+        open_until_ready(_SlowGoto(clock), "/down", Readiness("dom"), "Slow", clock=clock)
+    [row] = readiness_registry().summary_rows()
+    assert row["endpoint"] == "Slow (dom)" and row["count"] == 2 and row["errors"] == 1
+    readiness_registry().clear()
@@ -0,0 +1,51 @@
+# tests/test_resource_sampler.py
+import os
+import time
+
+from src.utils.performance import resource_sampler
+from src.utils.performance.metrics_collector import MetricsCollector
+from src.utils.performance.resource_sampler import ResourceSampler
+
+
+def test_per_test_delta_shows_leaked_memory_and_descriptors():
+    sampler = ResourceSampler(interval_s=0.01)
+    kept = []
+    sampler.begin("leaky")
+    kept.append(bytearray(64 * 1024 * 1024))
+    kept.append(os.open(os.devnull, os.O_RDONLY))
+    delta = sampler.end("leaky")
+    try:
+        assert delta["rss_delta_mb"] > 50 and delta["peak_rss_mb"] >= delta["rss_mb"]
+        assert delta["fds_delta"] == 1
+    finally:
+        os.close(kept.pop())
+    kept.clear()
+
+
+def test_ring_buffer_keeps_the_newest_samples(tmp_path):
+    sampler = ResourceSampler(interval_s=0.005, capacity=8).start()
+    time.sleep(0.2)
+    sampler.stop()
+    cols = sampler.samples()
+    assert len(sampler) == 8 and sampler._n > 8
+    assert cols["t"] == sorted(cols["t"]) and len(cols["rss"]) == 8
+
+    for i in range(12):
+        sampler.begin(f"t{i}")
+        sampler.end(f"t{i}")
+    out = resource_sampler.write_worker_file("gw0", sampler, tmp_path)
+    merged = resource_sampler.merge_worker_files(tmp_path)
+    assert out.exists() and len(merged["tests"]) == 12
+    assert merged["workers"]["gw0"]["rss_mb_per_100_tests"] is not None
+    assert resource_sampler.format_summary(merged)
+
+
+def test_metrics_collector_keeps_its_summary_shape():
+    collector = MetricsCollector(interval_s=0.01)
+    collector.start_collection()
+    for ms in (10, 20, 30):
+        collector.record_response_time("login", ms)
+    collector.stop_collection()
+    summary = collector.get_performance_summary()
+    assert summary["total_operations"] == 3 and 19 < summary["avg_response_time"] < 21
+    assert summary["resources"]["rss_end_mb"] > 0
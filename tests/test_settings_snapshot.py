@@ -0,0 +1,25 @@
+# tests/test_settings_snapshot.py
+import json
+import os
+
+from src.config.settings import Settings
+
+
+def test_snapshot_roundtrip_keeps_resolved_values(settings):
+    snapshot = json.loads(json.dumps(settings.to_snapshot()))  # what a worker receives
+    clone = Settings.from_snapshot(snapshot)
+    assert clone.api_base_url == settings.api_base_url
+    assert clone.timeout == settings.timeout
+    assert clone.test_data == settings.test_data
+    assert clone.config_sources == settings.config_sources
+
+
+def test_snapshot_carries_dotenv_values_without_overriding_the_worker_env(settings, monkeypatch):
+    snapshot = json.loads(json.dumps(settings.to_snapshot()))
+    snapshot["dotenv"] = {"UI_READINESS": "dom", "API_RECORD": "1"}
+    monkeypatch.delenv("UI_READINESS", raising=False)
+    monkeypatch.setenv("API_RECORD", "0")          # set on the worker itself: wins, as with load_dotenv(override=False)
+    clone = Settings.from_snapshot(snapshot)
+    assert os.environ["UI_READINESS"] == "dom" and os.environ["API_RECORD"] == "0"
+    assert "dotenv" in snapshot and not hasattr(clone, "dotenv")
+    monkeypatch.delenv("UI_READINESS")
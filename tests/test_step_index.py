@@ -0,0 +1,68 @@
+# tests/test_step_index.py
+from src.utils.step_index import FeatureStep, StepDef, StepIndexCache, analyse, extract_step_defs
+
+STEPS_SRC = '''
+from pytest_bdd import given, when, then, parsers
+
+@given("I am logged in")
+def logged_in(): pass
+
+@when(parsers.parse('I open the "{page}" page'))
+def open_page(page): pass
+
+@when(parsers.parse('I open the {what} page'))
+def open_any(what): pass
+
+@then(parsers.re(r"I see (?P<n>\\d+) items"))
+def see_items(n): pass
+
+@then("nothing uses me")
+def unused(): pass
+'''
+
+
+def _step(type_, text, line=1):
+    return FeatureStep(type_, text, "features/x.feature", line, "S")
+
+
+def test_extract_reads_all_parser_kinds(tmp_path):
+    f = tmp_path / "x_steps.py"
+    f.write_text(STEPS_SRC, encoding="utf-8")
+    defs = extract_step_defs(f, "step_definitions/x_steps.py")
+    assert [(d.type, d.kind) for d in defs] == [
+        ("given", "string"), ("when", "parse"), ("when", "parse"), ("then", "re"), ("then", "string"),
+    ]
+
+
+def test_analyse_reports_ambiguous_unused_unmatched_and_duplicates(tmp_path):
+    f = tmp_path / "x_steps.py"
+    f.write_text(STEPS_SRC, encoding="utf-8")
+    defs = extract_step_defs(f, "step_definitions/x_steps.py")
+    defs.append(StepDef("given", "string", "I am logged in", "step_definitions/y_steps.py", 3, "again"))
+
+    report = analyse(defs, [
+        _step("given", "I am logged in"),
+        _step("when", 'I open the "home" page', 2),
+        _step("then", "I see 3 items", 3),
+        _step("given", "I see 3 items", 4),  # wrong keyword
+    ])
+
+    assert len(report.duplicates) == 1
+    assert [fs.line for fs, _ in report.ambiguous] == [2]
+    assert [d.func for d in report.unused] == ["unused"]
+    (missing, other_types), = report.unmatched
+    assert missing.line == 4 and other_types[0].func == "see_items"
+    assert any({a.func, b.func} == {"open_page", "open_any"} for a, b in report.overlaps)
+
+
+def test_step_files_that_do_not_parse_are_skipped(tmp_path):
+    steps = tmp_path / "step_definitions"
+    steps.mkdir()
+    (steps / "ok_steps.py").write_text(STEPS_SRC, encoding="utf-8")
+    (steps / "broken_steps.py").write_text("@given('x'\ndef broken(:\n", encoding="utf-8")
+    cache = StepIndexCache(tmp_path / "index.json")
+    defs = cache.step_defs(steps, tmp_path)
+    assert {d.file for d in defs} == {"step_definitions/ok_steps.py"} and len(defs) == 5
+    assert len(cache.errors) == 1 and cache.errors[0].startswith("step_definitions/broken_steps.py")
+    cache.save()
+    assert "step_definitions/broken_steps.py" not in StepIndexCache(tmp_path / "index.json").files
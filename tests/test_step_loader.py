@@ -0,0 +1,49 @@
+# tests/test_step_loader.py
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.utils import step_loader
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class _Item:
+    def __init__(self, *marks, bdd=True):
+        self.fixturenames = ["request", "_pytest_bdd_example"] if bdd else ["request"]
+        self.obj = None
+        self._marks = [SimpleNamespace(name=m) for m in marks]
+
+    def iter_markers(self):
+        return iter(self._marks)
+
+
+def test_discover_groups_step_modules_by_package():
+    found = step_loader.discover(ROOT / "step_definitions", ROOT)
+    assert "step_definitions.api.auth_api_steps" in found["api"]
+    assert all(m.startswith("step_definitions.mobile.") for m in found["mobile"])
+
+
+def test_api_selection_skips_ui_and_mobile_steps():
+    available = ["api", "ui", "mobile", "e2e", "shared", "environments_specific"]
+    assert step_loader.packages_for_items([_Item("api", "smoke")], available) == {
+        "api", "shared", "environments_specific"
+    }
+    assert step_loader.packages_for_items([_Item(bdd=False)], available) == set()
+    # Mixed journeys or untagged scenarios load everything
+    assert step_loader.packages_for_items([_Item("mixed")], available) == set(available)
+    assert step_loader.packages_for_items([_Item("smoke")], available) == set(available)
+
+
+def test_a_step_module_that_fails_to_import_is_reported_not_raised(monkeypatch):
+    monkeypatch.setattr(step_loader, "IMPORT_ERRORS", {})
+    registered = {}
+
+    def import_plugin(mod):
+        if mod == "steps.broken_steps":
+            raise SyntaxError("invalid syntax (broken_steps.py, line 3)")
+        registered[mod] = object()
+
+    config = SimpleNamespace(pluginmanager=SimpleNamespace(get_plugin=registered.get, import_plugin=import_plugin))
+    assert step_loader.register(config, ["steps.broken_steps", "steps.ok_steps"]) == ["steps.ok_steps"]
+    assert step_loader.IMPORT_ERRORS == {"steps.broken_steps": "SyntaxError: invalid syntax (broken_steps.py, line 3)"}
+    assert step_loader.register(config, ["steps.broken_steps"]) == []       # not retried per worker loop
@@ -0,0 +1,42 @@
+# tests/test_timing.py
+import pytest
+
+from src.api.execution.timing import CallTimer, response_time_ms
+from src.utils.api.api_helpers import APIHelpers
+
+
+def test_call_timer_converts_phases_to_ms():
+    ticks = iter([1.0, 1.25])
+    timer = CallTimer("requests", clock=lambda: next(ticks))
+    out = timer.stop(clock=lambda: next(ticks), ttfb_s=0.2, dns_s=None).as_dict()
+    assert out == {"total_ms": 250.0, "ttfb_ms": 200.0, "source": "requests"}
+
+
+def test_executor_records_timing_on_last_response_and_trace(fake_executor):
+    ex = fake_executor(elapsed_ms=40)
+    ex(ctx={"api_client": "requests"}, step="s", method="GET", path="/ping")
+
+    timing = ex.last_response["timing"]
+    assert timing["source"] == "requests" and timing["ttfb_ms"] == 40.0
+    assert ex.last_response["duration_ms"] == timing["total_ms"] >= 0
+    assert ex.recorder.calls[0]["timing"] is timing
+    assert response_time_ms(ex, "ttfb_ms") == 40.0
+
+
+def test_assert_response_time_uses_measured_data(fake_executor):
+    ex = fake_executor(elapsed_ms=40)
+    ex(ctx={"api_client": "mock"}, step="s", method="GET", path="/ping")
+    APIHelpers.assert_response_time(ex, max_time_ms=5000)
+    APIHelpers.assert_response_time(ex.rq.request(), max_time_ms=50)
+    with pytest.raises(AssertionError, match="limit 10"):
+        APIHelpers.assert_response_time({"timing": {"total_ms": 12.5}}, max_time_ms=10)
+    with pytest.raises(AssertionError, match="No ttfb_ms timing"):
+        APIHelpers.assert_response_time(ex, phase="ttfb_ms")  # mock transport has no TTFB
+
+
+def test_only_real_transports_feed_the_latency_registry(fake_executor, isolated_latency_registry):
+    ex = fake_executor()
+    ex(ctx={"api_client": "mock"}, step="s", method="GET", path="/ping")
+    assert len(isolated_latency_registry) == 0 and not ex.endpoints
+    ex(ctx={"api_client": "requests"}, step="s", method="GET", path="/ping")
+    assert ex.endpoints == {"GET /ping"} and len(isolated_latency_registry) == 1